@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  synthetic beamlines of in-process devices """
+
+import json
+
+from .fakes import (FakeTango, FakeConfigServer, FakePool, FakeMacroServer,
+                    FakeDoor, FakeChannel)
+
+
+class SyntheticBeamline(object):
+
+    """ beamline with a configuration server, a macro server, a door,
+    a pool and its channels. The datasources are TANGO datasources of
+    the channels followed by chains of PYEVAL datasources, each of them
+    evaluating the previous one, and they are spread over components
+    with one STEP field per datasource.
+    """
+
+    #: (:obj:`str`) configuration server name
+    configServer = "p09/nxsconfigserver/bench"
+    #: (:obj:`str`) macro server name
+    macroServer = "p09/macroserver/bench"
+    #: (:obj:`str`) door name
+    door = "p09/door/bench"
+    #: (:obj:`str`) pool name
+    pool = "p09/pool/bench"
+    #: (:obj:`str`) measurement group name
+    mntGrp = "nxsbenchmg"
+    #: (:obj:`str`) timer name
+    timer = "exp_t01"
+
+    def __init__(self, components=10, datasources=100, channels=20,
+                 depth=2, latency=0.0):
+        """ constructor
+
+        :param components: number of components
+        :type components: :obj:`int`
+        :param datasources: number of component datasources
+        :type datasources: :obj:`int`
+        :param channels: number of pool channels
+        :type channels: :obj:`int`
+        :param depth: depth of PYEVAL datasource chains
+        :type depth: :obj:`int`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        """
+        #: (:obj:`int`) number of components
+        self.ncomponents = max(int(components), 1)
+        #: (:obj:`int`) number of component datasources
+        self.ndatasources = max(int(datasources), 1)
+        #: (:obj:`int`) number of pool channels
+        self.nchannels = max(int(channels), 1)
+        #: (:obj:`int`) depth of PYEVAL datasource chains
+        self.depth = max(int(depth), 0)
+        #: (:obj:`float`) delay of each remote call in seconds
+        self.latency = latency
+
+    def channels(self):
+        """ provides pool channels with their device names
+
+        :returns: (channel name, device name, controller name) tuples
+        :rtype: :obj:`list` <(:obj:`str`, :obj:`str`, :obj:`str`)>
+        """
+        res = [(self.timer, "expchan/dgg2ctrl01/1", "dgg2ctrl01")]
+        for i in range(1, self.nchannels):
+            ctrl = "ctctrl%02d" % (i // 32 + 1)
+            res.append(("exp_c%04d" % i, "expchan/%s/%s" % (ctrl, i % 32 + 1),
+                        ctrl))
+        return res
+
+    def components(self):
+        """ provides component names
+
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return ["bench_cp%04d" % i for i in range(self.ncomponents)]
+
+    def datasources(self):
+        """ provides component datasource names
+
+        :returns: datasource names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return ["bench_ds%05d" % i for i in range(self.ndatasources)]
+
+    def datasourceDevice(self, index):
+        """ provides device read by the datasource, i.e. by the TANGO
+        datasource starting its PYEVAL chain
+
+        :param index: datasource index
+        :type index: :obj:`int`
+        :returns: device name
+        :rtype: :obj:`str`
+        """
+        channels = self.channels()
+        return channels[(index // (self.depth + 1)) % len(channels)][1]
+
+    def componentDevices(self, index, level=None):
+        """ provides devices read by the component datasources
+
+        :param index: component index
+        :type index: :obj:`int`
+        :param level: maximal position in PYEVAL datasource chains
+                      of taken datasources, all if None
+        :type level: :obj:`int`
+        :returns: device names
+        :rtype: :obj:`set` <:obj:`str`>
+        """
+        return set(self.datasourceDevice(ds) for ds in range(
+            index, self.ndatasources, self.ncomponents)
+            if level is None or ds % (self.depth + 1) <= level)
+
+    def datasourceXML(self, index):
+        """ provides xml of the datasource. Datasources are grouped into
+        chains of the depth + 1 length starting with a TANGO datasource
+
+        :param index: datasource index
+        :type index: :obj:`int`
+        :returns: datasource xml
+        :rtype: :obj:`str`
+        """
+        names = self.datasources()
+        if index % (self.depth + 1) == 0:
+            body = '<datasource type="TANGO" name="%s">' \
+                '<device member="attribute" name="%s"/>' \
+                '<record name="Value"/></datasource>' % (
+                    names[index], self.datasourceDevice(index))
+        else:
+            body = '<datasource type="PYEVAL" name="%s">' \
+                '<result name="result">' \
+                'ds.result = ds.%s + 1</result> $datasources.%s' \
+                '</datasource>' % (names[index], names[index - 1],
+                                   names[index - 1])
+        return "<?xml version='1.0' encoding='utf8'?><definition>%s" \
+            "</definition>" % body
+
+    def componentXML(self, index):
+        """ provides xml of the component with STEP fields of
+        its datasources
+
+        :param index: component index
+        :type index: :obj:`int`
+        :returns: component xml
+        :rtype: :obj:`str`
+        """
+        name = self.components()[index]
+        fields = "".join(
+            '<field type="NX_FLOAT64" name="%s">'
+            '<strategy mode="STEP"/>$datasources.%s</field>' % (ds, ds)
+            for ds in self.datasources()[index::self.ncomponents])
+        return "<?xml version='1.0' encoding='utf8'?><definition>" \
+            "<group type=\"NXentry\" name=\"$var.entryname#'scan'" \
+            "$var.serialno\"><group type=\"NXinstrument\" " \
+            "name=\"instrument\"><group type=\"NXcollection\" " \
+            "name=\"%s\">%s</group></group></group></definition>" \
+            % (name, fields)
+
+    def build(self, registry=None):
+        """ creates the in-process devices
+
+        :param registry: registry of the devices, a new one if None
+        :type registry: :class:`benchmarks.fakes.FakeTango`
+        :returns: registry of the devices
+        :rtype: :class:`benchmarks.fakes.FakeTango`
+        """
+        registry = registry if registry is not None else FakeTango()
+        cs = registry.add(FakeConfigServer(self.configServer, self.latency))
+        for i, name in enumerate(self.datasources()):
+            cs.datasources[name] = self.datasourceXML(i)
+        for i, name in enumerate(self.components()):
+            cs.components[name] = self.componentXML(i)
+
+        pool = registry.add(FakePool(self.pool, self.latency))
+        for name, device, ctrl in self.channels():
+            registry.add(FakeChannel(device, self.latency), name)
+            pool.attr_ExpChannelList.append(json.dumps({
+                "name": name, "full_name": device, "controller": ctrl,
+                "source": "%s/Value" % device, "type": "CTExpChannel",
+                "interfaces": ["Object", "PoolObject", "PoolElement",
+                               "ExpChannel", "CTExpChannel"]}))
+            pool.attr_AcqChannelList.append(json.dumps({
+                "name": name, "full_name": "%s/Value" % device}))
+
+        registry.add(FakeMacroServer(
+            self.macroServer, self.latency,
+            {"PoolNames": [self.pool]})).attr_DoorList = [self.door]
+        registry.add(FakeDoor(self.door, self.latency))
+        return registry
+
+    def selection(self):
+        """ provides profile with all components and pool channels
+        selected and the timer
+
+        :returns: profile configuration
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`str`>
+        """
+        return {
+            "ComponentSelection": json.dumps(
+                dict((cp, True) for cp in self.components())),
+            "DataSourceSelection": json.dumps(
+                dict((ch[0], True) for ch in self.channels()[1:])),
+            "Timer": json.dumps([self.timer]),
+        }
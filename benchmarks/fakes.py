@@ -0,0 +1,1292 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  in-process stand-ins of tango devices
+
+The devices are modelled on the test servers, i.e. test/TestConfigServer.py,
+test/TestPool.py, test/TestMacroServer.py and test/TestMG.py. They live
+in a :class:`FakeTango` registry which is plugged into nxsrecconfig with
+the factories of :class:`nxsrecconfig.Utils.TangoUtils`, so no Tango
+database nor device servers are needed. Every remote call of a proxy
+is serialized per device and delayed by the device latency.
+"""
+
+import itertools
+import json
+import pickle
+import re
+import sys
+import threading
+import time
+
+try:
+    import tango
+except Exception:
+    import PyTango as tango
+
+from nxsrecconfig.Utils import Utils, TangoUtils
+
+
+def pickleloads(bytestr):
+    """ loads pickle byte string
+
+    :param bytestr: byte string to convert
+    :type bytesstr: :obj:`bytes`
+    :returns: loaded bytestring
+    :rtype: :obj:`any`
+    """
+    if sys.version_info > (3,):
+        return pickle.loads(bytestr, encoding='latin1')
+    else:
+        return pickle.loads(bytestr)
+
+
+class FakeDeviceAttribute(object):
+
+    """ reading of a device attribute
+    """
+
+    def __init__(self, name, value=None, failed=False):
+        """ constructor
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        :param failed: reading failed flag
+        :type failed: :obj:`bool`
+        """
+        #: (:obj:`str`) attribute name
+        self.name = name
+        #: (`any`) attribute value
+        self.value = value
+        #: (:obj:`bool`) reading failed flag
+        self.has_failed = failed
+        #: (:obj:`int`) x dimension
+        self.dim_x = 0
+        #: (:obj:`int`) y dimension
+        self.dim_y = 0
+        if isinstance(value, (list, tuple)):
+            self.dim_x = len(value)
+            if value and isinstance(value[0], (list, tuple)):
+                self.dim_y = len(value)
+                self.dim_x = len(value[0])
+
+
+class FakeAttributeInfo(object):
+
+    """ configuration of a device attribute
+    """
+
+    def __init__(self, name, value=None, unit="No unit"):
+        """ constructor
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value defining format and type
+        :type value: `any`
+        :param unit: attribute unit
+        :type unit: :obj:`str`
+        """
+        reading = FakeDeviceAttribute(name, value)
+        item = value
+        while isinstance(item, (list, tuple)):
+            item = item[0] if item else 0.
+        #: (:obj:`str`) attribute name
+        self.name = name
+        #: (:obj:`str`) attribute unit
+        self.unit = unit
+        #: (:class:`tango.CmdArgType`) attribute data type
+        self.data_type = tango.CmdArgType.DevDouble
+        if isinstance(item, bool):
+            self.data_type = tango.CmdArgType.DevBoolean
+        elif isinstance(item, int):
+            self.data_type = tango.CmdArgType.DevLong
+        elif not isinstance(item, float):
+            self.data_type = tango.CmdArgType.DevString
+        #: (:class:`tango.AttrDataFormat`) attribute data format
+        self.data_format = tango.AttrDataFormat.SCALAR
+        if reading.dim_y:
+            self.data_format = tango.AttrDataFormat.IMAGE
+        elif isinstance(value, (list, tuple)):
+            self.data_format = tango.AttrDataFormat.SPECTRUM
+        #: (:obj:`int`) maximal x dimension
+        self.max_dim_x = reading.dim_x
+        #: (:obj:`int`) maximal y dimension
+        self.max_dim_y = reading.dim_y
+
+
+class FakeEvent(object):
+
+    """ event pushed to subscribers
+    """
+
+    def __init__(self, name, value=None, err=False):
+        """ constructor
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        :param err: error flag
+        :type err: :obj:`bool`
+        """
+        #: (:obj:`str`) attribute name
+        self.attr_name = name
+        #: (:class:`FakeDeviceAttribute`) attribute reading
+        self.attr_value = FakeDeviceAttribute(name, value)
+        #: (:obj:`bool`) error flag
+        self.err = err
+
+
+class FakeDevice(object):
+
+    """ in-process tango device with attributes stored in attr_<name>
+    members, commands implemented by methods and an optional read_<name>
+    or write_<name> method overriding the attribute access
+    """
+
+    #: (:obj:`str`) tango class name
+    klass = "Device"
+    #: (:obj:`list` <:obj:`str`>) command names
+    commands = ["SetState"]
+    #: (:obj:`list` <:obj:`str`>) attribute names
+    attributes = []
+    #: (:class:`itertools.count`) event subscription ids
+    __ids = itertools.count(1)
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        #: (:obj:`str`) device name
+        self.name = name
+        #: (:obj:`float`) delay of each remote call in seconds
+        self.latency = latency
+        #: (:class:`tango.DevState`) device state
+        self.state = tango.DevState.ON
+        #: (:obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>) properties
+        self.properties = dict(properties or {})
+        #: (:class:`FakeTango`) registry of the device
+        self.registry = None
+        #: (:class:`threading.Lock`) lock serializing remote calls
+        self.lock = threading.Lock()
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) command names
+        self.__commands = dict((cmd.lower(), cmd) for cmd in self.commands)
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) attribute names
+        self.__attributes = dict(
+            (attr.lower(), attr) for attr in self.attributes)
+        #: (:obj:`dict` <:obj:`int`, (:obj:`str`, :obj:`function`)>) \
+        #:     event subscriptions
+        self.__events = {}
+
+    def delay(self, operation):
+        """ waits before the remote call
+
+        :param operation: command name or attribute operation
+        :type operation: :obj:`str`
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+    def command(self, name):
+        """ provides the command name
+
+        :param name: case insensitive command name
+        :type name: :obj:`str`
+        :returns: command name or None
+        :rtype: :obj:`str`
+        """
+        return self.__commands.get(name.lower())
+
+    def attribute(self, name):
+        """ provides the attribute name
+
+        :param name: case insensitive attribute name
+        :type name: :obj:`str`
+        :returns: attribute name or None
+        :rtype: :obj:`str`
+        """
+        return self.__attributes.get(name.lower())
+
+    def execute(self, name, *args):
+        """ executes the command
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param args: command arguments
+        :type args: :obj:`list` <`any`>
+        :returns: command result
+        :rtype: `any`
+        """
+        return getattr(self, self.command(name))(*args)
+
+    def read(self, name):
+        """ reads the attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute value
+        :rtype: `any`
+        """
+        name = self.attribute(name)
+        reader = getattr(self, "read_" + name, None)
+        if reader is not None:
+            return reader()
+        return getattr(self, "attr_" + name)
+
+    def write(self, name, value):
+        """ writes the attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        name = self.attribute(name)
+        writer = getattr(self, "write_" + name, None)
+        if writer is not None:
+            writer(value)
+        else:
+            setattr(self, "attr_" + name, value)
+        self.push(name)
+
+    def info(self, name):
+        """ provides attribute configuration
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute configuration
+        :rtype: :class:`FakeAttributeInfo`
+        """
+        return FakeAttributeInfo(self.attribute(name), self.read(name))
+
+    def subscribe(self, name, callback):
+        """ subscribes attribute events and pushes the first event
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param callback: event callback
+        :type callback: :obj:`function`
+        :returns: subscription id
+        :rtype: :obj:`int`
+        """
+        eid = next(self.__ids)
+        self.__events[eid] = (self.attribute(name), callback)
+        callback(FakeEvent(self.attribute(name)))
+        return eid
+
+    def unsubscribe(self, eid):
+        """ unsubscribes attribute events
+
+        :param eid: subscription id
+        :type eid: :obj:`int`
+        """
+        self.__events.pop(eid)
+
+    def push(self, name, value=None):
+        """ pushes event of the attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        for attr, callback in list(self.__events.values()):
+            if attr == name:
+                callback(FakeEvent(name, value))
+
+    def SetState(self, state):
+        """ sets device state
+
+        :param state: state name
+        :type state: :obj:`str`
+        """
+        self.state = getattr(tango.DevState, state)
+
+
+class FakeDeviceProxy(object):
+
+    """ client of the in-process device with the tango.DeviceProxy
+    interface used in nxsrecconfig
+    """
+
+    def __init__(self, device):
+        """ constructor
+
+        :param device: in-process device
+        :type device: :class:`FakeDevice`
+        """
+        object.__setattr__(self, "_FakeDeviceProxy__device", device)
+
+    def _call(self, operation, func, *args):
+        """ calls the device function as a remote call
+
+        :param operation: command name or attribute operation
+        :type operation: :obj:`str`
+        :param func: device function
+        :type func: :obj:`function`
+        :param args: function arguments
+        :type args: :obj:`list` <`any`>
+        :returns: function result
+        :rtype: `any`
+        """
+        device = self.__device
+        with device.lock:
+            device.delay(operation)
+            try:
+                return func(*args)
+            except tango.DevFailed:
+                raise
+            except Exception as e:
+                tango.Except.throw_exception(
+                    "PyDs_PythonError", str(e), device.name)
+
+    def dev_name(self):
+        """ provides device name
+
+        :returns: device name
+        :rtype: :obj:`str`
+        """
+        return self.__device.name
+
+    def name(self):
+        """ provides device name
+
+        :returns: device name
+        :rtype: :obj:`str`
+        """
+        return self.__device.name
+
+    def ping(self):
+        """ pings the device
+
+        :returns: ping time in microseconds
+        :rtype: :obj:`int`
+        """
+        start = time.time()
+        self._call("ping", lambda: None)
+        return int((time.time() - start) * 1000000)
+
+    def state(self):
+        """ provides device state
+
+        :returns: device state
+        :rtype: :class:`tango.DevState`
+        """
+        return self._call("state", lambda: self.__device.state)
+
+    def set_source(self, source):
+        """ sets source of readings
+
+        :param source: reading source
+        :type source: :class:`tango.DevSource`
+        """
+
+    def set_timeout_millis(self, timeout):
+        """ sets call timeout
+
+        :param timeout: timeout in milliseconds
+        :type timeout: :obj:`int`
+        """
+
+    def get_property(self, names):
+        """ provides device properties
+
+        :param names: property name or names
+        :type names: :obj:`str` or :obj:`list` <:obj:`str`>
+        :returns: property values
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        if not isinstance(names, (list, tuple)):
+            names = [names]
+        properties = self.__device.properties
+        return dict((name, list(properties.get(name, [])))
+                    for name in names)
+
+    def command_inout(self, name, *args):
+        """ executes the device command
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param args: command argument
+        :type args: :obj:`list` <`any`>
+        :returns: command result
+        :rtype: `any`
+        """
+        device = self.__device
+        if device.command(name) is None:
+            tango.Except.throw_exception(
+                "API_CommandNotFound", "Command %s not found" % name,
+                device.name)
+        return self._call(name, device.execute, name, *args)
+
+    def read_attribute(self, name):
+        """ reads the device attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute reading
+        :rtype: :class:`FakeDeviceAttribute`
+        """
+        device = self.__device
+        if device.attribute(name) is None:
+            tango.Except.throw_exception(
+                "API_AttrNotFound", "Attribute %s not found" % name,
+                device.name)
+        return FakeDeviceAttribute(
+            name, self._call("read " + name, device.read, name))
+
+    def read_attributes(self, names):
+        """ reads the device attributes without raising errors
+
+        :param names: attribute names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: attribute readings
+        :rtype: :obj:`list` <:class:`FakeDeviceAttribute`>
+        """
+        readings = []
+        for name in names:
+            try:
+                readings.append(self.read_attribute(name))
+            except tango.DevFailed:
+                readings.append(FakeDeviceAttribute(name, failed=True))
+        return readings
+
+    def write_attribute(self, name, value):
+        """ writes the device attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        device = self.__device
+        if device.attribute(name) is None:
+            tango.Except.throw_exception(
+                "API_AttrNotFound", "Attribute %s not found" % name,
+                device.name)
+        self._call("write " + name, device.write, name, value)
+
+    def subscribe_event(self, name, etype, callback, *args):
+        """ subscribes attribute events
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param etype: event type
+        :type etype: :class:`tango.EventType`
+        :param callback: event callback
+        :type callback: :obj:`function`
+        :returns: subscription id
+        :rtype: :obj:`int`
+        """
+        device = self.__device
+        if device.attribute(name) is None:
+            tango.Except.throw_exception(
+                "API_AttrNotFound", "Attribute %s not found" % name,
+                device.name)
+        return self._call("subscribe " + name, device.subscribe,
+                          name, callback)
+
+    def unsubscribe_event(self, eid):
+        """ unsubscribes attribute events
+
+        :param eid: subscription id
+        :type eid: :obj:`int`
+        """
+        self.__device.unsubscribe(eid)
+
+    def __getattr__(self, name):
+        """ provides commands and attribute values
+
+        :param name: command or attribute name
+        :type name: :obj:`str`
+        :returns: command function or attribute value
+        :rtype: :obj:`function` or `any`
+        """
+        device = self.__device
+        if device.command(name) is not None:
+            return lambda *args: self.command_inout(name, *args)
+        if device.attribute(name) is not None:
+            return self.read_attribute(name).value
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        """ writes attribute values
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        if self.__device.attribute(name) is None:
+            raise AttributeError(name)
+        self.write_attribute(name, value)
+
+
+class FakeAttributeProxy(object):
+
+    """ client of the in-process device attribute with the
+    tango.AttributeProxy interface used in nxsrecconfig
+    """
+
+    def __init__(self, device, name, proxy=None):
+        """ constructor
+
+        :param device: in-process device
+        :type device: :class:`FakeDevice`
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param proxy: proxy of the device
+        :type proxy: :class:`FakeDeviceProxy`
+        """
+        #: (:class:`FakeDeviceProxy`) device proxy
+        self.__proxy = proxy or FakeDeviceProxy(device)
+        #: (:class:`FakeDevice`) in-process device
+        self.__device = device
+        #: (:obj:`str`) attribute name
+        self.__name = name
+
+    def name(self):
+        """ provides attribute name
+
+        :returns: attribute name
+        :rtype: :obj:`str`
+        """
+        return self.__name
+
+    def get_device_proxy(self):
+        """ provides device proxy
+
+        :returns: device proxy
+        :rtype: :class:`FakeDeviceProxy`
+        """
+        return self.__proxy
+
+    def get_config(self):
+        """ provides attribute configuration
+
+        :returns: attribute configuration
+        :rtype: :class:`FakeAttributeInfo`
+        """
+        if self.__device.attribute(self.__name) is None:
+            tango.Except.throw_exception(
+                "API_AttrNotFound", "Attribute %s not found" % self.__name,
+                self.__device.name)
+        return self.__proxy._call(
+            "get_config " + self.__name, self.__device.info, self.__name)
+
+    def read(self, extract_as=None):
+        """ reads the attribute
+
+        :param extract_as: extraction method
+        :type extract_as: :class:`tango.ExtractAs`
+        :returns: attribute reading
+        :rtype: :class:`FakeDeviceAttribute`
+        """
+        return self.__proxy.read_attribute(self.__name)
+
+    def subscribe_event(self, etype, callback, *args):
+        """ subscribes attribute events
+
+        :param etype: event type
+        :type etype: :class:`tango.EventType`
+        :param callback: event callback
+        :type callback: :obj:`function`
+        :returns: subscription id
+        :rtype: :obj:`int`
+        """
+        return self.__proxy.subscribe_event(self.__name, etype, callback)
+
+    def unsubscribe_event(self, eid):
+        """ unsubscribes attribute events
+
+        :param eid: subscription id
+        :type eid: :obj:`int`
+        """
+        self.__proxy.unsubscribe_event(eid)
+
+
+class FakeDbDatum(object):
+
+    """ database reply with a list of strings
+    """
+
+    def __init__(self, values):
+        """ constructor
+
+        :param values: reply values
+        :type values: :obj:`list` <:obj:`str`>
+        """
+        #: (:obj:`list` <:obj:`str`>) reply values
+        self.value_string = list(values)
+
+
+class FakeDatabase(object):
+
+    """ tango database of the in-process devices
+    """
+
+    def __init__(self, registry):
+        """ constructor
+
+        :param registry: registry of in-process devices
+        :type registry: :class:`FakeTango`
+        """
+        #: (:class:`FakeTango`) registry of in-process devices
+        self.__registry = registry
+
+    def get_db_host(self):
+        """ provides database host
+
+        :returns: database host
+        :rtype: :obj:`str`
+        """
+        return self.__registry.host
+
+    def get_db_port(self):
+        """ provides database port
+
+        :returns: database port
+        :rtype: :obj:`str`
+        """
+        return str(self.__registry.port)
+
+    def get_device_exported_for_class(self, klass):
+        """ provides names of exported devices of the tango class
+
+        :param klass: tango class name
+        :type klass: :obj:`str`
+        :returns: device names
+        :rtype: :class:`FakeDbDatum`
+        """
+        return FakeDbDatum(self.__registry.names(klass))
+
+    def get_alias(self, name):
+        """ provides device alias
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: device alias
+        :rtype: :obj:`str`
+        """
+        return self.__registry.alias(name)
+
+    def put_device_property(self, name, properties):
+        """ sets device properties
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param properties: property values
+        :type properties: :obj:`dict` <:obj:`str`, `any`>
+        """
+        device = self.__registry.device(name)
+        for key, value in properties.items():
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            device.properties[key] = [str(vl) for vl in value]
+
+
+class FakeTango(object):
+
+    """ registry of in-process devices which provides device proxies,
+    attribute proxies and databases for :class:`TangoUtils`,
+    i.e. to be used in the `with` statement
+    """
+
+    def __init__(self, host="localhost", port=10000):
+        """ constructor
+
+        :param host: database host
+        :type host: :obj:`str`
+        :param port: database port
+        :type port: :obj:`int`
+        """
+        #: (:obj:`str`) database host
+        self.host = host
+        #: (:obj:`int`) database port
+        self.port = port
+        #: (:obj:`dict` <:obj:`str`, :class:`FakeDevice`>) devices
+        self.devices = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) device names of aliases
+        self.aliases = {}
+        #: (:obj:`tuple`) factories replaced by the registry
+        self.__factories = None
+
+    def add(self, device, alias=None):
+        """ adds the device
+
+        :param device: in-process device
+        :type device: :class:`FakeDevice`
+        :param alias: device alias
+        :type alias: :obj:`str`
+        :returns: the device
+        :rtype: :class:`FakeDevice`
+        """
+        device.registry = self
+        self.devices[device.name.lower()] = device
+        if alias:
+            self.aliases[alias] = device.name
+        return device
+
+    def names(self, klass):
+        """ provides names of devices of the tango class
+
+        :param klass: tango class name
+        :type klass: :obj:`str`
+        :returns: device names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return sorted(dv.name for dv in self.devices.values()
+                      if dv.klass == klass)
+
+    def alias(self, name):
+        """ provides device alias
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: device alias
+        :rtype: :obj:`str`
+        """
+        name = self.device(name).name
+        for alias, dname in self.aliases.items():
+            if dname == name:
+                return alias
+        tango.Except.throw_exception(
+            "DB_AliasNotDefined", "No alias for %s" % name, "FakeDatabase")
+
+    def device(self, name):
+        """ provides the device
+
+        :param name: device name or alias, optionally
+                     with tango:// and host:port
+        :type name: :obj:`str`
+        :returns: in-process device
+        :rtype: :class:`FakeDevice`
+        """
+        dname = re.sub(r"^tango://", "", Utils.tostr(name))
+        sname = dname.split("/")
+        if len(sname) > 1 and ":" in sname[0]:
+            dname = "/".join(sname[1:])
+        dname = self.aliases.get(dname, dname)
+        device = self.devices.get(dname.lower())
+        if device is None:
+            tango.Except.throw_exception(
+                "DB_DeviceNotDefined", "Device %s not defined" % name,
+                "FakeDatabase")
+        return device
+
+    def deviceProxy(self, name):
+        """ creates device proxy
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: device proxy
+        :rtype: :class:`FakeDeviceProxy`
+        """
+        return FakeDeviceProxy(self.device(name))
+
+    def attributeProxy(self, name):
+        """ creates attribute proxy
+
+        :param name: attribute name with its device name
+        :type name: :obj:`str`
+        :returns: attribute proxy
+        :rtype: :class:`FakeAttributeProxy`
+        """
+        dname, attr = Utils.tostr(name).rsplit("/", 1)
+        return FakeAttributeProxy(
+            self.device(dname), attr, self.deviceProxy(dname))
+
+    def database(self, *args):
+        """ creates database
+
+        :param args: optional database host and port
+        :type args: [:obj:`str`, :obj:`int`]
+        :returns: tango database
+        :rtype: :class:`FakeDatabase`
+        """
+        return FakeDatabase(self)
+
+    def __enter__(self):
+        """ plugs the registry into :class:`TangoUtils`
+
+        :returns: the registry
+        :rtype: :class:`FakeTango`
+        """
+        self.__factories = (TangoUtils.proxyFactory,
+                            TangoUtils.attributeProxyFactory,
+                            TangoUtils.databaseFactory)
+        TangoUtils.proxyFactory = self.deviceProxy
+        TangoUtils.attributeProxyFactory = self.attributeProxy
+        TangoUtils.databaseFactory = self.database
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ restores factories of :class:`TangoUtils`
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        (TangoUtils.proxyFactory, TangoUtils.attributeProxyFactory,
+         TangoUtils.databaseFactory) = self.__factories
+
+
+class FakeConfigServer(FakeDevice):
+
+    """ configuration server storing components, datasources
+    and selections
+    """
+
+    klass = "NXSConfigServer"
+    commands = [
+        "SetState", "Open", "Close", "Components", "ComponentVariables",
+        "DependentComponents", "Selections", "InstantiatedComponents",
+        "DataSources", "AvailableComponents", "AvailableSelections",
+        "AvailableDataSources", "MandatoryComponents", "StoreSelection",
+        "StoreDataSource", "StoreComponent", "DeleteComponent",
+        "DeleteSelection", "DeleteDataSource", "CreateConfiguration"]
+    attributes = [
+        "XMLString", "Version", "Selection", "JSONSettings",
+        "STEPDataSources", "LinkDataSources", "CanFailDataSources",
+        "Variables"]
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        FakeDevice.__init__(self, name, latency, properties)
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) component xmls
+        self.components = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) datasource xmls
+        self.datasources = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) selection jsons
+        self.selections = {}
+        #: (:obj:`list` <:obj:`str`>) mandatory components
+        self.mandatory = []
+        #: (:obj:`int`) database revision
+        self.revision = 0
+        self.attr_XMLString = ""
+        self.attr_Selection = ""
+        self.attr_JSONSettings = ""
+        self.attr_STEPDataSources = ""
+        self.attr_LinkDataSources = ""
+        self.attr_CanFailDataSources = ""
+        self.attr_Variables = "{}"
+
+    def read_Version(self):
+        """ provides version with the database revision
+
+        :returns: version
+        :rtype: :obj:`str`
+        """
+        return "3.0.0.%s" % self.revision
+
+    def Open(self):
+        """ opens the database
+        """
+        self.state = tango.DevState.OPEN
+
+    def Close(self):
+        """ closes the database
+        """
+
+    def Components(self, names):
+        """ provides component xmls
+
+        :param names: component names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: component xmls
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return [self.components[nm] for nm in names]
+
+    def ComponentVariables(self, name):
+        """ provides component variables
+
+        :param name: component name
+        :type name: :obj:`str`
+        :returns: variable names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return sorted(set(
+            re.findall(r"\$var\.(\w+)", self.components[name])))
+
+    def DependentComponents(self, names):
+        """ provides the components with their dependent components
+
+        :param names: component names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        res = []
+        tocheck = list(names)
+        while tocheck:
+            name = tocheck.pop(0)
+            if name not in res:
+                res.append(name)
+                tocheck.extend(re.findall(
+                    r"\$components\.(\w+)", self.components[name]))
+        return res
+
+    def Selections(self, names):
+        """ provides selection jsons
+
+        :param names: selection names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: selection jsons
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return [self.selections[nm] for nm in names]
+
+    def InstantiatedComponents(self, names):
+        """ provides component xmls with values of variables
+
+        :param names: component names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: component xmls
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        variables = json.loads(self.attr_Variables or "{}")
+
+        def value(match):
+            default = match.group(2)[2:-1] if match.group(2) else ""
+            return str(variables.get(match.group(1), default))
+        return [re.sub(r"\$var\.(\w+)(#'[^']*')?", value,
+                       self.components[nm]) for nm in names]
+
+    def DataSources(self, names):
+        """ provides datasource xmls
+
+        :param names: datasource names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: datasource xmls
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return [self.datasources[nm] for nm in names]
+
+    def AvailableComponents(self):
+        """ provides component names
+
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.components.keys())
+
+    def AvailableSelections(self):
+        """ provides selection names
+
+        :returns: selection names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.selections.keys())
+
+    def AvailableDataSources(self):
+        """ provides datasource names
+
+        :returns: datasource names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.datasources.keys())
+
+    def MandatoryComponents(self):
+        """ provides mandatory component names
+
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.mandatory)
+
+    def StoreSelection(self, name):
+        """ stores the selection from Selection
+
+        :param name: selection name
+        :type name: :obj:`str`
+        """
+        self.selections[str(name)] = self.attr_Selection
+        self.revision += 1
+
+    def StoreDataSource(self, name):
+        """ stores the datasource from XMLString
+
+        :param name: datasource name
+        :type name: :obj:`str`
+        """
+        self.datasources[str(name)] = self.attr_XMLString
+        self.revision += 1
+
+    def StoreComponent(self, name):
+        """ stores the component from XMLString
+
+        :param name: component name
+        :type name: :obj:`str`
+        """
+        self.components[str(name)] = self.attr_XMLString
+        self.revision += 1
+
+    def DeleteComponent(self, name):
+        """ deletes the component
+
+        :param name: component name
+        :type name: :obj:`str`
+        """
+        self.components.pop(str(name))
+        self.revision += 1
+
+    def DeleteSelection(self, name):
+        """ deletes the selection
+
+        :param name: selection name
+        :type name: :obj:`str`
+        """
+        self.selections.pop(str(name))
+        self.revision += 1
+
+    def DeleteDataSource(self, name):
+        """ deletes the datasource
+
+        :param name: datasource name
+        :type name: :obj:`str`
+        """
+        self.datasources.pop(str(name))
+        self.revision += 1
+
+    def CreateConfiguration(self, names):
+        """ creates configuration of the components in XMLString
+        without merging their groups
+
+        :param names: component names
+        :type names: :obj:`list` <:obj:`str`>
+        """
+        bodies = [re.sub(r"(?s)^.*?<definition>|</definition>\s*$", "", xml)
+                  for xml in self.InstantiatedComponents(
+                      self.DependentComponents(names))]
+        self.attr_XMLString = "<?xml version='1.0' encoding='utf8'?>" \
+            "<definition>%s</definition>" % "".join(bodies)
+
+
+class FakeMeasurementGroup(FakeDevice):
+
+    """ measurement group with its configuration
+    """
+
+    klass = "MeasurementGroup"
+    attributes = ["Configuration"]
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        FakeDevice.__init__(self, name, latency, properties)
+        self.attr_Configuration = "{}"
+
+
+class FakePool(FakeDevice):
+
+    """ sardana pool with element lists, it pushes Elements events
+    when its elements change
+    """
+
+    klass = "Pool"
+    commands = ["SetState", "CreateMeasurementGroup", "DeleteElement"]
+    attributes = ["AcqChannelList", "MeasurementGroupList",
+                  "ExpChannelList", "MotorList", "Elements"]
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        FakeDevice.__init__(self, name, latency, properties)
+        self.attr_AcqChannelList = []
+        self.attr_MeasurementGroupList = []
+        self.attr_ExpChannelList = []
+        self.attr_MotorList = []
+
+    def read_Elements(self):
+        """ provides all pool elements
+
+        :returns: json list of elements
+        :rtype: :obj:`str`
+        """
+        return json.dumps(
+            [json.loads(elm) for elm in itertools.chain(
+                self.attr_ExpChannelList, self.attr_MotorList,
+                self.attr_MeasurementGroupList)])
+
+    def write(self, name, value):
+        """ writes the attribute and pushes the Elements event
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        FakeDevice.write(self, name, list(value or []))
+        self.push("Elements")
+
+    def CreateMeasurementGroup(self, names):
+        """ creates the measurement group device
+
+        :param names: measurement group name followed by channel names
+        :type names: :obj:`list` <:obj:`str`>
+        """
+        mg = names[0]
+        fullname = "mntgrp/%s/%s" % (self.name.split("/")[-1], mg)
+        self.registry.add(
+            FakeMeasurementGroup(fullname, self.latency), mg)
+        self.attr_MeasurementGroupList.append(json.dumps(
+            {"name": mg, "full_name": fullname}))
+        self.push("Elements")
+
+    def DeleteElement(self, name):
+        """ deletes the pool element
+
+        :param name: element name
+        :type name: :obj:`str`
+        """
+        for attr in ["attr_MeasurementGroupList", "attr_AcqChannelList",
+                     "attr_ExpChannelList", "attr_MotorList"]:
+            setattr(self, attr, [
+                elm for elm in getattr(self, attr)
+                if json.loads(elm).get("name") != name])
+        self.push("Elements")
+
+
+class FakeMacroServer(FakeDevice):
+
+    """ macro server with doors and the pickled environment
+    """
+
+    klass = "MacroServer"
+    attributes = ["DoorList", "Environment"]
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        FakeDevice.__init__(self, name, latency, properties)
+        self.attr_DoorList = []
+        self.attr_Environment = (
+            "pickle", pickle.dumps({"new": {}}, protocol=2))
+
+    def write_Environment(self, value):
+        """ updates the environment with new, changed and deleted
+        variables
+
+        :param value: pickled environment changes
+        :type value: [:obj:`str`, :obj:`bytes`]
+        """
+        changes = pickleloads(value[1])
+        env = pickleloads(self.attr_Environment[1])
+        newenv = env.setdefault("new", {})
+        newenv.update(changes.get("new", {}))
+        newenv.update(changes.get("change", {}))
+        for name in changes.get("del", []):
+            newenv.pop(name, None)
+        self.attr_Environment = ("pickle", pickle.dumps(env, protocol=2))
+
+
+class FakeDoor(FakeDevice):
+
+    """ door of the macro server
+    """
+
+    klass = "Door"
+
+
+class FakeChannel(FakeDevice):
+
+    """ experimental channel with its value
+    """
+
+    klass = "CTExpChannel"
+    attributes = ["Value"]
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        FakeDevice.__init__(self, name, latency, properties)
+        self.attr_Value = 0.
+
+
+class FakeSelector(FakeDevice):
+
+    """ selector device with its memorized attributes, i.e. written back
+    by the selector itself
+    """
+
+    klass = "NXSRecSelector"
+    attributes = ["ConfigDevice", "Door", "MntGrp"]
+
+    def __init__(self, name, latency=0.0, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param latency: delay of each remote call in seconds
+        :type latency: :obj:`float`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        FakeDevice.__init__(self, name, latency, properties)
+        self.attr_ConfigDevice = ""
+        self.attr_Door = ""
+        self.attr_MntGrp = ""
@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""  latency and fault injection for in-process devices
+
+Faults of a device are given by :class:`DeviceFaults`, i.e. a latency
+distribution, a probability of hanging calls, a FAULT or ALARM state,
+failing attribute reads or a dead host. They are injected into
+a :class:`FaultyTango` registry whose proxies replace tango.DeviceProxy
+and tango.AttributeProxy in CheckerThread, PoolUtils and TangoUtils.
+Calls which would last longer than the client timeout fail with
+API_DeviceTimedOut after the timeout as the tango clients do.
+
+The scenarios measure PreselectComponents wall time and compare
+preselected components with the expected ones for fractions of dead
+devices. Components are expected to be deactivated by broken devices of
+their TANGO datasources or of TANGO datasources evaluated directly by
+their PYEVAL datasources, i.e. as found by Describer. Components reading
+broken devices only via longer PYEVAL chains are listed as chained.
+
+Usage: python -m benchmarks.faults [--scale 100 1000 100 2]
+           [--dead 0.0 0.01 0.1] [--latency constant:0.0]
+           [--hang 0.0] [--alarm 0.0] [--failing 0.0] [--timeout 3.0]
+           [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import time
+
+try:
+    import tango
+except Exception:
+    import PyTango as tango
+
+from .beamline import SyntheticBeamline
+from .fakes import FakeTango, FakeDeviceProxy
+
+
+def distribution(spec, rng=None):
+    """ creates latency distribution
+
+    :param spec: distribution with its parameters in seconds, i.e.
+                 constant:<value>, uniform:<min>:<max>,
+                 exponential:<mean>, normal:<mean>:<sigma> or
+                 lognormal:<mu>:<sigma> of log(seconds)
+    :type spec: :obj:`str`
+    :param rng: random generator
+    :type rng: :class:`random.Random`
+    :returns: function without arguments providing latencies
+    :rtype: :obj:`function`
+    """
+    rng = rng or random.Random()
+    sspec = spec.split(":")
+    name = sspec[0]
+    params = [float(pr) for pr in sspec[1:]]
+    if name == "constant":
+        return lambda: params[0]
+    elif name == "uniform":
+        return lambda: rng.uniform(params[0], params[1])
+    elif name == "exponential":
+        return lambda: rng.expovariate(1. / params[0]) if params[0] else 0.
+    elif name == "normal":
+        return lambda: max(rng.gauss(params[0], params[1]), 0.)
+    elif name == "lognormal":
+        return lambda: rng.lognormvariate(params[0], params[1])
+    raise ValueError("Unknown distribution: %s" % spec)
+
+
+class DeviceFaults(object):
+
+    """ faults of one device
+    """
+
+    def __init__(self, latency=None, hang=0.0, state=None, failing=None,
+                 dead=False, connect=0.0, seed=None):
+        """ constructor
+
+        :param latency: latency distribution or its specification
+        :type latency: :obj:`function` or :obj:`str`
+        :param hang: probability of a call which never returns
+        :type hang: :obj:`float`
+        :param state: device state name, e.g. FAULT or ALARM
+        :type state: :obj:`str`
+        :param failing: names of failing attributes, "*" for all
+        :type failing: :obj:`list` <:obj:`str`>
+        :param dead: dead host flag
+        :type dead: :obj:`bool`
+        :param connect: time of failing connections to the dead host
+                        in seconds
+        :type connect: :obj:`float`
+        :param seed: seed of the random generator
+        :type seed: `any`
+        """
+        #: (:class:`random.Random`) random generator
+        self.random = random.Random(seed)
+        if latency is not None and not callable(latency):
+            latency = distribution(latency, self.random)
+        #: (:obj:`function`) latency distribution
+        self.latency = latency
+        #: (:obj:`float`) probability of a call which never returns
+        self.hang = hang
+        #: (:obj:`str`) device state name
+        self.state = state
+        #: (:obj:`list` <:obj:`str`>) names of failing attributes
+        self.failing = [attr.lower() for attr in (failing or [])]
+        #: (:obj:`bool`) dead host flag
+        self.dead = dead
+        #: (:obj:`float`) time of failing connections in seconds
+        self.connect = connect
+
+    def delay(self):
+        """ provides latency of the next call
+
+        :returns: latency in seconds or None for a hanging call
+        :rtype: :obj:`float`
+        """
+        if self.hang and self.random.random() < self.hang:
+            return None
+        return self.latency() if self.latency is not None else 0.
+
+    def fails(self, attr):
+        """ checks if reading of the attribute fails
+
+        :param attr: attribute name
+        :type attr: :obj:`str`
+        :returns: True if the reading fails
+        :rtype: :obj:`bool`
+        """
+        return "*" in self.failing or attr.lower() in self.failing
+
+
+class FaultyDeviceProxy(FakeDeviceProxy):
+
+    """ client of the in-process device with injected faults
+    """
+
+    #: (:obj:`float`) default client timeout in seconds
+    timeout = 3.0
+
+    def __init__(self, device, faults, timeout=None):
+        """ constructor
+
+        :param device: in-process device
+        :type device: :class:`benchmarks.fakes.FakeDevice`
+        :param faults: device faults
+        :type faults: :class:`DeviceFaults`
+        :param timeout: client timeout in seconds
+        :type timeout: :obj:`float`
+        """
+        FakeDeviceProxy.__init__(self, device)
+        object.__setattr__(self, "_FaultyDeviceProxy__faults", faults)
+        object.__setattr__(
+            self, "_FaultyDeviceProxy__timeout",
+            self.timeout if timeout is None else timeout)
+
+    def set_timeout_millis(self, timeout):
+        """ sets call timeout
+
+        :param timeout: timeout in milliseconds
+        :type timeout: :obj:`int`
+        """
+        object.__setattr__(self, "_FaultyDeviceProxy__timeout",
+                           timeout / 1000.)
+
+    def get_timeout_millis(self):
+        """ provides call timeout
+
+        :returns: timeout in milliseconds
+        :rtype: :obj:`int`
+        """
+        return int(self.__timeout * 1000)
+
+    def _call(self, operation, func, *args):
+        """ calls the device function as a remote call with injected faults
+
+        :param operation: command name or attribute operation
+        :type operation: :obj:`str`
+        :param func: device function
+        :type func: :obj:`function`
+        :param args: function arguments
+        :type args: :obj:`list` <`any`>
+        :returns: function result
+        :rtype: `any`
+        """
+        faults = self.__faults
+        name = self.dev_name()
+        if faults.dead:
+            time.sleep(min(faults.connect, self.__timeout))
+            tango.Except.throw_exception(
+                "API_CantConnectToDevice",
+                "Failed to connect to device %s" % name, name)
+        delay = faults.delay()
+        if delay is None or delay >= self.__timeout:
+            time.sleep(self.__timeout)
+            tango.Except.throw_exception(
+                "API_DeviceTimedOut",
+                "Timeout (%s ms) exceeded on device %s" % (
+                    self.get_timeout_millis(), name), name)
+        if delay:
+            time.sleep(delay)
+        if operation.startswith("read ") and faults.fails(operation[5:]):
+            tango.Except.throw_exception(
+                "API_AttrValueNotSet",
+                "Reading of %s failed" % operation[5:], name)
+        return FakeDeviceProxy._call(self, operation, func, *args)
+
+
+class FaultyTango(FakeTango):
+
+    """ registry of in-process devices with injected faults
+    """
+
+    def __init__(self, host="localhost", port=10000, seed=0):
+        """ constructor
+
+        :param host: database host
+        :type host: :obj:`str`
+        :param port: database port
+        :type port: :obj:`int`
+        :param seed: seed of random generators
+        :type seed: `any`
+        """
+        FakeTango.__init__(self, host, port)
+        #: (`any`) seed of random generators
+        self.seed = seed
+        #: (:obj:`dict` <:obj:`str`, :class:`DeviceFaults`>) device faults
+        self.faults = {}
+        #: (:obj:`float`) default client timeout in seconds
+        self.timeout = FaultyDeviceProxy.timeout
+
+    def inject(self, name, **faults):
+        """ injects faults into the device
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param faults: :class:`DeviceFaults` parameters
+        :type faults: :obj:`dict` <:obj:`str`, `any`>
+        :returns: device faults
+        :rtype: :class:`DeviceFaults`
+        """
+        device = self.device(name)
+        faults.setdefault("seed", "%s:%s" % (self.seed, device.name))
+        dfaults = DeviceFaults(**faults)
+        self.faults[device.name.lower()] = dfaults
+        if dfaults.state:
+            device.state = getattr(tango.DevState, dfaults.state)
+        return dfaults
+
+    def deviceProxy(self, name):
+        """ creates device proxy
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: device proxy
+        :rtype: :class:`FaultyDeviceProxy` or
+                :class:`benchmarks.fakes.FakeDeviceProxy`
+        """
+        device = self.device(name)
+        faults = self.faults.get(device.name.lower())
+        if faults is None:
+            return FakeDeviceProxy(device)
+        return FaultyDeviceProxy(device, faults, self.timeout)
+
+
+def scenario(beamline, dead, hang=0.0, alarm=0.0, failing=0.0,
+             latency=None, timeout=3.0, seed=0):
+    """ measures PreselectComponents with faulty channel devices
+
+    :param beamline: synthetic beamline
+    :type beamline: :class:`benchmarks.beamline.SyntheticBeamline`
+    :param dead: fraction of dead devices
+    :type dead: :obj:`float`
+    :param hang: fraction of hanging devices
+    :type hang: :obj:`float`
+    :param alarm: fraction of devices in the ALARM state
+    :type alarm: :obj:`float`
+    :param failing: fraction of devices with failing reads
+    :type failing: :obj:`float`
+    :param latency: latency distribution of all channel devices
+    :type latency: :obj:`str`
+    :param timeout: default client timeout in seconds
+    :type timeout: :obj:`float`
+    :param seed: seed of random generators
+    :type seed: `any`
+    :returns: scenario result
+    :rtype: :obj:`dict` <:obj:`str`, `any`>
+    """
+    from nxsrecconfig.Settings import Settings
+
+    rng = random.Random(seed)
+    devices = [ch[1] for ch in beamline.channels()]
+    rng.shuffle(devices)
+    groups = {}
+    start = 0
+    for kind, fraction in [("dead", dead), ("hang", hang),
+                           ("alarm", alarm), ("failing", failing)]:
+        size = int(round(fraction * len(devices)))
+        groups[kind] = set(devices[start:start + size])
+        start += size
+    broken = groups["dead"] | groups["hang"] | groups["failing"]
+
+    registry = beamline.build(FaultyTango(seed=seed))
+    for device in devices:
+        faults = {"latency": latency}
+        if device in groups["dead"]:
+            faults["dead"] = True
+        elif device in groups["hang"]:
+            faults["hang"] = 1.0
+        elif device in groups["alarm"]:
+            faults["state"] = "ALARM"
+        elif device in groups["failing"]:
+            faults["failing"] = ["*"]
+        registry.inject(device, **faults)
+
+    registry.timeout = timeout
+    with registry:
+        settings = Settings()
+        settings.configDevice = beamline.configServer
+        settings.door = beamline.door
+        settings.mntGrp = beamline.mntGrp
+        profile = json.loads(settings.profileConfiguration)
+        profile.update(beamline.selection())
+        profile["ComponentPreselection"] = profile["ComponentSelection"]
+        settings.profileConfiguration = json.dumps(profile)
+        start = time.time()
+        settings.preselectComponents()
+        duration = time.time() - start
+        preselection = json.loads(json.loads(
+            settings.profileConfiguration)["ComponentPreselection"])
+
+    expected = set(
+        cp for i, cp in enumerate(beamline.components())
+        if beamline.componentDevices(i, 1) & broken)
+    chained = set(
+        cp for i, cp in enumerate(beamline.components())
+        if beamline.componentDevices(i) & broken) - expected
+    inactive = set(cp for cp, active in preselection.items() if not active)
+    return {
+        "components": beamline.ncomponents,
+        "datasources": beamline.ndatasources,
+        "channels": beamline.nchannels,
+        "depth": beamline.depth,
+        "latency": latency,
+        "timeout": timeout,
+        "seed": seed,
+        "dead": len(groups["dead"]),
+        "hang": len(groups["hang"]),
+        "alarm": len(groups["alarm"]),
+        "failing": len(groups["failing"]),
+        "preselect": duration,
+        "inactive": len(inactive),
+        "expected": len(expected),
+        "chained": sorted(chained),
+        "falseInactive": sorted(inactive - expected),
+        "falseActive": sorted(expected - inactive),
+        "correct": inactive == expected,
+    }
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="PreselectComponents with faulty devices")
+    parser.add_argument(
+        "--scale", type=int, nargs=4, default=[100, 1000, 100, 2],
+        metavar=("COMPONENTS", "DATASOURCES", "CHANNELS", "DEPTH"),
+        help="beamline scale")
+    parser.add_argument(
+        "--dead", type=float, nargs="+", default=[0.0, 0.01, 0.1],
+        help="fractions of dead channel devices")
+    parser.add_argument(
+        "--hang", type=float, default=0.0,
+        help="fraction of hanging channel devices")
+    parser.add_argument(
+        "--alarm", type=float, default=0.0,
+        help="fraction of channel devices in the ALARM state")
+    parser.add_argument(
+        "--failing", type=float, default=0.0,
+        help="fraction of channel devices with failing reads")
+    parser.add_argument(
+        "--latency", default=None,
+        help="latency distribution of channel devices, "
+        "e.g. lognormal:-7:0.5")
+    parser.add_argument(
+        "--timeout", type=float, default=3.0,
+        help="default client timeout in seconds, hanging devices are "
+        "retried by TangoUtils.wait before the timeout is set")
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="seed of random generators")
+    options = parser.parse_args()
+
+    for dead in options.dead:
+        result = scenario(
+            SyntheticBeamline(*options.scale), dead, options.hang,
+            options.alarm, options.failing, options.latency,
+            options.timeout, options.seed)
+        print(json.dumps(result, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
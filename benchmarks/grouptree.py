@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""  benchmark of dynamic component group trees
+
+It compares the merged group tree of dynamic components with
+the former layout with one group chain per field, i.e. XML size,
+build, parse and NeXus configuration merge times.
+
+Usage: python -m benchmarks.grouptree [--fields 1000 10000] [--repeat 3]
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+
+import lxml.etree
+
+try:
+    from nxsconfigserver.Merger import Merger
+except Exception:
+    Merger = None
+
+from .fakes import FakeTango
+
+
+class FakeConfigServer(object):
+
+    """ in-process configuration server storing components
+    """
+
+    def __init__(self, datasources):
+        """ constructor
+
+        :param datasources: names of client datasources
+        :type datasources: :obj:`list` <:obj:`str`>
+        """
+        #: (:obj:`list` <:obj:`str`>) names of client datasources
+        self.datasources = list(datasources)
+        #: (:obj:`str`) xml of the component to store
+        self.xmlstring = ""
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) stored components
+        self.stored = {}
+
+    def availableComponents(self):
+        """ provides names of stored components
+
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.stored.keys())
+
+    def availableDataSources(self):
+        """ provides names of stored datasources
+
+        :returns: datasource names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.datasources)
+
+    def dataSources(self, names):
+        """ provides xmls of client datasources
+
+        :param names: datasource names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: datasource xmls
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return ["<?xml version='1.0' encoding='utf8'?><definition>"
+                "<datasource name=\"%s\" type=\"CLIENT\">"
+                "<record name=\"%s\"/></datasource></definition>"
+                % (name, name) for name in names]
+
+    def storeComponent(self, name):
+        """ stores xmlstring as the component
+
+        :param name: component name
+        :type name: :obj:`str`
+        """
+        self.stored[name] = self.xmlstring
+
+
+def splitGroups(xml):
+    """ converts the merged group tree into one group chain per field
+
+    :param xml: dynamic component xml
+    :type xml: :obj:`str`
+    :returns: dynamic component xml with one group chain per field
+    :rtype: :obj:`str`
+    """
+    root = lxml.etree.fromstring(xml.encode("utf8"))
+    definition = lxml.etree.Element("definition")
+    links = {}
+    for link in root.iter("link"):
+        links[link.get("target").split("/")[-1]] = link
+    for field in root.iter("field"):
+        parent = definition
+        entry = None
+        for group in reversed(list(field.iterancestors("group"))):
+            node = lxml.etree.SubElement(parent, "group", group.attrib)
+            entry = entry if entry is not None else node
+            parent = node
+        parent.append(copy.deepcopy(field))
+        link = links.get(field.get("name"))
+        if link is not None and entry is not None:
+            nxdata = lxml.etree.SubElement(
+                entry, "group", {"type": "NXdata", "name": "data"})
+            nxdata.append(copy.deepcopy(link))
+    return "<?xml version='1.0' encoding='utf8'?>\n" + lxml.etree.tostring(
+        definition, encoding="unicode", method="xml", pretty_print=True)
+
+
+def timeit(func, repeat):
+    """ measures the shortest execution time of the function
+
+    :param func: function without arguments
+    :type func: :obj:`function`
+    :param repeat: number of repetitions
+    :type repeat: :obj:`int`
+    :returns: (shortest time in seconds, last result) tuple
+    :rtype: (:obj:`float`, `any`)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.time()
+        result = func()
+        duration = time.time() - start
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+
+def merge(xml):
+    """ merges the component as the configuration server does
+        for createConfiguration
+
+    :param xml: component xml
+    :type xml: :obj:`str`
+    :returns: merged xml
+    :rtype: :obj:`str`
+    """
+    mr = Merger()
+    mr.collect([xml])
+    mr.merge()
+    return mr.toString()
+
+
+def run(fields, repeat):
+    """ runs the benchmark for the given number of fields
+
+    :param fields: number of dynamic component fields
+    :type fields: :obj:`int`
+    :param repeat: number of repetitions
+    :type repeat: :obj:`int`
+    :returns: benchmark results for both layouts
+    :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+    """
+    from nxsrecconfig.DynamicComponent import DynamicComponent
+
+    names = ["exp_c%05d" % i for i in range(fields)]
+
+    def create():
+        cs = FakeConfigServer(names)
+        dc = DynamicComponent(cs)
+        dc.setStepDSources(names)
+        return cs.stored[dc.create()]
+
+    with FakeTango():
+        build, merged = timeit(create, repeat)
+    results = []
+    for layout, xml in [("merged", merged),
+                        ("per-field", splitGroups(merged))]:
+        parse, _ = timeit(
+            lambda: lxml.etree.fromstring(xml.encode("utf8")), repeat)
+        mtime = timeit(lambda: merge(xml), repeat)[0] \
+            if Merger is not None else None
+        results.append({
+            "fields": fields,
+            "layout": layout,
+            "bytes": len(xml.encode("utf8")),
+            "groups": xml.count("<group "),
+            "build": build if layout == "merged" else None,
+            "parse": parse,
+            "merge": mtime,
+        })
+    return results
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="benchmark of dynamic component group trees")
+    parser.add_argument(
+        "--fields", type=int, nargs="+", default=[1000, 10000],
+        help="numbers of dynamic component fields")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="number of repetitions")
+    options = parser.parse_args()
+
+    if Merger is None:
+        sys.stderr.write(
+            "nxsconfigserver is not installed: merge times are skipped\n")
+    for fields in options.fields:
+        for result in run(fields, options.repeat):
+            print(json.dumps(result, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
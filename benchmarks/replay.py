@@ -0,0 +1,725 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""  offline replay of recorded client sessions
+
+Sessions of NXSRecSelector are recorded into JSON-lines files when its
+SessionRecordFile property is set, see :mod:`nxsrecconfig.Recording`.
+The replay initializes the selector and repeats the recorded client
+requests while remote calls to the configuration server, pools, macro
+servers and the tango database are answered by stand-ins with the
+recorded responses, optionally delayed by the recorded latencies.
+It prints JSON lines with wall times per request name and a summary
+with numbers of missing remote calls and of results differing from
+the recorded ones.
+
+The record command records a client session of a synthetic beamline,
+e.g. to try out the replay without a beamline.
+
+Usage: python -m benchmarks.replay replay FILE [--latency 0.0]
+           [--repeat 1]
+       python -m benchmarks.replay record FILE [--scale 10 100 20 2]
+"""
+
+import argparse
+import functools
+import json
+import sys
+import threading
+import time
+
+try:
+    import tango
+except Exception:
+    import PyTango as tango
+
+from .beamline import SyntheticBeamline
+from .fakes import FakeSelector
+from nxsrecconfig.Recording import encode, decode
+from nxsrecconfig.Utils import Utils, TangoUtils
+
+
+def load(filename):
+    """ loads records of the session
+
+    :param filename: record file name
+    :type filename: :obj:`str`
+    :returns: session records
+    :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+    """
+    with open(filename) as fl:
+        return [json.loads(line) for line in fl if line.strip()]
+
+
+def canonical(record, jsons=False):
+    """ provides record with sorted string lists, i.e. independent
+    of set orders which change between processes
+
+    :param record: encoded value
+    :type record: `any`
+    :param jsons: if True JSON strings are replaced by their values
+    :type jsons: :obj:`bool`
+    :returns: canonical record
+    :rtype: `any`
+    """
+    if isinstance(record, list):
+        items = [canonical(rc, jsons) for rc in record]
+        if all(isinstance(it, (type(u""), str)) for it in items):
+            items.sort()
+        return items
+    if isinstance(record, dict):
+        return dict((ky, canonical(vl, jsons)) for ky, vl in record.items())
+    if jsons and isinstance(record, (type(u""), str)) and \
+            record[:1] in ["{", "["]:
+        try:
+            return canonical(json.loads(record), jsons)
+        except ValueError:
+            pass
+    return record
+
+
+def key(*items):
+    """ provides key of recorded remote calls
+
+    :param items: record items
+    :type items: :obj:`list` <`any`>
+    :returns: record key
+    :rtype: :obj:`str`
+    """
+    return json.dumps(canonical(list(items)), sort_keys=True)
+
+
+class ReplayStore(object):
+
+    """ recorded responses of remote calls and recorded events
+    """
+
+    def __init__(self, records, latency=0.0):
+        """ constructor
+
+        :param records: session records
+        :type records: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        :param latency: scale of recorded latencies of remote calls
+        :type latency: :obj:`float`
+        """
+        #: (:obj:`float`) scale of recorded latencies of remote calls
+        self.latency = latency
+        #: (:obj:`int`) number of missing remote calls
+        self.missing = 0
+        #: (:obj:`dict` <:obj:`str`, :obj:`list` <:obj:`dict`>>) \
+        #:    recorded responses by call keys
+        self.__responses = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) numbers of used responses
+        self.__used = {}
+        #: (:obj:`dict` <:obj:`int`, :obj:`list` <:obj:`dict`>>) \
+        #:    events by subscription ids
+        self.__events = {}
+        #: (:obj:`dict` <:obj:`int`, :obj:`function`>) \
+        #:    event callbacks by subscription ids
+        self.__callbacks = {}
+        #: (:class:`threading.Lock`) store lock
+        self.__lock = threading.Lock()
+        for record in records:
+            rtype = record["type"]
+            target = record.get("target")
+            if rtype == "open":
+                ky = key("open", record["factory"], target)
+            elif rtype == "call":
+                ky = key("call", record["factory"], target, record["method"],
+                         record["args"], record.get("kwargs"))
+            elif rtype == "get":
+                ky = key("get", record["factory"], target, record["name"])
+            elif rtype == "set":
+                ky = key("set", record["factory"], target, record["name"])
+            elif rtype == "event":
+                self.__events.setdefault(record["sid"], []).append(record)
+                continue
+            else:
+                continue
+            self.__responses.setdefault(ky, []).append(record)
+
+    def response(self, ky):
+        """ provides the next recorded response, the last one when
+        all of them were used
+
+        :param ky: call key
+        :type ky: :obj:`str`
+        :returns: recorded response or None if missing
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        with self.__lock:
+            responses = self.__responses.get(ky)
+            if not responses:
+                self.missing += 1
+                return None
+            used = self.__used.get(ky, 0)
+            self.__used[ky] = used + 1
+        record = responses[min(used, len(responses) - 1)]
+        if self.latency > 0:
+            time.sleep(record.get("duration", 0.) * self.latency)
+        return record
+
+    def recorded(self, ky):
+        """ checks if responses of the call were recorded
+
+        :param ky: call key
+        :type ky: :obj:`str`
+        :returns: True if the call was recorded
+        :rtype: :obj:`bool`
+        """
+        return ky in self.__responses
+
+    def subscribe(self, sid, callback):
+        """ registers callback of the subscription and pushes events
+        received during the subscription call
+
+        :param sid: subscription id
+        :type sid: :obj:`int`
+        :param callback: event callback
+        :type callback: :obj:`function`
+        """
+        with self.__lock:
+            self.__callbacks[sid] = callback
+        for record in self.__events.get(sid, []):
+            if record["sync"]:
+                callback(decode(record["event"]))
+
+    def push(self, seq):
+        """ pushes events received after the previous request started
+        and before the given request started
+
+        :param seq: request number
+        :type seq: :obj:`int`
+        """
+        for sid, records in self.__events.items():
+            callback = self.__callbacks.get(sid)
+            if callback is None:
+                continue
+            for record in records:
+                if not record["sync"] and record["after"] == seq:
+                    callback(decode(record["event"]))
+
+
+class ReplayProxy(object):
+
+    """ stand-in of a device proxy, an attribute proxy or a tango
+    database answering with the recorded responses
+    """
+
+    def __init__(self, store, factory, target):
+        """ constructor
+
+        :param store: recorded responses
+        :type store: :class:`ReplayStore`
+        :param factory: factory name, i.e. device, attribute or database
+        :type factory: :obj:`str`
+        :param target: device name, attribute name or database arguments
+        :type target: :obj:`str` or :obj:`list` <`any`>
+        """
+        object.__setattr__(self, "_ReplayProxy__store", store)
+        object.__setattr__(self, "_ReplayProxy__factory", factory)
+        object.__setattr__(self, "_ReplayProxy__target", target)
+
+    def __result(self, record, name):
+        """ provides the recorded result or raises the recorded error
+
+        :param record: recorded response
+        :type record: :obj:`dict` <:obj:`str`, `any`>
+        :param name: member name
+        :type name: :obj:`str`
+        :returns: recorded result
+        :rtype: `any`
+        """
+        if record is None:
+            tango.Except.throw_exception(
+                "API_ReplayMissing",
+                "%s of %s was not recorded" % (name, self.__target),
+                "ReplayProxy")
+        if "error" in record:
+            raise decode(record["error"], self.__proxy)
+        return decode(record.get("result"), self.__proxy)
+
+    def __proxy(self, factory, target):
+        """ creates stand-in of the recorded proxy
+
+        :param factory: factory name
+        :type factory: :obj:`str`
+        :param target: proxy target
+        :type target: :obj:`str` or :obj:`list` <`any`>
+        :returns: proxy stand-in
+        :rtype: :class:`ReplayProxy`
+        """
+        return ReplayProxy(self.__store, factory, target)
+
+    def __call(self, name, *args, **kwargs):
+        """ answers the remote call
+
+        :param name: method name
+        :type name: :obj:`str`
+        :param args: method arguments
+        :type args: :obj:`list` <`any`>
+        :param kwargs: method keyword arguments
+        :type kwargs: :obj:`dict` <:obj:`str`, `any`>
+        :returns: recorded result
+        :rtype: `any`
+        """
+        record = self.__store.response(key(
+            "call", self.__factory, self.__target, name,
+            encode(list(args)), encode(kwargs) if kwargs else None))
+        if record is not None and "sid" in record:
+            for arg in args:
+                if callable(arg):
+                    self.__store.subscribe(record["sid"], arg)
+        return self.__result(record, name)
+
+    def __getattr__(self, name):
+        """ provides recorded attribute values and remote methods
+
+        :param name: member name
+        :type name: :obj:`str`
+        :returns: member value
+        :rtype: `any`
+        """
+        if name.startswith("__"):
+            raise AttributeError(name)
+        ky = key("get", self.__factory, self.__target, name)
+        if self.__store.recorded(ky):
+            return self.__result(self.__store.response(ky), name)
+        return functools.partial(self.__call, name)
+
+    def __setattr__(self, name, value):
+        """ answers the attribute writing
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        self.__result(self.__store.response(key(
+            "set", self.__factory, self.__target, name)), name)
+
+
+class ReplayTango(object):
+
+    """ factories of proxy stand-ins with the recorded responses
+    """
+
+    def __init__(self, store):
+        """ constructor
+
+        :param store: recorded responses
+        :type store: :class:`ReplayStore`
+        """
+        #: (:class:`ReplayStore`) recorded responses
+        self.store = store
+        #: (:obj:`tuple` <:obj:`function`>) replaced factories
+        self.__factories = None
+
+    def __open(self, factory, target):
+        """ opens the proxy stand-in
+
+        :param factory: factory name
+        :type factory: :obj:`str`
+        :param target: proxy target
+        :type target: :obj:`str` or :obj:`list` <`any`>
+        :returns: proxy stand-in
+        :rtype: :class:`ReplayProxy`
+        """
+        record = self.store.response(key("open", factory, target))
+        if record is not None and "error" in record:
+            raise decode(record["error"])
+        return ReplayProxy(self.store, factory, target)
+
+    def deviceProxy(self, name):
+        """ creates device proxy stand-in
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: device proxy stand-in
+        :rtype: :class:`ReplayProxy`
+        """
+        return self.__open("device", Utils.tostr(name))
+
+    def attributeProxy(self, name):
+        """ creates attribute proxy stand-in
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute proxy stand-in
+        :rtype: :class:`ReplayProxy`
+        """
+        return self.__open("attribute", Utils.tostr(name))
+
+    def database(self, *args):
+        """ creates tango database stand-in
+
+        :param args: optional database host and port
+        :type args: [:obj:`str`, :obj:`int`]
+        :returns: tango database stand-in
+        :rtype: :class:`ReplayProxy`
+        """
+        return self.__open("database", encode(list(args)))
+
+    def __enter__(self):
+        """ plugs the stand-ins into :class:`TangoUtils`
+
+        :returns: the factories
+        :rtype: :class:`ReplayTango`
+        """
+        self.__factories = (TangoUtils.proxyFactory,
+                            TangoUtils.attributeProxyFactory,
+                            TangoUtils.databaseFactory)
+        TangoUtils.proxyFactory = self.deviceProxy
+        TangoUtils.attributeProxyFactory = self.attributeProxy
+        TangoUtils.databaseFactory = self.database
+        TangoUtils.clearMetadata()
+        TangoUtils.clearHostCache()
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ restores factories of :class:`TangoUtils`
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        (TangoUtils.proxyFactory, TangoUtils.attributeProxyFactory,
+         TangoUtils.databaseFactory) = self.__factories
+        TangoUtils.clearMetadata()
+        TangoUtils.clearHostCache()
+
+
+class StandInAttribute(object):
+
+    """ read or written attribute of the selector stand-in
+    """
+
+    def __init__(self, value=None):
+        """ constructor
+
+        :param value: written value
+        :type value: `any`
+        """
+        #: (`any`) attribute value
+        self.value = value
+
+    def set_value(self, value, *args):
+        """ sets the read value
+
+        :param value: attribute value
+        :type value: `any`
+        :param args: optional dimensions
+        :type args: :obj:`list` <:obj:`int`>
+        """
+        self.value = value
+
+    def get_write_value(self):
+        """ provides the written value
+
+        :returns: attribute value
+        :rtype: `any`
+        """
+        return self.value
+
+
+class SelectorStandIn(object):
+
+    """ NXSRecSelector device running in-process without a device server,
+    i.e. its command and attribute methods are called directly
+    """
+
+    def __init__(self, name, properties=None):
+        """ constructor
+
+        :param name: device name
+        :type name: :obj:`str`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, `any`>
+        """
+        from nxsrecconfig.NXSConfig import NXSRecSelectorClass
+
+        #: (:obj:`str`) device name
+        self.__name = name
+        #: (:class:`tango.DevState`) device state
+        self.__state = tango.DevState.ON
+        self._NXSRecSelector__stg = None
+        self._NXSRecSelector__dp = None
+        self._NXSRecSelector__toupdate = ['ConfigDevice', 'Door']
+        self._NXSRecSelector__staleEvents = False
+        for pname, prop in NXSRecSelectorClass.device_property_list.items():
+            if "Array" in str(prop[0]):
+                value = list(prop[2])
+            else:
+                value = prop[2][0] if prop[2] else None
+            setattr(self, pname, value)
+        for pname, value in (properties or {}).items():
+            setattr(self, pname, value)
+
+    def __getattr__(self, name):
+        """ provides methods of NXSRecSelector bound to the stand-in
+
+        :param name: method name
+        :type name: :obj:`str`
+        :returns: bound method
+        :rtype: :obj:`function`
+        """
+        from nxsrecconfig.NXSConfig import NXSRecSelector
+
+        method = NXSRecSelector.__dict__.get(name)
+        if method is None or not callable(method):
+            raise AttributeError(name)
+        return functools.partial(method, self)
+
+    def request(self, name, *args):
+        """ executes the client request
+
+        :param name: command or attribute method name
+        :type name: :obj:`str`
+        :param args: command argument or written value
+        :type args: :obj:`list` <`any`>
+        :returns: command result or read value
+        :rtype: `any`
+        """
+        self.always_executed_hook()
+        if name.startswith("read_"):
+            attr = StandInAttribute()
+            getattr(self, name)(attr)
+            return attr.value
+        elif name.startswith("write_"):
+            return getattr(self, name)(StandInAttribute(*args[:1]))
+        return getattr(self, name)(*args)
+
+    def get_name(self):
+        """ provides device name
+
+        :returns: device name
+        :rtype: :obj:`str`
+        """
+        return self.__name
+
+    def get_state(self):
+        """ provides device state
+
+        :returns: device state
+        :rtype: :class:`tango.DevState`
+        """
+        return self.__state
+
+    def set_state(self, state):
+        """ sets device state
+
+        :param state: device state
+        :type state: :class:`tango.DevState`
+        """
+        self.__state = state
+
+    def get_device_class(self):
+        """ provides device class
+
+        :returns: None
+        :rtype: :obj:`None`
+        """
+
+    def get_device_properties(self, _):
+        """ sets device properties, i.e. they are set by the constructor
+        """
+
+    def set_change_event(self, name, implemented, detect):
+        """ declares change events of the attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param implemented: events pushed by the device
+        :type implemented: :obj:`bool`
+        :param detect: events checked by the device
+        :type detect: :obj:`bool`
+        """
+
+    def push_change_event(self, name, value=None):
+        """ pushes change event of the attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+
+    def debug_stream(self, message):
+        """ writes debug message
+
+        :param message: message
+        :type message: :obj:`str`
+        """
+
+    def warn_stream(self, message):
+        """ writes warning message
+
+        :param message: message
+        :type message: :obj:`str`
+        """
+
+    def error_stream(self, message):
+        """ writes error message
+
+        :param message: message
+        :type message: :obj:`str`
+        """
+
+
+def replay(records, latency=0.0):
+    """ replays the recorded session
+
+    :param records: session records
+    :type records: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+    :param latency: scale of recorded latencies of remote calls
+    :type latency: :obj:`float`
+    :returns: (request results, summary)
+    :rtype: (:obj:`list` <:obj:`dict` <:obj:`str`, `any`>>,
+             :obj:`dict` <:obj:`str`, `any`>)
+    """
+    start = [rc for rc in records if rc["type"] == "start"][0]
+    requests = sorted([rc for rc in records if rc["type"] == "request"],
+                      key=lambda rc: rc["seq"])
+    properties = decode(start["properties"])
+    properties["SessionRecordFile"] = ""
+    store = ReplayStore(records, latency)
+    results = []
+    with ReplayTango(store):
+        device = SelectorStandIn(start["device"], properties)
+        begin = time.time()
+        device.init_device()
+        initialization = time.time() - begin
+        for request in requests:
+            store.push(request["seq"])
+            args = decode(request["args"])
+            begin = time.time()
+            try:
+                result = encode(device.request(request["name"], *args))
+                error = None
+            except Exception as e:
+                result = None
+                error = encode(e)
+            duration = time.time() - begin
+            if "error" in request:
+                matched = error is not None
+            else:
+                matched = error is None and \
+                    canonical(result, True) == \
+                    canonical(request.get("result"), True)
+            results.append({
+                "request": request["name"], "duration": duration,
+                "recorded": request["duration"], "matched": matched})
+        device.delete_device()
+    summary = {
+        "requests": len(results),
+        "initialization": initialization,
+        "duration": sum(res["duration"] for res in results),
+        "recorded": sum(res["recorded"] for res in results),
+        "mismatched": len([res for res in results if not res["matched"]]),
+        "missing": store.missing,
+        "latency": latency,
+    }
+    return results, summary
+
+
+def record(filename, beamline, selector="p09/nxsrecselector/bench"):
+    """ records a client session of the synthetic beamline
+
+    :param filename: record file name
+    :type filename: :obj:`str`
+    :param beamline: synthetic beamline
+    :type beamline: :class:`benchmarks.beamline.SyntheticBeamline`
+    :param selector: selector device name
+    :type selector: :obj:`str`
+    """
+    with beamline.build() as registry:
+        registry.add(FakeSelector(selector, beamline.latency))
+        device = SelectorStandIn(
+            selector,
+            {"SessionRecordFile": filename, "NumberOfThreads": 4})
+        device.init_device()
+        device.request("write_ConfigDevice", beamline.configServer)
+        device.request("write_Door", beamline.door)
+        device.request("write_MntGrp", beamline.mntGrp)
+        profile = json.loads(device.request("read_ProfileConfiguration"))
+        profile.update(beamline.selection())
+        device.request("write_ProfileConfiguration", json.dumps(profile))
+        device.request("AvailableComponents")
+        device.request("AvailableTimers")
+        device.request("PreselectComponents")
+        device.request("read_Components")
+        device.request("UpdateMntGrp")
+        device.request("IsMntGrpUpdated")
+        device.request("MutedChannels")
+        device.request("read_ProfileConfiguration")
+        device.request("IsMntGrpUpdated")
+        device.delete_device()
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="offline replay of recorded client sessions")
+    parser.add_argument(
+        "command", choices=["replay", "record"],
+        help="replay the session or record a synthetic session")
+    parser.add_argument("filename", help="record file")
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="scale of recorded latencies of remote calls")
+    parser.add_argument(
+        "--repeat", type=int, default=1,
+        help="number of replays")
+    parser.add_argument(
+        "--scale", type=int, nargs=4, default=[10, 100, 20, 2],
+        metavar=("COMPONENTS", "DATASOURCES", "CHANNELS", "DEPTH"),
+        help="scale of the recorded synthetic beamline")
+    options = parser.parse_args()
+
+    if options.command == "record":
+        record(options.filename, SyntheticBeamline(*options.scale))
+        return
+
+    records = load(options.filename)
+    for _ in range(max(options.repeat, 1)):
+        results, summary = replay(records, options.latency)
+        names = []
+        for res in results:
+            if res["request"] not in names:
+                names.append(res["request"])
+        for name in names:
+            items = [res for res in results if res["request"] == name]
+            print(json.dumps({
+                "request": name, "count": len(items),
+                "duration": sum(res["duration"] for res in items),
+                "recorded": sum(res["recorded"] for res in items),
+                "mismatched": len([res for res in items
+                                   if not res["matched"]]),
+            }, sort_keys=True))
+        print(json.dumps(summary, sort_keys=True))
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
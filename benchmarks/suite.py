@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""  benchmark suite of synthetic beamlines
+
+It times the main selector operations on synthetic beamlines of
+in-process devices, i.e. without a Tango database, prints JSON lines
+with the first and the best times and compares them with a baseline.
+A scale is given by numbers of components, datasources, pool channels
+and the depth of PYEVAL datasource chains.
+
+Usage: python -m benchmarks.suite [--scale 10 100 20 2] [--latency 0.0]
+           [--repeat 3] [--baseline benchmarks/baseline.json]
+           [--save-baseline FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .beamline import SyntheticBeamline
+
+
+#: (:obj:`list` <:obj:`str`>) keys identifying benchmark results
+KEYS = ["benchmark", "components", "datasources", "channels", "depth",
+        "latency"]
+
+#: (:obj:`str`) stored baseline
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "baseline.json")
+
+
+def measure(func, repeat):
+    """ measures the first and the shortest execution time of the function
+
+    :param func: function without arguments
+    :type func: :obj:`function`
+    :param repeat: number of repetitions
+    :type repeat: :obj:`int`
+    :returns: (first time, shortest time) in seconds
+    :rtype: (:obj:`float`, :obj:`float`)
+    """
+    times = []
+    for _ in range(max(repeat, 1)):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return times[0], min(times)
+
+
+def benchmarks(beamline, settings):
+    """ provides timed operations of the beamline
+
+    :param beamline: synthetic beamline
+    :type beamline: :class:`benchmarks.beamline.SyntheticBeamline`
+    :param settings: selector settings of the beamline
+    :type settings: :class:`nxsrecconfig.Settings.Settings`
+    :returns: (benchmark name, function) tuples
+    :rtype: :obj:`list` <(:obj:`str`, :obj:`function`)>
+    """
+    from nxsrecconfig.Describer import Describer
+    from nxsrecconfig.MacroServerPools import MacroServerPools
+    from nxsrecconfig.Utils import TangoUtils
+
+    components = beamline.components()
+    channels = [ch[0] for ch in beamline.channels()]
+    configserver = TangoUtils.openProxy(beamline.configServer)
+    msp = MacroServerPools(settings.numberOfThreads)
+    dynamic = json.dumps(beamline.datasources() + channels[1:])
+
+    return [
+        ("Describer.components",
+         lambda: Describer(configserver, True, pyevalfromscript=True)
+         .components(components)),
+        ("MacroServerPools.checkChannels",
+         lambda: msp.checkChannels(
+             beamline.door, configserver, channels,
+             dict((cp, None) for cp in components), {}, [])),
+        ("ProfileManager.updateProfile",
+         lambda: settings.updateMntGrp()),
+        ("ProfileManager.isMntGrpUpdated",
+         lambda: settings.isMntGrpUpdated()),
+        ("DynamicComponent.create",
+         lambda: settings.createDynamicComponent([dynamic])),
+        ("Settings.mutedChannels",
+         lambda: settings.mutedChannels()),
+    ]
+
+
+def run(beamline, repeat):
+    """ runs the benchmarks of the synthetic beamline
+
+    :param beamline: synthetic beamline
+    :type beamline: :class:`benchmarks.beamline.SyntheticBeamline`
+    :param repeat: number of repetitions
+    :type repeat: :obj:`int`
+    :returns: benchmark results
+    :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+    """
+    from nxsrecconfig.Settings import Settings
+
+    results = []
+    with beamline.build():
+        settings = Settings()
+        settings.configDevice = beamline.configServer
+        settings.door = beamline.door
+        settings.mntGrp = beamline.mntGrp
+        profile = json.loads(settings.profileConfiguration)
+        profile.update(beamline.selection())
+        settings.profileConfiguration = json.dumps(profile)
+        for name, func in benchmarks(beamline, settings):
+            first, best = measure(func, repeat)
+            results.append({
+                "benchmark": name,
+                "components": beamline.ncomponents,
+                "datasources": beamline.ndatasources,
+                "channels": beamline.nchannels,
+                "depth": beamline.depth,
+                "latency": beamline.latency,
+                "repeat": repeat,
+                "first": first,
+                "best": best,
+            })
+    return results
+
+
+def compare(results, baseline, tolerance, slack):
+    """ compares best times with the baseline
+
+    :param results: benchmark results
+    :type results: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+    :param baseline: baseline results
+    :type baseline: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+    :param tolerance: allowed ratio of the best and the baseline times
+    :type tolerance: :obj:`float`
+    :param slack: allowed absolute difference in seconds
+    :type slack: :obj:`float`
+    :returns: names of regressed benchmarks
+    :rtype: :obj:`list` <:obj:`str`>
+    """
+    bests = dict((tuple(res[key] for key in KEYS), res["best"])
+                 for res in baseline)
+    regressions = []
+    for res in results:
+        best = bests.get(tuple(res[key] for key in KEYS))
+        if best is None:
+            continue
+        res["baseline"] = best
+        res["ratio"] = res["best"] / best if best else None
+        res["regression"] = bool(
+            res["best"] > best * tolerance and res["best"] - best > slack)
+        if res["regression"]:
+            regressions.append(res["benchmark"])
+    return regressions
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="benchmark suite of synthetic beamlines")
+    parser.add_argument(
+        "--scale", type=int, nargs=4, action="append",
+        metavar=("COMPONENTS", "DATASOURCES", "CHANNELS", "DEPTH"),
+        help="beamline scale, can be repeated "
+        "(default: 10 100 20 2 and 100 1000 100 3)")
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="delay of each remote call in seconds")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="number of repetitions")
+    parser.add_argument(
+        "--baseline", default=BASELINE,
+        help="baseline file to compare with, empty to skip comparison")
+    parser.add_argument(
+        "--tolerance", type=float, default=1.5,
+        help="allowed ratio of the best and the baseline times")
+    parser.add_argument(
+        "--slack", type=float, default=0.005,
+        help="allowed absolute difference of times in seconds")
+    parser.add_argument(
+        "--save-baseline", dest="savebaseline", default="",
+        help="file to store the results as a baseline")
+    options = parser.parse_args()
+
+    baseline = []
+    if options.baseline and os.path.isfile(options.baseline):
+        with open(options.baseline) as fl:
+            baseline = json.load(fl)["results"]
+    results = []
+    for scale in options.scale or [[10, 100, 20, 2], [100, 1000, 100, 3]]:
+        results.extend(run(SyntheticBeamline(*scale, latency=options.latency),
+                           options.repeat))
+    regressions = compare(results, baseline, options.tolerance,
+                          options.slack)
+    for result in results:
+        print(json.dumps(result, sort_keys=True))
+    if options.savebaseline:
+        with open(options.savebaseline, "w") as fl:
+            json.dump({"results": results}, fl, indent=1, sort_keys=True)
+            fl.write("\n")
+    if regressions:
+        sys.stderr.write("regressions: %s\n" % ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,7 @@ except Exception:
     import PyTango as tango
 
 from .Utils import TangoUtils, Utils
+from .Instrumentation import Instrumentation
 
 if sys.version_info > (3,):
     import queue as Queue
@@ -113,20 +114,25 @@ class CheckerThread(threading.Thread):
         #: (:obj:`list` <:obj:`str`>) tango datasources warning states
         self.tangoSourceWarningStates = ["ALARM", "DISABLE"]
 
+        #: (:obj:`tuple`) instrumentation context of the calling command
+        self.context = None
+
     def run(self):
         """ runner
 
         :brief: It runs the defined thread
         """
         full = True
-        while full:
-            try:
-                elem = self.__queue.get(block=False)
-                self.__check(elem)
+        with Instrumentation.attach(self.context):
+            while full:
+                try:
+                    elem = self.__queue.get(block=False)
+                    self.__check(elem)
 
-            except Queue.Empty:
-                full = False
+                except Queue.Empty:
+                    full = False
 
+    @Instrumentation.spanned("CheckerThread.check")
     def __check(self, checkeritem):
         """ checks oen device list item which usually corresponds
         to one components
@@ -142,7 +148,7 @@ class CheckerThread(threading.Thread):
                     dvat = "%s/%s" % (ds.device or ds.name, ds.attr)
                 else:
                     dvat = "%s" % (ds.device or ds.name)
-                dp = tango.DeviceProxy(ds.device or ds.name)
+                dp = TangoUtils.deviceProxy(ds.device or ds.name)
                 # read real value (not polled)
                 dp.set_source(tango.DevSource.DEV)
                 # wait when DeviceProxy is ready
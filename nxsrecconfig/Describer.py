@@ -32,6 +32,7 @@ import xml.etree.ElementTree as et
 from lxml.etree import XMLParser
 # from lxml import etree
 from .Utils import Utils, TangoUtils
+from .Instrumentation import Instrumentation
 
 
 if sys.version_info > (3,):
@@ -164,7 +165,9 @@ class Describer(object):
     """ Lists datasources, strategy, dstype and record name
         of given component """
 
-    def __init__(self, nexusconfig_device, tree=False, pyevalfromscript=False):
+    def __init__(self, nexusconfig_device, tree=False, pyevalfromscript=False,
+                 availablecomponents=None, availabledatasources=None,
+                 dsxmls=None):
         """ constructor
 
         :param nexusconfig_device: configserver configuration server
@@ -174,6 +177,14 @@ class Describer(object):
         :type tree: :obj:`bool`
         :param pyevalfromscript: if evalulate PYEVAL datasources from script
         :type pyevalfromscript: :obj:`bool`
+        :param availablecomponents: available components,
+                                    if None they are fetched
+        :type availablecomponents: :obj:`list` <:obj:`str`>
+        :param availabledatasources: available datasources,
+                                     if None they are fetched
+        :type availabledatasources: :obj:`list` <:obj:`str`>
+        :param dsxmls: shared datasource xml cache
+        :type dsxmls: :obj:`dict` <:obj:`str`, :obj:`str`>
         """
         #: (:class:`tango.DeviceProxy` \
         #: or :class:`nxsconfigserver.XMLConfigurator.XMLConfigurator`) \
@@ -184,15 +195,39 @@ class Describer(object):
         #: (:obj:`bool`) flag for evalulating PYEVAL datasources from script
         self.__pyevalfromscript = pyevalfromscript
         #: (:obj:`list` <:obj:`str`>) available configuration server components
-        self.__availableComponents = TangoUtils.command(
-            self.__nexusconfig_device,
-            "availableComponents")
+        self.__availableComponents = availablecomponents \
+            if availablecomponents is not None else TangoUtils.command(
+                self.__nexusconfig_device,
+                "availableComponents")
         #: (:obj:`list` <:obj:`str`>) \
         #:     available configuration server datasources
-        self.__availableDataSources = TangoUtils.command(
-            self.__nexusconfig_device,
-            "availableDataSources")
+        self.__availableDataSources = availabledatasources \
+            if availabledatasources is not None else TangoUtils.command(
+                self.__nexusconfig_device,
+                "availableDataSources")
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) datasource xml cache
+        self.__dsxmls = dsxmls
 
+    def __fetchDataSources(self, names):
+        """ fetches datasource xmls from the configuration server
+
+        :param names: datasource names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: datasource xmls
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if self.__dsxmls is None:
+            return TangoUtils.command(
+                self.__nexusconfig_device, "dataSources", names)
+        missing = [name for name in names if name not in self.__dsxmls]
+        if missing:
+            xmls = TangoUtils.command(
+                self.__nexusconfig_device, "dataSources", missing)
+            self.__dsxmls.update(zip(missing, xmls or []))
+        return [self.__dsxmls[name] for name in names
+                if name in self.__dsxmls]
+
+    @Instrumentation.spanned("Describer.components")
     def components(self, components=None, strategy='', dstype='', cfvars=None):
         """ describes given components. If :obj:`tree` = True it returns
 
@@ -363,9 +398,8 @@ class Describer(object):
                     subc = ''
                 name = subc.strip() if subc else ""
                 if Utils.tostr(name) in self.__availableDataSources:
-                    dsxmls = TangoUtils.command(
-                        self.__nexusconfig_device,
-                        "dataSources", [Utils.tostr(name)])
+                    dsxmls = self.__fetchDataSources(
+                        [Utils.tostr(name)])
                 else:
                     dsxmls = None
                     dsitem = DSItem(
@@ -396,6 +430,24 @@ class Describer(object):
 
         return dslist
 
+    @classmethod
+    def __fromString(cls, xml):
+        """ parses xml string
+
+        :param xml: xml string
+        :type xml: :obj:`str`
+        :returns: root node
+        :rtype: :class:`lxml.etree.Element`
+        """
+        with Instrumentation.call("xml", "parse") as measurement:
+            measurement.add(xml)
+            if sys.version_info > (3,):
+                return et.fromstring(bytes(xml, "UTF-8"),
+                                     parser=XMLParser(collect_ids=False))
+            else:
+                return et.fromstring(xml,
+                                     parser=XMLParser(collect_ids=False))
+
     def __findsubdatasources(self, dsxml, parentobj="datasource"):
         """ finds datasources in pyeval scripts
 
@@ -409,12 +461,7 @@ class Describer(object):
         dslist = []
         result = ""
         label = 'datasources'
-        if sys.version_info > (3,):
-            root = et.fromstring(bytes(dsxml, "UTF-8"),
-                                 parser=XMLParser(collect_ids=False))
-        else:
-            root = et.fromstring(dsxml,
-                                 parser=XMLParser(collect_ids=False))
+        root = self.__fromString(dsxml)
 
         cnode = root.findall("datasource")
         if cnode:
@@ -436,9 +483,8 @@ class Describer(object):
                 subc = ''
             name = subc.strip() if subc else ""
             if name in result:
-                chdsxml = TangoUtils.command(
-                    self.__nexusconfig_device,
-                    "dataSources", [Utils.tostr(name)])
+                chdsxml = self.__fetchDataSources(
+                    [Utils.tostr(name)])
                 if chdsxml:
                     dsitem = self.__describeDataSource(name, chdsxml[0])
                     dsitem.parentobj = parentobj
@@ -540,12 +586,7 @@ class Describer(object):
         """
         dss = ExDSDict()
         for cpxml in cpxmls:
-            if sys.version_info > (3,):
-                root = et.fromstring(bytes(cpxml, "UTF-8"),
-                                     parser=XMLParser(collect_ids=False))
-            else:
-                root = et.fromstring(cpxml,
-                                     parser=XMLParser(collect_ids=False))
+            root = self.__fromString(cpxml)
             parents = root.findall(".//field")
             attrs = root.findall(".//attribute")
             dims = root.findall(".//dim")
@@ -591,8 +632,7 @@ class Describer(object):
             dss = ads
         try:
             if dss:
-                xmls = TangoUtils.command(self.__nexusconfig_device,
-                                          "dataSources", dss)
+                xmls = self.__fetchDataSources(dss)
             else:
                 xmls = []
         except Exception:
@@ -641,20 +681,13 @@ class Describer(object):
         record = None
         try:
             if not dsxml:
-                dsource = TangoUtils.command(
-                    self.__nexusconfig_device,
-                    "dataSources", [Utils.tostr(name)])
+                dsource = self.__fetchDataSources([Utils.tostr(name)])
             else:
                 dsource = [dsxml]
         except tango.DevFailed:
             dsource = []
         if len(dsource) > 0:
-            if sys.version_info > (3,):
-                root = et.fromstring(bytes(dsource[0], "UTF-8"),
-                                     parser=XMLParser(collect_ids=False))
-            else:
-                root = et.fromstring(dsource[0],
-                                     parser=XMLParser(collect_ids=False))
+            root = self.__fromString(dsource[0])
             dss = root.findall(".//datasource")
             for ds in dss:
                 if ds.tag == 'datasource':
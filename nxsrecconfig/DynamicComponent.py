@@ -19,19 +19,17 @@
 
 """  Dynamic Component """
 
+import hashlib
 import json
+import re
 import sys
+import time
 import lxml.etree
 import xml.etree.ElementTree as et
 from lxml.etree import XMLParser
 
-try:
-    import tango
-except Exception:
-    import PyTango as tango
-
-
 from .Utils import Utils, TangoUtils, PoolUtils
+from .Instrumentation import Instrumentation
 
 
 class DynamicComponent(object):
@@ -86,7 +84,7 @@ class DynamicComponent(object):
         self.__nexusshapes = {}
 
         #: (:class:`tango.Database` ) pytango database server
-        self.__db = tango.Database()
+        self.__db = TangoUtils.database()
 
         #: (:obj:`str`) default dynamic component path
         self.__ldefaultpath = defaultpath
@@ -101,6 +99,34 @@ class DynamicComponent(object):
         #: (:obj:`str`) default data type
         self.__defaulttype = defaulttype
 
+        #: (:obj:`bool`) reuse stored dynamic component
+        #:    created from the same inputs
+        self.reuse = False
+        #: (:obj:`bool`) store creation time in the dynamic component
+        self.stampTime = False
+
+        #: (:obj:`int`) number of threads used to read datasource metadata
+        self.numberOfThreads = 20
+        #: (:obj:`float`) device call timeout in seconds
+        #:    used to read datasource metadata
+        self.metadataTimeout = 3.0
+        #: (:obj:`dict` <:obj:`str` , :class:`lxml.etree.Element`> ) \
+        #:       prefetched datasource nodes
+        self.__dsnodes = {}
+        #: (:obj:`dict` <:obj:`str` , :obj:`tuple`> ) \
+        #:       prefetched (shape, data_type, units) of tango sources
+        self.__metadata = {}
+        #: (:obj:`dict` <(:obj:`str`, :obj:`str`), \
+        #:       (:obj:`str`, :obj:`str`)> ) \
+        #:       (path, field) tuples of (alias, default path)
+        self.__pathfields = {}
+        #: (:obj:`dict` <:obj:`str` , :obj:`tuple` <(:obj:`str`, :obj:`str`)> \
+        #:       > ) (name, type) tuples of groups for nexus paths
+        self.__grouppaths = {}
+        #: (:obj:`dict` <:obj:`tuple` , :class:`lxml.etree.Element`> ) \
+        #:       created group nodes of (name, type) group paths
+        self.__groups = {}
+
         #: (:obj:`dict` <:obj:`str` , :obj:`str`> ) \
         #:    map of numpy types : NEXUS
         self.__npTn = {"float32": "NX_FLOAT32", "float64": "NX_FLOAT64",
@@ -202,6 +228,7 @@ class DynamicComponent(object):
         self.__nexusshapes = json.loads(shapes)
         if not isinstance(self.__nexusshapes, dict):
             self.__nexusshapes = {}
+        self.__pathfields = {}
 
     def setDefaultLinkPath(self, dynamicLinks, dynamicPath,
                            dynamicInitLinks=None):
@@ -234,7 +261,10 @@ class DynamicComponent(object):
         dstype = ds.get("type")
         if dstype == 'TANGO':
             source = Utils.tostr(Utils.getRecord(ds))
-            shape, dt, _ = TangoUtils.getShapeTypeUnit(source)
+            if source in self.__metadata:
+                shape, dt, _ = self.__metadata[source]
+            else:
+                shape, dt, _ = TangoUtils.getShapeTypeUnit(source)
             nxtype = self.__npTn[dt] \
                 if dt in self.__npTn.keys() else nxtype
         return shape, nxtype
@@ -242,8 +272,8 @@ class DynamicComponent(object):
     def __createSardanaNodes(self, created, definition):
         """ creates XML nodes for sardana devices
 
-        :param created: list of created devices
-        :type created: :obj:`list` <:obj:`str`>
+        :param created: set of created devices
+        :type created: :obj:`set` <:obj:`str`>
         :param definition: definition node
         :type definition: :class:`lxml.etree.Element`
         """
@@ -257,15 +287,13 @@ class DynamicComponent(object):
                 defaultpath = self.__defaultuserpath
                 links = self.__ilinks
             alias = self.__get_alias(Utils.tostr(dd["name"]))
-            path, field = self.__getPathField(
-                self.__nexuspaths, self.__nexuslabels,
-                alias, defaultpath)
+            path, field = self.__pathField(alias, defaultpath)
             link = self.__getProp(
                 self.__nexuslinks, self.__nexuslabels,
                 alias, links)
             (parent, nxdata) = self.__createGroupTree(
                 definition, path, link)
-            created.append(alias)
+            created.add(alias)
             nxtype = self.__npTn[dd["dtype"]] \
                 if dd["dtype"] in self.__npTn.keys() else 'NX_CHAR'
             xmlfield = self.__createField(
@@ -280,14 +308,73 @@ class DynamicComponent(object):
             if link:
                 self.__createLink(nxdata, path, field)
 
+    def __prefetchDataSources(self, created, avds):
+        """ fetches nodes of non sardana datasources and reads
+            metadata of their tango sources concurrently
+
+        :param created: set of created devices
+        :type created: :obj:`set` <:obj:`str`>
+        :param avds: available datasources
+        :type avds: :obj:`set` <:obj:`str`>
+        """
+        self.__dsnodes = {}
+        names = []
+        seen = set(created)
+        for ds in self.__stepdsources + self.__initdsources:
+            if ds not in seen and ds in avds:
+                seen.add(ds)
+                names.append(ds)
+        xmls = []
+        if names:
+            try:
+                xmls = TangoUtils.command(
+                    self.__nexusconfig_device, "dataSources",
+                    [Utils.tostr(ds) for ds in names]) or []
+            except Exception:
+                xmls = []
+        for ds, xml in zip(names, xmls):
+            try:
+                node = self.__parseDataSource(xml)
+            except Exception:
+                continue
+            if node is not None:
+                self.__dsnodes[ds] = node
+        sources = [Utils.tostr(Utils.getRecord(node))
+                   for node in self.__dsnodes.values()
+                   if node.get("type") == 'TANGO']
+        self.__metadata = TangoUtils.getShapeTypeUnits(
+            sources, self.numberOfThreads, self.metadataTimeout)
+
+    @classmethod
+    def __parseDataSource(cls, xml):
+        """ parses datasource xml
+
+        :param xml: datasource xml
+        :type xml: :obj:`str`
+        :returns: first datasource node or None
+        :rtype: :class:`lxml.etree.Element`
+        """
+        with Instrumentation.call("xml", "parse") as measurement:
+            measurement.add(xml)
+            if sys.version_info > (3,):
+                root = et.fromstring(
+                    bytes(xml, "UTF-8"),
+                    parser=XMLParser(collect_ids=False))
+            else:
+                root = et.fromstring(
+                    xml,
+                    parser=XMLParser(collect_ids=False))
+        dss = root.findall(".//datasource")
+        return dss[0] if dss else None
+
     def __createNonSardanaNodes(self, created, avds, definition,
                                 strategy="STEP"):
         """ creates XML nodes for non sardana devices
 
-        :param created: list of created devices
-        :type created: :obj:`list` <:obj:`str`>
+        :param created: set of created devices
+        :type created: :obj:`set` <:obj:`str`>
         :param avds: available datasources
-        :type avds: :obj:`list` <:obj:`str`>
+        :type avds: :obj:`set` <:obj:`str`>
         :param definition: definition node
         :type definition: :class:`lxml.etree.Element`
         """
@@ -295,9 +382,7 @@ class DynamicComponent(object):
             if strategy == 'INIT' else self.__stepdsources
         for ds in dsources:
             if ds not in created:
-                path, field = self.__getPathField(
-                    self.__nexuspaths, self.__nexuslabels,
-                    ds, self.__defaultpath)
+                path, field = self.__pathField(ds, self.__defaultpath)
 
                 link = self.__getProp(
                     self.__nexuslinks, self.__nexuslabels, ds,
@@ -305,22 +390,18 @@ class DynamicComponent(object):
                     else self.__links)
                 (parent, nxdata) = self.__createGroupTree(
                     definition, path, link)
-                created.append(ds)
+                created.add(ds)
 
                 shape, nxtype = None, self.__defaulttype
-                if ds in avds:
+                if ds in self.__dsnodes:
+                    dss = [self.__dsnodes[ds]]
+                elif ds in avds:
                     dsource = TangoUtils.command(
                         self.__nexusconfig_device, "dataSources",
                         [Utils.tostr(ds)])
-                    if sys.version_info > (3,):
-                        root = et.fromstring(
-                            bytes(dsource[0], "UTF-8"),
-                            parser=XMLParser(collect_ids=False))
-                    else:
-                        root = et.fromstring(
-                            dsource[0],
-                            parser=XMLParser(collect_ids=False))
-                    dss = root.findall(".//datasource")
+                    node = self.__parseDataSource(dsource[0])
+                    dss = [node] if node is not None else []
+                if ds in avds:
                     if dss and shape is None:
                         shape, nxtype = self.__shapeFromTango(dss[0])
                         if not nxtype:
@@ -341,6 +422,96 @@ class DynamicComponent(object):
                 if link:
                     self.__createLink(nxdata, path, field)
 
+    def inputHash(self):
+        """ provides hash of the dynamic component inputs
+
+        :returns: hash of datasources, label parameters,
+                  default paths, links and type
+        :rtype: :obj:`str`
+        """
+        data = [self.__stepdsourcesDict, self.__stepdsources,
+                self.__initdsources, self.__nexuslabels, self.__nexuspaths,
+                self.__nexuslinks, self.__nexustypes, self.__nexusshapes,
+                self.__defaultpath, self.__defaultuserpath, self.__links,
+                self.__ilinks, self.__defaulttype]
+        return hashlib.sha1(
+            json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    @classmethod
+    def __hashComment(cls, ihash):
+        """ provides text of the XML comment with the input hash
+
+        :param ihash: hash of the dynamic component inputs
+        :type ihash: :obj:`str`
+        :returns: comment text
+        :rtype: :obj:`str`
+        """
+        return " inputs: %s " % ihash
+
+    def __findComponent(self, cps, ihash):
+        """ finds stored dynamic component created from the same inputs
+
+        :param cps: available components
+        :type cps: :obj:`list` <:obj:`str`>
+        :param ihash: hash of the dynamic component inputs
+        :type ihash: :obj:`str`
+        :returns: dynamic component name and its xml
+                  or (None, None) if it is not found
+        :rtype: (:obj:`str`, :obj:`str`)
+        """
+        names = [cp for cp in cps if cp.startswith(self.__defaultCP)]
+        if not names:
+            return None, None
+        try:
+            xmls = TangoUtils.command(
+                self.__nexusconfig_device, "components", names)
+        except Exception:
+            return None, None
+        comment = self.__hashComment(ihash).strip()
+        for name, xml in zip(names, xmls or []):
+            if comment in xml:
+                return name, Utils.tostr(xml)
+        return None, None
+
+    @classmethod
+    def __timeComment(cls, ctime):
+        """ provides text of the XML comment with the creation time
+
+        :param ctime: creation time in seconds since the epoch
+        :type ctime: :obj:`float`
+        :returns: comment text
+        :rtype: :obj:`str`
+        """
+        return " created: %.3f " % ctime
+
+    @classmethod
+    def __creationTime(cls, xml):
+        """ provides creation time stored in the component xml
+
+        :param xml: component xml
+        :type xml: :obj:`str`
+        :returns: creation time or None if it is not stored
+        :rtype: :obj:`float`
+        """
+        found = re.search(r"<!-- created: ([0-9.]+) -->", xml)
+        return float(found.group(1)) if found else None
+
+    def __storeXML(self, xmls):
+        """ stores xml of the dynamic component
+
+        :param xmls: component xml
+        :type xmls: :obj:`str`
+        """
+        if xmls.startswith("<?xml"):
+            self.__nexusconfig_device.xmlstring = xmls
+        else:
+            self.__nexusconfig_device.xmlstring = \
+                "<?xml version='1.0' encoding='utf8'?>\n" + xmls
+
+        TangoUtils.command(self.__nexusconfig_device, "storeComponent",
+                           Utils.tostr(self.__dynamicCP))
+
+    @Instrumentation.spanned("DynamicComponent.create")
     def create(self):
         """ creates dynamic component
 
@@ -349,17 +520,36 @@ class DynamicComponent(object):
         """
         cps = TangoUtils.command(self.__nexusconfig_device,
                                  "availableComponents")
+        ihash = None
+        if self.reuse:
+            ihash = self.inputHash()
+            name, xml = self.__findComponent(cps, ihash)
+            if name:
+                self.__dynamicCP = name
+                if self.stampTime and self.__creationTime(xml) is not None:
+                    self.__storeXML(re.sub(
+                        r"<!-- created: [0-9.]+ -->",
+                        "<!--%s-->" % self.__timeComment(time.time()),
+                        xml))
+                return self.__dynamicCP
         name = self.__defaultCP
         while name in cps:
             name = name + "x"
         self.__dynamicCP = name
 
         definition = lxml.etree.Element("definition")
-        avds = TangoUtils.command(self.__nexusconfig_device,
-                                  "availableDataSources")
-
-        created = []
+        self.__groups = {}
+        if ihash:
+            definition.append(lxml.etree.Comment(self.__hashComment(ihash)))
+        if self.stampTime:
+            definition.append(
+                lxml.etree.Comment(self.__timeComment(time.time())))
+        avds = set(TangoUtils.command(self.__nexusconfig_device,
+                                      "availableDataSources") or [])
+
+        created = set()
         self.__createSardanaNodes(created, definition)
+        self.__prefetchDataSources(created, avds)
         self.__createNonSardanaNodes(created, avds, definition, 'STEP')
         self.__createNonSardanaNodes(created, avds, definition, 'INIT')
 
@@ -373,14 +563,7 @@ class DynamicComponent(object):
                 lxml.etree.tostring(
                     definition, encoding='utf8',
                     method='xml', pretty_print=True))
-        if xmls.startswith("<?xml"):
-            self.__nexusconfig_device.xmlstring = xmls
-        else:
-            self.__nexusconfig_device.xmlstring = \
-                "<?xml version='1.0' encoding='utf8'?>\n" + xmls
-
-        TangoUtils.command(self.__nexusconfig_device, "storeComponent",
-                           Utils.tostr(self.__dynamicCP))
+        self.__storeXML(xmls)
 #        print("Dynamic Component:\n%s" % root.toprettyxml(indent="  "))
 
         return self.__dynamicCP
@@ -403,6 +586,23 @@ class DynamicComponent(object):
             prop = nexusprop.get(name, default)
         return prop
 
+    def __pathField(self, alias, defaultpath):
+        """ gets the Nexus path and field name for the given datasource
+            memoized until the label parameters are changed
+
+        :param alias : datasource alias
+        :type alias : :obj:`str`
+        :param defaultpath: default path if path is not defined
+        :type defaultpath: :obj:`str`
+        :returns: (path, fieldname)
+        :rtype: (:obj:`str` , :obj:`str`)
+        """
+        key = (alias, defaultpath)
+        if key not in self.__pathfields:
+            self.__pathfields[key] = self.__getPathField(
+                self.__nexuspaths, self.__nexuslabels, alias, defaultpath)
+        return self.__pathfields[key]
+
     @classmethod
     def __getPathField(cls, nexuspaths, nexuslabels, alias, defaultpath):
         """ gets the Nexus path and for the given datasource
@@ -582,9 +782,89 @@ class DynamicComponent(object):
             TangoUtils.command(self.__nexusconfig_device,
                                "deleteComponent", Utils.tostr(name))
 
-    @classmethod
-    def __createGroupTree(cls, definition, path, links=False):
-        """ creates group tree
+    def removeComponents(self, names):
+        """ removes dynamic components listing available components once
+
+        :param names: dynamic component names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: names of removed components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        cps = set(TangoUtils.command(self.__nexusconfig_device,
+                                     "availableComponents") or [])
+        removed = []
+        for name in names:
+            if self.__defaultCP in name and name in cps:
+                TangoUtils.command(self.__nexusconfig_device,
+                                   "deleteComponent", Utils.tostr(name))
+                removed.append(name)
+        return removed
+
+    def staleComponents(self, maxAge):
+        """ provides stored dynamic components with creation times
+            older than the given age, components without the stored
+            creation time are not reported
+
+        :param maxAge: age in seconds
+        :type maxAge: :obj:`float`
+        :returns: names of stale components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        cps = TangoUtils.command(self.__nexusconfig_device,
+                                 "availableComponents") or []
+        names = [cp for cp in cps if cp.startswith(self.__defaultCP)]
+        if not names:
+            return []
+        xmls = TangoUtils.command(
+            self.__nexusconfig_device, "components", names) or []
+        now = time.time()
+        stale = []
+        for name, xml in zip(names, xmls):
+            ctime = self.__creationTime(Utils.tostr(xml))
+            if ctime is not None and now - ctime >= maxAge:
+                stale.append(name)
+        return stale
+
+    def removeStaleComponents(self, maxAge):
+        """ removes stored dynamic components with creation times
+            older than the given age
+
+        :param maxAge: age in seconds
+        :type maxAge: :obj:`float`
+        :returns: names of removed components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        removed = []
+        for name in self.staleComponents(maxAge):
+            TangoUtils.command(self.__nexusconfig_device,
+                               "deleteComponent", Utils.tostr(name))
+            removed.append(name)
+        return removed
+
+    def __groupPath(self, path):
+        """ parses NeXus path into group names and types
+
+        :param path: NeXus path
+        :type path: :obj:`str`
+        :returns: (name, type) tuples of groups
+        :rtype: :obj:`tuple` <(:obj:`str`, :obj:`str`)>
+        """
+        if path not in self.__grouppaths:
+            groups = []
+            for dr in path.split('/'):
+                if dr.strip():
+                    w = dr.split(':')
+                    if len(w) == 1:
+                        if len(w[0]) > 2 and w[0][:2] == 'NX':
+                            w.insert(0, w[0][2:])
+                        else:
+                            w.append("NX" + w[0])
+                    groups.append((w[0], w[1]))
+            self.__grouppaths[path] = tuple(groups)
+        return self.__grouppaths[path]
+
+    def __createGroupTree(self, definition, path, links=False):
+        """ creates group tree or reuses its already created groups
 
         :param definition: definition node
         :type definition: :class:`lxml.etree.Element`
@@ -595,30 +875,27 @@ class DynamicComponent(object):
         :returns (last group node, nxdata group node) tuple
         :rtype (:class:`lxml.etree.Element`, :class:`lxml.etree.Element`)
         """
-        spath = path.split('/')
-        entry = None
+        groups = self.__groupPath(path)
         parent = definition
         nxdata = None
-        for dr in spath:
-            if dr.strip():
+        for i in range(len(groups)):
+            key = groups[:i + 1]
+            node = self.__groups.get(key)
+            if node is None:
                 node = lxml.etree.Element("group")
                 parent.append(node)
-                if entry is None:
-                    entry = node
-
-                w = dr.split(':')
-                if len(w) == 1:
-                    if len(w[0]) > 2 and w[0][:2] == 'NX':
-                        w.insert(0, w[0][2:])
-                    else:
-                        w.append("NX" + w[0])
-                node.attrib["type"] = w[1]
-                node.attrib["name"] = w[0]
-                parent = node
-        if links and entry is not None:
-            nxdata = lxml.etree.Element("group")
-            entry.append(nxdata)
-            nxdata.attrib["type"] = "NXdata"
-            nxdata.attrib["name"] = "data"
+                node.attrib["type"] = groups[i][1]
+                node.attrib["name"] = groups[i][0]
+                self.__groups[key] = node
+            parent = node
+        if links and groups:
+            key = groups[:1] + (("data", "NXdata"),)
+            nxdata = self.__groups.get(key)
+            if nxdata is None:
+                nxdata = lxml.etree.Element("group")
+                self.__groups[groups[:1]].append(nxdata)
+                nxdata.attrib["type"] = "NXdata"
+                nxdata.attrib["name"] = "data"
+                self.__groups[key] = nxdata
 
         return parent, nxdata
@@ -0,0 +1,497 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Performance statistics of commands and their remote calls """
+
+import functools
+import threading
+import time
+
+from .Tracing import Tracer
+
+
+class NoMeasurement(object):
+
+    """ Measurement used when the instrumentation is disabled
+    """
+
+    def __enter__(self):
+        """ enters the measurement
+
+        :returns: the measurement
+        :rtype: :class:`NoMeasurement`
+        """
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ exits the measurement
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+
+    def add(self, value):
+        """ adds size of the transferred value
+
+        :param value: transferred value
+        :type value: `any`
+        """
+
+    def set(self, name, value):
+        """ sets attribute of the traced span
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+
+
+#: (:class:`NoMeasurement`) measurement of the disabled instrumentation
+NOMEASUREMENT = NoMeasurement()
+
+
+class CommandMeasurement(NoMeasurement):
+
+    """ Wall time measurement and trace of one command
+    """
+
+    def __init__(self, name, frame=None, span=None):
+        """ constructor
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param frame: command frame to be attached, i.e. in a worker thread
+        :type frame: :obj:`list` <:obj:`str`>
+        :param span: command span to be attached, i.e. in a worker thread
+        :type span: :class:`nxsrecconfig.Tracing.Span`
+        """
+        #: (:obj:`str`) command name
+        self.name = name
+        #: (:obj:`list` <:obj:`str`>) attached command frame,
+        #:    i.e. [command, stage]
+        self.__frame = frame
+        #: (:class:`nxsrecconfig.Tracing.NoSpan`) command span
+        self.__span = Tracer.attach(span) if frame is not None \
+            else Tracer.trace(name)
+        #: (:obj:`float`) start time
+        self.__start = None
+
+    def __enter__(self):
+        """ starts the measurement
+
+        :returns: the measurement
+        :rtype: :class:`CommandMeasurement`
+        """
+        frame = self.__frame or [self.name, ""]
+        Instrumentation.frames().append(frame)
+        self.__span.__enter__()
+        self.__start = time.time()
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ records wall time of the command
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        frames = Instrumentation.frames()
+        if frames:
+            frames.pop()
+        self.__span.__exit__(etype, evalue, tb)
+        if self.__frame is None and Instrumentation.enabled:
+            Instrumentation.recordCommand(
+                self.name, time.time() - self.__start)
+
+
+class CallMeasurement(NoMeasurement):
+
+    """ Wall time and size measurement and span of one remote call
+    """
+
+    def __init__(self, target, operation):
+        """ constructor
+
+        :param target: remote target name
+        :type target: :obj:`str`
+        :param operation: operation name
+        :type operation: :obj:`str`
+        """
+        #: (:obj:`str`) remote target name
+        self.target = target
+        #: (:obj:`str`) operation name
+        self.operation = operation
+        #: (:obj:`int`) number of transferred bytes
+        self.bytes = 0
+        #: (:obj:`list` <:obj:`str`>) command frame, i.e. [command, stage]
+        self.__frame = Instrumentation.frame()
+        #: (:class:`nxsrecconfig.Tracing.NoSpan`) call span
+        self.__span = Tracer.span(
+            operation, target=target, stage=self.__frame[1])
+        #: (:obj:`float`) start time
+        self.__start = None
+
+    def __enter__(self):
+        """ starts the measurement
+
+        :returns: the measurement
+        :rtype: :class:`CallMeasurement`
+        """
+        self.__span.__enter__()
+        self.__start = time.time()
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ records the remote call
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        duration = time.time() - self.__start
+        self.__span.set("bytes", self.bytes)
+        self.__span.__exit__(etype, evalue, tb)
+        if Instrumentation.enabled:
+            Instrumentation.recordCall(
+                self.__frame, self.target, self.operation, duration,
+                self.bytes, etype is not None)
+
+    def add(self, value):
+        """ adds size of the transferred value
+
+        :param value: transferred value
+        :type value: `any`
+        """
+        self.bytes += Instrumentation.size(value)
+
+    def set(self, name, value):
+        """ sets attribute of the traced span
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        self.__span.set(name, value)
+
+
+class Instrumentation(object):
+
+    """ Aggregates wall times of commands and counts, wall times
+    and sizes of their remote calls per target and stage.
+    Measurements also record spans of enabled :class:`Tracer`.
+    When both are disabled all measurements are shared no-op objects.
+    """
+
+    #: (:obj:`bool`) instrumentation enabled flag
+    enabled = False
+
+    #: (:class:`threading.Lock`) statistics lock
+    __lock = threading.Lock()
+    #: (:class:`threading.local`) command frames of the current thread
+    __local = threading.local()
+    #: (:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, `any`>>) \
+    #:    command statistics
+    __stats = {}
+    #: (:obj:`float`) time of the last reset
+    __since = time.time()
+
+    @classmethod
+    def frames(cls):
+        """ provides command frames of the current thread
+
+        :returns: list of [command, stage] frames
+        :rtype: :obj:`list` <:obj:`list` <:obj:`str`>>
+        """
+        frames = getattr(cls.__local, "frames", None)
+        if frames is None:
+            frames = cls.__local.frames = []
+        return frames
+
+    @classmethod
+    def command(cls, name):
+        """ provides measurement of the command wall time,
+        i.e. to be used in the `with` statement
+
+        :param name: command name
+        :type name: :obj:`str`
+        :returns: command measurement
+        :rtype: :class:`CommandMeasurement` or :class:`NoMeasurement`
+        """
+        if not cls.enabled and not Tracer.enabled:
+            return NOMEASUREMENT
+        return CommandMeasurement(name)
+
+    @classmethod
+    def frame(cls):
+        """ provides the current command frame
+
+        :returns: [command, stage] frame, command is empty outside commands
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        frames = cls.frames()
+        return frames[-1] if frames else ["", ""]
+
+    @classmethod
+    def current(cls):
+        """ provides the current command context
+
+        :returns: [command, stage] frame and the current span or None
+        :rtype: (:obj:`list` <:obj:`str`>, \
+                 :class:`nxsrecconfig.Tracing.Span`)
+        """
+        if not cls.enabled and not Tracer.enabled:
+            return None
+        frames = cls.frames()
+        if not frames:
+            return None
+        return (frames[-1], Tracer.current())
+
+    @classmethod
+    def attach(cls, context):
+        """ attaches the command context to the current thread,
+        i.e. to be used in the `with` statement in worker threads
+
+        :param context: command context from :meth:`current`
+        :type context: (:obj:`list` <:obj:`str`>, \
+                        :class:`nxsrecconfig.Tracing.Span`)
+        :returns: command measurement
+        :rtype: :class:`CommandMeasurement` or :class:`NoMeasurement`
+        """
+        if context is None:
+            return NOMEASUREMENT
+        return CommandMeasurement(context[0][0], context[0], context[1])
+
+    @classmethod
+    def span(cls, name, **attributes):
+        """ provides span of the current trace,
+        i.e. to be used in the `with` statement
+
+        :param name: span name
+        :type name: :obj:`str`
+        :param attributes: span attributes
+        :type attributes: :obj:`dict` <:obj:`str`, `any`>
+        :returns: span
+        :rtype: :class:`nxsrecconfig.Tracing.NoSpan`
+        """
+        return Tracer.span(name, **attributes)
+
+    @classmethod
+    def spanned(cls, name):
+        """ provides decorator of methods recorded as spans
+        of the current trace
+
+        :param name: span name
+        :type name: :obj:`str`
+        :returns: method decorator
+        :rtype: :obj:`function`
+        """
+        def decorator(method):
+            @functools.wraps(method)
+            def spanned(*args, **kwargs):
+                with Tracer.span(name):
+                    return method(*args, **kwargs)
+            return spanned
+        return decorator
+
+    @classmethod
+    def stage(cls, name):
+        """ sets stage of the current command
+
+        :param name: stage name
+        :type name: :obj:`str`
+        """
+        frames = cls.frames()
+        if frames:
+            frames[-1][1] = name
+
+    @classmethod
+    def stager(cls, func=None):
+        """ provides stage function which also sets the command stage
+
+        :param func: function called with stage names
+        :type func: :obj:`instancemethod` or :obj:`function`
+        :returns: stage function
+        :rtype: :obj:`function`
+        """
+        def stage(name):
+            cls.stage(name)
+            if func is not None:
+                func(name)
+        return stage
+
+    @classmethod
+    def call(cls, target, operation):
+        """ provides measurement of a remote call,
+        i.e. to be used in the `with` statement
+
+        :param target: remote target, i.e. device proxy or its name
+        :type target: :class:`tango.DeviceProxy` or :obj:`str`
+        :param operation: operation name
+        :type operation: :obj:`str`
+        :returns: call measurement
+        :rtype: :class:`CallMeasurement` or :class:`NoMeasurement`
+        """
+        if not cls.enabled and not Tracer.enabled:
+            return NOMEASUREMENT
+        return CallMeasurement(cls.targetName(target), operation)
+
+    @classmethod
+    def targetName(cls, target):
+        """ provides name of the remote target
+
+        :param target: remote target, i.e. device proxy or its name
+        :type target: :class:`tango.DeviceProxy` or :obj:`str`
+        :returns: target name
+        :rtype: :obj:`str`
+        """
+        if isinstance(target, (str, type(u""))):
+            return target
+        if hasattr(target, "dev_name"):
+            try:
+                return str(target.dev_name())
+            except Exception:
+                pass
+        return target.__class__.__name__
+
+    @classmethod
+    def size(cls, value):
+        """ estimates size of the transferred value
+
+        :param value: transferred value
+        :type value: `any`
+        :returns: number of bytes
+        :rtype: :obj:`int`
+        """
+        if value is None:
+            return 0
+        if isinstance(value, (list, tuple)):
+            return sum(cls.size(vl) for vl in value)
+        if isinstance(value, dict):
+            return sum(cls.size(ky) + cls.size(vl)
+                       for ky, vl in value.items())
+        if isinstance(value, (bool, int, float)):
+            return 8
+        try:
+            return len(value)
+        except Exception:
+            return 0
+
+    @classmethod
+    def __commandStats(cls, name):
+        """ provides statistics of the given command
+
+        :param name: command name
+        :type name: :obj:`str`
+        :returns: command statistics
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        stats = cls.__stats.get(name)
+        if stats is None:
+            stats = cls.__stats[name] = {
+                "count": 0, "time": 0.0, "max": 0.0, "calls": {}}
+        return stats
+
+    @classmethod
+    def recordCommand(cls, name, duration):
+        """ records wall time of the command
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param duration: wall time in seconds
+        :type duration: :obj:`float`
+        """
+        with cls.__lock:
+            stats = cls.__commandStats(name)
+            stats["count"] += 1
+            stats["time"] += duration
+            stats["max"] = max(stats["max"], duration)
+
+    @classmethod
+    def recordCall(cls, frame, target, operation, duration, size=0,
+                   error=False):
+        """ records remote call of the command
+
+        :param frame: [command, stage] frame
+        :type frame: :obj:`list` <:obj:`str`>
+        :param target: remote target name
+        :type target: :obj:`str`
+        :param operation: operation name
+        :type operation: :obj:`str`
+        :param duration: wall time in seconds
+        :type duration: :obj:`float`
+        :param size: number of transferred bytes
+        :type size: :obj:`int`
+        :param error: call failure flag
+        :type error: :obj:`bool`
+        """
+        command, stage = frame
+        key = (target, operation, stage)
+        with cls.__lock:
+            calls = cls.__commandStats(command)["calls"]
+            call = calls.get(key)
+            if call is None:
+                call = calls[key] = [0, 0.0, 0, 0]
+            call[0] += 1
+            call[1] += duration
+            call[2] += size
+            if error:
+                call[3] += 1
+
+    @classmethod
+    def stats(cls):
+        """ provides aggregated statistics
+
+        :returns: statistics with commands sorted by their total time.
+                  Remote calls outside commands are under the '' key
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        with cls.__lock:
+            commands = {}
+            for name, stats in cls.__stats.items():
+                calls = [
+                    {"target": key[0], "operation": key[1],
+                     "stage": key[2], "count": call[0], "time": call[1],
+                     "bytes": call[2], "errors": call[3]}
+                    for key, call in stats["calls"].items()]
+                calls.sort(key=lambda cl: -cl["time"])
+                commands[name] = {
+                    "count": stats["count"], "time": stats["time"],
+                    "max": stats["max"], "calls": calls}
+            return {"enabled": cls.enabled, "since": cls.__since,
+                    "commands": commands}
+
+    @classmethod
+    def reset(cls):
+        """ removes all aggregated statistics
+        """
+        with cls.__lock:
+            cls.__stats = {}
+            cls.__since = time.time()
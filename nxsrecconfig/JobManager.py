@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Asynchronous jobs executed by a worker thread """
+
+import sys
+import threading
+import time
+import uuid
+
+from collections import OrderedDict
+
+from .Utils import Utils
+from .Instrumentation import Instrumentation
+
+if sys.version_info > (3,):
+    import queue as Queue
+else:
+    import Queue
+
+
+class Job(object):
+
+    """ Asynchronous job with its status, progress and stage timing
+    """
+
+    def __init__(self, name, func, stages=None):
+        """ constructor
+
+        :param name: job name
+        :type name: :obj:`str`
+        :param func: job function called with the job
+        :type func: :obj:`instancemethod` or :obj:`function`
+        :param stages: names of expected job stages
+        :type stages: :obj:`list` <:obj:`str`>
+        """
+        #: (:obj:`str`) job id
+        self.id = uuid.uuid4().hex
+        #: (:obj:`str`) job name
+        self.name = name
+        #: (:obj:`instancemethod` or :obj:`function`) job function
+        self.func = func
+        #: (:obj:`str`) job status, i.e. QUEUED, RUNNING, DONE or FAILED
+        self.status = "QUEUED"
+        #: (`any`) job result
+        self.result = None
+        #: (:obj:`str`) job error
+        self.error = None
+        #: (:obj:`float`) submission time
+        self.submitted = time.time()
+        #: (:obj:`float`) start time
+        self.started = None
+        #: (:obj:`float`) finish time
+        self.finished = None
+        #: (:obj:`list` <:obj:`str`>) names of expected job stages
+        self.expected = list(stages or [])
+        #: (:obj:`list` <:obj:`dict` <:obj:`str`, `any`>>) \
+        #:    stage names, start times and durations
+        self.stages = []
+
+    def stage(self, name):
+        """ starts the next job stage
+
+        :param name: stage name
+        :type name: :obj:`str`
+        """
+        now = time.time()
+        self.__closeStage(now)
+        self.stages.append({"name": name, "start": now, "duration": None})
+        Instrumentation.stage(name)
+
+    def __closeStage(self, now):
+        """ sets duration of the current stage
+
+        :param now: current time
+        :type now: :obj:`float`
+        """
+        if self.stages and self.stages[-1]["duration"] is None:
+            self.stages[-1]["duration"] = now - self.stages[-1]["start"]
+
+    @property
+    def progress(self):
+        """ provides job progress
+
+        :returns: job progress from 0 to 1
+        :rtype: :obj:`float`
+        """
+        if self.status in ["DONE", "FAILED"]:
+            return 1.0
+        if not self.expected:
+            return 0.0
+        done = len([st for st in self.stages if st["duration"] is not None])
+        return min(float(done) / len(self.expected), 1.0)
+
+    def run(self):
+        """ executes the job function
+        """
+        self.status = "RUNNING"
+        self.started = time.time()
+        try:
+            with Instrumentation.command("job:%s" % self.name):
+                self.result = self.func(self)
+            self.status = "DONE"
+        except Exception as e:
+            self.error = Utils.tostr(str(e))
+            self.status = "FAILED"
+        self.finished = time.time()
+        self.__closeStage(self.finished)
+
+    def info(self):
+        """ provides job description without its result
+
+        :returns: job description
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "stages": [dict(st) for st in self.stages],
+        }
+
+
+class JobManager(object):
+
+    """ Executes asynchronous jobs by a worker thread
+    """
+
+    def __init__(self, maxjobs=100, callback=None):
+        """ constructor
+
+        :param maxjobs: maximal number of kept finished jobs
+        :type maxjobs: :obj:`int`
+        :param callback: function called with the finished job
+        :type callback: :obj:`instancemethod` or :obj:`function`
+        """
+        #: (:obj:`int`) maximal number of kept finished jobs
+        self.maxJobs = maxjobs
+        #: (:obj:`instancemethod` or :obj:`function`) function called
+        #:    with the finished job
+        self.callback = callback
+        #: (:class:`collections.OrderedDict` <:obj:`str`, :class:`Job`>) \
+        #:    jobs by their ids
+        self.__jobs = OrderedDict()
+        #: (:class:`threading.Lock`) job lock
+        self.__lock = threading.Lock()
+        #: (:class:`Queue.Queue`) queue of waiting jobs
+        self.__queue = Queue.Queue()
+        #: (:class:`threading.Thread`) worker thread
+        self.__worker = None
+
+    def submit(self, name, func, stages=None):
+        """ submits job to the worker
+
+        :param name: job name
+        :type name: :obj:`str`
+        :param func: job function called with the job
+        :type func: :obj:`instancemethod` or :obj:`function`
+        :param stages: names of expected job stages
+        :type stages: :obj:`list` <:obj:`str`>
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        job = Job(name, func, stages)
+        with self.__lock:
+            self.__jobs[job.id] = job
+            self.__removeFinished()
+            if self.__worker is None or not self.__worker.is_alive():
+                self.__worker = threading.Thread(target=self.__work)
+                self.__worker.daemon = True
+                self.__worker.start()
+        self.__queue.put(job)
+        return job.id
+
+    def __removeFinished(self):
+        """ removes the oldest finished jobs above maxJobs
+        """
+        finished = [jid for jid, job in self.__jobs.items()
+                    if job.status in ["DONE", "FAILED"]]
+        for jid in finished[:max(len(finished) - self.maxJobs, 0)]:
+            self.__jobs.pop(jid)
+
+    def __work(self):
+        """ executes jobs from the queue
+        """
+        while True:
+            job = self.__queue.get()
+            job.run()
+            if self.callback is not None:
+                try:
+                    self.callback(job)
+                except Exception:
+                    pass
+
+    def job(self, jid):
+        """ provides job with the given id
+
+        :param jid: job id
+        :type jid: :obj:`str`
+        :returns: job
+        :rtype: :class:`Job`
+        """
+        with self.__lock:
+            if jid not in self.__jobs:
+                raise Exception("Job '%s' cannot be found" % jid)
+            return self.__jobs[jid]
+
+    def status(self, jid):
+        """ provides job description
+
+        :param jid: job id
+        :type jid: :obj:`str`
+        :returns: job description
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        return self.job(jid).info()
+
+    def result(self, jid):
+        """ provides result of the finished job
+
+        :param jid: job id
+        :type jid: :obj:`str`
+        :returns: job result
+        :rtype: `any`
+        """
+        job = self.job(jid)
+        if job.status == "FAILED":
+            raise Exception("Job '%s' failed: %s" % (jid, job.error))
+        if job.status != "DONE":
+            raise Exception("Job '%s' is %s" % (jid, job.status))
+        return job.result
+
+    def jobs(self):
+        """ provides descriptions of all kept jobs
+
+        :returns: job descriptions
+        :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        """
+        with self.__lock:
+            jobs = list(self.__jobs.values())
+        return [job.info() for job in jobs]
+
+    def pending(self):
+        """ provides number of queued and running jobs
+
+        :returns: number of unfinished jobs
+        :rtype: :obj:`int`
+        """
+        with self.__lock:
+            return len([job for job in self.__jobs.values()
+                        if job.status in ["QUEUED", "RUNNING"]])
@@ -29,8 +29,9 @@ except Exception:
 
 
 from .Utils import (
-    Utils, TangoUtils, MSUtils, PoolUtils, OldTangoError, PYTG_BUG_213)
+    Utils, TangoUtils, MSUtils, PoolUtils)
 from .Describer import Describer
+from .Instrumentation import Instrumentation
 from .CheckerThread import CheckerThread, TangoDSItem, CheckerItem
 
 if sys.version_info > (3,):
@@ -55,7 +56,7 @@ class MacroServerPools(object):
         self.__numberOfThreads = numberOfThreads
 
         #: (:class:`tango.Database`) tango database
-        self.__db = tango.Database()
+        self.__db = TangoUtils.database()
 
         #: (:obj:`str`) nexus configuration variable name in ms
         self.__nxsenv = "NeXusConfiguration"
@@ -64,6 +65,13 @@ class MacroServerPools(object):
         self.__macroserver = ""
         #: (:obj:`list` <:obj:`tango.DeviceProxy`>) pool instances
         self.__pools = []
+        #: (:obj:`int`) pool revision increased on pool element changes
+        self.__poolRevision = 0
+        #: (:obj:`bool`) pool element changes are tracked by events
+        self.__poolEvents = False
+        #: (:obj:`list` <(:class:`tango.DeviceProxy`, :obj:`int`)>) \
+        #:    pool element event subscriptions
+        self.__poolSubscriptions = []
         #: (:obj:`list` <:obj:`str`>) black list of pools
         self.poolBlacklist = []
 
@@ -99,13 +107,14 @@ class MacroServerPools(object):
         """
         self.__macroserver = ""
         self.__pools = []
+        self.__unsubscribePools()
         host = None
         port = None
         if not door:
             raise Exception("Door '%s' cannot be found" % door)
         if ":" in door.split("/")[0] and len(door.split("/")) > 1:
             host, port = door.split("/")[0].split(":")
-            db = tango.Database(host, int(port))
+            db = TangoUtils.database(host, int(port))
             macroserver = MSUtils.getMacroServer(db, door)
         else:
             macroserver = MSUtils.getMacroServer(self.__db, door)
@@ -121,8 +130,61 @@ class MacroServerPools(object):
                      for pn in poolNames]
         self.__pools = TangoUtils.getProxies(poolNames)
         self.__macroserver = macroserver
+        self.__subscribePools()
         return self.__macroserver
 
+    def __subscribePools(self):
+        """ subscribes change events of pool elements which increase
+            the pool revision
+        """
+        self.__unsubscribePools()
+        self.__poolRevision += 1
+        armed = []
+
+        def elementsChanged(event):
+            if armed:
+                self.__poolRevision += 1
+                if event.err:
+                    self.__poolEvents = False
+
+        events = bool(self.__pools)
+        for pool in self.__pools:
+            try:
+                eid = pool.subscribe_event(
+                    "Elements", tango.EventType.CHANGE_EVENT,
+                    elementsChanged)
+                self.__poolSubscriptions.append((pool, eid))
+            except Exception:
+                events = False
+        self.__poolEvents = events
+        armed.append(True)
+
+    def __unsubscribePools(self):
+        """ unsubscribes change events of pool elements
+        """
+        self.__poolEvents = False
+        subscriptions = self.__poolSubscriptions
+        self.__poolSubscriptions = []
+        for pool, eid in subscriptions:
+            try:
+                pool.unsubscribe_event(eid)
+            except Exception:
+                pass
+
+    def poolRevision(self):
+        """ provides pool revision which changes with pool elements
+
+        :returns: pool revision or None if pool changes are not tracked
+        :rtype: :obj:`int`
+        """
+        if self.__poolEvents:
+            return self.__poolRevision
+
+    def invalidatePools(self):
+        """ increases pool revision, i.e. pool elements are read again
+        """
+        self.__poolRevision += 1
+
     def getMacroServer(self, door):
         """ door macro server device name
 
@@ -262,6 +324,7 @@ class MacroServerPools(object):
                         toCheck[name] = CheckerItem(name)
                     toCheck[name].append(TangoDSItem(Utils.tostr(ds)))
 
+    @Instrumentation.spanned("MacroServerPools.checkChannels")
     def checkChannels(self, door, configdevice, channels,
                       componentgroup, datasourcegroup,
                       channelerrors):
@@ -304,6 +367,7 @@ class MacroServerPools(object):
 
         for i in range(min(self.__numberOfThreads, len(toCheck))):
             thd = CheckerThread(i, cqueue)
+            thd.context = Instrumentation.current()
             thd.tangoSourceErrorStates = self.tangoSourceErrorStates
             thd.tangoSourceWarningStates = self.tangoSourceWarningStates
             threads.append(thd)
@@ -366,7 +430,7 @@ class MacroServerPools(object):
             doors = msp.doorList
             for door in doors:
                 try:
-                    dp = tango.DeviceProxy(door)
+                    dp = TangoUtils.deviceProxy(door)
                     if dp.state() == tango.DevState.RUNNING:
                         status = True
                         break
@@ -390,15 +454,10 @@ class MacroServerPools(object):
         params = ["ScanDir",
                   "ScanFile"]
 
-        msp = TangoUtils.openProxy(self.getMacroServer(door))
-        if PYTG_BUG_213:
-            raise OldTangoError(
-                "Reading Encoded Attributes not supported in tango < 9.2.5")
-        rec = msp.Environment
+        dc = MSUtils.getEnvironment(self.getMacroServer(door))
         nenv = {}
         vl = None
-        if rec[0] == 'pickle':
-            dc = Utils.pickleloads(rec[1])
+        if dc is not None:
             if 'new' in dc.keys():
                 if self.__nxsenv in dc['new'].keys():
                     nenv = dc['new'][self.__nxsenv]
@@ -427,13 +486,9 @@ class MacroServerPools(object):
         params = ["ScanDir",
                   "ScanFile"]
 
-        msp = TangoUtils.openProxy(self.getMacroServer(door))
-        if PYTG_BUG_213:
-            raise OldTangoError(
-                "Reading Encoded Attributes not supported in tango < 9.2.5")
-        rec = msp.Environment
-        if rec[0] == 'pickle':
-            dc = Utils.pickleloads(rec[1])
+        ms = self.getMacroServer(door)
+        dc = MSUtils.getEnvironment(ms)
+        if dc is not None:
             if 'new' in dc.keys():
                 dc = {'new': {}}
                 if self.__nxsenv not in dc['new'].keys() \
@@ -459,7 +514,7 @@ class MacroServerPools(object):
                 if cmddata:
                     for name, value in cmddata.items():
                         nenv[Utils.tostr(name)] = value
-                MSUtils.writeEnvAttr(dc, msp)
+                MSUtils.writeEnv(dc, ms)
 
     def getScanEnv(self, door):
         """ fetches Scan Environment Data
@@ -475,14 +530,8 @@ class MacroServerPools(object):
                   # "ActiveMntGrp",
                   "NeXusSelectorDevice"]
         res = {}
-        msp = TangoUtils.openProxy(self.getMacroServer(door))
-        if PYTG_BUG_213:
-            raise OldTangoError(
-                "Reading Encoded Attributes not supported in "
-                "tango < 9.2.5")
-        rec = msp.Environment
-        if rec[0] == 'pickle':
-            dc = Utils.pickleloads(rec[1])
+        dc = MSUtils.getEnvironment(self.getMacroServer(door))
+        if dc is not None:
             if 'new' in dc.keys():
                 for var in params:
                     if var in dc['new'].keys():
@@ -500,14 +549,9 @@ class MacroServerPools(object):
         jdata = Utils.stringToDictJson(jdata)
         data = json.loads(jdata)
         scanID = -1
-        msp = TangoUtils.openProxy(self.getMacroServer(door))
-        if PYTG_BUG_213:
-            raise OldTangoError(
-                "Reading Encoded Attributes not supported in "
-                "tango < 9.2.5")
-        rec = msp.Environment
-        if rec[0] == 'pickle':
-            dc = Utils.pickleloads(rec[1])
+        ms = self.getMacroServer(door)
+        dc = MSUtils.getEnvironment(ms)
+        if dc is not None:
             if 'new' in dc.keys():
                 if 'ScanID' in dc['new'].keys():
                     scanID = int(dc['new']["ScanID"])
@@ -516,5 +560,5 @@ class MacroServerPools(object):
                 dc['new'][Utils.tostr(var)] = Utils.toString(data[var])
             if 'ScanID' in dc['new'].keys():
                 scanID = int(dc['new']["ScanID"])
-            MSUtils.writeEnvAttr(dc, msp)
+            MSUtils.writeEnv(dc, ms)
         return scanID
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Measurement group configuration normaliser and comparator """
+
+import json
+import sys
+
+from .Utils import Utils
+
+
+if sys.version_info > (3,):
+    unicode = str
+
+
+class MntGrpConf(object):
+
+    """ Normalises measurement group configurations and compares them
+
+    The normalised form follows the measurement group canonicalisation:
+    internal setting keys starting with an underscore and keys with
+    `None` values are dropped, tuples become lists, strings are unicode and
+    channel full names in `channels` dictionaries are lower-case.
+    Configurations are compared structurally: element names in
+    `controllers`, `channels` and `units` have to match while
+    other dictionaries are compared only on keys of the required
+    configuration, i.e. defaults added by the measurement group
+    are ignored.
+    """
+
+    #: (:obj:`list` <:obj:`str`>) dictionaries of named elements
+    collections = ["controllers", "channels", "units"]
+
+    @classmethod
+    def normalize(cls, conf):
+        """ provides normalised measurement group configuration
+
+        :param conf: measurement group configuration or its JSON string
+        :type conf: :obj:`dict` <:obj:`str`, `any`> or :obj:`str`
+        :returns: normalised configuration
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        if not isinstance(conf, dict):
+            conf = json.loads(Utils.tostr(conf or "{}"))
+        return cls.__normalize(conf)
+
+    @classmethod
+    def __normalize(cls, value, key=None):
+        """ normalises the configuration value
+
+        :param value: configuration value
+        :type value: `any`
+        :param key: name of the value in its parent dictionary
+        :type key: :obj:`str`
+        :returns: normalised value
+        :rtype: `any`
+        """
+        if isinstance(value, dict):
+            res = {}
+            for ky, vl in value.items():
+                ky = Utils.tostr(ky)
+                if vl is None or (
+                        ky.startswith("_") and key not in cls.collections):
+                    continue
+                if key == "channels":
+                    ky = ky.lower()
+                res[ky] = cls.__normalize(vl, ky)
+            return res
+        elif isinstance(value, (list, tuple)):
+            return [cls.__normalize(vl) for vl in value]
+        elif isinstance(value, (bytes, unicode)):
+            return Utils.tostr(value)
+        return value
+
+    @classmethod
+    def diff(cls, current, required):
+        """ provides differences between the current and required
+            measurement group configurations
+
+        :param current: current configuration or its JSON string
+        :type current: :obj:`dict` <:obj:`str`, `any`> or :obj:`str`
+        :param required: required configuration or its JSON string
+        :type required: :obj:`dict` <:obj:`str`, `any`> or :obj:`str`
+        :returns: list of differences with "path", "action",
+                  i.e. "add", "remove" or "change", "old" and "new" items
+        :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        """
+        result = []
+        cls.__diff(
+            cls.normalize(current), cls.normalize(required), [], result)
+        return result
+
+    @classmethod
+    def __diff(cls, current, required, path, result):
+        """ appends differences of configuration dictionaries
+
+        :param current: current configuration dictionary
+        :type current: :obj:`dict` <:obj:`str`, `any`>
+        :param required: required configuration dictionary
+        :type required: :obj:`dict` <:obj:`str`, `any`>
+        :param path: path of the dictionaries
+        :type path: :obj:`list` <:obj:`str`>
+        :param result: list of differences
+        :type result: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        """
+        for key in sorted(required.keys()):
+            new = required[key]
+            if key not in current:
+                result.append({"path": path + [key], "action": "add",
+                               "old": None, "new": new})
+            elif isinstance(new, dict) and isinstance(current[key], dict):
+                cls.__diff(current[key], new, path + [key], result)
+            elif current[key] != new:
+                result.append({"path": path + [key], "action": "change",
+                               "old": current[key], "new": new})
+        if path and path[-1] in cls.collections:
+            for key in sorted(set(current.keys()) - set(required.keys())):
+                result.append({"path": path + [key], "action": "remove",
+                               "old": current[key], "new": None})
+
+    @classmethod
+    def changedElements(cls, differences):
+        """ provides names of controllers and channels
+            affected by the differences
+
+        :param differences: differences created by :meth:`diff`
+        :type differences: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        :returns: dictionary with sorted "controllers", "channels"
+                  and other "settings" names
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+        """
+        ctrls = set()
+        channels = set()
+        settings = set()
+        for df in differences:
+            path = df["path"]
+            if len(path) > 1 and path[0] == "controllers":
+                ctrls.add(path[1])
+                if "channels" in path[2:-1]:
+                    channels.add(path[path.index("channels", 2) + 1])
+                else:
+                    channels.update(cls.__channels({path[-1]: df["old"]}))
+                    channels.update(cls.__channels({path[-1]: df["new"]}))
+            else:
+                settings.add(path[0])
+        return {"controllers": sorted(ctrls),
+                "channels": sorted(channels),
+                "settings": sorted(settings)}
+
+    @classmethod
+    def __channels(cls, value):
+        """ provides channel names of the configuration value
+
+        :param value: configuration value
+        :type value: `any`
+        :returns: channel names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        names = []
+        if isinstance(value, dict):
+            for key, vl in value.items():
+                if key == "channels" and isinstance(vl, dict):
+                    names.extend(vl.keys())
+                else:
+                    names.extend(cls.__channels(vl))
+        return names
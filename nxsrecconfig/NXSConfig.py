@@ -35,13 +35,71 @@
 # ==================================================================
 # ==================================================================
 
+import functools
+
 try:
     import tango
 except Exception:
     import PyTango as tango
 
 from .Settings import Settings as STG
-from .Utils import Utils
+from .Utils import Utils, TangoUtils
+from .Instrumentation import Instrumentation
+from .Profiling import Profiler
+from .Recording import Recorder
+
+
+def _exclusive(method):
+    """ decorates attribute method accessing the settings which holds
+    the settings access lock shared with asynchronous jobs
+
+    :brief: the access is rejected while jobs are pending
+    :param method: attribute method
+    :type method: :obj:`instancemethod` or :obj:`function`
+    :returns: decorated attribute method
+    :rtype: :obj:`function`
+    """
+    @functools.wraps(method)
+    def exclusive(self, *args):
+        stg = getattr(self, "_NXSRecSelector__stg", None)
+        if stg is None:
+            return method(self, *args)
+        if stg.pendingJobs() or not stg.acquire(False):
+            message = "%s: please wait for the pending jobs" % \
+                method.__name__
+            self.warn_stream(message)
+            raise Exception(message)
+        try:
+            return method(self, *args)
+        finally:
+            stg.release()
+    return exclusive
+
+
+#: (:obj:`list` <:obj:`str`>) measured command and attribute methods
+_MEASURED = []
+
+
+def _measured(method):
+    """ decorates command or attribute method with the command
+    measurement, profiling and session recording
+
+    :param method: command or attribute method
+    :type method: :obj:`instancemethod` or :obj:`function`
+    :returns: measured method
+    :rtype: :obj:`function`
+    """
+    name = method.__name__
+    _MEASURED.append(name)
+
+    @functools.wraps(method)
+    def measured(self, *args):
+        with Instrumentation.command(name):
+            with Profiler.profile(name):
+                if Recorder.active:
+                    return Recorder.request(name, method, self, *args)
+                return method(self, *args)
+    return measured
 
 
 class NXSRecSelector(tango.LatestDeviceImpl):
@@ -78,9 +136,17 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """ Device destructor
         """
         self.debug_stream("In delete_device()")
+        if getattr(self, '_NXSRecSelector__stg', None) is not None:
+            try:
+                self.__stg.flushProfile()
+            except Exception as e:
+                self.error_stream(
+                    "Profile cannot be stored: %s" % Utils.tostr(e))
+            self.__stg.dynamicComponentCleanInterval = 0
         if hasattr(self, 'stg') and self.__stg:
             del self.__stg
             self.__stg = None
+        Recorder.stop()
         self.set_state(tango.DevState.OFF)
 
     def init_device(self):
@@ -91,6 +157,13 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             del self.__stg
             self.__stg = None
         self.get_device_properties(self.get_device_class())
+        Recorder.stop()
+        self.__dp = None
+        if self.SessionRecordFile:
+            Recorder.start(
+                self.SessionRecordFile, self.get_name(),
+                dict((name, getattr(self, name, None)) for name in
+                     NXSRecSelectorClass.device_property_list.keys()))
         numberofthreads = self.NumberOfThreads or None
         defaultpath = self.DefaultNeXusPath or None
         defaultudatapath = self.DefaultUserDataPath or None
@@ -109,6 +182,12 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             "*dgg*", "*/timer/*", "*/ctctrl0*"]
         self.__stg.masterTimerFirst = bool(self.MasterTimerFirst)
         self.__stg.mergeProfilesToMntGrps = bool(self.MergeProfilesToMntGrps)
+        self.__stg.reuseDynamicComponents = \
+            bool(self.ReuseDynamicComponents)
+        self.__stg.dynamicComponentMaxAge = \
+            float(self.DynamicComponentMaxAge)
+        self.__stg.dynamicComponentCleanInterval = \
+            float(self.DynamicComponentCleanInterval)
         self.__stg.resetInvalidDoor = bool(self.ResetInvalidDoor)
         self.__stg.masterTimer = bool(self.MasterTimer)
         self.__stg.mutedChannelFilters = self.MutedChannelFilters \
@@ -127,11 +206,40 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         # print(self.TangoSourceWarningStates)
         self.__stg.clientRecordKeys = \
             self.ClientRecordKeys or []
+        self.__stg.metadataCacheTTL = float(self.MetadataCacheTTL)
+        self.__stg.metadataTimeout = float(self.MetadataTimeout)
+        self.__stg.configShapes = bool(self.ShapesFromConfiguration)
+        self.__stg.profileCacheSize = int(self.ProfileCacheSize)
+        self.__stg.storeDelay = float(self.StoreDelay)
+        self.__stg.resultCacheTTL = float(self.ResultCacheTTL)
+        self.__stg.performanceStatsEnabled = \
+            bool(self.EnablePerformanceStats)
+        self.__stg.setTraceFile(
+            self.TraceFile or "", int(self.TraceFileMaxBytes),
+            int(self.TraceFileBackups))
+        self.__stg.tracingEnabled = bool(self.EnableTracing)
+        self.__stg.profileDirectory = self.ProfileDirectory or ""
+        self.__stg.profileTopN = int(self.ProfileTopN)
+        #: (:obj:`bool`) change events of computed attributes
+        #:    are pending after finished jobs
+        self.__staleEvents = False
+        self.__stg.jobCallback = self.__jobFinished
+        self.set_change_event("Jobs", True, False)
+        self.__stg.changeCallback = self.__pushEvent
+        for name in self.__stg.eventAttributes:
+            self.set_change_event(name, True, False)
 
     def always_executed_hook(self):
         """ Always excuted hook method
         """
         self.debug_stream("In always_excuted_hook()")
+        if self.__staleEvents and self.__stg is not None and \
+                not self.__stg.pendingJobs() and self.__stg.acquire(False):
+            try:
+                self.__staleEvents = False
+                self.__pushChangeEvents()
+            finally:
+                self.__stg.release()
 
 # ==================================================================
 #
@@ -143,6 +251,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In read_attr_hardware()")
 
+    @_measured
+    @_exclusive
     def read_Components(self, attr):
         """ Read Components attribute
 
@@ -152,6 +262,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_Components()")
         attr.set_value(self.__stg.components)
 
+    @_measured
+    @_exclusive
     def read_DescriptionErrors(self, attr):
         """ Read DescriptionErrors attribute
 
@@ -161,6 +273,26 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_DescriptionErrors()")
         attr.set_value(self.__stg.descriptionErrors)
 
+    @_measured
+    def read_Jobs(self, attr):
+        """ Read Jobs attribute
+
+        :param attr: read attribute
+        :type attr: :class:`tango.Attribute`
+        """
+        self.debug_stream("In read_Jobs()")
+        attr.set_value(self.__stg.jobs)
+
+    def read_PerformanceStats(self, attr):
+        """ Read PerformanceStats attribute
+
+        :param attr: read attribute
+        :type attr: :class:`tango.Attribute`
+        """
+        self.debug_stream("In read_PerformanceStats()")
+        attr.set_value(self.__stg.performanceStats)
+
+    @_measured
     def read_Version(self, attr):
         """ Read Version attribute
 
@@ -170,6 +302,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_Version()")
         attr.set_value(self.__stg.version)
 
+    @_measured
+    @_exclusive
     def read_MacroServer(self, attr):
         """ Read MacroServer attribute
 
@@ -179,6 +313,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_MacroServer()")
         attr.set_value(self.__stg.macroServer)
 
+    @_measured
+    @_exclusive
     def read_Door(self, attr):
         """ Read Door attribute
 
@@ -188,6 +324,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_Door()")
         attr.set_value(self.__stg.door)
 
+    @_measured
+    @_exclusive
     def write_Door(self, attr):
         """ Write Door attribute
 
@@ -196,7 +334,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_Door()")
         self.__stg.door = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_StepDataSources(self, attr):
         """ Read StepDataSources attribute
 
@@ -206,6 +347,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_StepDataSources()")
         attr.set_value(self.__stg.stepdatasources or "")
 
+    @_measured
+    @_exclusive
     def write_StepDataSources(self, attr):
         """ Write StepDataSources attribute
 
@@ -230,6 +373,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
+    @_exclusive
     def read_CanFailDataSources(self, attr):
         """ Read CanFailDataSources attribute
 
@@ -239,6 +384,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_CanFailDataSources()")
         attr.set_value(self.__stg.canfaildatasources or "")
 
+    @_measured
+    @_exclusive
     def write_CanFailDataSources(self, attr):
         """ Write CanFailDataSources attribute
 
@@ -263,6 +410,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
+    @_exclusive
     def read_LinkDataSources(self, attr):
         """ Read LinkDataSources attribute
 
@@ -272,6 +421,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_LinkDataSources()")
         attr.set_value(self.__stg.linkdatasources or "")
 
+    @_measured
+    @_exclusive
     def write_LinkDataSources(self, attr):
         """ Write LinkDataSources attribute
 
@@ -296,6 +447,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
+    @_exclusive
     def read_ConfigDevice(self, attr):
         """ Read ConfigDevice attribute
 
@@ -305,6 +458,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_ConfigDevice()")
         attr.set_value(self.__stg.configDevice)
 
+    @_measured
+    @_exclusive
     def write_ConfigDevice(self, attr):
         """ Write ConfigDevice attribute
 
@@ -313,7 +468,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_ConfigDevice()")
         self.__stg.configDevice = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_MntGrp(self, attr):
         """ Read MntGrp attribute
 
@@ -323,6 +481,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_MntGrp()")
         attr.set_value(self.__stg.mntGrp)
 
+    @_measured
+    @_exclusive
     def write_MntGrp(self, attr):
         """ Write MntGrp attribute
 
@@ -331,7 +491,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_MntGrp()")
         self.__stg.mntGrp = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_ScanDir(self, attr):
         """ Read ScanDir attribute
 
@@ -341,6 +504,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_ScanDir()")
         attr.set_value(self.__stg.scanDir)
 
+    @_measured
+    @_exclusive
     def write_ScanDir(self, attr):
         """ Write ScanDir attribute
 
@@ -350,6 +515,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In write_ScanDir()")
         self.__stg.scanDir = attr.get_write_value()
 
+    @_measured
+    @_exclusive
     def read_ScanFile(self, attr):
         """ Read ScanFile attribute
 
@@ -359,6 +526,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_ScanFile()")
         attr.set_value(self.__stg.scanFile or "")
 
+    @_measured
+    @_exclusive
     def write_ScanFile(self, attr):
         """ Write ScanFile attribute
 
@@ -368,6 +537,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In write_ScanFile()")
         self.__stg.scanFile = attr.get_write_value() or ""
 
+    @_measured
+    @_exclusive
     def read_ScanID(self, attr):
         """ Read ScanID attribute
 
@@ -377,6 +548,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_ScanID()")
         attr.set_value(self.__stg.scanID)
 
+    @_measured
+    @_exclusive
     def write_ScanID(self, attr):
         """ Write ScanID attribute
 
@@ -386,6 +559,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In write_ScanID()")
         self.__stg.scanID = attr.get_write_value()
 
+    @_measured
+    @_exclusive
     def read_WriterDevice(self, attr):
         """ Read WriterDevice attribute
 
@@ -395,6 +570,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_WriterDevice()")
         attr.set_value(self.__stg.writerDevice)
 
+    @_measured
+    @_exclusive
     def write_WriterDevice(self, attr):
         """ Write WriterDevice attribute
 
@@ -403,7 +580,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_WriterDevice()")
         self.__stg.writerDevice = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_DeviceGroups(self, attr):
         """ Read DeviceGroups attribute
 
@@ -413,6 +593,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_DeviceGroups()")
         attr.set_value(self.__stg.deviceGroups)
 
+    @_measured
+    @_exclusive
     def write_DeviceGroups(self, attr):
         """ Write DeviceGroups attribute
 
@@ -422,6 +604,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In write_DeviceGroups()")
         self.__stg.deviceGroups = attr.get_write_value()
 
+    @_measured
+    @_exclusive
     def read_UserData(self, attr):
         """ Read UserData attribute
 
@@ -431,6 +615,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_UserData()")
         attr.set_value(self.__stg.userData)
 
+    @_measured
+    @_exclusive
     def write_UserData(self, attr):
         """ Write UserData attribute
 
@@ -439,7 +625,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_UserData()")
         self.__stg.userData = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_DataSources(self, attr):
         """ Read DataSources attribute
 
@@ -449,6 +638,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_DataSources()")
         attr.set_value(self.__stg.dataSources)
 
+    @_measured
+    @_exclusive
     def read_ProfileConfiguration(self, attr):
         """ Read ProfileConfiguration attribute
 
@@ -458,6 +649,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_DataSources()")
         attr.set_value(self.__stg.profileConfiguration)
 
+    @_measured
+    @_exclusive
     def write_ProfileConfiguration(self, attr):
         """ Write ProfileConfiguration attribute
 
@@ -467,7 +660,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In write_ProfileConfiguration()")
         self.__stg.profileConfiguration = attr.get_write_value()
         try:
-            self.__dp = self.__dp or tango.DeviceProxy(
+            self.__dp = self.__dp or TangoUtils.deviceProxy(
                 Utils.tostr(self.get_name()))
             for var in self.__toupdate:
                 if var in self.__stg.names():
@@ -475,11 +668,14 @@ class NXSRecSelector(tango.LatestDeviceImpl):
                         self.__dp.write_attribute(
                             Utils.tostr(var), self.__stg.value(var))
 
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
                 self.set_state(tango.DevState.ON)
 
+    @_measured
+    @_exclusive
     def read_AppendEntry(self, attr):
         """ Read AppendEntry attribute
 
@@ -489,6 +685,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_AppendEntry()")
         attr.set_value(self.__stg.appendEntry)
 
+    @_measured
+    @_exclusive
     def write_AppendEntry(self, attr):
         """ Write AppendEntry attribute
 
@@ -497,7 +695,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_AppendEntry()")
         self.__stg.appendEntry = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_ConfigVariables(self, attr):
         """ Read ConfigVariables attribute
 
@@ -507,6 +708,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_ConfigVariables()")
         attr.set_value(self.__stg.configVariables)
 
+    @_measured
+    @_exclusive
     def write_ConfigVariables(self, attr):
         """ Write ConfigVariables attribute
 
@@ -515,7 +718,10 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         """
         self.debug_stream("In write_ConfigVariables()")
         self.__stg.configVariables = attr.get_write_value()
+        self.__pushChangeEvents()
 
+    @_measured
+    @_exclusive
     def read_ProfileFile(self, attr):
         """ Read ProfileFile attribute
 
@@ -525,6 +731,8 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         self.debug_stream("In read_ProfileFile()")
         attr.set_value(self.__stg.profileFile)
 
+    @_measured
+    @_exclusive
     def write_ProfileFile(self, attr):
         """ Write ProfileFile attribute
 
@@ -540,6 +748,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
     #
     # ==================================================================
 
+    @_measured
     def LoadProfile(self):
         """ LoadProfile command
 
@@ -551,7 +760,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             self.__stg.loadProfile()
 
             # updating memorized attributes
-            self.__dp = self.__dp or tango.DeviceProxy(
+            self.__dp = self.__dp or TangoUtils.deviceProxy(
                 Utils.tostr(self.get_name()))
             for var in self.__toupdate:
                 if var in self.__stg.names():
@@ -559,6 +768,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
                         self.__dp.write_attribute(
                             Utils.tostr(var), self.__stg.value(var))
 
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -574,6 +784,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def FetchProfile(self):
         """ FetchProfile command
 
@@ -585,7 +796,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             self.__stg.fetchProfile()
 
             # updating memorized attributes
-            self.__dp = self.__dp or tango.DeviceProxy(
+            self.__dp = self.__dp or TangoUtils.deviceProxy(
                 Utils.tostr(self.get_name()))
             for var in self.__toupdate:
                 if var in self.__stg.names():
@@ -593,6 +804,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
                         self.__dp.write_attribute(
                             Utils.tostr(var), self.__stg.value(var))
 
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -608,6 +820,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def SaveProfile(self):
         """ SaveProfile command
 
@@ -632,6 +845,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def StoreProfile(self):
         """ StoreProfile command command
 
@@ -656,6 +870,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def PreselectComponents(self):
         """ PreselectComponents command
 
@@ -665,6 +880,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             self.__stg.preselectComponents()
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -680,6 +896,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ResetPreselectedComponents(self):
         """  ResetPreselectedComponents command
 
@@ -690,6 +907,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             self.__stg.resetPreselectedComponents()
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -705,6 +923,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def DeleteAllProfiles(self):
         """ DeleteAllProfiles command
 
@@ -729,6 +948,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def UpdateConfigVariables(self):
         """ UpdateConfigVariables command
 
@@ -754,6 +974,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def IsMntGrpUpdated(self):
         """ IsMntGrpUpdated command
 
@@ -781,6 +1002,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def MntGrpConfiguration(self):
         """ MntGrpConfiguration command
 
@@ -810,6 +1032,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def UpdateProfile(self):
         """ UpdateProfile command
 
@@ -821,6 +1044,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             conf = Utils.tostr(self.__stg.updateProfile())
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -837,6 +1061,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def UpdateMntGrp(self):
         """ UpdateMntGrp command
 
@@ -848,6 +1073,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             conf = Utils.tostr(self.__stg.updateMntGrp())
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -864,6 +1090,263 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
+    def UpdateMntGrpPlan(self):
+        """ UpdateMntGrpPlan command
+
+        :brief: Dry run of UpdateMntGrp
+        :returns: JSON string with changes of mntgrp configuration
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In UpdateMntGrpPlan()")
+        try:
+            self.set_state(tango.DevState.RUNNING)
+            plan = Utils.tostr(self.__stg.mntGrpUpdatePlan())
+            self.set_state(tango.DevState.ON)
+        finally:
+            if self.get_state() == tango.DevState.RUNNING:
+                self.set_state(tango.DevState.ON)
+        return plan
+
+    def is_UpdateMntGrpPlan_allowed(self):
+        """ UpdateMntGrpPlan command State Machine
+
+        :returns: True if the operation allowed
+        :rtype: :obj:`bool`
+        """
+        if self.get_state() in [tango.DevState.RUNNING]:
+            return False
+        return True
+
+    def __submitJob(self, submit, *args):
+        """ sets RUNNING state and submits the asynchronous job
+
+        :param submit: settings method submitting the job
+        :type submit: :obj:`instancemethod`
+        :param args: method parameters
+        :type args: :obj:`list` <`any`>
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        self.set_state(tango.DevState.RUNNING)
+        try:
+            return Utils.tostr(submit(*args))
+        except Exception:
+            if not self.__stg.pendingJobs():
+                self.set_state(tango.DevState.ON)
+            raise
+
+    def __jobFinished(self, _):
+        """ sets ON state when all jobs are finished, pushes
+            the Jobs change event and marks computed attributes as stale.
+            Their change events are pushed by the next request thread
+
+        :param _: finished job
+        :type _: :class:`nxsrecconfig.JobManager.Job`
+        """
+        stg = getattr(self, "_NXSRecSelector__stg", None)
+        if stg is None:
+            return
+        if not stg.pendingJobs() and \
+                self.get_state() == tango.DevState.RUNNING:
+            self.set_state(tango.DevState.ON)
+        stg.clearCachedValues()
+        self.__staleEvents = True
+        omni = getattr(tango, "EnsureOmniThread", None)
+        if omni is not None:
+            with omni():
+                self.__pushEvent("Jobs", stg.jobs)
+        else:
+            self.__pushEvent("Jobs", stg.jobs)
+
+    def __pushEvent(self, name, value):
+        """ pushes change event of the attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        try:
+            self.push_change_event(name, value)
+        except Exception as e:
+            self.error_stream(
+                "%s event cannot be pushed: %s" % (name, Utils.tostr(e)))
+
+    def __pushChangeEvents(self):
+        """ pushes change events of the changed computed attributes
+        """
+        try:
+            self.__stg.pushChangeEvents()
+        except Exception as e:
+            self.error_stream(
+                "Change events cannot be pushed: %s" % Utils.tostr(e))
+
+    @_measured
+    def UpdateMntGrpAsync(self):
+        """ UpdateMntGrpAsync command
+
+        :brief: Submits the UpdateMntGrp job
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In UpdateMntGrpAsync()")
+        return self.__submitJob(self.__stg.updateMntGrpAsync)
+
+    def is_UpdateMntGrpAsync_allowed(self):
+        """ UpdateMntGrpAsync command State Machine
+
+        :returns: True if the operation allowed
+        :rtype: :obj:`bool`
+        """
+        if self.get_state() in [tango.DevState.RUNNING]:
+            return False
+        return True
+
+    @_measured
+    def UpdateProfileAsync(self):
+        """ UpdateProfileAsync command
+
+        :brief: Submits the UpdateProfile job
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In UpdateProfileAsync()")
+        return self.__submitJob(self.__stg.updateProfileAsync)
+
+    def is_UpdateProfileAsync_allowed(self):
+        """ UpdateProfileAsync command State Machine
+
+        :returns: True if the operation allowed
+        :rtype: :obj:`bool`
+        """
+        if self.get_state() in [tango.DevState.RUNNING]:
+            return False
+        return True
+
+    @_measured
+    def PreselectComponentsAsync(self):
+        """ PreselectComponentsAsync command
+
+        :brief: Submits the PreselectComponents job
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In PreselectComponentsAsync()")
+        return self.__submitJob(self.__stg.preselectComponentsAsync)
+
+    def is_PreselectComponentsAsync_allowed(self):
+        """ PreselectComponentsAsync command State Machine
+
+        :returns: True if the operation allowed
+        :rtype: :obj:`bool`
+        """
+        if self.get_state() in [tango.DevState.RUNNING]:
+            return False
+        return True
+
+    @_measured
+    def CreateDynamicComponentAsync(self, argin):
+        """ CreateDynamicComponentAsync command
+
+        :brief: Submits the CreateDynamicComponent job
+        :param argin:  DevVarStringArray    list of datasource parameters
+        :type argin: :obj:`list` <:obj:`str`>
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In CreateDynamicComponentAsync()")
+        return self.__submitJob(
+            self.__stg.createDynamicComponentAsync, argin)
+
+    def is_CreateDynamicComponentAsync_allowed(self):
+        """ CreateDynamicComponentAsync command State Machine
+
+        :returns: True if the operation allowed
+        :rtype: :obj:`bool`
+        """
+        if self.get_state() in [tango.DevState.RUNNING]:
+            return False
+        return True
+
+    @_measured
+    def JobStatus(self, argin):
+        """ JobStatus command
+
+        :brief: Provides status of the asynchronous job
+        :param argin:  DevString    job id
+        :type argin: :obj:`str`
+        :returns: JSON dictionary with job status, progress,
+                  error and stage timing
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In JobStatus()")
+        return Utils.tostr(self.__stg.jobStatus(argin))
+
+    @_measured
+    def JobResult(self, argin):
+        """ JobResult command
+
+        :brief: Provides result of the finished asynchronous job
+        :param argin:  DevString    job id
+        :type argin: :obj:`str`
+        :returns: job result
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In JobResult()")
+        return Utils.tostr(self.__stg.jobResult(argin))
+
+    @_measured
+    def ResetPerformanceStats(self):
+        """ ResetPerformanceStats command
+
+        :brief: Removes collected performance statistics
+        """
+        self.debug_stream("In ResetPerformanceStats()")
+        self.__stg.resetPerformanceStats()
+
+    def LastTrace(self, argin):
+        """ LastTrace command
+
+        :brief: Provides the last recorded trace of the given command
+        :param argin:  DevString    command name or empty for any command
+        :type argin: :obj:`str`
+        :returns: JSON span tree with start and end times and attributes
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In LastTrace()")
+        return Utils.tostr(self.__stg.lastTrace(argin))
+
+    @_measured
+    def ProfileNextCommand(self, argin):
+        """ ProfileNextCommand command
+
+        :brief: Profiles the next invocations of the command with cProfile.
+                Their hotspots are provided by the ProfileReports attribute
+        :param argin:  DevVarStringArray    command name and optional
+                       number of invocations, 0 disarms the command
+        :type argin: :obj:`list` <:obj:`str`>
+        :returns: JSON dictionary with numbers of invocations
+                  to be profiled by command names
+        :rtype: :obj:`str`
+        """
+        self.debug_stream("In ProfileNextCommand()")
+        if not argin or argin[0] not in _MEASURED:
+            raise Exception("Command '%s' cannot be found"
+                            % (argin[0] if argin else ""))
+        count = int(argin[1]) if len(argin) > 1 else 1
+        return Utils.tostr(self.__stg.profileNextCommand(argin[0], count))
+
+    def read_ProfileReports(self, attr):
+        """ Read ProfileReports attribute
+
+        :param attr: read attribute
+        :type attr: :class:`tango.Attribute`
+        """
+        self.debug_stream("In read_ProfileReports()")
+        attr.set_value(self.__stg.profileReports)
+
+    @_measured
     def SwitchProfile(self):
         """ SwitchProfile command
 
@@ -873,6 +1356,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             self.__stg.switchProfile()
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -888,6 +1372,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ImportMntGrp(self):
         """ ImportMntGrp command
 
@@ -897,6 +1382,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             self.__stg.importMntGrp()
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -912,6 +1398,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ImportEnvProfile(self):
         """  ImportEnvProfile command
 
@@ -923,7 +1410,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             self.__stg.importEnvProfile()
 
             # updating memorized attributes
-            self.__dp = self.__dp or tango.DeviceProxy(
+            self.__dp = self.__dp or TangoUtils.deviceProxy(
                 Utils.tostr(self.get_name()))
             for var in self.__toupdate:
                 if var in self.__stg.names():
@@ -931,6 +1418,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
                         self.__dp.write_attribute(
                             Utils.tostr(var), self.__stg.value(var))
 
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -946,6 +1434,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ExportEnvProfile(self):
         """ ExportEnvProfile command
 
@@ -970,6 +1459,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def AvailableTimers(self):
         """ AvailableTimers command
 
@@ -999,6 +1489,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def MutedChannels(self):
         """  MutedChannels command
 
@@ -1027,6 +1518,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def AvailableComponents(self):
         """ AvailableComponents command
 
@@ -1056,6 +1548,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ComponentDescription(self):
         """ ComponentDescription command
 
@@ -1084,6 +1577,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def SetScanEnvVariables(self, argin):
         """ SetScanEnvVariables command
 
@@ -1115,6 +1609,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def FullDeviceNames(self):
         """ FullDeviceNames command
 
@@ -1143,6 +1638,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ScanEnvVariables(self):
         """ ScanEnvVariables command
 
@@ -1173,6 +1669,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def VariableComponents(self):
         """ VariableComponents command
 
@@ -1201,6 +1698,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def AvailableProfiles(self):
         """ AvailableProfiles command
 
@@ -1229,6 +1727,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def AvailableMntGrps(self):
         """ AvailableMntGrps command
 
@@ -1257,6 +1756,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def AvailableDataSources(self):
         """ AvailableDataSources command
 
@@ -1285,6 +1785,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def PoolElementNames(self, argin):
         """ PoolElementNames command
 
@@ -1316,6 +1817,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ComponentDataSources(self):
         """ ComponentDataSources command
 
@@ -1344,6 +1846,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def SelectedDataSources(self):
         """ SelectedDataSources command
 
@@ -1369,6 +1872,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def AdministratorDataNames(self):
         """ AdministratorDataNames command
 
@@ -1397,6 +1901,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def MandatoryComponents(self):
         """ MandatoryComponents command
 
@@ -1425,6 +1930,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def SelectedComponents(self):
         """ SelectedComponents command
 
@@ -1453,6 +1959,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def PreselectedComponents(self):
         """ PreselectedComponents command
 
@@ -1481,6 +1988,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def PreselectedDataSources(self):
         """ PreselectedDataSources command
 
@@ -1509,6 +2017,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def CreateDynamicComponent(self, argin):
         """ CreateDynamicComponent command
 
@@ -1539,6 +2048,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def RemoveDynamicComponent(self, argin):
         """ RemoveDynamicComponent command
 
@@ -1565,6 +2075,36 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
+    def CleanDynamicComponents(self):
+        """ CleanDynamicComponents command
+
+        :brief: Removes dynamic components with stored creation times
+                older than DynamicComponentMaxAge
+        :returns: DevVarStringArray  names of removed dynamic components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        self.debug_stream("In CleanDynamicComponents()")
+        try:
+            self.set_state(tango.DevState.RUNNING)
+            argout = self.__stg.cleanDynamicComponents()
+            self.set_state(tango.DevState.ON)
+        finally:
+            if self.get_state() == tango.DevState.RUNNING:
+                self.set_state(tango.DevState.ON)
+        return argout
+
+    def is_CleanDynamicComponents_allowed(self):
+        """ CleanDynamicComponents command State Machine
+
+        :returns: True if the operation allowed
+        :rtype: :obj:`bool`
+        """
+        if self.get_state() in [tango.DevState.RUNNING]:
+            return False
+        return True
+
+    @_measured
     def DeleteProfile(self, argin):
         """ DeleteProfile command
 
@@ -1576,6 +2116,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             self.__stg.deleteProfile(argin)
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -1591,6 +2132,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ChannelProperties(self, argin):
         """ ChannelProperties command
 
@@ -1623,6 +2165,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def SetChannelProperties(self, argin):
         """ SetChannelProperties command SetChannelProperties
 
@@ -1636,6 +2179,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             argout = self.__stg.setChannelProperties(argin)
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -1653,6 +2197,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ComponentClientSources(self, argin):
         """ ComponentClientSources command
 
@@ -1683,6 +2228,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def ComponentSources(self, argin):
         """ ComponentSources command
 
@@ -1713,6 +2259,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def DataSourceDescription(self, argin):
         """ DataSourceDescription command
 
@@ -1734,6 +2281,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
 
         return argout
 
+    @_measured
     def AddStepDataSources(self, argin):
         """ AddStepDataSources command
 
@@ -1765,6 +2313,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def CreateWriterConfiguration(self, argin):
         """ CreateWriterConfiguration command
 
@@ -1796,6 +2345,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
             return False
         return True
 
+    @_measured
     def CreateDataSources(self, argin):
         """ It creates new DataSources on the ConfigServer
 
@@ -1806,6 +2356,7 @@ class NXSRecSelector(tango.LatestDeviceImpl):
         try:
             self.set_state(tango.DevState.RUNNING)
             argout = self.__stg.createDataSources(argin)
+            self.__pushChangeEvents()
             self.set_state(tango.DevState.ON)
         finally:
             if self.get_state() == tango.DevState.RUNNING:
@@ -1918,6 +2469,55 @@ class NXSRecSelectorClass(tango.DeviceClass):
         [tango.DevBoolean,
          "set the master timer/monitor channel for older MG",
          [False]],
+        'ReuseDynamicComponents':
+        [tango.DevBoolean,
+         "reuse dynamic components created from the same inputs",
+         [False]],
+        'DynamicComponentMaxAge':
+        [tango.DevDouble,
+         "age in seconds of dynamic components removed as stale, "
+         "their creation times are stored only if it is positive",
+         [0.0]],
+        'DynamicComponentCleanInterval':
+        [tango.DevDouble,
+         "interval in seconds of stale dynamic component cleaning, "
+         "disabled if not positive",
+         [0.0]],
+        'EnablePerformanceStats':
+        [tango.DevBoolean,
+         "collect wall times of commands and their remote calls",
+         [True]],
+        'EnableTracing':
+        [tango.DevBoolean,
+         "record span trees of individual commands",
+         [False]],
+        'TraceFile':
+        [tango.DevString,
+         "rotating JSON-lines file of command traces, "
+         "traces are kept only in memory if empty",
+         [""]],
+        'TraceFileMaxBytes':
+        [tango.DevLong,
+         "maximal size in bytes of the trace file before its rotation",
+         [10000000]],
+        'TraceFileBackups':
+        [tango.DevLong,
+         "number of kept rotated trace files",
+         [5]],
+        'ProfileDirectory':
+        [tango.DevString,
+         "directory of .pstats files of profiled commands, "
+         "the temporary directory if empty",
+         [""]],
+        'ProfileTopN':
+        [tango.DevLong,
+         "number of reported hotspots of profiled commands",
+         [20]],
+        'SessionRecordFile':
+        [tango.DevString,
+         "JSON-lines file recording client requests with their remote "
+         "calls from the device initialization, disabled if empty",
+         [""]],
         'DefaultCanFailDataSources':
         [tango.DevVarStringArray,
          "list of default datasources in the CanFail mode",
@@ -1931,6 +2531,35 @@ class NXSRecSelectorClass(tango.DeviceClass):
         [tango.DevVarStringArray,
          "list of tango warning states for tango datasources",
          ["ALARM", "DISABLE"]],
+        'MetadataCacheTTL':
+        [tango.DevDouble,
+         "lifetime of cached attribute shapes, types and units in seconds",
+         [0.0]],
+        'MetadataTimeout':
+        [tango.DevDouble,
+         "device call timeout in seconds used to read attribute shapes, "
+         "types and units",
+         [3.0]],
+        'ShapesFromConfiguration':
+        [tango.DevBoolean,
+         "take shapes of spectrum and image attributes which are not "
+         "Sardana channel values from their max_dim_x and max_dim_y "
+         "instead of reading the values",
+         [False]],
+        'ProfileCacheSize':
+        [tango.DevLong,
+         "maximal number of profiles with cached mntgrp configurations",
+         [16]],
+        'StoreDelay':
+        [tango.DevDouble,
+         "delay in seconds of coalesced profile stores, "
+         "0 for synchronous stores",
+         [0.0]],
+        'ResultCacheTTL':
+        [tango.DevDouble,
+         "lifetime in seconds of results shared by identical "
+         "command calls",
+         [1.0]],
     }
 
     #: (:obj:`dict` <:obj:`str`, \
@@ -1970,6 +2599,9 @@ class NXSRecSelectorClass(tango.DeviceClass):
         'UpdateMntGrp':
             [[tango.DevVoid, ""],
              [tango.DevString, "configuration"]],
+        'UpdateMntGrpPlan':
+            [[tango.DevVoid, ""],
+             [tango.DevString, "JSON string with mntgrp changes"]],
         'UpdateProfile':
             [[tango.DevVoid, ""],
              [tango.DevString, "mntgrp configuration string"]],
@@ -2060,6 +2692,36 @@ class NXSRecSelectorClass(tango.DeviceClass):
             [[tango.DevVarStringArray,
               "list of JSON strings with datasource parameters"],
              [tango.DevString, "name of dynamic Component"]],
+        'CreateDynamicComponentAsync':
+            [[tango.DevVarStringArray,
+              "list of JSON strings with datasource parameters"],
+             [tango.DevString, "job id"]],
+        'UpdateMntGrpAsync':
+            [[tango.DevVoid, ""],
+             [tango.DevString, "job id"]],
+        'UpdateProfileAsync':
+            [[tango.DevVoid, ""],
+             [tango.DevString, "job id"]],
+        'PreselectComponentsAsync':
+            [[tango.DevVoid, ""],
+             [tango.DevString, "job id"]],
+        'JobStatus':
+            [[tango.DevString, "job id"],
+             [tango.DevString, "JSON dictionary with job status"]],
+        'JobResult':
+            [[tango.DevString, "job id"],
+             [tango.DevString, "job result"]],
+        'ResetPerformanceStats':
+            [[tango.DevVoid, ""],
+             [tango.DevVoid, ""]],
+        'LastTrace':
+            [[tango.DevString, "command name or empty for any command"],
+             [tango.DevString, "JSON span tree of the last command trace"]],
+        'ProfileNextCommand':
+            [[tango.DevVarStringArray,
+              "command name and optional number of invocations"],
+             [tango.DevString,
+              "JSON dictionary with numbers of invocations to be profiled"]],
         'DataSourceDescription':
             [[tango.DevVarStringArray, "list of required datasources"],
              [tango.DevVarStringArray,
@@ -2093,6 +2755,10 @@ class NXSRecSelectorClass(tango.DeviceClass):
         'RemoveDynamicComponent':
             [[tango.DevString, "name of dynamic Component"],
              [tango.DevVoid, ""]],
+        'CleanDynamicComponents':
+            [[tango.DevVoid, ""],
+             [tango.DevVarStringArray,
+              "names of removed dynamic components"]],
         'CreateDataSources':
             [[tango.DevString,
               "JSON dictionary with {``dsname``: ``tangosource``, ...}"],
@@ -2159,6 +2825,37 @@ class NXSRecSelectorClass(tango.DeviceClass):
                  'label': "Version",
                  'description': "server version",
             }],
+        'Jobs':
+            [[tango.DevString,
+              tango.SCALAR,
+              tango.READ],
+             {
+                 'label': "Asynchronous Jobs",
+                 'description': "JSON list with asynchronous job statuses,"
+                 " progress and stage timing",
+                 'Display level': tango.DispLevel.EXPERT,
+            }],
+        'PerformanceStats':
+            [[tango.DevString,
+              tango.SCALAR,
+              tango.READ],
+             {
+                 'label': "Performance Statistics",
+                 'description': "JSON dictionary with wall times of commands"
+                 " and counts, wall times and sizes of their remote calls"
+                 " per target and stage",
+                 'Display level': tango.DispLevel.EXPERT,
+            }],
+        'ProfileReports':
+            [[tango.DevString,
+              tango.SCALAR,
+              tango.READ],
+             {
+                 'label': "Profile Reports",
+                 'description': "JSON list with wall times, .pstats files"
+                 " and hotspots of commands profiled by ProfileNextCommand",
+                 'Display level': tango.DispLevel.EXPERT,
+            }],
         'MacroServer':
             [[tango.DevString,
               tango.SCALAR,
@@ -19,8 +19,11 @@
 
 """  ProfileManager """
 
-import json
 import sys
+import copy
+import json
+import hashlib
+from collections import OrderedDict
 
 try:
     import tango
@@ -28,7 +31,10 @@ except Exception:
     import PyTango as tango
 
 from .Utils import TangoUtils, PoolUtils, MSUtils, Utils
+from .Instrumentation import Instrumentation
 from .Describer import Describer
+from .RequestContext import RequestContext
+from .MntGrpConf import MntGrpConf
 
 try:
     from nxstools.nxsxml import (XMLFile, NDSource)
@@ -52,7 +58,7 @@ class ProfileManager(object):
     """  Manages Measurement Group and Profile from Selector"""
 
     def __init__(self, selector, syncsnapshot=False,
-                 writepoolmotorpositions=False):
+                 writepoolmotorpositions=False, numberofthreads=None):
         """ constructor
 
         :param selector: selector object
@@ -62,6 +68,9 @@ class ProfileManager(object):
         :param writepoolmotorpositions: add dynamic components
                                         for all pool motor positions
         :type writepoolmotorpositions: :obj:`bool`
+        :param numberofthreads: number of threads used to read
+                                channel metadata
+        :type numberofthreads: :obj:`int`
         """
         #: (:class:`nxsrecconfig.Selector.Selector`) configuration selector
         self.__selector = selector
@@ -100,6 +109,26 @@ class ProfileManager(object):
         #: (:obj:`bool`) add dynamic components for all pool motor positions
         self.__writepoolmotorpositions = writepoolmotorpositions
 
+        #: (:obj:`int`) number of threads used to read channel metadata
+        self.numberOfThreads = numberofthreads or 20
+        #: (:obj:`float`) device call timeout in seconds
+        #:    used to read channel metadata
+        self.metadataTimeout = 3.0
+
+        #: (:obj:`int`) maximal number of profiles with cached
+        #:    mntgrp configurations, zero disables the cache
+        self.profileCacheSize = 0
+        #: (:class:`collections.OrderedDict` <:obj:`str`, \
+        #:    :obj:`dict` <:obj:`str`, `any`> >) cached mntgrp configurations
+        self.__profileCache = OrderedDict()
+        #: (:obj:`int`) maximal number of cached profile switches
+        #:    per profile
+        self.switchCacheSize = 4
+        #: (:obj:`list` <:obj:`str`>) selection items set by profile switches
+        self.__switchKeys = ["DataSourceSelection", "ChannelProperties",
+                             "UnplottedComponents", "Timer",
+                             "OrderedChannels"]
+
     def __updateMacroServer(self):
         """ updatas MacroServer name
         """
@@ -111,10 +140,15 @@ class ProfileManager(object):
         """
         self.__configServer = self.__selector.setConfigInstance()
 
-    def __updatePools(self):
+    def __updatePools(self, context=None):
         """ update device pool proxy list
+
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         """
-        self.__pools = self.__selector.getPools()
+        pools = self.__selector.getPools()
+        self.__pools = context.pools(pools) \
+            if context is not None else pools
         self.__withsynch = self.__hassynch()
 
     def __hassynch(self):
@@ -167,16 +201,21 @@ class ProfileManager(object):
         motors = motors if motors else []
         return motors
 
-    def components(self):
+    def components(self, context=None):
         """ provides selected components
 
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         :returns: list of available selected components
         :rtype: :obj:`list` <:obj:`str`>
         """
-        cps = json.loads(self.__selector["ComponentSelection"])
-        ads = json.loads(self.__selector["DataSourceSelection"])
+        cps = self.__selector.getValue("ComponentSelection")
+        ads = self.__selector.getValue("DataSourceSelection")
         dss = [ds for ds in ads if ads[ds]]
-        acp = self.__selector.configCommand("availableComponents") or []
+        if context is not None:
+            acp = context.availableComponents()
+        else:
+            acp = self.__selector.configCommand("availableComponents") or []
         res = []
         if isinstance(cps, dict):
             res = [cp for cp in cps.keys() if cps[cp]]
@@ -191,7 +230,7 @@ class ProfileManager(object):
         :returns: list of available preselected components
         :rtype: :obj:`list` <:obj:`str`>
         """
-        cps = json.loads(self.__selector["ComponentPreselection"])
+        cps = self.__selector.getValue("ComponentPreselection")
         if isinstance(cps, dict):
             return [cp for cp in cps.keys() if cps[cp]]
         else:
@@ -203,7 +242,7 @@ class ProfileManager(object):
         :returns: list of available preselected components
         :rtype: :obj:`list` <:obj:`str`>
         """
-        cps = json.loads(self.__selector["DataSourcePreselection"])
+        cps = self.__selector.getValue("DataSourcePreselection")
         if isinstance(cps, dict):
             return [cp for cp in cps.keys() if cps[cp]]
         else:
@@ -279,7 +318,7 @@ class ProfileManager(object):
             compdatasources = self.__componentDataSources()
         if not isinstance(compdatasources, list):
             compdatasources = []
-        dss = json.loads(self.__selector["DataSourceSelection"])
+        dss = self.__selector.getValue("DataSourceSelection")
         if isinstance(dss, dict):
             return [ds for ds in dss.keys()
                     if dss[ds] and ds not in compdatasources]
@@ -300,6 +339,7 @@ class ProfileManager(object):
         :param name: mntgrp name
         :type name: :obj:`str`
         """
+        self.__profileCache.pop(name, None)
         self.__updatePools()
         for pool in self.__pools:
             mntgrps = PoolUtils.getElementNames([pool], 'MeasurementGroupList')
@@ -308,11 +348,13 @@ class ProfileManager(object):
                     pool, "DeleteElement", Utils.tostr(name))
         if MSUtils.getEnv('ActiveMntGrp', self.__macroServerName) == name:
             MSUtils.usetEnv("ActiveMntGrp", self.__macroServerName)
+        self.__selector.flushSelection()
         inst = self.__selector.setConfigInstance()
         if name in inst.AvailableSelections():
             inst.deleteSelection(name)
 
-    def updateProfile(self, sync=False, resetDoor=False):
+    @Instrumentation.spanned("ProfileManager.updateProfile")
+    def updateProfile(self, sync=False, resetDoor=False, stage=None):
         """ sets active measurement group from components and
         import setting from active measurement
 
@@ -321,33 +363,34 @@ class ProfileManager(object):
         :type sync: :obj:`bool`
         :param sync: reset door device name flag
         :type sync: :obj:`bool`
+        :param stage: function called with names of the update stages,
+                      i.e. configuration, mntgrp, profile and environment
+        :type stage: :obj:`instancemethod` or :obj:`function`
         :returns: json dictionary with mntgrp configuration information
         :rtype: :obj:`str`
         """
-        mcp = self.__selector.configCommand("mandatoryComponents") or []
-        components = list(
-            set(self.components()) | set(self.preselectedComponents()) |
-            set(mcp))
-
-        self.__updateConfigServer()
-        describer = Describer(self.__configServer, True)
-        description = describer.components(components, '', '')
-        componentdatasources = self.__componentDataSources(description)
-        datasources = self.__dataSources(componentdatasources)
-#        conf, mntgrp
-        mginfo = self.__createMntGrpConf(
-            datasources, componentdatasources, description)
+        stage = Instrumentation.stager(stage)
+        stage("configuration")
+        mginfo, componentdatasources, context, digest = \
+            self.__cachedMntGrpConf()
+        stage("mntgrp")
         conf = mginfo['configuration']
         dpmg = TangoUtils.openProxy(Utils.tostr(mginfo['device']))
-        dpmg.Configuration = conf
-        conf = Utils.tostr(dpmg.configuration)
+        oldconf = Utils.tostr(dpmg.configuration)
+        if MntGrpConf.diff(oldconf, conf):
+            dpmg.Configuration = conf
+            conf = Utils.tostr(dpmg.configuration)
+        else:
+            conf = oldconf
+        stage("profile")
         self.__selector['MntGrpConfiguration'] = conf
         mginfo['configuration'] = conf
         if resetDoor:
             self.__selector["Door"] = ""
         if sync:
-            self.__setFromMntGrpConf(conf, componentdatasources)
+            self.__setFromMntGrpConf(conf, componentdatasources, context)
         self.__selector.storeSelection()
+        self.__addProfileCacheKey(digest)
 
         if self.mutedPreScanAttrFilters:
             mginfo['snapshot'] = PoolUtils.filterOutTango(
@@ -363,6 +406,7 @@ class ProfileManager(object):
                 unique_snapshot.append(sn)
         mginfo['snapshot'] = unique_snapshot
 
+        stage("environment")
         MSUtils.setEnvs(
             {'PreScanSnapshot': mginfo['snapshot'],
              'ActiveMntGrp': mginfo['alias']},
@@ -384,8 +428,84 @@ class ProfileManager(object):
         self.fetchProfile()
         jconf = self.mntGrpConfiguration()
         self.__updateConfigServer()
-        if self.__setFromMntGrpConf(jconf):
+        changed, values = self.__cachedSetFromMntGrpConf(jconf)
+        if changed:
             self.__selector.storeSelection()
+        self.__addSwitchCacheKey(jconf, values)
+
+    def __cachedSetFromMntGrpConf(self, jconf):
+        """ imports setting from measurement group configuration or
+            applies the cached import of the same configuration if the
+            profile selection, configuration server and pool revisions
+            have not been changed
+
+        :param jconf: json with mntgrp configuration
+        :type jconf: :obj:`str`
+        :returns: (if profile has been changed, imported selection items
+                   or None if they are not cached)
+        :rtype: (:obj:`bool`, :obj:`dict` <:obj:`str`, `any`>)
+        """
+        key = self.__switchCacheKey(jconf)
+        if key is None:
+            return self.__setFromMntGrpConf(jconf), None
+        switches = self.__profileEntry(self.__selector["MntGrp"])["switches"]
+        values = switches.get(key)
+        if values is None:
+            changed = self.__setFromMntGrpConf(jconf)
+            values = dict(
+                (name, copy.deepcopy(self.__selector.getValue(name)))
+                for name in self.__switchKeys)
+            self.__addSwitchCacheKey(jconf, values, key)
+            return changed, values
+
+        changed = False
+        for name, value in values.items():
+            if self.__selector.getValue(name) != value:
+                self.__selector.setValue(name, copy.deepcopy(value))
+                changed = True
+        self.__selector.flushSelection()
+        if self.__selector["MntGrp"] not in \
+           self.__configServer.availableSelections():
+            changed = True
+        return changed, values
+
+    def __switchCacheKey(self, jconf):
+        """ provides cache key of the profile switch
+
+        :param jconf: json with mntgrp configuration
+        :type jconf: :obj:`str`
+        :returns: cache key or None if revisions are not tracked
+        :rtype: :obj:`str`
+        """
+        if self.profileCacheSize <= 0:
+            return None
+        digest = self.__revisionDigest()
+        if digest is None:
+            return None
+        return self.__profileCacheKey(digest) + \
+            hashlib.sha1(jconf.encode()).hexdigest()
+
+    def __addSwitchCacheKey(self, jconf, values, key=None):
+        """ marks imported selection items as valid for the profile
+            switch with the given or the current cache key
+
+        :param jconf: json with mntgrp configuration
+        :type jconf: :obj:`str`
+        :param values: imported selection items
+        :type values: :obj:`dict` <:obj:`str`, `any`>
+        :param key: cache key, the current one if None
+        :type key: :obj:`str`
+        """
+        if values is None:
+            return
+        key = key or self.__switchCacheKey(jconf)
+        if key is None:
+            return
+        switches = self.__profileEntry(self.__selector["MntGrp"])["switches"]
+        switches.pop(key, None)
+        switches[key] = values
+        while len(switches) > self.switchCacheSize:
+            switches.popitem(last=False)
 
     def mntGrpConfiguration(self):
         """ provides configuration of mntgrp
@@ -406,44 +526,193 @@ class ProfileManager(object):
     def isMntGrpUpdated(self):
         """ check if active measurement group was changed
 
+        :brief: the required configuration is compared in memory with
+                the current one, i.e. the measurement group is neither
+                created nor written
         :returns: True if it is different to the current setting
         :rtype: :obj:`bool`
         """
+        mgconf, mginfo, differences = self.__mntGrpDifferences()
+        if not json.loads(mgconf):
+            return False
+        return not differences
+
+    def mntGrpUpdatePlan(self):
+        """ provides changes which would be made by updateProfile
+            without touching the measurement group
+
+        :returns: dictionary with the measurement group "alias", "device",
+                  "create", "changed" flags, names of changed "controllers",
+                  "channels" and other "settings" and a list of
+                  configuration "differences"
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        mgconf, mginfo, differences = self.__mntGrpDifferences()
+        plan = MntGrpConf.changedElements(differences)
+        plan["alias"] = mginfo["alias"]
+        plan["device"] = mginfo["device"]
+        plan["create"] = not mginfo["device"]
+        plan["changed"] = bool(differences)
+        plan["differences"] = differences
+        return plan
+
+    def __mntGrpDifferences(self):
+        """ compares the current measurement group configuration
+            with the required one, the selection is left unchanged
+
+        :returns: (current configuration, mntgrp info, differences)
+        :rtype: (:obj:`str`, :obj:`dict` <:obj:`str`, `any`>, \
+                 :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>)
+        """
+        self.__updateConfigServer()
+        mgconf = self.mntGrpConfiguration()
+        state = self.__selector.get()
+        mginfo = self.__requiredMntGrpConf(create=False)[0]
+        state2 = self.__selector.get()
+        if json.dumps(state) != json.dumps(state2):
+            self.__selector.set(state)
+        return mgconf, mginfo, MntGrpConf.diff(
+            mgconf, mginfo["configuration"])
+
+    def clearProfileCache(self):
+        """ clears cached mntgrp configurations
+        """
+        self.__profileCache.clear()
+
+    def __cachedMntGrpConf(self):
+        """ provides cached measurement group configuration of the profile
+            if its components, datasources, pool elements and selection
+            have not been changed or creates the new one
+
+        :brief: changes are detected by configuration server and pool
+                revisions, if they are not tracked nothing is cached
+        :returns: (mntgrp info, component datasources, request context,
+                   configuration digest)
+        :rtype: (:obj:`dict` <:obj:`str`, `any`>, :obj:`list` <:obj:`str`>, \
+                 :class:`nxsrecconfig.RequestContext.RequestContext`, \
+                 :obj:`str`)
+        """
+        if self.profileCacheSize <= 0:
+            if self.__profileCache:
+                self.__profileCache.clear()
+            return self.__requiredMntGrpConf() + (None,)
+        self.__updateConfigServer()
+        context = RequestContext(self.__configServer)
+        digest = self.__revisionDigest()
+        if digest is None:
+            return self.__requiredMntGrpConf(context=context) + (None,)
+        name = self.__selector["MntGrp"]
+        prekey = self.__profileCacheKey(digest)
+        entry = self.__profileCache.get(name)
+        if entry is not None and entry["mginfo"] is not None and \
+                prekey in entry["keys"]:
+            self.__profileCache.pop(name)
+            self.__profileCache[name] = entry
+            self.__updateMacroServer()
+            for key, value in entry["selection"].items():
+                self.__selector[key] = value
+            return (copy.deepcopy(entry["mginfo"]),
+                    list(entry["componentdatasources"]), context, digest)
+
+        mginfo, componentdatasources, context = \
+            self.__requiredMntGrpConf(context=context)
+        digest = self.__revisionDigest() or digest
+        entry = self.__profileEntry(name)
+        entry["keys"] = set([prekey, self.__profileCacheKey(digest)])
+        entry["mginfo"] = copy.deepcopy(mginfo)
+        entry["componentdatasources"] = list(componentdatasources)
+        entry["selection"] = dict(
+            (key, self.__selector[key])
+            for key in ["DataSourceSelection", "UnplottedComponents"])
+        return mginfo, componentdatasources, context, digest
+
+    def __profileEntry(self, name):
+        """ provides the most recently used cache entry of the profile
+
+        :param name: profile name
+        :type name: :obj:`str`
+        :returns: profile cache entry
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        entry = self.__profileCache.pop(name, None)
+        if entry is None:
+            entry = {"keys": set(), "mginfo": None,
+                     "componentdatasources": [], "selection": {},
+                     "switches": OrderedDict()}
+        self.__profileCache[name] = entry
+        while len(self.__profileCache) > self.profileCacheSize:
+            self.__profileCache.popitem(last=False)
+        return entry
+
+    def __addProfileCacheKey(self, digest):
+        """ marks the cached configuration of the current profile
+            as valid for the current selection
+
+        :param digest: configuration digest
+        :type digest: :obj:`str`
+        """
+        entry = self.__profileCache.get(self.__selector["MntGrp"])
+        if digest is not None and entry is not None:
+            entry["keys"].add(self.__profileCacheKey(digest))
+
+    def __profileCacheKey(self, digest):
+        """ provides cache key of the current selection
+
+        :param digest: configuration digest
+        :type digest: :obj:`str`
+        :returns: cache key
+        :rtype: :obj:`str`
+        """
+        state = self.__selector.get()
+        state.pop("MntGrpConfiguration", None)
+        return digest + hashlib.sha1(
+            json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+    def __revisionDigest(self):
+        """ provides digest of the configuration server and pool revisions
+            and of the settings used in the mntgrp configuration
+
+        :returns: revision digest or None if revisions are not tracked
+        :rtype: :obj:`str`
+        """
+        key = self.__selector.stateKey()
+        if key is None:
+            return None
+        data = [list(key[1:]), self.__hassynch(), self.masterTimer,
+                self.masterTimerFirst, sorted(self.clientRecordKeys),
+                list(self.timerFilters)]
+        return "revision:" + hashlib.sha1(
+            json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def __requiredMntGrpConf(self, create=True, context=None):
+        """ creates measurement group configuration from
+            selected, preselected and mandatory components
+
+        :param create: create measurement group if it does not exist
+        :type create: :obj:`bool`
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
+        :returns: (mntgrp info, component datasources, request context)
+        :rtype: (:obj:`dict` <:obj:`str`, `any`>, :obj:`list` <:obj:`str`>, \
+                 :class:`nxsrecconfig.RequestContext.RequestContext`)
+        """
+        if context is None:
+            self.__updateConfigServer()
+            context = RequestContext(self.__configServer)
         mcp = self.__selector.configCommand("mandatoryComponents") or []
         components = list(
-            set(self.components()) | set(self.preselectedComponents()) |
+            set(self.components(context)) |
+            set(self.preselectedComponents()) |
             set(mcp))
 
-        self.__updateConfigServer()
-        describer = Describer(self.__configServer, True)
+        describer = context.describer(True)
         description = describer.components(components, '', '')
         componentdatasources = self.__componentDataSources(description)
         datasources = self.__dataSources(componentdatasources)
-        mgconf = json.loads(self.mntGrpConfiguration())
-
-        state = self.__selector.get()
-        amg = MSUtils.getEnv('ActiveMntGrp', self.__macroServerName)
-
         mginfo = self.__createMntGrpConf(
-            datasources, componentdatasources, description)
-        llconf = mginfo["configuration"]
-
-        dpmg = TangoUtils.openProxy(Utils.tostr(mginfo['device']))
-        oldconf = Utils.tostr(dpmg.configuration)
-        dpmg.Configuration = llconf
-        llconf = Utils.tostr(dpmg.configuration)
-        dpmg.Configuration = oldconf
-
-        amg2 = MSUtils.getEnv('ActiveMntGrp', self.__macroServerName)
-        if amg != amg2:
-            MSUtils.setEnv(
-                'ActiveMntGrp', Utils.tostr(amg), self.__macroServerName)
-        state2 = self.__selector.get()
-        if json.dumps(state) != json.dumps(state2):
-            self.__selector.set(state)
-
-        lsconf = json.loads(llconf)
-        return Utils.compareDict(mgconf, lsconf)
+            datasources, componentdatasources, description, context,
+            create)
+        return mginfo, componentdatasources, context
 
     def importMntGrp(self):
         """ import setting from active measurement
@@ -477,9 +746,9 @@ class ProfileManager(object):
         snpds = dict([(ds[0], False) for ds in tangods])
         mydsg = {}
         self.createDataSources(tangods, mydsg)
-        jpcps = json.loads(self.__selector["ComponentPreselection"])
-        jpdss = json.loads(self.__selector["DataSourcePreselection"])
-        predss = set(json.loads(self.__selector["PreselectingDataSources"]))
+        jpcps = dict(self.__selector.getValue("ComponentPreselection"))
+        jpdss = dict(self.__selector.getValue("DataSourcePreselection"))
+        predss = set(self.__selector.getValue("PreselectingDataSources"))
         changed = False
         for cp in components:
             if cp not in jpcps.keys():
@@ -511,13 +780,11 @@ class ProfileManager(object):
         for ds, val in snpds.items():
             if val is not True:
                 jpdss[ds] = None
-        pcps = json.dumps(jpcps)
-        pdss = json.dumps(jpdss)
-        if pcps != self.__selector["ComponentPreselection"]:
-            self.__selector["ComponentPreselection"] = pcps
+        if jpcps != self.__selector.getValue("ComponentPreselection"):
+            self.__selector.setValue("ComponentPreselection", jpcps)
             changed = True
-        if pdss != self.__selector["DataSourcePreselection"]:
-            self.__selector["DataSourcePreselection"] = pdss
+        if jpdss != self.__selector.getValue("DataSourcePreselection"):
+            self.__selector.setValue("DataSourcePreselection", jpdss)
             changed = True
         return changed
 
@@ -543,7 +810,8 @@ class ProfileManager(object):
                 self.__selector.preselect()
 
     def __createMntGrpConf(self, datasources,
-                           componentdatasources, description):
+                           componentdatasources, description, context=None,
+                           create=True):
         """ sets active measurement group from components
 
         :param components:  component list
@@ -556,31 +824,37 @@ class ProfileManager(object):
         :type description: [:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, \
             :obj:`list` <(:obj:`str`, :obj:`str`, :obj:`str`, \
             :obj:`str`, :obj:`list` <:obj:`int`>)> > > ]
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
+        :param create: create measurement group if it does not exist
+        :type create: :obj:`bool`
         :returns: dictionary of MntGrp configuration and MntGrp Device name
         :rtype: {"alias": :obj:`str` , "device": :obj:`str` , \
             "configuration": :obj:`str` ,  \
             "snapshot": :obj:`list` <(:obj:`str` , :obj:`str` )>}
         """
-        self.__updatePools()
+        if context is None:
+            context = RequestContext(self.__configServer)
+        self.__updatePools(context)
         self.__updateMacroServer()
         cnf = {}
         cnf['controllers'] = {}
         cnf['description'] = "Measurement Group"
         cnf['label'] = ""
 
-        dontdisplay = set(json.loads(self.__selector["UnplottedComponents"]))
+        dontdisplay = set(self.__selector.getValue("UnplottedComponents"))
 
         ltimers = set()
         timer = self.__prepareTimers(cnf, ltimers)
         aliases, snapshot = self.__fetchChannels(
             datasources, componentdatasources,
-            dontdisplay, set(ltimers) | set([timer]), description)
-        mfullname = self.__prepareMntGrp(cnf, timer)
+            dontdisplay, set(ltimers) | set([timer]), description, context)
+        mfullname = self.__prepareMntGrp(cnf, timer, create)
 
         index = 0
         fullnames = PoolUtils.getFullDeviceNames(self.__pools, aliases)
         sources = PoolUtils.getChannelSources(self.__pools, aliases)
-        props = json.loads(self.__selector["ChannelProperties"])
+        props = self.__selector.getValue("ChannelProperties")
         synchronizer = props["synchronizer"] \
             if "synchronizer" in props.keys() else {}
         synchronization = props["synchronization"] \
@@ -591,6 +865,8 @@ class ProfileManager(object):
         tchannels = tchannels | ltimers
         if self.masterTimerFirst and timer and timer in aliases:
             index = 1
+        metadata = self.__prefetchMetadata(
+            aliases, fullnames, sources, context)
         for al in aliases:
             if self.masterTimerFirst and al == timer:
                 curindex = index
@@ -601,7 +877,7 @@ class ProfileManager(object):
                 fullnames, sources,
                 synchronizer[al] if al in synchronizer.keys() else None,
                 int(synchronization[al]) if al in synchronization.keys()
-                else None
+                else None, metadata, context
             )
             if self.masterTimerFirst and al == timer:
                 index = curindex
@@ -616,33 +892,93 @@ class ProfileManager(object):
         }
         return mginfo
 
-    def __setFromMntGrpConf(self, jconf, compdatasources=None):
+    def __prefetchMetadata(self, aliases, fullnames, sources, context=None):
+        """ resolves sources, shapes, types and units of all channels
+            concurrently
+
+        :param aliases: channel aliases
+        :type aliases: :obj:`list` <:obj:`str`>
+        :param fullnames: dictionary with full names
+        :type fullnames: :obj:`dict` <:obj:`str`, :obj:`str`>
+        :param sources: dictionary with source names
+        :type sources: :obj:`dict` <:obj:`str`, :obj:`str`>
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
+        :returns: channel metadata with "source", "record" and "stu"
+                  i.e. (shape, data_type, units) items
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, `any`> >
+        """
+        metadata = {}
+        timeout = self.metadataTimeout
+        ctrls = PoolUtils.getDeviceControllers(self.__pools, aliases)
+        channels = [al for al in aliases if ctrls.get(al)]
+        others = [al for al in aliases if not ctrls.get(al)]
+
+        errors = {}
+        dsources = Utils.parallelCall(
+            lambda al: self.__channelSource(
+                fullnames.get(al, ""), sources.get(al, ""), timeout),
+            channels, self.numberOfThreads,
+            Utils.roundsTimeout(len(channels), self.numberOfThreads, timeout),
+            errors)
+        for al, dsource in dsources.items():
+            metadata[al] = {"source": dsource}
+
+        if others:
+            describer = context.describer() if context is not None \
+                else Describer(self.__configServer)
+            for sds in describer.dataSources(others):
+                js = json.loads(sds)
+                if js["dsname"] in others:
+                    metadata[js["dsname"]] = {"record": js}
+
+        tsources = {}
+        for al, md in metadata.items():
+            if "source" in md:
+                tsources[al] = md["source"]
+            elif md["record"]["dstype"] == 'TANGO':
+                tsources[al] = Utils.tostr(md["record"]["record"])
+        stus = TangoUtils.getShapeTypeUnits(
+            tsources.values(), self.numberOfThreads, timeout, errors)
+        for al, source in tsources.items():
+            if source in stus:
+                metadata[al]["stu"] = stus[source]
+        for name, error in errors.items():
+            self.__selector.streams.debug(
+                "ProfileManager::createMntGrpConf() - "
+                "metadata of '%s' cannot be prefetched: %s"
+                % (name, Utils.tostr(error)))
+        return metadata
+
+    def __setFromMntGrpConf(self, jconf, compdatasources=None, context=None):
         """ import setting from active measurement
 
         :param jconf: json with mntgrp configuration
         :type jconf: :obj:`str`
         :param componentdatasources: component datasources
         :type componentdatasources: :obj:`list` <:obj:`int`>
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         :returns: if profile has been changed
         :rtype: :obj:`bool`
         """
-        self.__updatePools()
+        self.__updatePools(context)
         conf = json.loads(jconf)
         otimers = None
         ochs = None
         timers = {}
         idch = {}
 
-        dsg = json.loads(self.__selector["DataSourceSelection"])
-        hel = set(json.loads(self.__selector["UnplottedComponents"]))
-        props = json.loads(self.__selector["ChannelProperties"])
+        dsg = dict(self.__selector.getValue("DataSourceSelection"))
+        hel = set(self.__selector.getValue("UnplottedComponents"))
+        props = dict(self.__selector.getValue("ChannelProperties"))
         # synchronizer = props["synchronizer"] \
         #     if "synchronizer" in props.keys() else {}
         synchronizer = {}
         # synchronization = props["synchronization"] \
         #     if "synchronization" in props.keys() else {}
         synchronization = {}
-        self.__clearChannels(dsg, hel, compdatasources)
+        self.__clearChannels(dsg, hel, compdatasources, context)
 
         # fill in dsg, timers hel
         if "controllers" in conf.keys() and \
@@ -659,36 +995,33 @@ class ProfileManager(object):
         props["synchronization"] = synchronization
 
         changed = False
-        jdsg = json.dumps(dsg)
-        if self.__selector["DataSourceSelection"] != jdsg:
-            self.__selector["DataSourceSelection"] = jdsg
+        if self.__selector.getValue("DataSourceSelection") != dsg:
+            self.__selector.setValue("DataSourceSelection", dsg)
             changed = True
 
-        jprops = json.dumps(props)
-        if self.__selector["ChannelProperties"] != jprops:
-            self.__selector["ChannelProperties"] = jprops
+        if self.__selector.getValue("ChannelProperties") != props:
+            self.__selector.setValue("ChannelProperties", props)
             changed = True
 
-        if set(json.loads(self.__selector["UnplottedComponents"])) != hel:
-            self.__selector["UnplottedComponents"] = json.dumps(list(hel))
+        if set(self.__selector.getValue("UnplottedComponents")) != hel:
+            self.__selector.setValue("UnplottedComponents", list(hel))
             changed = True
 
         if otimers is not None:
-            jtimers = json.dumps(otimers)
-            if self.__selector["Timer"] != jtimers:
-                self.__selector["Timer"] = jtimers
+            if self.__selector.getValue("Timer") != otimers:
+                self.__selector.setValue("Timer", otimers)
                 changed = True
         if ochs is not None:
-            jochs = json.dumps(ochs)
-            if self.__selector["OrderedChannels"] != jochs:
-                self.__selector["OrderedChannels"] = jochs
+            if self.__selector.getValue("OrderedChannels") != ochs:
+                self.__selector.setValue("OrderedChannels", ochs)
                 changed = True
+        self.__selector.flushSelection()
         if self.__selector["MntGrp"] not in \
            self.__configServer.availableSelections():
             changed = True
         return changed
 
-    def __clearChannels(self, dsg, hel, compdatasources=None):
+    def __clearChannels(self, dsg, hel, compdatasources=None, context=None):
         """ clears profile channels
 
         :param dsg: datasource selection dictionary
@@ -697,11 +1030,15 @@ class ProfileManager(object):
         :type hel: :obj:`list` <:obj:`str`>
         :param componentdatasources: component datasources
         :type componentdatasources: :obj:`list` <:obj:`int`>
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         """
         if compdatasources is None:
             compdatasources = self.componentDataSources()
-        describer = Describer(self.__configServer, True)
-        ads = TangoUtils.command(self.__configServer, "availableDataSources")
+        if context is None:
+            context = RequestContext(self.__configServer)
+        describer = context.describer(True)
+        ads = context.availableDataSources()
         dsres = describer.dataSources(ads, 'TANGO')[0]
         tangods = [Utils.tostr(dsr.name) for dsr in dsres.values()
                    if dsr.name not in compdatasources]
@@ -848,7 +1185,7 @@ class ProfileManager(object):
         elif "timer" in conf and not otimers:
             otimers.insert(0, dtimers[conf["timer"]])
 
-        tms = json.loads(self.__selector["Timer"])
+        tms = list(self.__selector.getValue("Timer"))
         tms.extend(otimers)
 
         for tm in tms:
@@ -869,7 +1206,7 @@ class ProfileManager(object):
         lindex = -1
         pchannels = None
         if hasattr(idch, "items"):
-            pchs = json.loads(self.__selector["OrderedChannels"])
+            pchs = self.__selector.getValue("OrderedChannels")
             pchannels = []
             for ch in pchs:
                 if ch not in pchannels:
@@ -889,7 +1226,7 @@ class ProfileManager(object):
 
         return pchannels
 
-    def __checkClientRecords(self, datasources, description):
+    def __checkClientRecords(self, datasources, description, context=None):
         """ checks client records
 
         :param datasources: datasource list
@@ -898,9 +1235,12 @@ class ProfileManager(object):
         :type description: [:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, \
             :obj:`list` <(:obj:`str`, :obj:`str`, :obj:`str`, \
             :obj:`str`, :obj:`list` <:obj:`int`>)> > > ]
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         """
-
-        describer = Describer(self.__configServer, True)
+        if context is None:
+            context = RequestContext(self.__configServer)
+        describer = context.describer(True)
         frecords = PoolUtils.getFullDeviceNames(self.__pools)
         dsres = describer.dataSources(
             set(datasources) - set(frecords.keys()), 'CLIENT')[0]
@@ -913,7 +1253,7 @@ class ProfileManager(object):
                         if dsr[1] == 'CLIENT':
                             records.append(Utils.tostr(dsr[2]))
 
-        urecords = list(json.loads(self.__selector["UserData"]).keys())
+        urecords = list(self.__selector.getValue("UserData").keys())
         precords = list(frecords.values())
         missing = sorted(set(records)
                          - set(DEFAULT_RECORD_KEYS)
@@ -989,7 +1329,7 @@ class ProfileManager(object):
         :returns: master timer
         :rtype: :obj:`str`
         """
-        mtimers = json.loads(self.__selector["Timer"])
+        mtimers = self.__selector.getValue("Timer")
         #   avtimers = PoolUtils.getTimers(self.__pools, self.timerFilters)
         #   mtimers = mtimers or []
         #   mtimers = [tm for tm in mtimers if tm in avtimers]
@@ -1014,7 +1354,7 @@ class ProfileManager(object):
         return timer
 
     def __fetchChannels(self, datasources, componentdatasources,
-                        dontdisplay, timers, description):
+                        dontdisplay, timers, description, context=None):
         """ fetches component channels from config server
             and preselect datasources
 
@@ -1030,6 +1370,8 @@ class ProfileManager(object):
         :type description: [:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, \
             :obj:`list` <(:obj:`str`, :obj:`str`, :obj:`str`, \
             :obj:`str`, :obj:`list` <:obj:`int`>)> > > ]
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         :returns:  (ordered pool channels, snapshot tuple list)
         :rtype: (:obj:`list` <:obj:`str`> ,  \
             :obj:`list` <(:obj:`str` , :obj:`str` )>)
@@ -1037,15 +1379,17 @@ class ProfileManager(object):
         aliases = []
         initsources = {}
 
-        self.__checkClientRecords(datasources, description)
+        if context is None:
+            context = RequestContext(self.__configServer)
+        self.__checkClientRecords(datasources, description, context)
         if isinstance(datasources, list):
             aliases = list(datasources)
-        pchannels = json.loads(self.__selector["OrderedChannels"])
-        dsg = json.loads(self.__selector["DataSourceSelection"])
+        pchannels = self.__selector.getValue("OrderedChannels")
+        dsg = dict(self.__selector.getValue("DataSourceSelection"))
         aliases.extend(
             list(set(pchannels) & set(componentdatasources)))
 
-        describer = Describer(self.__configServer, True)
+        describer = context.describer(True)
         for grp in description:
             for cp, dss in grp.items():
                 ndcp = cp in dontdisplay
@@ -1083,9 +1427,8 @@ class ProfileManager(object):
                 if tm in dsg.keys():
                     dsg[Utils.tostr(tm)] = False
 
-        self.__selector["DataSourceSelection"] = json.dumps(dsg)
-        self.__selector["UnplottedComponents"] = json.dumps(
-            list(dontdisplay))
+        self.__selector.setValue("DataSourceSelection", dsg)
+        self.__selector.setValue("UnplottedComponents", list(dontdisplay))
         aliases = list(set(aliases))
 
         for tm in timers:
@@ -1098,13 +1441,15 @@ class ProfileManager(object):
         pchannels.extend(aliases)
         return pchannels, snapshot
 
-    def __prepareMntGrp(self, cnf, timer):
+    def __prepareMntGrp(self, cnf, timer, create=True):
         """ creates mntgrp if does not exists
 
         :param cnf: mntgrp configuration
         :type cnf: :obj:`dict` <:obj:`str`, `any`>
         :param timer: master timer
         :type timer: :obj:`str`
+        :param create: create measurement group if it does not exist
+        :type create: :obj:`bool`
         :returns: full mntgrp name
         :rtype: :obj:`str`
         """
@@ -1112,7 +1457,7 @@ class ProfileManager(object):
         mfullname = Utils.tostr(PoolUtils.getMntGrpName(
             self.__pools, mntGrpName))
 
-        if not mfullname:
+        if not mfullname and create:
             mfullname = self.__createMntGrpDevice(mntGrpName, timer)
 
         cnf['label'] = mntGrpName
@@ -1284,7 +1629,8 @@ class ProfileManager(object):
 
     def __addDevice(self, device, dontdisplay, cnf,
                     timer, index, fullnames=None, sources=None,
-                    synchronizer=None, synchronization=None):
+                    synchronizer=None, synchronization=None,
+                    metadata=None, context=None):
         """ adds device into configuration dictionary
 
         :param device: device alias
@@ -1305,9 +1651,15 @@ class ProfileManager(object):
         :type synchronizer: :obj:`str`
         :param synchronization: trigger:0 or gate:1
         :type synchronization: :obj:`int`
+        :param metadata: prefetched channel metadata
+        :type metadata: :obj:`dict` <:obj:`str`, \
+                        :obj:`dict` <:obj:`str`, `any`> >
+        :param context: request context
+        :type context: :class:`nxsrecconfig.RequestContext.RequestContext`
         :returns: next device index
         :rtype: :obj:`int`
         """
+        metadata = metadata or {}
         if not fullnames:
             fullnames = PoolUtils.getFullDeviceNames(
                 self.__pools, [device, timer])
@@ -1324,18 +1676,25 @@ class ProfileManager(object):
             source = sources[device] \
                 if sources and device in sources.keys() else ""
             index = self.__addChannel(cnf, ctrl, device, fullname,
-                                      dontdisplay, index, source)
+                                      dontdisplay, index, source,
+                                      metadata.get(device))
         else:
-            describer = Describer(self.__configServer)
-            sds = describer.dataSources([device])
-            if sds:
-                js = json.loads(sds[0])
+            if device in metadata and "record" in metadata[device]:
+                js = metadata[device]["record"]
+            else:
+                js = None
+                describer = context.describer() if context is not None \
+                    else Describer(self.__configServer)
+                sds = describer.dataSources([device])
+                if sds:
+                    js = json.loads(sds[0])
+            if js:
                 if js["dstype"] == 'TANGO':
                     ctrl = "__tango__"
                     self.__addController(cnf, ctrl, fulltimer)
                     index = self.__addTangoChannel(
                         cnf, ctrl, device, Utils.tostr(js["record"]),
-                        dontdisplay, index)
+                        dontdisplay, index, metadata.get(device))
         synchronization = synchronization or None
         synchronizer = synchronizer or None
         if synchronization is not None:
@@ -1410,9 +1769,27 @@ class ProfileManager(object):
                 cnf['controllers'][ctrl][u'timer'] = fulltimer
                 cnf['controllers'][ctrl][u'synchronizer'] = 'software'
 
+    @classmethod
+    def __channelSource(cls, fullname, source, timeout=None):
+        """ provides source attribute of pool channel
+
+        :param fullname: full device name
+        :type fullname: :obj:`str`
+        :param source: channel source
+        :type source: :obj:`str`
+        :param timeout: device call timeout in seconds
+        :type timeout: :obj:`float`
+        :returns: channel source attribute
+        :rtype: :obj:`str`
+        """
+        dsource = source.encode() or PoolUtils.getSource(fullname, timeout)
+        if not dsource:
+            dsource = '%s/%s' % (fullname.encode(), 'Value')
+        return dsource
+
     @classmethod
     def __addChannel(cls, cnf, ctrl, device, fullname, dontdisplay, index,
-                     source):
+                     source, metadata=None):
         """ adds channel into mngrp configuration dictionary
 
         :param cnf: mntgrp configuration dictionary
@@ -1429,19 +1806,26 @@ class ProfileManager(object):
         :type index: :obj:`int`
         :param source: channel source
         :type source: :obj:`str`
+        :param metadata: prefetched channel metadata
+        :type metadata: :obj:`dict` <:obj:`str`, `any`>
         :returns: next index
         :rtype: :obj:`int`
         """
+        metadata = metadata or {}
         if 'units' in cnf['controllers'][ctrl].keys():
             ctrlChannels = cnf['controllers'][ctrl]['units']['0'][
                 u'channels']
         else:
             ctrlChannels = cnf['controllers'][ctrl][u'channels']
         if fullname not in ctrlChannels.keys():
-            dsource = source.encode() or PoolUtils.getSource(fullname)
-            if not dsource:
-                dsource = '%s/%s' % (fullname.encode(), 'Value')
-            shp, dt, ut = TangoUtils.getShapeTypeUnit(dsource)
+            if "source" in metadata:
+                dsource = metadata["source"]
+            else:
+                dsource = cls.__channelSource(fullname, source)
+            if "stu" in metadata:
+                shp, dt, ut = metadata["stu"]
+            else:
+                shp, dt, ut = TangoUtils.getShapeTypeUnit(dsource)
             dct = {}
             dct['_controller_name'] = Utils.tostr(ctrl)
             dct['_unit_id'] = u'0'
@@ -1480,7 +1864,8 @@ class ProfileManager(object):
         return index
 
     @classmethod
-    def __addTangoChannel(cls, cnf, ctrl, device, record, dontdisplay, index):
+    def __addTangoChannel(cls, cnf, ctrl, device, record, dontdisplay, index,
+                          metadata=None):
         """ adds tango channel into mntgrp configuration dictionary
 
         :param cnf: mntgrp configuration dictionary
@@ -1495,10 +1880,12 @@ class ProfileManager(object):
         :type dontdisplay: :obj:`list` <:obj:`str`>
         :param index: channel index
         :type index: :obj:`int`
+        :param metadata: prefetched channel metadata
+        :type metadata: :obj:`dict` <:obj:`str`, `any`>
         :returns: next index
         :rtype: :obj:`int`
         """
-
+        metadata = metadata or {}
         if 'units' in cnf['controllers'][ctrl].keys():
             ctrlChannels = cnf['controllers'][ctrl]['units']['0'][
                 u'channels']
@@ -1512,7 +1899,10 @@ class ProfileManager(object):
             label = record
         if fullname not in ctrlChannels.keys():
             source = record
-            shp, dt, ut = TangoUtils.getShapeTypeUnit(source)
+            if "stu" in metadata:
+                shp, dt, ut = metadata["stu"]
+            else:
+                shp, dt, ut = TangoUtils.getShapeTypeUnit(source)
             dct = {}
             dct['_controller_name'] = Utils.tostr(ctrl)
             dct['_unit_id'] = u'0'
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  cProfile hook for selected command invocations """
+
+import cProfile
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+
+from .Instrumentation import NOMEASUREMENT
+
+
+class ProfiledCommand(object):
+
+    """ cProfile run of one command invocation
+    """
+
+    def __init__(self, name):
+        """ constructor
+
+        :param name: command name
+        :type name: :obj:`str`
+        """
+        #: (:obj:`str`) command name
+        self.name = name
+        #: (:class:`cProfile.Profile`) profiler
+        self.__profile = cProfile.Profile()
+        #: (:obj:`bool`) profiler started flag
+        self.__started = False
+        #: (:obj:`float`) start time
+        self.__start = None
+
+    def __enter__(self):
+        """ starts profiling
+
+        :returns: the profiled command
+        :rtype: :class:`ProfiledCommand`
+        """
+        self.__start = time.time()
+        try:
+            self.__profile.enable()
+            self.__started = True
+        except ValueError:
+            # another profiler is active in this thread
+            pass
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ stops profiling and stores the report
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        if not self.__started:
+            return
+        self.__profile.disable()
+        Profiler.report(self.name, self.__profile,
+                        time.time() - self.__start)
+
+
+class Profiler(object):
+
+    """ Profiles the next invocations of armed commands with cProfile,
+    writes their .pstats files and keeps their hotspots.
+    Only the thread executing the command is profiled.
+    """
+
+    #: (:obj:`str`) directory of .pstats files, temporary if empty
+    directory = ""
+    #: (:obj:`int`) number of reported hotspots
+    topN = 20
+    #: (:obj:`int`) maximal number of kept reports
+    maxReports = 20
+
+    #: (:class:`threading.Lock`) profiler lock
+    __lock = threading.Lock()
+    #: (:obj:`dict` <:obj:`str`, :obj:`int`>) numbers of invocations
+    #:    to be profiled by command names
+    __armed = {}
+    #: (:obj:`list` <:obj:`dict` <:obj:`str`, `any`>>) profiling reports
+    __reports = []
+
+    @classmethod
+    def arm(cls, name, count=1):
+        """ profiles the next invocations of the command
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param count: number of profiled invocations, 0 disarms the command
+        :type count: :obj:`int`
+        """
+        with cls.__lock:
+            if count > 0:
+                cls.__armed[name] = int(count)
+            else:
+                cls.__armed.pop(name, None)
+
+    @classmethod
+    def armed(cls):
+        """ provides numbers of invocations to be profiled
+
+        :returns: numbers of invocations by command names
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`int`>
+        """
+        with cls.__lock:
+            return dict(cls.__armed)
+
+    @classmethod
+    def profile(cls, name):
+        """ provides cProfile run if the command is armed,
+        i.e. to be used in the `with` statement
+
+        :param name: command name
+        :type name: :obj:`str`
+        :returns: profiled command or no-op measurement
+        :rtype: :class:`ProfiledCommand` or \
+                :class:`nxsrecconfig.Instrumentation.NoMeasurement`
+        """
+        if not cls.__armed:
+            return NOMEASUREMENT
+        with cls.__lock:
+            count = cls.__armed.get(name)
+            if not count:
+                return NOMEASUREMENT
+            if count > 1:
+                cls.__armed[name] = count - 1
+            else:
+                cls.__armed.pop(name)
+        return ProfiledCommand(name)
+
+    @classmethod
+    def hotspots(cls, stats, topn):
+        """ provides functions with the largest internal time
+
+        :param stats: profile statistics
+        :type stats: :class:`pstats.Stats`
+        :param topn: number of hotspots
+        :type topn: :obj:`int`
+        :returns: hotspot descriptions
+        :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        """
+        items = sorted(stats.stats.items(), key=lambda it: -it[1][2])
+        return [
+            {"function": key[2], "file": key[0], "line": key[1],
+             "primitive_calls": value[0], "calls": value[1],
+             "tottime": value[2], "cumtime": value[3]}
+            for key, value in items[:max(int(topn), 0)]]
+
+    @classmethod
+    def report(cls, name, profile, duration):
+        """ writes .pstats file and stores the hotspot report
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param profile: finished profiler
+        :type profile: :class:`cProfile.Profile`
+        :param duration: wall time of the command in seconds
+        :type duration: :obj:`float`
+        """
+        now = time.time()
+        filename = os.path.join(
+            cls.directory or tempfile.gettempdir(),
+            "nxsrecselector_%s_%s_%06d.pstats" % (
+                re.sub(r"\W", "_", name),
+                time.strftime("%Y%m%d_%H%M%S", time.localtime(now)),
+                int((now % 1) * 1000000)))
+        error = None
+        try:
+            profile.dump_stats(filename)
+        except Exception as e:
+            error = str(e)
+            filename = ""
+        stats = pstats.Stats(profile)
+        report = {"command": name, "time": now, "duration": duration,
+                  "file": filename, "error": error,
+                  "hotspots": cls.hotspots(stats, cls.topN)}
+        with cls.__lock:
+            cls.__reports.append(report)
+            del cls.__reports[:max(len(cls.__reports) - cls.maxReports, 0)]
+
+    @classmethod
+    def reports(cls):
+        """ provides kept profiling reports
+
+        :returns: reports with command names, wall times,
+                  .pstats file names and hotspots
+        :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, `any`>>
+        """
+        with cls.__lock:
+            return list(cls.__reports)
+
+    @classmethod
+    def clear(cls):
+        """ disarms all commands and removes kept reports
+        """
+        with cls.__lock:
+            cls.__armed = {}
+            cls.__reports = []
@@ -0,0 +1,580 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Record of client sessions with their remote calls
+
+The record is a JSON-lines file with a ``start`` record followed by
+``request`` records of client commands and attribute accesses,
+``open``, ``call``, ``get`` and ``set`` records of remote calls made
+via the factories of :class:`nxsrecconfig.Utils.TangoUtils` and
+``event`` records of subscribed events. Values are stored by
+:func:`encode` and restored by :func:`decode`.
+"""
+
+import base64
+import json
+import sys
+import threading
+import time
+
+try:
+    import tango
+except Exception:
+    import PyTango as tango
+
+from .Utils import Utils, TangoUtils
+
+
+if sys.version_info > (3,):
+    import builtins
+    unicode = str
+    long = int
+else:
+    import __builtin__ as builtins
+
+
+#: (:obj:`list` <:obj:`str`>) recorded fields of attribute readings,
+#:    attribute configurations, database data, events and errors
+FIELDS = [
+    "name", "value", "w_value", "has_failed", "quality", "type",
+    "dim_x", "dim_y", "data_type", "data_format", "unit", "max_dim_x",
+    "max_dim_y", "label", "description", "format", "value_string",
+    "attr_name", "event", "err", "errors", "attr_value", "attr_conf",
+    "reason", "desc", "origin",
+]
+
+
+class RecordedObject(object):
+
+    """ Object restored from its recorded fields
+    """
+
+    def __init__(self, fields):
+        """ constructor
+
+        :param fields: object fields
+        :type fields: :obj:`dict` <:obj:`str`, `any`>
+        """
+        self.__dict__.update(fields)
+
+
+def encode(value):
+    """ converts the value into its JSON-serializable record
+
+    :param value: value to convert
+    :type value: `any`
+    :returns: JSON-serializable record
+    :rtype: `any`
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, long)) and \
+            getattr(tango, type(value).__name__, None) is type(value):
+        return {"__enum__": [type(value).__name__,
+                             getattr(value, "name", str(value))]}
+    if hasattr(value, "tolist") and hasattr(value, "dtype"):
+        if getattr(value, "ndim", 0):
+            return {"__array__": value.tolist()}
+        return value.tolist()
+    if isinstance(value, (int, long, float, unicode)):
+        return value
+    if isinstance(value, bytes):
+        if sys.version_info > (3,):
+            return {"__bytes__": Utils.tostr(base64.b64encode(value))}
+        return value
+    if isinstance(value, list):
+        return [encode(vl) for vl in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode(vl) for vl in value]}
+    if isinstance(value, dict):
+        return dict((Utils.tostr(ky), encode(vl)) for ky, vl in value.items())
+    if isinstance(value, tango.DevFailed):
+        return {"__error__": [
+            [Utils.tostr(err.reason), Utils.tostr(err.desc),
+             Utils.tostr(err.origin)] for err in value.args]}
+    if isinstance(value, Exception):
+        return {"__exception__": [type(value).__name__, Utils.tostr(value)]}
+    if isinstance(value, RecordingProxy):
+        return {"__proxy__": [value.factory, value.target]}
+    if callable(value):
+        return {"__callable__": getattr(value, "__name__", "")}
+    fields = {}
+    for field in FIELDS:
+        try:
+            item = getattr(value, field)
+        except Exception:
+            continue
+        if not callable(item):
+            fields[field] = encode(item)
+    if fields:
+        return {"__object__": fields}
+    return {"__repr__": repr(value)}
+
+
+def decode(record, proxy=None):
+    """ restores the value from its record
+
+    :param record: JSON-serializable record
+    :type record: `any`
+    :param proxy: function creating stand-ins of recorded proxies
+                  called with the factory name and the target
+    :type proxy: :obj:`function`
+    :returns: restored value, i.e. :class:`tango.DevFailed` for errors
+              and :class:`RecordedObject` for tango structures
+    :rtype: `any`
+    """
+    if isinstance(record, list):
+        return [decode(rc, proxy) for rc in record]
+    if not isinstance(record, dict):
+        return record
+    if len(record) == 1:
+        key, value = list(record.items())[0]
+        if key == "__enum__":
+            return getattr(getattr(tango, value[0]), value[1])
+        elif key == "__array__":
+            return value
+        elif key == "__bytes__":
+            return base64.b64decode(value)
+        elif key == "__tuple__":
+            return tuple(decode(rc, proxy) for rc in value)
+        elif key == "__error__":
+            errors = []
+            for reason, desc, origin in value:
+                err = tango.DevError()
+                err.reason = reason
+                err.desc = desc
+                err.origin = origin
+                errors.append(err)
+            return tango.DevFailed(*errors)
+        elif key == "__exception__":
+            etype = getattr(builtins, value[0], None)
+            if isinstance(etype, type) and issubclass(etype, Exception):
+                return etype(value[1])
+            return Exception("%s: %s" % tuple(value))
+        elif key == "__proxy__":
+            return proxy(value[0], value[1]) if proxy else None
+        elif key == "__callable__":
+            return None
+        elif key == "__object__":
+            return RecordedObject(
+                dict((ky, decode(vl, proxy)) for ky, vl in value.items()))
+        elif key == "__repr__":
+            return value
+    return dict((ky, decode(vl, proxy)) for ky, vl in record.items())
+
+
+class RecordedAttribute(object):
+
+    """ Read attribute of the device server which keeps the set value
+    """
+
+    def __init__(self, attr):
+        """ constructor
+
+        :param attr: read attribute
+        :type attr: :class:`tango.Attribute`
+        """
+        #: (:class:`tango.Attribute`) read attribute
+        self.__attr = attr
+        #: (`any`) set value
+        self.value = None
+
+    def set_value(self, value, *args):
+        """ sets the attribute value
+
+        :param value: attribute value
+        :type value: `any`
+        :param args: optional dimensions
+        :type args: :obj:`list` <:obj:`int`>
+        """
+        self.value = value
+        self.__attr.set_value(value, *args)
+
+    def __getattr__(self, name):
+        """ provides members of the read attribute
+
+        :param name: member name
+        :type name: :obj:`str`
+        :returns: member of the read attribute
+        :rtype: `any`
+        """
+        return getattr(self.__attr, name)
+
+
+class RecordingProxy(object):
+
+    """ Proxy which records its remote calls
+    """
+
+    def __init__(self, proxy, factory, target):
+        """ constructor
+
+        :param proxy: device or attribute proxy or tango database
+        :type proxy: :class:`tango.DeviceProxy` or \
+                     :class:`tango.AttributeProxy` or :class:`tango.Database`
+        :param factory: factory name, i.e. device, attribute or database
+        :type factory: :obj:`str`
+        :param target: device name, attribute name or database arguments
+        :type target: :obj:`str` or :obj:`list` <`any`>
+        """
+        object.__setattr__(self, "_RecordingProxy__proxy", proxy)
+        object.__setattr__(self, "factory", factory)
+        object.__setattr__(self, "target", target)
+
+    def __call(self, name, method, args, kwargs):
+        """ calls and records the proxy method
+
+        :param name: method name
+        :type name: :obj:`str`
+        :param method: proxy method
+        :type method: :obj:`function`
+        :param args: method arguments
+        :type args: :obj:`tuple` <`any`>
+        :param kwargs: method keyword arguments
+        :type kwargs: :obj:`dict` <:obj:`str`, `any`>
+        :returns: method result
+        :rtype: `any`
+        """
+        record = {"type": "call", "factory": self.factory,
+                  "target": self.target, "method": name,
+                  "args": encode(list(args))}
+        if kwargs:
+            record["kwargs"] = encode(kwargs)
+        if any(callable(arg) for arg in args):
+            sid = Recorder.subscription()
+            record["sid"] = sid
+            args = [Recorder.callback(sid, arg) if callable(arg) else arg
+                    for arg in args]
+        start = time.time()
+        try:
+            result = method(*args, **kwargs)
+            if name == "get_device_proxy":
+                result = RecordingProxy(
+                    result, "device", Utils.tostr(result.dev_name()))
+            record["result"] = encode(result)
+            return result
+        except Exception as e:
+            record["error"] = encode(e)
+            raise
+        finally:
+            record["start"] = start
+            record["duration"] = time.time() - start
+            if "sid" in record:
+                Recorder.subscribed(record["sid"])
+            Recorder.record(record)
+
+    def __getattr__(self, name):
+        """ provides and records proxy members, i.e. methods, commands
+        and attribute values
+
+        :param name: member name
+        :type name: :obj:`str`
+        :returns: member value
+        :rtype: `any`
+        """
+        record = {"type": "get", "factory": self.factory,
+                  "target": self.target, "name": name}
+        start = time.time()
+        try:
+            value = getattr(self.__proxy, name)
+        except Exception as e:
+            record["error"] = encode(e)
+            record["start"] = start
+            record["duration"] = time.time() - start
+            Recorder.record(record)
+            raise
+        if callable(value):
+            return lambda *args, **kwargs: self.__call(
+                name, value, args, kwargs)
+        record["result"] = encode(value)
+        record["start"] = start
+        record["duration"] = time.time() - start
+        Recorder.record(record)
+        return value
+
+    def __setattr__(self, name, value):
+        """ writes and records attribute values
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        record = {"type": "set", "factory": self.factory,
+                  "target": self.target, "name": name,
+                  "value": encode(value)}
+        start = time.time()
+        try:
+            setattr(self.__proxy, name, value)
+        except Exception as e:
+            record["error"] = encode(e)
+            raise
+        finally:
+            record["start"] = start
+            record["duration"] = time.time() - start
+            Recorder.record(record)
+
+
+class Recorder(object):
+
+    """ Records client requests of the device server together with
+    remote calls of their device proxies, attribute proxies
+    and tango databases into a JSON-lines file
+    """
+
+    #: (:obj:`bool`) recording flag
+    active = False
+
+    #: (:class:`threading.Lock`) recorder lock
+    __lock = threading.Lock()
+    #: (:obj:`file`) record file
+    __file = None
+    #: (:obj:`str`) record file name
+    __filename = ""
+    #: (:obj:`int`) number of started requests
+    __requests = 0
+    #: (:obj:`int`) number of event subscriptions
+    __subscriptions = 0
+    #: (:obj:`set` <:obj:`int`>) subscriptions in progress
+    __subscribing = set()
+    #: (:obj:`tuple` <:obj:`function`>) replaced proxy factories
+    __factories = None
+
+    @classmethod
+    def start(cls, filename, device="", properties=None):
+        """ starts recording into the file, i.e. installs recording
+        factories into :class:`nxsrecconfig.Utils.TangoUtils`
+
+        :param filename: record file name
+        :type filename: :obj:`str`
+        :param device: device server name
+        :type device: :obj:`str`
+        :param properties: device properties
+        :type properties: :obj:`dict` <:obj:`str`, `any`>
+        """
+        cls.stop()
+        fl = open(filename, "w")
+        with cls.__lock:
+            cls.__file = fl
+            cls.__filename = filename
+            cls.__requests = 0
+            cls.__subscriptions = 0
+            cls.__subscribing = set()
+            cls.__factories = (
+                TangoUtils.proxyFactory, TangoUtils.attributeProxyFactory,
+                TangoUtils.databaseFactory)
+            TangoUtils.proxyFactory = cls.deviceProxy
+            TangoUtils.attributeProxyFactory = cls.attributeProxy
+            TangoUtils.databaseFactory = cls.database
+            cls.active = True
+        TangoUtils.clearMetadata()
+        TangoUtils.clearHostCache()
+        cls.record({"type": "start", "time": time.time(),
+                    "device": Utils.tostr(device),
+                    "properties": encode(properties or {})})
+
+    @classmethod
+    def stop(cls):
+        """ stops recording and restores the replaced factories
+        """
+        TangoUtils.clearMetadata()
+        with cls.__lock:
+            if cls.__factories is not None:
+                TangoUtils.proxyFactory, TangoUtils.attributeProxyFactory, \
+                    TangoUtils.databaseFactory = cls.__factories
+                cls.__factories = None
+            fl = cls.__file
+            cls.__file = None
+            cls.active = False
+        if fl is not None:
+            fl.close()
+
+    @classmethod
+    def filename(cls):
+        """ provides name of the record file
+
+        :returns: record file name or empty string if not recording
+        :rtype: :obj:`str`
+        """
+        return cls.__filename if cls.active else ""
+
+    @classmethod
+    def record(cls, record):
+        """ writes the record
+
+        :param record: JSON-serializable record
+        :type record: :obj:`dict` <:obj:`str`, `any`>
+        """
+        line = json.dumps(record, sort_keys=True)
+        with cls.__lock:
+            if cls.__file is not None:
+                cls.__file.write(line + "\n")
+                cls.__file.flush()
+
+    @classmethod
+    def __open(cls, factory, target, create, args):
+        """ creates and records the proxy
+
+        :param factory: factory name
+        :type factory: :obj:`str`
+        :param target: device name, attribute name or database arguments
+        :type target: :obj:`str` or :obj:`list` <`any`>
+        :param create: replaced factory
+        :type create: :obj:`function`
+        :param args: factory arguments
+        :type args: :obj:`list` <`any`>
+        :returns: recording proxy
+        :rtype: :class:`RecordingProxy`
+        """
+        record = {"type": "open", "factory": factory, "target": target}
+        start = time.time()
+        try:
+            return RecordingProxy(create(*args), factory, target)
+        except Exception as e:
+            record["error"] = encode(e)
+            raise
+        finally:
+            record["start"] = start
+            record["duration"] = time.time() - start
+            cls.record(record)
+
+    @classmethod
+    def deviceProxy(cls, name):
+        """ creates recording device proxy
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: recording device proxy
+        :rtype: :class:`RecordingProxy`
+        """
+        factory = (cls.__factories or [None])[0] or tango.DeviceProxy
+        return cls.__open("device", Utils.tostr(name), factory, [name])
+
+    @classmethod
+    def attributeProxy(cls, name):
+        """ creates recording attribute proxy
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: recording attribute proxy
+        :rtype: :class:`RecordingProxy`
+        """
+        factory = (cls.__factories or [None, None])[1] \
+            or tango.AttributeProxy
+        return cls.__open("attribute", Utils.tostr(name), factory, [name])
+
+    @classmethod
+    def database(cls, *args):
+        """ creates recording tango database
+
+        :param args: optional database host and port
+        :type args: [:obj:`str`, :obj:`int`]
+        :returns: recording tango database
+        :rtype: :class:`RecordingProxy`
+        """
+        factory = (cls.__factories or [None, None, None])[2] \
+            or tango.Database
+        return cls.__open("database", encode(list(args)), factory, args)
+
+    @classmethod
+    def subscription(cls):
+        """ provides id of a new event subscription
+
+        :returns: subscription id
+        :rtype: :obj:`int`
+        """
+        with cls.__lock:
+            cls.__subscriptions += 1
+            cls.__subscribing.add(cls.__subscriptions)
+            return cls.__subscriptions
+
+    @classmethod
+    def subscribed(cls, sid):
+        """ marks end of the subscription call
+
+        :param sid: subscription id
+        :type sid: :obj:`int`
+        """
+        with cls.__lock:
+            cls.__subscribing.discard(sid)
+
+    @classmethod
+    def callback(cls, sid, callback):
+        """ provides event callback which records events
+
+        :param sid: subscription id
+        :type sid: :obj:`int`
+        :param callback: event callback
+        :type callback: :obj:`function`
+        :returns: recording event callback
+        :rtype: :obj:`function`
+        """
+        def recorded(event):
+            with cls.__lock:
+                sync = sid in cls.__subscribing
+                after = cls.__requests
+            cls.record({"type": "event", "sid": sid, "sync": sync,
+                        "after": after, "time": time.time(),
+                        "event": encode(event)})
+            return callback(event)
+        return recorded
+
+    @classmethod
+    def request(cls, name, method, device, *args):
+        """ executes and records the client request,
+        i.e. the command or the attribute method of the device server
+
+        :param name: command or attribute method name
+        :type name: :obj:`str`
+        :param method: device server method
+        :type method: :obj:`function`
+        :param device: device server
+        :type device: :class:`tango.LatestDeviceImpl`
+        :param args: method arguments
+        :type args: :obj:`list` <`any`>
+        :returns: method result
+        :rtype: `any`
+        """
+        with cls.__lock:
+            seq = cls.__requests
+            cls.__requests += 1
+        attr = None
+        if name.startswith("read_") and args:
+            attr = RecordedAttribute(args[0])
+            args = (attr,) + tuple(args[1:])
+            rargs = []
+        elif name.startswith("write_") and args:
+            rargs = [args[0].get_write_value()]
+        else:
+            rargs = list(args)
+        record = {"type": "request", "seq": seq, "name": name,
+                  "args": encode(rargs)}
+        start = time.time()
+        try:
+            result = method(device, *args)
+            record["result"] = encode(
+                attr.value if attr is not None else result)
+            return result
+        except Exception as e:
+            record["error"] = encode(e)
+            raise
+        finally:
+            record["start"] = start
+            record["duration"] = time.time() - start
+            cls.record(record)
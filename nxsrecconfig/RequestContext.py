@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Request context - configuration server and pool data
+     fetched once per a server command """
+
+from .Utils import TangoUtils
+from .Describer import Describer
+
+
+class CachedPool(object):
+
+    """ Pool device proxy which reads its element list attributes once
+    """
+
+    def __init__(self, pool):
+        """ constructor
+
+        :param pool: pool device proxy
+        :type pool: :class:`tango.DeviceProxy`
+        """
+        #: (:class:`tango.DeviceProxy`) pool device proxy
+        self.__pool = pool
+        #: (:obj:`dict` <:obj:`str`, `any`>) read list attributes
+        self.__lists = {}
+
+    @property
+    def pool(self):
+        """ provides the wrapped pool device proxy
+
+        :returns: pool device proxy
+        :rtype: :class:`tango.DeviceProxy`
+        """
+        return self.__pool
+
+    def __getattr__(self, name):
+        """ provides pool attributes, i.e. element lists are read once
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute value
+        :rtype: `any`
+        """
+        if name.startswith("_") or not name.endswith("List"):
+            return getattr(self.__pool, name)
+        if name not in self.__lists:
+            self.__lists[name] = getattr(self.__pool, name)
+        return self.__lists[name]
+
+    def command_inout(self, *args):
+        """ executes the pool command and drops read element lists
+
+        :param args: command name and its parameters
+        :type args: :obj:`list` <`any`>
+        :returns: command result
+        :rtype: `any`
+        """
+        self.invalidate()
+        return self.__pool.command_inout(*args)
+
+    def invalidate(self):
+        """ drops read element lists
+        """
+        self.__lists.clear()
+
+
+class RequestContext(object):
+
+    """ Keeps configuration server and pool data fetched during
+        one server command
+    """
+
+    def __init__(self, configserver, pools=None):
+        """ constructor
+
+        :param configserver: configuration server
+        :type configserver: :class:`tango.DeviceProxy` \
+             or :class:`nxsconfigserver.XMLConfigurator.XMLConfigurator`
+        :param pools: pool device proxies
+        :type pools: :obj:`list` <:class:`tango.DeviceProxy`>
+        """
+        #: (:class:`tango.DeviceProxy` \
+        #: or :class:`nxsconfigserver.XMLConfigurator.XMLConfigurator`) \
+        #:     configuration server
+        self.configServer = configserver
+        #: (:obj:`list` <:class:`CachedPool`>) cached pools
+        self.__pools = None
+        #: (:obj:`list` <:obj:`str`>) available components
+        self.__availableComponents = None
+        #: (:obj:`list` <:obj:`str`>) available datasources
+        self.__availableDataSources = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) datasource xmls
+        self.__dsxmls = {}
+        #: (:obj:`dict` <:obj:`bool`, \
+        #:    :class:`nxsrecconfig.Describer.Describer`>) \
+        #:    describers with tree or list output
+        self.__describers = {}
+        if pools is not None:
+            self.pools(pools)
+
+    def pools(self, pools=None):
+        """ provides cached pools
+
+        :param pools: pool device proxies to be cached
+                      if the context has no pools yet
+        :type pools: :obj:`list` <:class:`tango.DeviceProxy`>
+        :returns: cached pools
+        :rtype: :obj:`list` <:class:`CachedPool`>
+        """
+        if self.__pools is None and pools is not None:
+            self.__pools = [
+                pool if isinstance(pool, CachedPool) else CachedPool(pool)
+                for pool in pools]
+        return self.__pools
+
+    def invalidatePools(self):
+        """ drops element lists read from pools
+        """
+        for pool in self.__pools or []:
+            pool.invalidate()
+
+    def availableComponents(self):
+        """ provides available components
+
+        :returns: available components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if self.__availableComponents is None:
+            self.__availableComponents = TangoUtils.command(
+                self.configServer, "availableComponents") or []
+        return self.__availableComponents
+
+    def availableDataSources(self):
+        """ provides available datasources
+
+        :returns: available datasources
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if self.__availableDataSources is None:
+            self.__availableDataSources = TangoUtils.command(
+                self.configServer, "availableDataSources") or []
+        return self.__availableDataSources
+
+    def dataSources(self, names):
+        """ provides xmls of the given datasources fetched once
+
+        :param names: datasource names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: datasource xmls
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        missing = [name for name in names if name not in self.__dsxmls]
+        if missing:
+            xmls = TangoUtils.command(
+                self.configServer, "dataSources", missing)
+            self.__dsxmls.update(zip(missing, xmls or []))
+        return [self.__dsxmls[name] for name in names
+                if name in self.__dsxmls]
+
+    def describer(self, tree=False):
+        """ provides describer which shares the context data
+
+        :param tree: flag for output tree dictionary
+        :type tree: :obj:`bool`
+        :returns: describer
+        :rtype: :class:`nxsrecconfig.Describer.Describer`
+        """
+        tree = bool(tree)
+        if tree not in self.__describers:
+            self.__describers[tree] = Describer(
+                self.configServer, tree,
+                availablecomponents=self.availableComponents(),
+                availabledatasources=self.availableDataSources(),
+                dsxmls=self.__dsxmls)
+        return self.__describers[tree]
@@ -20,6 +20,11 @@
 """  Selection state """
 
 import json
+import sys
+
+
+if sys.version_info > (3,):
+    unicode = str
 
 
 class Selection(dict):
@@ -53,8 +58,19 @@ class Selection(dict):
     "MntGrpConfiguration":  ''
     }
 
+    JSON records are kept also in their parsed form. Values set by
+    :meth:`setValue` are serialised only when their string is read,
+    i.e. the string dictionary interface stays a compatibility view.
     """
 
+    #: (:obj:`list` <:obj:`str`>) records with JSON strings
+    jsonKeys = [
+        "Timer", "OrderedChannels", "ComponentSelection",
+        "DataSourceSelection", "DataSourcePreselection",
+        "ComponentPreselection", "PreselectingDataSources",
+        "OptionalComponents", "ConfigVariables", "UserData",
+        "ChannelProperties", "UnplottedComponents"]
+
     def __init__(self, *args, **kw):
         """ constructor
 
@@ -63,6 +79,15 @@ class Selection(dict):
         :param kw: dictionary kw
         :type kw: :obj:`dict` <:obj:`str`, `any`>
         """
+        #: (:obj:`dict` <:obj:`str`, `any`>) parsed JSON records
+        self.__values = {}
+        #: (:obj:`set` <:obj:`str`>) records with not serialised values
+        self.__dirty = set()
+        #: (:obj:`int`) selection generation increased on each change
+        self.generation = 0
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) generations
+        #:    of the last record changes
+        self.__modified = {}
         super(Selection, self).__init__(*args, **kw)
 
         #: (:obj:`str`) default zone
@@ -77,6 +102,105 @@ class Selection(dict):
             if "Version" in self else "1.0.0"
         self.reset()
 
+    def __getitem__(self, key):
+        """ provides value of selection record serialising
+            its parsed value if needed
+
+        :param key: record name
+        :type key: :obj:`str`
+        :returns: record value
+        :rtype: `any`
+        """
+        if key in self.__dirty:
+            dict.__setitem__(self, key, json.dumps(self.__values[key]))
+            self.__dirty.discard(key)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        """ sets value of selection record
+
+        :param key: record name
+        :type key: :obj:`str`
+        :param value: record value
+        :type value: `any`
+        """
+        if key in self.__dirty or not dict.__contains__(self, key) \
+                or dict.__getitem__(self, key) != value:
+            self.generation += 1
+            self.__modified[key] = self.generation
+        self.__values.pop(key, None)
+        self.__dirty.discard(key)
+        dict.__setitem__(self, key, value)
+
+    def getValue(self, key):
+        """ provides parsed value of selection record.
+            The returned object is shared and should not be modified.
+
+        :param key: record name
+        :type key: :obj:`str`
+        :returns: parsed record value
+        :rtype: `any`
+        """
+        if key in self.__values:
+            return self.__values[key]
+        value = dict.__getitem__(self, key)
+        if key in self.jsonKeys and isinstance(value, (str, unicode)):
+            value = json.loads(value)
+            self.__values[key] = value
+        return value
+
+    def setValue(self, key, value):
+        """ sets parsed value of selection record without its serialisation
+
+        :param key: record name
+        :type key: :obj:`str`
+        :param value: parsed record value
+        :type value: `any`
+        """
+        if key not in self.jsonKeys:
+            self[key] = value
+            return
+        if not dict.__contains__(self, key):
+            dict.__setitem__(self, key, None)
+        self.__values[key] = value
+        self.__dirty.add(key)
+        self.generation += 1
+        self.__modified[key] = self.generation
+
+    def modified(self, key):
+        """ provides generation of the last record change
+
+        :param key: record name
+        :type key: :obj:`str`
+        :returns: selection generation of the last record change
+        :rtype: :obj:`int`
+        """
+        return self.__modified.get(key, 0)
+
+    def flush(self):
+        """ serialises all modified parsed values
+        """
+        for key in list(self.__dirty):
+            self[key]
+
+    def export(self):
+        """ provides selection dictionary with serialised records
+
+        :returns: selection dictionary
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        self.flush()
+        return dict(self)
+
+    def clear(self):
+        """ removes all records
+        """
+        super(Selection, self).clear()
+        self.__values.clear()
+        self.__dirty.clear()
+        self.__modified.clear()
+        self.generation += 1
+
     def reset(self):
         """ resets dictionary to default value
         """
@@ -135,15 +259,11 @@ class Selection(dict):
     def deselect(self):
         """ deselects components and datasources
         """
-        cps = json.loads(self["ComponentSelection"])
-        ads = json.loads(self["DataSourceSelection"])
-        for k in cps.keys():
-            cps[k] = False
-        for k in ads.keys():
-            ads[k] = False
+        cps = self.getValue("ComponentSelection")
+        ads = self.getValue("DataSourceSelection")
         self["DataSourcePreselection"] = '{}'
-        self["DataSourceSelection"] = json.dumps(ads)
-        self["ComponentSelection"] = json.dumps(cps)
+        self.setValue("DataSourceSelection", dict.fromkeys(ads, False))
+        self.setValue("ComponentSelection", dict.fromkeys(cps, False))
         self["UnplottedComponents"] = '[]'
 
     def updatePreselectingDataSources(self, datasources):
@@ -153,9 +273,13 @@ class Selection(dict):
         :param datasources: list of datasources
         :type datasources: :obj:`list` <:obj:`str`>
         """
-        adsg = json.loads(self["PreselectingDataSources"])
-        adsg = list(set(adsg or []) | set(datasources or []))
-        self["PreselectingDataSources"] = json.dumps(adsg)
+        adsg = self.getValue("PreselectingDataSources") or []
+        sadsg = set(adsg)
+        if len(sadsg) != len(adsg) or \
+                not sadsg.issuperset(datasources or []):
+            self.setValue(
+                "PreselectingDataSources",
+                list(sadsg | set(datasources or [])))
 
     def updateOrderedChannels(self, channels):
         """ update method for orderedChannels attribute
@@ -164,11 +288,12 @@ class Selection(dict):
         :param channels: pool channels
         :type channels: :obj:`list` <:obj:`str`>
         """
-        och = json.loads(self["OrderedChannels"])
+        och = self.getValue("OrderedChannels")
         ordchannels = [ch for ch in och if ch in channels]
         uordchannels = list(set(channels) - set(och))
         ordchannels.extend(sorted(uordchannels))
-        self["OrderedChannels"] = json.dumps(ordchannels)
+        if ordchannels != och:
+            self.setValue("OrderedChannels", ordchannels)
 
     def updateChannelProperties(self, devicecontrollers, triggergate):
         """ update method for orderedChannels attribute
@@ -179,24 +304,25 @@ class Selection(dict):
         :param triggergate: trigger gate list
         :type triggergate: :obj:`list` <:obj:`str`>
         """
-        props = json.loads(self["ChannelProperties"])
+        props = dict(self.getValue("ChannelProperties"))
         if devicecontrollers:
             props["__controllers__"] = devicecontrollers
         if triggergate:
             props["__triggergatelist__"] = triggergate
-        self["ChannelProperties"] = json.dumps(props)
+        if props != self.getValue("ChannelProperties"):
+            self.setValue("ChannelProperties", props)
 
     def updateComponentSelection(self):
         """ update method for componentGroup attribute
 
         :brief: It removes datasource components from component group
         """
-        cpg = json.loads(self["ComponentSelection"])
-        dss = list(json.loads(self["DataSourceSelection"]).keys())
-        for cp in set(cpg.keys()):
-            if cp in dss:
-                cpg.pop(cp)
-        self["ComponentSelection"] = json.dumps(cpg)
+        cpg = self.getValue("ComponentSelection")
+        dss = self.getValue("DataSourceSelection")
+        if any(cp in dss for cp in cpg):
+            self.setValue(
+                "ComponentSelection",
+                dict((cp, vl) for cp, vl in cpg.items() if cp not in dss))
 
     def updateDataSourceSelection(self, channels, datasources):
         """ update method for dataSourceGroup attribute
@@ -209,15 +335,18 @@ class Selection(dict):
         :param datasources: available datasources
         :type datasources: :obj:`list` <:obj:`str`>
         """
-        dsg = json.loads(self["DataSourceSelection"])
-        datasources = datasources or []
+        dsg = dict(self.getValue("DataSourceSelection"))
+        datasources = set(datasources or [])
+        channels = list(channels)
+        schannels = set(channels)
         for ds in tuple(dsg.keys()):
-            if ds not in channels and ds not in datasources:
+            if ds not in schannels and ds not in datasources:
                 dsg.pop(ds)
         for pc in channels:
-            if pc not in dsg.keys():
+            if pc not in dsg:
                 dsg[pc] = False
-        self["DataSourceSelection"] = json.dumps(dsg)
+        if dsg != self.getValue("DataSourceSelection"):
+            self.setValue("DataSourceSelection", dsg)
 
     def resetMntGrp(self):
         """ reset method for mntGrp attribute
@@ -241,7 +370,4 @@ class Selection(dict):
         :param components: list of components to be set
         :type components: :obj:`list` <:obj:`str`>
         """
-        acps = {}
-        for cp in components:
-            acps[cp] = None
-        self["ComponentPreselection"] = json.dumps(acps)
+        self.setValue("ComponentPreselection", dict.fromkeys(components))
@@ -20,6 +20,8 @@
 """  Selection state """
 
 import json
+import time
+import threading
 
 try:
     import tango
@@ -31,6 +33,7 @@ from os.path import expanduser
 from .Utils import TangoUtils, PoolUtils, Utils, MSUtils
 from .Selection import Selection
 from .Converter import Converter
+from .StreamSet import StreamSet
 
 
 class Selector(object):
@@ -81,12 +84,55 @@ class Selector(object):
         self.__version = version
 
         #: (:class:`tango.Database`) tango database
-        self.__db = tango.Database()
+        self.__db = TangoUtils.database()
 
         #: (:obj:`str`) module label
         self.moduleLabel = 'module'
+        #: (:class:`tango.DeviceProxy` \
+        #:  or :class:`nxsconfigserver.XMLConfigurator.XMLConfigurator`) \
+        #:  opened config instance
+        self.__configInstance = None
+        #: (:obj:`str`) ConfigDevice name of the opened config instance
+        self.__configInstanceName = None
+        #: (:obj:`tuple` <:class:`Exception`>) errors which force
+        #:  reopening of the config instance
+        self.__configErrors = ()
+        #: (:obj:`list` <:obj:`str`>) reasons of configuration server
+        #:  errors which force reopening of the config instance,
+        #:  i.e. lost connections and restarted servers which are not open
+        self.connectionErrorReasons = [
+            "API_DeviceNotExported", "API_CantConnectToDevice",
+            "API_DeviceTimedOut", "API_CommandNotAllowed"]
         #: (:obj:`list` <:obj:`str`>) error descriptions
         self.descErrors = []
+        #: (:obj:`float`) minimal time in seconds between reads
+        #:    of the configuration server revision
+        self.revisionInterval = 1.0
+        #: (:obj:`str`) configuration server revision
+        self.__configRevision = None
+        #: (:obj:`float`) time of the configuration server revision read
+        self.__configRevisionTime = 0
+        #: (:obj:`float`) time of the last check if the kept
+        #:    configuration server is open
+        self.__configCheckTime = 0
+        #: (:obj:`int`) revision increased by explicit invalidation
+        self.__revision = 0
+        #: (:obj:`dict` <:obj:`str`, :obj:`tuple`>) inputs
+        #:    of the last update hook runs
+        self.__hookInputs = {}
+        #: (:obj:`float`) delay in seconds of coalesced selection stores,
+        #:    stores are synchronous if it is not positive
+        self.storeDelay = 0.0
+        #: (:obj:`dict` <:obj:`str`, (:class:`tango.DeviceProxy`, \
+        #:    :obj:`dict` <:obj:`str`, `any`>)>) config instances and
+        #:    selections waiting for their store by profile names
+        self.__pendingStores = {}
+        #: (:class:`threading.Timer`) timer of delayed selection stores
+        self.__storeTimer = None
+        #: (:class:`threading.RLock`) selection store lock
+        self.__storeLock = threading.RLock()
+        #: (:class:`nxsrecconfig.StreamSet.StreamSet`) stream set
+        self.streams = StreamSet(None)
 
     def reset(self):
         """ resets seleciton except Door and ConfigDevice
@@ -94,8 +140,8 @@ class Selector(object):
         door = self["Door"]
         cf = self["ConfigDevice"]
         self.__selection.reset()
-        self["Door"] = door
-        self["ConfigDevice"] = cf
+        self.__selection["Door"] = door
+        self.__selection["ConfigDevice"] = cf
 
     def deselect(self):
         """ deselects all seleciton elements
@@ -138,7 +184,7 @@ class Selector(object):
         for key in self.keys():
             if hasattr(self, "_Selector__preGet" + key):
                 getattr(self, "_Selector__preGet" + key)()
-        return dict(self.__selection)
+        return self.__selection.export()
 
     #
     def __getitem__(self, key):
@@ -173,6 +219,37 @@ class Selector(object):
         if hasattr(self, "_Selector__postSet" + key):
             getattr(self, "_Selector__postSet" + key)(changed)
 
+    def getValue(self, key):
+        """ provides parsed value of selection item,
+            i.e. JSON items are not decoded again.
+            The returned object should not be modified.
+
+        :param key: selection item name
+        :type key: :obj:`str`
+        :returns: parsed selection item value
+        :rtype: `any`
+        """
+        if key in self.__selection:
+            if hasattr(self, "_Selector__preGet" + key):
+                getattr(self, "_Selector__preGet" + key)()
+            return self.__selection.getValue(key)
+
+    def setValue(self, key, value):
+        """ sets parsed value of selection item,
+            i.e. JSON items are serialised when they are read
+
+        :param key: selection item name
+        :type key: :obj:`str`
+        :param value: parsed selection item value
+        :type value: `any`
+        """
+        changed = False
+        if self.__selection.getValue(key) != value:
+            self.__selection.setValue(key, value)
+            changed = True
+        if hasattr(self, "_Selector__postSet" + key):
+            getattr(self, "_Selector__postSet" + key)(changed)
+
     def __preGetConfigDevice(self):
         """ updates method for configDevice attribute
 
@@ -228,21 +305,118 @@ class Selector(object):
         if changed:
             self.__msp.updateMacroServer(self.__selection["Door"])
 
+    def __inputs(self, key, config=False):
+        """ provides current inputs of the update hook
+
+        :param key: selection item name
+        :type key: :obj:`str`
+        :param config: hook depends on the configuration server
+        :type config: :obj:`bool`
+        :returns: hook inputs or None if they are not tracked
+        :rtype: :obj:`tuple`
+        """
+        poolrevision = self.__msp.poolRevision()
+        if poolrevision is None:
+            return None
+        inputs = (self.__revision, poolrevision, self.__selection["Door"],
+                  self.__selection.modified(key))
+        if config:
+            configrevision = self.configRevision()
+            if configrevision is None:
+                return None
+            inputs += (self.__selection["ConfigDevice"], configrevision)
+        return inputs
+
+    def __isUpdated(self, key, config=False):
+        """ checks if the update hook inputs are unchanged
+            since its last run
+
+        :param key: selection item name
+        :type key: :obj:`str`
+        :param config: hook depends on the configuration server
+        :type config: :obj:`bool`
+        :returns: True if the hook can be skipped
+        :rtype: :obj:`bool`
+        """
+        inputs = self.__inputs(key, config)
+        return inputs is not None and self.__hookInputs.get(key) == inputs
+
+    def __setUpdated(self, key, config=False):
+        """ stores inputs of the finished update hook
+
+        :param key: selection item name
+        :type key: :obj:`str`
+        :param config: hook depends on the configuration server
+        :type config: :obj:`bool`
+        """
+        self.__hookInputs[key] = self.__inputs(key, config)
+
+    def invalidate(self):
+        """ forces update hooks to read pools
+            and the configuration server again
+        """
+        self.__revision += 1
+        self.__configRevision = None
+
+    def stateKey(self):
+        """ provides key of the selection state and its inputs
+
+        :returns: selection generation, device names, invalidation,
+                  pool and configuration server revisions
+                  or None if they are not tracked
+        :rtype: :obj:`tuple`
+        """
+        poolrevision = self.__msp.poolRevision()
+        if poolrevision is None:
+            return None
+        configrevision = self.configRevision()
+        if configrevision is None:
+            return None
+        return (self.__selection.generation, self.__revision,
+                self.__selection["Door"], self.__selection["ConfigDevice"],
+                self.__selection["MntGrp"], poolrevision, configrevision)
+
+    def configRevision(self):
+        """ provides configuration server revision read at most once
+            per revisionInterval
+
+        :returns: configuration server revision or None if it is unknown
+        :rtype: :obj:`str`
+        """
+        now = time.time()
+        if self.__configRevision is None or \
+                now - self.__configRevisionTime >= self.revisionInterval:
+            try:
+                self.__configRevision = Utils.tostr(
+                    self.setConfigInstance().version)
+            except Exception:
+                self.__configRevision = None
+            self.__configRevisionTime = now
+        return self.__configRevision
+
     def __preGetPreselectingDataSources(self):
         """ get method for preselectedDataSources attribute
         """
+        if self.__isUpdated("PreselectingDataSources"):
+            return
         self.__selection.updatePreselectingDataSources(
             self.poolElementNames('MotorList'))
+        self.__setUpdated("PreselectingDataSources")
 
     def __preGetOrderedChannels(self):
         """ update method for orderedChannels attribute
         """
+        if self.__isUpdated("OrderedChannels"):
+            return
         self.__selection.updateOrderedChannels(
             self.poolElementNames('ExpChannelList'))
+        self.__setUpdated("OrderedChannels")
 
     def __preGetChannelProperties(self):
         """ update method for orderedChannels attribute
         """
+        if self.__isUpdated("ChannelProperties"):
+            return
         pools = self.getPools()
         try:
             triggergate = PoolUtils.getElementNames(
@@ -251,6 +425,7 @@ class Selector(object):
             triggergate = []
         self.__selection.updateChannelProperties(
             PoolUtils.getDeviceControllers(pools), triggergate)
+        self.__setUpdated("ChannelProperties")
 
     def __preGetMntGrp(self):
         """ update method for mntGrp attribute
@@ -270,9 +445,12 @@ class Selector(object):
     def __preGetDataSourceSelection(self):
         """ update method for dataSourceGroup attribute
         """
+        if self.__isUpdated("DataSourceSelection", True):
+            return
         self.__selection.updateDataSourceSelection(
             PoolUtils.getElementNames(self.getPools(), 'ExpChannelList'),
             self.configCommand("availableDataSources"))
+        self.__setUpdated("DataSourceSelection", True)
 
     def __preGetTimeZone(self):
         """ update method for timeZone attribute
@@ -294,7 +472,7 @@ class Selector(object):
         if door:
             if ":" in door.split("/")[0] and len(door.split("/")) > 1:
                 host, port = door.split("/")[0].split(":")
-                db = tango.Database(host, int(port))
+                db = TangoUtils.database(host, int(port))
                 macroserver = MSUtils.getMacroServer(db, door, False)
             else:
                 macroserver = MSUtils.getMacroServer(self.__db, door, False)
@@ -315,9 +493,9 @@ class Selector(object):
 
         :brief: It provides new group of preselected components
         """
-        datasources = set(json.loads(self["PreselectingDataSources"]))
-        acpgroup = json.loads(self["ComponentPreselection"])
-        adsgroup = json.loads(self["DataSourcePreselection"])
+        datasources = set(self.getValue("PreselectingDataSources"))
+        acpgroup = dict(self.getValue("ComponentPreselection"))
+        adsgroup = dict(self.getValue("DataSourcePreselection"))
         configdevice = self.setConfigInstance()
         jacps, jadss = self.__msp.checkChannels(
             self["Door"], configdevice, datasources,
@@ -361,21 +539,31 @@ class Selector(object):
     def setConfigInstance(self):
         """ sets config instances
 
+        :brief: the opened and validated instance is kept and reused
+                until ConfigDevice is changed, a call on it fails
+                or the server is found not open. Every new instance
+                of the tango configuration server is opened.
         :returns: set config instance
         :rtype: :class:`tango.DeviceProxy` \
              or :class:`nxsconfigserver.XMLConfigurator.XMLConfigurator`
         """
-        configDevice = None
         self.__preGetConfigDevice()
+        name = self.__selection["ConfigDevice"]
+        if self.__configInstance is not None and \
+                self.__configInstanceName == name and \
+                self.__isConfigInstanceOpen():
+            return self.__configInstance
+        self.resetConfigInstance()
 
-        if self.__selection["ConfigDevice"] and \
-                self.__selection["ConfigDevice"].lower() != self.moduleLabel:
-            configDevice = TangoUtils.openProxy(
-                self.__selection["ConfigDevice"])
+        configDevice = None
+        if name and name.lower() != self.moduleLabel:
+            configDevice = TangoUtils.openProxy(name)
             configDevice.command_inout("Open")
+            errors = (tango.DevFailed,)
         else:
             from nxsconfigserver import XMLConfigurator
             from MySQLdb.connections import DatabaseError
+            from MySQLdb import OperationalError, InterfaceError
             configDevice = XMLConfigurator.XMLConfigurator()
             self.getMacroServer()
 
@@ -399,15 +587,71 @@ class Selector(object):
                 configDevice.jsonsettings = dbp
                 configDevice.open()
                 configDevice.availableComponents()
+            errors = (OperationalError, InterfaceError)
         cnfmajor = int(Utils.tostr(configDevice.version).split(".")[0])
         if cnfmajor < 2:
             raise Exception("NXSConfigServer (%s) version below 2.0.0" %
                             self.__selection["ConfigDevice"])
+        self.__configInstance = configDevice
+        self.__configInstanceName = name
+        self.__configErrors = errors
+        self.__configCheckTime = time.time()
         return configDevice
 
+    def __isConfigInstanceOpen(self):
+        """ checks at most once per revisionInterval if the kept tango
+            configuration server is still open, i.e. it has not been
+            restarted into its ON state which rejects commands until Open
+
+        :returns: if the kept config instance can be reused
+        :rtype: :obj:`bool`
+        """
+        if not self.__isRemote(self.__configInstance):
+            return True
+        now = time.time()
+        if now - self.__configCheckTime < self.revisionInterval:
+            return True
+        try:
+            state = self.__configInstance.state()
+        except Exception:
+            return False
+        self.__configCheckTime = now
+        return state != tango.DevState.ON
+
+    def __isRemote(self, inst):
+        """ checks if the config instance is a proxy of the tango
+            configuration server, i.e. a device proxy or its recording
+            or replaying stand-in, rather than a local configurator
+
+        :param inst: config instance
+        :type inst: :class:`tango.DeviceProxy` \
+                    or :class:`nxsconfigserver.XMLConfigurator.XMLConfigurator`
+        :returns: if the config instance is a tango proxy
+        :rtype: :obj:`bool`
+        """
+        return hasattr(inst, "command_inout")
+
+    def resetConfigInstance(self):
+        """ drops the kept config instance, i.e. the next call of
+            setConfigInstance reopens the configuration server
+        """
+        if self.__configInstance is not None and \
+                not self.__isRemote(self.__configInstance):
+            try:
+                self.__configInstance.close()
+            except Exception:
+                pass
+        self.__configInstance = None
+        self.__configInstanceName = None
+        self.__configErrors = ()
+        self.__configRevision = None
+
     def configCommand(self, command, *var):
         """ executes command on configuration server
 
+        :brief: if the command fails due to the configuration server
+                connection the server is reopen and the command is
+                executed once again, other errors are raised at once
         :param command: command name
         :type command: :obj:`str`
         :param var: parameter list
@@ -415,9 +659,39 @@ class Selector(object):
         :returns: command result
         :rtype: `any`
         """
+        if command in ["availableSelections", "selections",
+                       "deleteSelection"]:
+            self.flushSelection()
+        configdevice = self.setConfigInstance()
+        try:
+            return TangoUtils.command(configdevice, command, *var)
+        except self.__configErrors as e:
+            if not self.__isConnectionError(e):
+                raise
+            self.resetConfigInstance()
         configdevice = self.setConfigInstance()
         return TangoUtils.command(configdevice, command, *var)
 
+    def __isConnectionError(self, error):
+        """ checks if the configuration server call failed due to
+            its connection and not due to the command itself
+
+        :param error: raised error
+        :type error: :class:`Exception`
+        :returns: if the error is a connection error
+        :rtype: :obj:`bool`
+        """
+        if not isinstance(error, tango.DevFailed):
+            return True
+        if isinstance(error, (tango.CommunicationFailed,
+                              tango.ConnectionFailed)):
+            return True
+        for err in error.args:
+            if Utils.tostr(getattr(err, "reason", "")) in \
+                    self.connectionErrorReasons:
+                return True
+        return False
+
     def importEnv(self, names=None, data=None):
         """ imports Selector Environment Data
 
@@ -466,11 +740,62 @@ class Selector(object):
 
     def storeSelection(self):
         """ saves configuration
+
+        :brief: for positive storeDelay and the configuration device
+                consecutive stores of the same profile are coalesced
+                and written by a timer thread after storeDelay seconds
         """
         inst = self.setConfigInstance()
-        conf = Utils.tostr(json.dumps(self.get()))
-        inst.selection = conf
-        inst.storeSelection(self["MntGrp"])
+        with self.__storeLock:
+            self.__pendingStores[self["MntGrp"]] = (inst, self.get())
+            if self.storeDelay <= 0 or not self.__isRemote(inst):
+                self.flushSelection()
+            elif self.__storeTimer is None:
+                self.__storeTimer = threading.Timer(
+                    self.storeDelay, self.__delayedFlush)
+                self.__storeTimer.daemon = True
+                self.__storeTimer.start()
+
+    def flushSelection(self):
+        """ writes selections waiting for their store
+        """
+        with self.__storeLock:
+            if self.__storeTimer is not None:
+                self.__storeTimer.cancel()
+                self.__storeTimer = None
+            for name in list(self.__pendingStores.keys()):
+                self.__storePending(name)
+
+    def __storePending(self, name):
+        """ writes the selection waiting for its store,
+            the selection stays waiting if the store fails
+
+        :param name: profile name
+        :type name: :obj:`str`
+        """
+        inst, state = self.__pendingStores.pop(name)
+        try:
+            inst.selection = Utils.tostr(json.dumps(state))
+            inst.storeSelection(name)
+        except Exception:
+            self.__pendingStores.setdefault(name, (inst, state))
+            raise
+
+    def __delayedFlush(self):
+        """ writes selections waiting for their store in the timer thread,
+            failed stores are reported and retried by the next flush
+        """
+        with self.__storeLock:
+            if self.__storeTimer is threading.current_thread():
+                self.__storeTimer = None
+            for name in list(self.__pendingStores.keys()):
+                try:
+                    self.__storePending(name)
+                except Exception as e:
+                    self.streams.error(
+                        "Selector::storeSelection() - "
+                        "Profile '%s' cannot be stored: %s"
+                        % (name, Utils.tostr(e)))
 
     def fetchSelection(self):
         """ fetch configuration
@@ -478,6 +803,7 @@ class Selector(object):
         :returns: if configuration was fetched
         :rtype: :obj:`bool`
         """
+        self.flushSelection()
         inst = self.setConfigInstance()
         cnfdv = self["ConfigDevice"]
         avsl = inst.availableSelections()
@@ -19,12 +19,14 @@
 
 """  NeXus Sardana Recorder Settings implementation """
 
+import copy
 import json
 import gc
 import xml.etree.ElementTree as et
 from lxml.etree import XMLParser
 # from lxml import etree
 import sys
+import threading
 import weakref
 
 try:
@@ -41,6 +43,11 @@ from .Selector import Selector
 from .Release import __version__
 from .MacroServerPools import MacroServerPools
 from .StreamSet import StreamSet
+from .SingleFlight import SingleFlight
+from .JobManager import JobManager
+from .Instrumentation import Instrumentation
+from .Tracing import Tracer
+from .Profiling import Profiler
 
 if sys.version_info > (3,):
     unicode = str
@@ -111,6 +118,46 @@ class Settings(object):
         self.resetInvalidDoor = True
         #: (:obj:`bool`) merge profiles to available measurement groups
         self.mergeProfilesToMntGrps = False
+        #: (:obj:`bool`) reuse dynamic components created from
+        #:    the same inputs
+        self.reuseDynamicComponents = False
+        #: (:obj:`float`) age in seconds of dynamic components
+        #:    removed as stale, creation times of dynamic components
+        #:    are stored only if it is positive
+        self.dynamicComponentMaxAge = 0.0
+        #: (:obj:`set` <:obj:`str`>) configuration devices
+        #:    cleaned by the stale dynamic component timer
+        self.__cleanDevices = set()
+        #: (:class:`threading.Lock`) dynamic component lock
+        self.__dcpLock = threading.Lock()
+        #: (:obj:`float`) interval in seconds of stale dynamic
+        #:    component cleaning
+        self.__cleanInterval = 0.0
+        #: (:class:`threading.Timer`) stale dynamic component cleaning timer
+        self.__cleanTimer = None
+        #: (:class:`nxsrecconfig.SingleFlight.SingleFlight`) \
+        #:    single-flight executor of expensive commands
+        self.__singleFlight = SingleFlight()
+        #: (:class:`nxsrecconfig.JobManager.JobManager`) \
+        #:    asynchronous job manager
+        self.__jobManager = JobManager()
+        #: (:class:`threading.RLock`) lock serialising access to the settings
+        #:    of device requests and asynchronous jobs
+        self.__accessLock = threading.RLock()
+        #: (:obj:`list` <:obj:`str`>) computed attributes with change events
+        self.eventAttributes = [
+            "Components", "DataSources", "DescriptionErrors",
+            "ProfileConfiguration", "MntGrp"]
+        #: (:obj:`instancemethod` or :obj:`function`) function called
+        #:    with names and new values of changed computed attributes
+        self.changeCallback = None
+        #: (:obj:`dict` <:obj:`str`, (:obj:`tuple`, `any`)>) \
+        #:    selection state keys and cached attribute values
+        self.__attributeCache = {}
+        #: (:obj:`dict` <:obj:`str`, `any`>) last pushed attribute values
+        self.__pushedValues = {}
+        #: (:class:`threading.Lock`) change event lock
+        self.__eventLock = threading.Lock()
         #: (:obj:`bool`) add dynamic components for all pool motor positions
         self.writepoolmotorpositions = writepoolmotorpositions
         if PYTG_BUG_213:
@@ -129,20 +176,22 @@ class Settings(object):
         self.__selector = Selector(
             self.__msp, self.version, self.defaultNeXusPath,
             self.defaultTimeZone, self.defaultMntGrp)
+        self.__selector.streams = self._streams
 
         #: (:class:`nxsrecconfg.ProfileManager.ProfileManager) \
         #: profile
         self.__profileManager = ProfileManager(
             self.__selector,
             syncsnapshot=syncsnapshot,
-            writepoolmotorpositions=writepoolmotorpositions
+            writepoolmotorpositions=writepoolmotorpositions,
+            numberofthreads=self.numberOfThreads
         )
 
         #: (:obj:`str`) configuration file
         self.profileFile = '/tmp/nxsrecconfig.cfg'
 
         #: (:class:`tango.Database`) tango database
-        self.__db = tango.Database()
+        self.__db = TangoUtils.database()
 
         #:  (:obj:`list` <:obj:`str`>) muted channel filters
         self.mutedChannelFilters = ["*tip551*"]
@@ -162,27 +211,40 @@ class Settings(object):
     def __setupSelection(self):
         """ sets up the current selection from ActiveMntGrp
         """
-        if not self.__server:
-            self.fetchProfile()
-        ms = self.__selector.getMacroServer()
-        amntgrp = MSUtils.getEnv('ActiveMntGrp', ms)
-        if amntgrp:
-            self.__selector["MntGrp"] = amntgrp
-        else:
-            avsel = self.availableProfiles()
-            if avsel and avsel[0]:
-                self.__selector["MntGrp"] = avsel[0]
+        with self.__envSession():
+            if not self.__server:
+                self.fetchProfile()
+            ms = self.__selector.getMacroServer()
+            amntgrp = MSUtils.getEnv('ActiveMntGrp', ms)
+            if amntgrp:
+                self.__selector["MntGrp"] = amntgrp
+            else:
+                avsel = self.availableProfiles()
+                if avsel and avsel[0]:
+                    self.__selector["MntGrp"] = avsel[0]
+            try:
+                self.fetchProfile()
+            except Exception:
+                import sys
+                import traceback
+                info = sys.exc_info()
+                message = Utils.tostr(info[1].__str__()) + "\n " + (" ").join(
+                    traceback.format_tb(sys.exc_info()[2]))
+                self._streams.error("Error in fetching profile: %s"
+                                    % self.__selector["MntGrp"])
+                self._streams.error(Utils.tostr(message))
+
+    def __envSession(self):
+        """ creates MacroServer Environment session for one command
+
+        :returns: environment session
+        :rtype: :class:`nxsrecconfig.Utils.MSEnvSession`
+        """
         try:
-            self.fetchProfile()
+            ms = self.__selector.getMacroServer()
         except Exception:
-            import sys
-            import traceback
-            info = sys.exc_info()
-            message = Utils.tostr(info[1].__str__()) + "\n " + (" ").join(
-                traceback.format_tb(sys.exc_info()[2]))
-            self._streams.error("Error in fetching profile: %s"
-                                % self.__selector["MntGrp"])
-            self._streams.error(Utils.tostr(message))
+            ms = None
+        return MSUtils.envSession(ms)
 
     def value(self, name):
         """ provides values of the required variable
@@ -248,9 +310,18 @@ class Settings(object):
                     set(self.preselectedComponents()) |
                     set(self.mandatoryComponents()))
 
+    def __cachedComponents(self):
+        """ provides all configuration components cached
+            for the current selection state
+
+        :returns: list of available selected components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return self.__cachedValue("Components", self.__components)
+
     #: (:obj:`list` <:obj:`str`>) provides selected components
     components = property(
-        __components,
+        __cachedComponents,
         doc='provides selected components')
 
     def preselectedComponents(self):
@@ -273,6 +344,267 @@ class Settings(object):
     descriptionErrors = property(__getDescriptionErrors,
                                  doc='provides description component errors')
 
+    def __getJobs(self):
+        """ provides descriptions of asynchronous jobs
+
+        :returns: JSON list with job ids, names, statuses, progress,
+                  errors and stage timing
+        :rtype: :obj:`str`
+        """
+        return json.dumps(self.__jobManager.jobs())
+
+    #: (:obj:`str`) descriptions of asynchronous jobs
+    jobs = property(__getJobs,
+                    doc='provides descriptions of asynchronous jobs')
+
+    def __getJobCallback(self):
+        """ get method for jobCallback attribute
+
+        :returns: function called with finished jobs
+        :rtype: :obj:`instancemethod` or :obj:`function`
+        """
+        return self.__jobManager.callback
+
+    def __setJobCallback(self, callback):
+        """ set method for jobCallback attribute
+
+        :param callback: function called with finished jobs
+        :type callback: :obj:`instancemethod` or :obj:`function`
+        """
+        self.__jobManager.callback = callback
+
+    #: (:obj:`instancemethod` or :obj:`function`) function called
+    #:    with finished jobs
+    jobCallback = property(
+        __getJobCallback,
+        __setJobCallback,
+        doc='function called with finished jobs')
+
+    def __getPerformanceStats(self):
+        """ provides performance statistics
+
+        :returns: JSON dictionary with wall times of commands and counts,
+                  wall times and sizes of their remote calls
+                  per target and stage
+        :rtype: :obj:`str`
+        """
+        return json.dumps(Instrumentation.stats())
+
+    #: (:obj:`str`) performance statistics
+    performanceStats = property(__getPerformanceStats,
+                                doc='provides performance statistics')
+
+    def __getPerformanceStatsEnabled(self):
+        """ get method for performanceStatsEnabled attribute
+
+        :returns: True if performance statistics are collected
+        :rtype: :obj:`bool`
+        """
+        return Instrumentation.enabled
+
+    def __setPerformanceStatsEnabled(self, enabled):
+        """ set method for performanceStatsEnabled attribute
+
+        :param enabled: True if performance statistics are collected
+        :type enabled: :obj:`bool`
+        """
+        Instrumentation.enabled = bool(enabled)
+
+    #: (:obj:`bool`) performance statistics enabled flag
+    performanceStatsEnabled = property(
+        __getPerformanceStatsEnabled,
+        __setPerformanceStatsEnabled,
+        doc='performance statistics enabled flag')
+
+    def resetPerformanceStats(self):
+        """ removes collected performance statistics
+        """
+        Instrumentation.reset()
+
+    def __getTracingEnabled(self):
+        """ get method for tracingEnabled attribute
+
+        :returns: True if command traces are recorded
+        :rtype: :obj:`bool`
+        """
+        return Tracer.enabled
+
+    def __setTracingEnabled(self, enabled):
+        """ set method for tracingEnabled attribute
+
+        :param enabled: True if command traces are recorded
+        :type enabled: :obj:`bool`
+        """
+        Tracer.enabled = bool(enabled)
+
+    #: (:obj:`bool`) command tracing enabled flag
+    tracingEnabled = property(
+        __getTracingEnabled,
+        __setTracingEnabled,
+        doc='command tracing enabled flag')
+
+    def setTraceFile(self, filename, maxbytes=10000000, backups=5):
+        """ sets the rotating JSON-lines file of command traces
+
+        :param filename: trace file name or empty to keep traces
+                         only in memory
+        :type filename: :obj:`str`
+        :param maxbytes: maximal size of the trace file
+        :type maxbytes: :obj:`int`
+        :param backups: number of kept rotated trace files
+        :type backups: :obj:`int`
+        """
+        Tracer.setFile(filename, maxbytes, backups)
+
+    def lastTrace(self, name=None):
+        """ provides the last command trace
+
+        :param name: command name or None for any command
+        :type name: :obj:`str`
+        :returns: JSON span tree with start and end times and attributes
+                  or an empty string
+        :rtype: :obj:`str`
+        """
+        return Tracer.lastTrace(name)
+
+    def profileNextCommand(self, name, count=1):
+        """ profiles the next invocations of the command with cProfile
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param count: number of profiled invocations, 0 disarms the command
+        :type count: :obj:`int`
+        :returns: JSON dictionary with numbers of invocations
+                  to be profiled by command names
+        :rtype: :obj:`str`
+        """
+        Profiler.arm(name, count)
+        return json.dumps(Profiler.armed())
+
+    def __getProfileReports(self):
+        """ provides reports of profiled commands
+
+        :returns: JSON list with command names, wall times,
+                  .pstats file names and hotspots
+        :rtype: :obj:`str`
+        """
+        return json.dumps(Profiler.reports())
+
+    #: (:obj:`str`) reports of profiled commands
+    profileReports = property(__getProfileReports,
+                              doc='provides reports of profiled commands')
+
+    def __getProfileDirectory(self):
+        """ get method for profileDirectory attribute
+
+        :returns: directory of .pstats files, temporary if empty
+        :rtype: :obj:`str`
+        """
+        return Profiler.directory
+
+    def __setProfileDirectory(self, directory):
+        """ set method for profileDirectory attribute
+
+        :param directory: directory of .pstats files, temporary if empty
+        :type directory: :obj:`str`
+        """
+        Profiler.directory = directory or ""
+
+    #: (:obj:`str`) directory of .pstats files
+    profileDirectory = property(
+        __getProfileDirectory,
+        __setProfileDirectory,
+        doc='directory of .pstats files')
+
+    def __getProfileTopN(self):
+        """ get method for profileTopN attribute
+
+        :returns: number of reported hotspots
+        :rtype: :obj:`int`
+        """
+        return Profiler.topN
+
+    def __setProfileTopN(self, topn):
+        """ set method for profileTopN attribute
+
+        :param topn: number of reported hotspots
+        :type topn: :obj:`int`
+        """
+        Profiler.topN = int(topn)
+
+    #: (:obj:`int`) number of reported hotspots
+    profileTopN = property(
+        __getProfileTopN,
+        __setProfileTopN,
+        doc='number of reported hotspots')
+
+    def __cachedValue(self, name, func):
+        """ provides attribute value cached for the current selection state
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param func: function computing the attribute value
+        :type func: :obj:`instancemethod` or :obj:`function`
+        :returns: attribute value
+        :rtype: `any`
+        """
+        key = self.__selector.stateKey()
+        if key is not None:
+            cached = self.__attributeCache.get(name)
+            if cached is not None and cached[0] == key:
+                return copy.copy(cached[1])
+        value = func()
+        if key is not None:
+            self.__attributeCache[name] = (key, copy.copy(value))
+        return value
+
+    def clearCachedValues(self):
+        """ marks cached values of computed attributes as stale
+        """
+        self.__attributeCache = {}
+
+    def __eventValue(self, name):
+        """ provides value of computed attribute with change events
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute value
+        :rtype: `any`
+        """
+        if name == "Components":
+            return self.components
+        elif name == "DataSources":
+            return self.dataSources
+        elif name == "DescriptionErrors":
+            return self.descriptionErrors
+        elif name == "ProfileConfiguration":
+            return self.profileConfiguration
+        elif name == "MntGrp":
+            return self.mntGrp
+        raise Exception("Attribute '%s' has no change events" % name)
+
+    def pushChangeEvents(self):
+        """ calls changeCallback for computed attributes
+            which changed since their last push
+        """
+        callback = self.changeCallback
+        if callback is None:
+            return
+        with self.__eventLock:
+            for name in self.eventAttributes:
+                try:
+                    value = self.__eventValue(name)
+                except Exception as e:
+                    self._streams.error(
+                        "Settings::pushChangeEvents() - "
+                        "%s cannot be read: %s" % (name, Utils.tostr(e)))
+                    continue
+                cvalue = sorted(value) if isinstance(value, list) else value
+                if name not in self.__pushedValues or \
+                        self.__pushedValues[name] != cvalue:
+                    self.__pushedValues[name] = cvalue
+                    callback(name, value)
+
     def selectedDataSources(self):
         """ provides selected datasources
 
@@ -299,9 +631,18 @@ class Settings(object):
             set(self.componentDataSources())
         )
 
+    def __cachedDataSources(self):
+        """ provides all selected data sources cached
+            for the current selection state
+
+        :returns: all selected data sources
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return self.__cachedValue("DataSources", self.__dataSources)
+
     #: (:obj:`list` <:obj:`str`>) provides all selected data sources
     dataSources = property(
-        __dataSources,
+        __cachedDataSources,
         doc=' provides selected data sources')
 
     def componentDataSources(self):
@@ -490,6 +831,183 @@ class Settings(object):
         __setMasterTimer,
         doc='set master timer/monitor for older MGs')
 
+    def __getResultCacheTTL(self):
+        """ get method for resultCacheTTL attribute
+
+        :returns: lifetime of shared command results in seconds
+        :rtype: :obj:`float`
+        """
+        return self.__singleFlight.ttl
+
+    def __setResultCacheTTL(self, ttl):
+        """ set method for resultCacheTTL attribute
+
+        :param ttl: lifetime of shared command results in seconds
+        :type ttl: :obj:`float`
+        """
+        self.__singleFlight.ttl = ttl
+        self.__singleFlight.clear()
+
+    #: (:obj:`float`) lifetime of shared command results in seconds
+    resultCacheTTL = property(
+        __getResultCacheTTL,
+        __setResultCacheTTL,
+        doc='lifetime of shared command results in seconds')
+
+    def __getMetadataCacheTTL(self):
+        """ get method for metadataCacheTTL attribute
+
+        :returns: lifetime of cached attribute metadata in seconds
+        :rtype: :obj:`float`
+        """
+        return TangoUtils.metadataTTL
+
+    def __setMetadataCacheTTL(self, ttl):
+        """ set method for metadataCacheTTL attribute
+
+        :param ttl: lifetime of cached attribute metadata in seconds
+        :type ttl: :obj:`float`
+        """
+        TangoUtils.metadataTTL = ttl
+        if ttl <= 0:
+            TangoUtils.clearMetadata()
+
+    #: (:obj:`float`) lifetime of cached attribute metadata in seconds
+    metadataCacheTTL = property(
+        __getMetadataCacheTTL,
+        __setMetadataCacheTTL,
+        doc='lifetime of cached attribute metadata in seconds')
+
+    def __getMetadataTimeout(self):
+        """ get method for metadataTimeout attribute
+
+        :returns: device call timeout in seconds used to read metadata
+        :rtype: :obj:`float`
+        """
+        return self.__profileManager.metadataTimeout
+
+    def __setMetadataTimeout(self, timeout):
+        """ set method for metadataTimeout attribute
+
+        :param timeout: device call timeout in seconds used to read metadata
+        :type timeout: :obj:`float`
+        """
+        self.__profileManager.metadataTimeout = timeout
+
+    #: (:obj:`float`) device call timeout in seconds used to read metadata
+    metadataTimeout = property(
+        __getMetadataTimeout,
+        __setMetadataTimeout,
+        doc='device call timeout in seconds used to read metadata')
+
+    def __getConfigShapes(self):
+        """ get method for configShapes attribute
+
+        :returns: if shapes are taken from attribute configurations
+        :rtype: :obj:`bool`
+        """
+        return TangoUtils.configShapes
+
+    def __setConfigShapes(self, flag):
+        """ set method for configShapes attribute
+
+        :param flag: if shapes are taken from attribute configurations
+        :type flag: :obj:`bool`
+        """
+        if TangoUtils.configShapes != bool(flag):
+            TangoUtils.configShapes = bool(flag)
+            TangoUtils.clearMetadata()
+
+    #: (:obj:`bool`) take spectrum and image shapes from maximal dimensions
+    #:    of attribute configurations instead of reading attribute values
+    configShapes = property(
+        __getConfigShapes,
+        __setConfigShapes,
+        doc='take spectrum and image shapes from maximal dimensions'
+        ' of attribute configurations')
+
+    def __getProfileCacheSize(self):
+        """ get method for profileCacheSize attribute
+
+        :returns: maximal number of profiles with cached mntgrp
+                  configurations
+        :rtype: :obj:`int`
+        """
+        return self.__profileManager.profileCacheSize
+
+    def __setProfileCacheSize(self, size):
+        """ set method for profileCacheSize attribute
+
+        :param size: maximal number of profiles with cached mntgrp
+                     configurations
+        :type size: :obj:`int`
+        """
+        self.__profileManager.profileCacheSize = size
+        if size <= 0:
+            self.__profileManager.clearProfileCache()
+
+    #: (:obj:`int`) maximal number of profiles with cached
+    #:    mntgrp configurations
+    profileCacheSize = property(
+        __getProfileCacheSize,
+        __setProfileCacheSize,
+        doc='maximal number of profiles with cached mntgrp configurations')
+
+    def __getStoreDelay(self):
+        """ get method for storeDelay attribute
+
+        :returns: delay in seconds of coalesced profile stores
+        :rtype: :obj:`float`
+        """
+        return self.__selector.storeDelay
+
+    def __setStoreDelay(self, delay):
+        """ set method for storeDelay attribute
+
+        :param delay: delay in seconds of coalesced profile stores,
+                      stores are synchronous if it is not positive
+        :type delay: :obj:`float`
+        """
+        self.__selector.storeDelay = delay
+        if delay <= 0:
+            self.__selector.flushSelection()
+
+    #: (:obj:`float`) delay in seconds of coalesced profile stores
+    storeDelay = property(
+        __getStoreDelay,
+        __setStoreDelay,
+        doc='delay in seconds of coalesced profile stores')
+
+    def __getDynamicComponentCleanInterval(self):
+        """ get method for dynamicComponentCleanInterval attribute
+
+        :returns: interval in seconds of stale dynamic component cleaning
+        :rtype: :obj:`float`
+        """
+        return self.__cleanInterval
+
+    def __setDynamicComponentCleanInterval(self, interval):
+        """ set method for dynamicComponentCleanInterval attribute
+
+        :param interval: interval in seconds of stale dynamic component
+                         cleaning, it is disabled if it is not positive
+        :type interval: :obj:`float`
+        """
+        if interval > 0:
+            self.__addCleanDevice()
+        with self.__dcpLock:
+            self.__cleanInterval = interval
+            if self.__cleanTimer is not None:
+                self.__cleanTimer.cancel()
+                self.__cleanTimer = None
+            self.__scheduleCleaning()
+
+    #: (:obj:`float`) interval in seconds of stale dynamic component cleaning
+    dynamicComponentCleanInterval = property(
+        __getDynamicComponentCleanInterval,
+        __setDynamicComponentCleanInterval,
+        doc='interval in seconds of stale dynamic component cleaning')
+
     def __getConfigDevice(self):
         """ get method for configDevice attribute
 
@@ -547,7 +1065,9 @@ class Settings(object):
         :returns: configuration
         :rtype: :obj:`str`
         """
-        return json.dumps(self.__selector.get())
+        return self.__cachedValue(
+            "ProfileConfiguration",
+            lambda: json.dumps(self.__selector.get()))
 
     #: (:obj:`str`) the json data string
     profileConfiguration = property(
@@ -751,7 +1271,7 @@ class Settings(object):
         :returns:  json dictionary with channel properties
         :rtype: :obj:`str`
         """
-        props = json.loads(self.__selector["ChannelProperties"])
+        props = self.__selector.getValue("ChannelProperties")
         if ptype in props.keys():
             return json.dumps(props[ptype])
         else:
@@ -766,14 +1286,14 @@ class Settings(object):
         """
         ptype, variables = typeandvariables
         jvar = Utils.stringToDictJson(variables)
-        props = json.loads(self.__selector["ChannelProperties"])
+        props = dict(self.__selector.getValue("ChannelProperties"))
         if ptype in props.keys():
             lvar = json.dumps(props[ptype])
         else:
             lvar = '{}'
         if lvar != jvar:
             props[ptype] = json.loads(jvar)
-            self.__selector["ChannelProperties"] = json.dumps(props)
+            self.__selector.setValue("ChannelProperties", props)
             self.storeProfile()
 
     def __getMntGrp(self):
@@ -1088,10 +1608,16 @@ class Settings(object):
         """
         self.__selector.storeSelection()
 
+    def flushProfile(self):
+        """ writes delayed configuration stores
+        """
+        self.__selector.flushSelection()
+
     def fetchProfile(self):
         """ fetch configuration
         """
-        self.__profileManager.fetchProfile()
+        with self.__envSession():
+            self.__profileManager.fetchProfile()
 
     def loadProfile(self):
         """ loads configuration
@@ -1193,21 +1719,26 @@ class Settings(object):
     def preselectComponents(self):
         """ checks existing controllers of pools
         """
-        self.__selector.preselect()
-        gc.collect()
+        def preselect():
+            with self.__envSession():
+                self.__selector.preselect()
+                gc.collect()
+        self.__singleFlightCall("preselectComponents", preselect)
 
     def resetPreselectedComponents(self):
         """ reset preselected Components to defaultPreselectedComponents
         """
-        self.__selector.resetPreselectedComponents(
-            self.defaultPreselectedComponents)
-        self.__selector["DataSourcePreselection"] = '{}'
-        self.preselectComponents()
-        self.storeProfile()
+        with self.__envSession():
+            self.__selector.resetPreselectedComponents(
+                self.defaultPreselectedComponents)
+            self.__selector["DataSourcePreselection"] = '{}'
+            self.preselectComponents()
+            self.storeProfile()
 
     def deleteAllProfiles(self):
         """ clear all selections
         """
+        self.__selector.flushSelection()
         avsel = self.availableProfiles()
         if avsel:
             inst = self.__selector.setConfigInstance()
@@ -1238,6 +1769,7 @@ class Settings(object):
         jdss = json.loads(jvar)
         tangods = [[name, name, source] for name, source in jdss.items()]
         self.__profileManager.createDataSources(tangods)
+        self.__selector.invalidate()
 
     def addStepDataSources(self, datasources):
         """ describe datasources
@@ -1269,7 +1801,9 @@ class Settings(object):
         :param name: mntgrp name
         :type name: :obj:`str`
         """
-        self.__profileManager.deleteProfile(name)
+        self.__singleFlight.clear()
+        with self.__envSession():
+            self.__profileManager.deleteProfile(name)
 
     def mntGrpConfiguration(self):
         """ provides configuration of mntgrp
@@ -1279,24 +1813,97 @@ class Settings(object):
         """
         return self.__profileManager.mntGrpConfiguration()
 
+    def __flightKey(self, command):
+        """ provides key of the command inputs for single-flight execution
+
+        :param command: command name
+        :type command: :obj:`str`
+        :returns: command inputs key or command name if
+                  the selection inputs are not tracked
+        :rtype: :obj:`tuple`
+        """
+        state = self.__selector.stateKey()
+        if state is None:
+            return (command,)
+        pm = self.__profileManager
+        return (command, state, pm.masterTimer, pm.masterTimerFirst,
+                tuple(pm.timerFilters), tuple(pm.clientRecordKeys),
+                tuple(pm.mutedPreScanAttrFilters),
+                tuple(pm.defaultPreselectedComponents),
+                self.resetInvalidDoor, self.mergeProfilesToMntGrps)
+
+    def __flightPostKey(self, command):
+        """ provides function which creates key of the command inputs
+            after the command execution
+
+        :param command: command name
+        :type command: :obj:`str`
+        :returns: function which provides inputs key
+                  or None if the inputs are not tracked
+        :rtype: :obj:`function`
+        """
+        def postkey():
+            key = self.__flightKey(command)
+            return key if len(key) > 1 else None
+        return postkey
+
+    def __singleFlightCall(self, command, func, cached=True):
+        """ executes the command function once for identical concurrent
+            calls and shares its result for resultCacheTTL seconds
+
+        :param command: command name
+        :type command: :obj:`str`
+        :param func: function executing the command
+        :type func: :obj:`function`
+        :param cached: share the result after the call, i.e. it is
+                       False for commands which change the settings
+        :type cached: :obj:`bool`
+        :returns: command result
+        :rtype: `any`
+        """
+        return self.__singleFlight.call(
+            self.__flightKey(command), func,
+            self.__flightPostKey(command) if cached else None)
+
     def isMntGrpUpdated(self):
         """ check if active measurement group was changed
 
         :returns: True if it is different to the current setting
         :rtype: :obj:`bool`
         """
-        return self.__profileManager.isMntGrpUpdated()
+        def isUpdated():
+            with self.__envSession():
+                return self.__profileManager.isMntGrpUpdated()
+        return self.__singleFlightCall("isMntGrpUpdated", isUpdated)
 
-    def updateMntGrp(self):
+    def updateMntGrp(self, stage=None):
         """ set active measurement group from components
 
+        :param stage: function called with names of the update stages
+        :type stage: :obj:`instancemethod` or :obj:`function`
         :returns: string with mntgrp configuration
         :rtype: :obj:`str`
         """
-        reset = False
-        if self.resetInvalidDoor:
-            reset = not self.__selector.isDoorValid()
-        return self.__profileManager.updateProfile(False, reset)
+        def update():
+            self.__singleFlight.clear()
+            with self.__envSession():
+                reset = False
+                if self.resetInvalidDoor:
+                    reset = not self.__selector.isDoorValid()
+                return self.__profileManager.updateProfile(
+                    False, reset, stage)
+        return self.__singleFlightCall("updateMntGrp", update, False)
+
+    def mntGrpUpdatePlan(self):
+        """ provides changes of the measurement group
+            which would be made by updateMntGrp
+
+        :returns: JSON string with changed controllers, channels,
+                  settings and configuration differences
+        :rtype: :obj:`str`
+        """
+        with self.__envSession():
+            return json.dumps(self.__profileManager.mntGrpUpdatePlan())
 
     def switchProfile(self, toActive=True):
         """ switch to active measurement
@@ -1304,24 +1911,33 @@ class Settings(object):
         :param toActive: if False update the current profile
         :type toActive: :obj:`bool`
         """
-        self.__profileManager.switchProfile(toActive)
+        self.__singleFlight.clear()
+        with self.__envSession():
+            self.__profileManager.switchProfile(toActive)
 
-    def updateProfile(self):
+    def updateProfile(self, stage=None):
         """ update profile and measurement group
 
+        :param stage: function called with names of the update stages
+        :type stage: :obj:`instancemethod` or :obj:`function`
         :returns: string with mntgrp configuration
         :rtype: :obj:`str`
         """
-        if not self.__msp.isDoorRunning(self.__selector.getMacroServer()):
-            return self.__profileManager.updateProfile(True)
-        else:
-            raise Exception(
-                "Door is RUNNING. Cannot update the Measurement Group")
+        self.__singleFlight.clear()
+        with self.__envSession():
+            if not self.__msp.isDoorRunning(self.__selector.getMacroServer()):
+                return self.__profileManager.updateProfile(
+                    True, stage=stage)
+            else:
+                raise Exception(
+                    "Door is RUNNING. Cannot update the Measurement Group")
 
     def importMntGrp(self):
         """ import setting from active measurement
         """
-        self.__profileManager.importMntGrp()
+        self.__singleFlight.clear()
+        with self.__envSession():
+            self.__profileManager.importMntGrp()
 
     def availableMntGrps(self):
         """ available mntgrps
@@ -1329,15 +1945,18 @@ class Settings(object):
         :returns: list of available measurement groups
         :rtype: :obj:`list` <:obj:`str`>
         """
-        if not self.mergeProfilesToMntGrps:
-            return self.__profileManager.availableMntGrps()
-        else:
-            avmgs = self.__profileManager.availableMntGrps() or []
-            avprs = self.availableProfiles() or []
-            for pr in avprs:
-                if pr not in avmgs:
-                    avmgs.append(pr)
-            return avmgs
+        def available():
+            with self.__envSession():
+                if not self.mergeProfilesToMntGrps:
+                    return self.__profileManager.availableMntGrps()
+                else:
+                    avmgs = self.__profileManager.availableMntGrps() or []
+                    avprs = self.availableProfiles() or []
+                    for pr in avprs:
+                        if pr not in avmgs:
+                            avmgs.append(pr)
+                    return avmgs
+        return self.__singleFlightCall("availableMntGrps", available)
 
 # Dynamic component methods
 
@@ -1353,6 +1972,10 @@ class Settings(object):
         dcpcreator = DynamicComponent(
             nexusconfig_device, self.defaultNeXusPath, self.defaultNeXusType,
             self.defaultUserDataPath)
+        dcpcreator.numberOfThreads = self.numberOfThreads
+        dcpcreator.metadataTimeout = self.metadataTimeout
+        dcpcreator.reuse = self.reuseDynamicComponents
+        dcpcreator.stampTime = self.dynamicComponentMaxAge > 0
         if isinstance(params, (list, tuple)):
             if len(params) > 0 and params[0]:
                 dcpcreator.setStepDSources(
@@ -1384,7 +2007,124 @@ class Settings(object):
             bool(self.__selector["DefaultDynamicLinks"]),
             Utils.tostr(self.__selector["DefaultDynamicPath"]))
 
-        return dcpcreator.create()
+        name = dcpcreator.create()
+        if dcpcreator.stampTime:
+            self.__addCleanDevice()
+        return name
+
+    def updateMntGrpAsync(self):
+        """ submits the updateMntGrp job
+
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        return self.__submitJob(
+            "UpdateMntGrp", lambda job: self.updateMntGrp(job.stage),
+            ["configuration", "mntgrp", "profile", "environment"])
+
+    def updateProfileAsync(self):
+        """ submits the updateProfile job
+
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        return self.__submitJob(
+            "UpdateProfile", lambda job: self.updateProfile(job.stage),
+            ["configuration", "mntgrp", "profile", "environment"])
+
+    def preselectComponentsAsync(self):
+        """ submits the preselectComponents job
+
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        def preselect(job):
+            job.stage("preselect")
+            self.preselectComponents()
+        return self.__submitJob(
+            "PreselectComponents", preselect, ["preselect"])
+
+    def createDynamicComponentAsync(self, params):
+        """ submits the createDynamicComponent job
+
+        :param params: datasource parameters
+        :type params: :obj:`list` <:obj:`str`>
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        params = list(params or [])
+
+        def create(job):
+            job.stage("create")
+            return self.createDynamicComponent(params)
+        return self.__submitJob(
+            "CreateDynamicComponent", create, ["create"])
+
+    def jobStatus(self, jid):
+        """ provides status of the asynchronous job
+
+        :param jid: job id
+        :type jid: :obj:`str`
+        :returns: JSON dictionary with job status, progress,
+                  error and stage timing
+        :rtype: :obj:`str`
+        """
+        return json.dumps(self.__jobManager.status(jid))
+
+    def jobResult(self, jid):
+        """ provides result of the finished asynchronous job
+
+        :param jid: job id
+        :type jid: :obj:`str`
+        :returns: job result string
+        :rtype: :obj:`str`
+        """
+        result = self.__jobManager.result(jid)
+        if result is None:
+            return ""
+        if isinstance(result, (bytes, unicode)):
+            return Utils.tostr(result)
+        return json.dumps(result)
+
+    def __submitJob(self, name, func, stages=None):
+        """ submits the job which runs holding the access lock
+
+        :param name: job name
+        :type name: :obj:`str`
+        :param func: job function called with the job
+        :type func: :obj:`instancemethod` or :obj:`function`
+        :param stages: names of expected job stages
+        :type stages: :obj:`list` <:obj:`str`>
+        :returns: job id
+        :rtype: :obj:`str`
+        """
+        def locked(job):
+            with self.__accessLock:
+                return func(job)
+        return self.__jobManager.submit(name, locked, stages)
+
+    def acquire(self, blocking=True):
+        """ acquires the access lock of the settings
+
+        :param blocking: wait until the lock is released by other threads
+        :type blocking: :obj:`bool`
+        :returns: True if the lock has been acquired
+        :rtype: :obj:`bool`
+        """
+        return self.__accessLock.acquire(blocking)
+
+    def release(self):
+        """ releases the access lock of the settings
+        """
+        self.__accessLock.release()
+
+    def pendingJobs(self):
+        """ provides number of queued and running asynchronous jobs
+
+        :returns: number of unfinished jobs
+        :rtype: :obj:`int`
+        """
+        return self.__jobManager.pending()
 
     def removeDynamicComponent(self, name):
         """ removes dynamic component
@@ -1396,6 +2136,72 @@ class Settings(object):
         dcpcreator = DynamicComponent(nexusconfig_device)
         dcpcreator.remove(name)
 
+    def cleanDynamicComponents(self):
+        """ removes dynamic components of the current configuration
+            device with stored creation times older than
+            dynamicComponentMaxAge
+
+        :brief: components are identified on the configuration server
+                by their name prefix and the creation time stored
+                in their xml so components created before a restart
+                or by other servers are removed as well
+        :returns: names of removed dynamic components
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if self.dynamicComponentMaxAge <= 0:
+            return []
+        dcpcreator = DynamicComponent(self.__selector.setConfigInstance())
+        return dcpcreator.removeStaleComponents(self.dynamicComponentMaxAge)
+
+    def __addCleanDevice(self):
+        """ adds the current configuration device to devices
+            cleaned by the stale dynamic component timer
+        """
+        configdevice = self.__selector["ConfigDevice"]
+        with self.__dcpLock:
+            self.__cleanDevices.add(configdevice)
+
+    def __scheduleCleaning(self):
+        """ starts timer of the next stale dynamic component cleaning
+        """
+        if self.__cleanInterval > 0:
+            self.__cleanTimer = threading.Timer(
+                self.__cleanInterval, self.__periodicCleaning)
+            self.__cleanTimer.daemon = True
+            self.__cleanTimer.start()
+
+    def __periodicCleaning(self):
+        """ removes stale dynamic components in the timer thread
+
+        :brief: the timer uses its own configuration server proxies
+                and skips components of the module configuration
+                which are not thread-safe
+        """
+        with self.__dcpLock:
+            configdevices = sorted(self.__cleanDevices)
+        maxage = self.dynamicComponentMaxAge
+        for configdevice in configdevices:
+            if maxage <= 0 or not configdevice or \
+                    configdevice.lower() == self.__selector.moduleLabel:
+                continue
+            try:
+                nexusconfig_device = TangoUtils.openProxy(configdevice)
+                nexusconfig_device.command_inout("Open")
+                removed = DynamicComponent(
+                    nexusconfig_device).removeStaleComponents(maxage)
+                if removed:
+                    self._streams.info(
+                        "Settings::cleanDynamicComponents() - "
+                        "removed: %s" % ", ".join(removed))
+            except Exception as e:
+                self._streams.error(
+                    "Settings::cleanDynamicComponents() - "
+                    "%s" % Utils.tostr(e))
+        with self.__dcpLock:
+            if self.__cleanTimer is threading.current_thread():
+                self.__cleanTimer = None
+                self.__scheduleCleaning()
+
 # Environment methods:
 
     def scanEnvVariables(self):
@@ -1427,7 +2233,8 @@ class Settings(object):
             "components": "Components",
             "dataSources": "DataSources"
         }
-        for attr, name in commands.items():
-            vl = getattr(self, attr)
-            nenv[Utils.tostr(name)] = vl
-        self.__selector.exportEnv(cmddata=nenv)
+        with self.__envSession():
+            for attr, name in commands.items():
+                vl = getattr(self, attr)
+                nenv[Utils.tostr(name)] = vl
+            self.__selector.exportEnv(cmddata=nenv)
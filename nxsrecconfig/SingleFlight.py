@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Single-flight execution of identical calls with short result cache """
+
+import copy
+import threading
+import time
+
+
+class Flight(object):
+
+    """ Computation shared by identical calls
+    """
+
+    def __init__(self):
+        """ constructor
+        """
+        #: (:class:`threading.Event`) computation finished
+        self.done = threading.Event()
+        #: (`any`) computation result
+        self.result = None
+        #: (:class:`Exception`) computation error
+        self.error = None
+
+
+class SingleFlight(object):
+
+    """ Executes identical concurrent calls once and keeps their results
+        for a short time
+    """
+
+    def __init__(self, ttl=0.0):
+        """ constructor
+
+        :param ttl: lifetime of results in seconds
+        :type ttl: :obj:`float`
+        """
+        #: (:obj:`float`) lifetime of results in seconds
+        self.ttl = ttl
+        #: (:class:`threading.Lock`) flight lock
+        self.__lock = threading.Lock()
+        #: (:obj:`dict` <:obj:`tuple`, :class:`Flight`>) running flights
+        self.__flights = {}
+        #: (:obj:`dict` <:obj:`tuple`, (:obj:`float`, `any`)>) \
+        #:    result times and results
+        self.__results = {}
+
+    def call(self, key, func, postkey=None):
+        """ executes the function or attaches to its running execution
+            with the same key
+
+        :param key: key of the call inputs
+        :type key: :obj:`tuple`
+        :param func: function without arguments
+        :type func: :obj:`instancemethod` or :obj:`function`
+        :param postkey: function which provides key of the inputs after
+                        the call. The result is cached with this key
+                        if it is not None.
+        :type postkey: :obj:`instancemethod` or :obj:`function`
+        :returns: function result
+        :rtype: `any`
+        """
+        with self.__lock:
+            if key in self.__results:
+                rtime, result = self.__results[key]
+                if time.time() - rtime < self.ttl:
+                    return copy.deepcopy(result)
+                self.__results.pop(key)
+            flight = self.__flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight()
+                self.__flights[key] = flight
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+        try:
+            flight.result = func()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.__lock:
+                self.__flights.pop(key, None)
+            flight.done.set()
+        if self.ttl > 0 and postkey is not None:
+            rkey = postkey()
+            if rkey is not None:
+                with self.__lock:
+                    self.__results[rkey] = (
+                        time.time(), copy.deepcopy(flight.result))
+        return flight.result
+
+    def clear(self):
+        """ removes cached results
+        """
+        with self.__lock:
+            self.__results.clear()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+#   This file is part of nxsrecconfig - NeXus Sardana Recorder Settings
+#
+#    Copyright (C) 2014-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""  Span trees of individual command executions """
+
+import json
+import logging
+import logging.handlers
+import threading
+import time
+
+
+class NoSpan(object):
+
+    """ Span used when tracing is disabled
+    """
+
+    def __enter__(self):
+        """ enters the span
+
+        :returns: the span
+        :rtype: :class:`NoSpan`
+        """
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ exits the span
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+
+    def set(self, name, value):
+        """ sets span attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+
+
+#: (:class:`NoSpan`) span of the disabled tracing
+NOSPAN = NoSpan()
+
+
+class Span(NoSpan):
+
+    """ Timed operation with attributes and child spans
+    """
+
+    def __init__(self, name, attributes=None, parent=None):
+        """ constructor
+
+        :param name: span name
+        :type name: :obj:`str`
+        :param attributes: span attributes
+        :type attributes: :obj:`dict` <:obj:`str`, `any`>
+        :param parent: parent span or None for the trace root
+        :type parent: :class:`Span`
+        """
+        #: (:obj:`str`) span name
+        self.name = name
+        #: (:obj:`dict` <:obj:`str`, `any`>) span attributes
+        self.attributes = dict(attributes or {})
+        #: (:class:`Span`) parent span
+        self.parent = parent
+        #: (:class:`Span`) trace root span
+        self.root = parent.root if parent is not None else self
+        #: (:obj:`list` <:class:`Span`>) child spans
+        self.children = []
+        #: (:obj:`float`) start time
+        self.start = None
+        #: (:obj:`float`) end time
+        self.end = None
+        #: (:obj:`int`) number of spans in the trace
+        self.spans = 1
+        #: (:obj:`int`) number of spans dropped from the trace
+        self.dropped = 0
+
+    def __enter__(self):
+        """ starts the span
+
+        :returns: the span
+        :rtype: :class:`Span`
+        """
+        Tracer.spans().append(self)
+        self.start = time.time()
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        """ finishes the span
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        self.end = time.time()
+        if evalue is not None:
+            self.attributes["error"] = str(evalue)
+        spans = Tracer.spans()
+        if spans:
+            spans.pop()
+        if self.parent is None:
+            Tracer.finish(self)
+
+    def set(self, name, value):
+        """ sets span attribute
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        self.attributes[name] = value
+
+    def toDict(self):
+        """ provides span tree as a dictionary
+
+        :returns: span tree
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        dct = {"name": self.name, "start": self.start, "end": self.end,
+               "attributes": self.attributes,
+               "children": [child.toDict() for child in self.children]}
+        if self.parent is None:
+            dct["spans"] = self.spans
+            dct["dropped"] = self.dropped
+        return dct
+
+
+class AttachedSpan(NoSpan):
+
+    """ Span of another thread attached to the current thread
+    """
+
+    def __init__(self, span):
+        """ constructor
+
+        :param span: attached span
+        :type span: :class:`Span`
+        """
+        #: (:class:`Span`) attached span
+        self.span = span
+
+    def __enter__(self):
+        """ attaches the span
+
+        :returns: the attached span
+        :rtype: :class:`Span`
+        """
+        Tracer.spans().append(self.span)
+        return self.span
+
+    def __exit__(self, etype, evalue, tb):
+        """ detaches the span
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        spans = Tracer.spans()
+        if spans:
+            spans.pop()
+
+
+class Tracer(object):
+
+    """ Records span trees of commands and writes finished traces
+    into a rotating JSON-lines file
+    """
+
+    #: (:obj:`bool`) tracing enabled flag
+    enabled = False
+    #: (:obj:`int`) maximal number of spans in one trace
+    maxSpans = 10000
+
+    #: (:class:`threading.Lock`) trace lock
+    __lock = threading.Lock()
+    #: (:class:`threading.local`) open spans of the current thread
+    __local = threading.local()
+    #: (:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, `any`>>) \
+    #:    last traces of commands
+    __last = {}
+    #: (:obj:`dict` <:obj:`str`, `any`>) last trace
+    __lastTrace = None
+    #: (:class:`logging.Logger`) trace file logger
+    __logger = None
+    #: (:class:`logging.handlers.RotatingFileHandler`) trace file handler
+    __handler = None
+
+    @classmethod
+    def spans(cls):
+        """ provides open spans of the current thread
+
+        :returns: list of open spans
+        :rtype: :obj:`list` <:class:`Span`>
+        """
+        spans = getattr(cls.__local, "spans", None)
+        if spans is None:
+            spans = cls.__local.spans = []
+        return spans
+
+    @classmethod
+    def trace(cls, name, **attributes):
+        """ provides root span of a new trace or a child span
+        if a trace is already open, i.e. to be used in the `with` statement
+
+        :param name: span name
+        :type name: :obj:`str`
+        :param attributes: span attributes
+        :type attributes: :obj:`dict` <:obj:`str`, `any`>
+        :returns: span
+        :rtype: :class:`Span` or :class:`NoSpan`
+        """
+        if not cls.enabled:
+            return NOSPAN
+        spans = cls.spans()
+        if spans:
+            return cls.span(name, **attributes)
+        return Span(name, attributes)
+
+    @classmethod
+    def span(cls, name, **attributes):
+        """ provides child span of the current span,
+        i.e. to be used in the `with` statement
+
+        :param name: span name
+        :type name: :obj:`str`
+        :param attributes: span attributes
+        :type attributes: :obj:`dict` <:obj:`str`, `any`>
+        :returns: span or no-op span outside traces
+        :rtype: :class:`Span` or :class:`NoSpan`
+        """
+        if not cls.enabled:
+            return NOSPAN
+        spans = cls.spans()
+        if not spans:
+            return NOSPAN
+        parent = spans[-1]
+        root = parent.root
+        with cls.__lock:
+            if root.spans >= cls.maxSpans:
+                root.dropped += 1
+                return NOSPAN
+            root.spans += 1
+            span = Span(name, attributes, parent)
+            parent.children.append(span)
+        return span
+
+    @classmethod
+    def current(cls):
+        """ provides the current span
+
+        :returns: current span or None
+        :rtype: :class:`Span`
+        """
+        if not cls.enabled:
+            return None
+        spans = cls.spans()
+        return spans[-1] if spans else None
+
+    @classmethod
+    def attach(cls, span):
+        """ attaches span of another thread to the current thread,
+        i.e. to be used in the `with` statement in worker threads
+
+        :param span: span from :meth:`current`
+        :type span: :class:`Span`
+        :returns: attached span
+        :rtype: :class:`AttachedSpan` or :class:`NoSpan`
+        """
+        if not cls.enabled or span is None:
+            return NOSPAN
+        return AttachedSpan(span)
+
+    @classmethod
+    def finish(cls, root):
+        """ stores the finished trace and writes it into the trace file
+
+        :param root: root span of the trace
+        :type root: :class:`Span`
+        """
+        with cls.__lock:
+            trace = root.toDict()
+            cls.__last[root.name] = trace
+            cls.__lastTrace = trace
+            logger = cls.__logger
+        if logger is not None:
+            try:
+                logger.info(json.dumps(trace))
+            except Exception:
+                pass
+
+    @classmethod
+    def lastTrace(cls, name=None):
+        """ provides the last finished trace
+
+        :param name: command name or None for any command
+        :type name: :obj:`str`
+        :returns: JSON span tree or an empty string
+        :rtype: :obj:`str`
+        """
+        with cls.__lock:
+            trace = cls.__last.get(name) if name else cls.__lastTrace
+        return json.dumps(trace) if trace is not None else ""
+
+    @classmethod
+    def setFile(cls, filename, maxbytes=10000000, backups=5):
+        """ sets the rotating trace file
+
+        :param filename: trace file name or empty to keep traces
+                         only in memory
+        :type filename: :obj:`str`
+        :param maxbytes: maximal size of the trace file
+        :type maxbytes: :obj:`int`
+        :param backups: number of kept rotated trace files
+        :type backups: :obj:`int`
+        """
+        with cls.__lock:
+            if cls.__handler is not None:
+                cls.__logger.removeHandler(cls.__handler)
+                cls.__handler.close()
+                cls.__handler = None
+            cls.__logger = None
+            if filename:
+                handler = logging.handlers.RotatingFileHandler(
+                    filename, maxBytes=max(int(maxbytes), 0),
+                    backupCount=max(int(backups), 0))
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("nxsrecconfig.traces")
+                logger.propagate = False
+                logger.setLevel(logging.INFO)
+                logger.addHandler(handler)
+                cls.__handler = handler
+                cls.__logger = logger
+
+    @classmethod
+    def clear(cls):
+        """ removes the last traces
+        """
+        with cls.__lock:
+            cls.__last = {}
+            cls.__lastTrace = None
@@ -23,16 +23,23 @@ import re
 import time
 import json
 import pickle
-import numpy
 import fnmatch
 import socket
 import sys
+import threading
 
 try:
     import tango
 except Exception:
     import PyTango as tango
 
+from .Instrumentation import Instrumentation
+
+if sys.version_info > (3,):
+    import queue as Queue
+else:
+    import Queue
+
 
 if sys.version_info > (3,):
     unicode = str
@@ -96,6 +103,94 @@ class Utils(object):
         else:
             return pickle.loads(bytestr)
 
+    @classmethod
+    def parallelCall(cls, function, arguments, numberOfThreads=20,
+                     timeout=None, errors=None):
+        """ calls function for every argument in a bounded number
+        of threads
+
+        :brief: The timeout is best-effort, i.e. it only limits waiting
+                for the results. Calls which do not finish in time are
+                left running in daemon threads and their results are
+                dropped. Remote calls should be limited by their own
+                timeouts.
+        :param function: called function with one argument
+        :type function: :obj:`instancemethod` or :obj:`function`
+        :param arguments: list of hashable function arguments
+        :type arguments: :obj:`list` < `any` >
+        :param numberOfThreads: maximal number of threads
+        :type numberOfThreads: :obj:`int`
+        :param timeout: time limit for waiting for all calls in seconds
+        :type timeout: :obj:`float`
+        :param errors: dictionary filled with exceptions of failed calls
+                       by their arguments
+        :type errors: :obj:`dict` < `any`, :class:`Exception` >
+        :returns: dictionary of results of calls which succeeded in time
+        :rtype: :obj:`dict` < `any`, `any` >
+        """
+        arguments = list(arguments)
+        results = {}
+        if not arguments:
+            return results
+        failures = {}
+        queue = Queue.Queue()
+        for arg in arguments:
+            queue.put(arg)
+        lock = threading.Lock()
+        frame = Instrumentation.current()
+
+        def worker():
+            with Instrumentation.attach(frame):
+                while True:
+                    try:
+                        arg = queue.get(block=False)
+                    except Queue.Empty:
+                        break
+                    try:
+                        res = function(arg)
+                        with lock:
+                            results[arg] = res
+                    except Exception as e:
+                        with lock:
+                            failures[arg] = e
+
+        threads = []
+        for _ in range(min(max(int(numberOfThreads or 1), 1),
+                           len(arguments))):
+            th = threading.Thread(target=worker)
+            th.daemon = True
+            threads.append(th)
+            th.start()
+        deadline = time.time() + timeout if timeout else None
+        for th in threads:
+            if deadline is None:
+                th.join()
+            else:
+                th.join(max(deadline - time.time(), 0))
+        with lock:
+            if errors is not None:
+                errors.update(failures)
+            return dict(results)
+
+    @classmethod
+    def roundsTimeout(cls, count, numberOfThreads, timeout):
+        """ provides time limit for calls in a bounded number of threads
+        where each call is limited by the timeout
+
+        :param count: number of calls
+        :type count: :obj:`int`
+        :param numberOfThreads: maximal number of threads
+        :type numberOfThreads: :obj:`int`
+        :param timeout: time limit of one call in seconds
+        :type timeout: :obj:`float`
+        :returns: time limit for all calls in seconds or None
+        :rtype: :obj:`float`
+        """
+        if not timeout or not count:
+            return None
+        threads = max(int(numberOfThreads or 1), 1)
+        return timeout * ((count + threads - 1) // threads)
+
     @classmethod
     def compareDict(cls, dct, dct2):
         """ copares two dictionaries
@@ -272,6 +367,90 @@ class TangoUtils(object):
             tango.DevFloat: "float32", tango.DevString: "string",
             tango.DevBoolean: "bool", tango.DevEncoded: "encoded"}
 
+    #: (:obj:`float`) lifetime of cached attribute metadata in seconds,
+    #:    zero or negative value disables the cache
+    metadataTTL = 0.0
+
+    #: (:obj:`bool`) invalidate cached attribute metadata
+    #:    on attribute configuration change events
+    metadataEvents = True
+
+    #: (:obj:`bool`) take shapes of spectrum and image attributes
+    #:    which are not Sardana channel values from max_dim_x and max_dim_y
+    #:    of their configuration instead of reading their values
+    configShapes = False
+
+    #: (:obj:`dict` <:obj:`str`, (:obj:`float`, :obj:`tuple`)>) \
+    #:    cached (shape, data_type, units) with their timestamps
+    __metadata = {}
+
+    #: (:obj:`dict` <:obj:`str`, (:class:`tango.AttributeProxy`, \
+    #:    :obj:`int`)>) attribute configuration event subscriptions
+    __subscriptions = {}
+
+    #: (:class:`threading.Lock`) metadata cache lock
+    __metadataLock = threading.Lock()
+
+    #: (:obj:`float`) lifetime of cached fqdn host names in seconds,
+    #:    zero or negative value disables the cache
+    fqdnTTL = 300.0
+
+    #: (:obj:`dict` <:obj:`str`, (:obj:`float`, :obj:`str`)>) \
+    #:    cached fqdn host names with their timestamps
+    __fqdns = {}
+
+    #: ((:obj:`str`, :obj:`str`)) tango database host and port
+    __dbHostPort = None
+
+    #: (:class:`threading.Lock`) host cache lock
+    __hostLock = threading.Lock()
+
+    #: (:obj:`function`) factory of device proxies called with device
+    #:    names, i.e. to plug in-process stand-ins,
+    #:    :class:`tango.DeviceProxy` if None
+    proxyFactory = None
+
+    #: (:obj:`function`) factory of attribute proxies called with
+    #:    attribute names, :class:`tango.AttributeProxy` if None
+    attributeProxyFactory = None
+
+    #: (:obj:`function`) factory of tango databases called without
+    #:    arguments or with host and port, :class:`tango.Database` if None
+    databaseFactory = None
+
+    @classmethod
+    def deviceProxy(cls, name):
+        """ creates device proxy with proxyFactory
+
+        :param name: device name
+        :type name: :obj:`str`
+        :returns: device proxy
+        :rtype: :class:`tango.DeviceProxy`
+        """
+        return (cls.proxyFactory or tango.DeviceProxy)(name)
+
+    @classmethod
+    def attributeProxy(cls, name):
+        """ creates attribute proxy with attributeProxyFactory
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute proxy
+        :rtype: :class:`tango.AttributeProxy`
+        """
+        return (cls.attributeProxyFactory or tango.AttributeProxy)(name)
+
+    @classmethod
+    def database(cls, *args):
+        """ creates tango database with databaseFactory
+
+        :param args: optional database host and port
+        :type args: [:obj:`str`, :obj:`int`]
+        :returns: tango database
+        :rtype: :class:`tango.Database`
+        """
+        return (cls.databaseFactory or tango.Database)(*args)
+
     @classmethod
     def openProxy(cls, device, counter=1000):
         """ opens device proxy of the given device
@@ -283,7 +462,7 @@ class TangoUtils(object):
         """
         found = False
         cnt = 0
-        cnfServer = tango.DeviceProxy(Utils.tostr(device))
+        cnfServer = cls.deviceProxy(Utils.tostr(device))
 
         while not found and cnt < counter:
             if cnt > 1:
@@ -342,7 +521,7 @@ class TangoUtils(object):
         """
         dps = []
         for name in names:
-            dp = tango.DeviceProxy(Utils.tostr(name))
+            dp = cls.deviceProxy(Utils.tostr(name))
             try:
                 dp.ping()
                 dps.append(dp)
@@ -366,7 +545,7 @@ class TangoUtils(object):
         device = ''
         for server in servers:
             try:
-                dp = tango.DeviceProxy(Utils.tostr(server))
+                dp = cls.deviceProxy(Utils.tostr(server))
                 dp.ping()
                 device = server
                 break
@@ -390,55 +569,117 @@ class TangoUtils(object):
                 return "tango://%s" % source
             else:
                 lsource = source.split(":")
-                lsource[0] = socket.getfqdn(lsource[0])
+                lsource[0] = cls.getFQDN(lsource[0])
 
                 return "tango://%s" % ":".join(lsource)
 
         else:
-            db = tango.Database()
-            host, port = db.get_db_host(), db.get_db_port()
+            host, port = cls.getDBHostPort()
             if fqdn:
-                host = socket.getfqdn(host)
+                host = cls.getFQDN(host)
             return "tango://%s:%s/%s" % (host, port, source)
 
     @classmethod
-    def getShapeTypeUnit(cls, source):
+    def getDBHostPort(cls):
+        """ provides host and port of the default tango database,
+            they are fetched once per process
+
+        :returns: database host and port
+        :rtype: (:obj:`str`, :obj:`str`)
+        """
+        with cls.__hostLock:
+            if cls.__dbHostPort is None:
+                db = cls.database()
+                cls.__dbHostPort = (db.get_db_host(), db.get_db_port())
+            return cls.__dbHostPort
+
+    @classmethod
+    def getFQDN(cls, host):
+        """ provides fully qualified domain name of the given host
+
+        :param host: host name
+        :type host: :obj:`str`
+        :returns: fully qualified domain name
+        :rtype: :obj:`str`
+        """
+        if cls.fqdnTTL <= 0:
+            return socket.getfqdn(host)
+        with cls.__hostLock:
+            item = cls.__fqdns.get(host)
+        if item is not None and time.time() - item[0] < cls.fqdnTTL:
+            return item[1]
+        name = socket.getfqdn(host)
+        with cls.__hostLock:
+            cls.__fqdns[host] = (time.time(), name)
+        return name
+
+    @classmethod
+    def clearHostCache(cls):
+        """ clears cached database host, port and fqdn host names
+        """
+        with cls.__hostLock:
+            cls.__fqdns.clear()
+            cls.__dbHostPort = None
+
+    @classmethod
+    def getShapeTypeUnit(cls, source, timeout=None):
         """ retrives shape type units for attribure
 
         :param source: string with device name and its attribute
         :type source: :obj:`str`
+        :param timeout: device call timeout in seconds
+        :type timeout: :obj:`float`
         :returns: (shape, data_type, units)
         :rtype: (:obj:`list` <:obj:`int`>, :obj:`str`, :obj:`str`)
         """
-        vl = None
-        shp = []
+        key = Utils.tostr(source).lower()
+        if cls.metadataTTL > 0:
+            with cls.__metadataLock:
+                item = cls.__metadata.get(key)
+            if item is not None and \
+                    time.time() - item[0] < cls.metadataTTL:
+                shp, dt, ut = item[1]
+                return (list(shp), dt, ut)
+        with Instrumentation.call(
+                key.rsplit("/", 1)[0], "get_config") as measurement:
+            ap = cls.attributeProxy(source)
+            if timeout:
+                ap.get_device_proxy().set_timeout_millis(
+                    int(timeout * 1000))
+            if cls.metadataTTL > 0 and cls.metadataEvents:
+                cls.__subscribeConfigEvents(key, ap)
+            shp, dt, ut = cls.__readShapeTypeUnit(ap)
+            measurement.add(shp)
+        if cls.metadataTTL > 0:
+            with cls.__metadataLock:
+                cls.__metadata[key] = (time.time(), (list(shp), dt, ut))
+        return (shp, dt, ut)
+
+    @classmethod
+    def __readShapeTypeUnit(cls, ap):
+        """ reads shape type units of attribure from the device
+
+        :param ap: attribute proxy
+        :type ap: :class:`tango.AttributeProxy`
+        :returns: (shape, data_type, units)
+        :rtype: (:obj:`list` <:obj:`int`>, :obj:`str`, :obj:`str`)
+        """
+        shp = None
         dt = 'float64'
         ut = 'No unit'
-        ap = tango.AttributeProxy(source)
-        da = None
         ac = None
 
         try:
             ac = ap.get_config()
             if ac.data_format != tango.AttrDataFormat.SCALAR:
-                da = ap.read()
-                vl = da.value
+                shp = cls.__readShape(ap, ac)
         except tango.DevFailed:
             pass
-            # if ac and ac.data_format != tango.AttrDataFormat.SCALAR \
-            #         and (da is None or not hasattr(da, 'dim_x')):
-            #     raise
 
-        if vl is not None:
-            shp = list(numpy.shape(vl))
-        elif da is not None:
-            if ac.data_format != tango.AttrDataFormat.SCALAR:
-                if da.dim_x and da.dim_x > 1:
-                    shp = [da.dim_y, da.dim_x] \
-                        if da.dim_y \
-                        else [da.dim_x]
-        elif ac is not None:
-            if ac.data_format != tango.AttrDataFormat.SCALAR:
+        if shp is None:
+            shp = []
+            if ac is not None and \
+                    ac.data_format != tango.AttrDataFormat.SCALAR:
                 if ac.max_dim_x and ac.max_dim_x > 1:
                     shp = [ac.max_dim_y, ac.max_dim_x] \
                         if ac.max_dim_y \
@@ -448,6 +689,125 @@ class TangoUtils(object):
             ut = ac.unit
         return (shp, dt, ut)
 
+    @classmethod
+    def __readShape(cls, ap, ac):
+        """ reads shape of spectrum or image attribure, i.e. from
+        the Shape attribute of Sardana channels, from max_dim_x/max_dim_y
+        of the configuration if configShapes is set or from dim_x/dim_y
+        of the reading. The reading is not extracted into python objects
+        but its value is still transferred from the device server
+
+        :param ap: attribute proxy
+        :type ap: :class:`tango.AttributeProxy`
+        :param ac: attribute configuration
+        :type ac: :class:`tango.AttributeInfoEx`
+        :returns: attribute shape
+        :rtype: :obj:`list` <:obj:`int`>
+        """
+        image = (ac.data_format == tango.AttrDataFormat.IMAGE)
+        if Utils.tostr(ap.name()).lower() == "value":
+            try:
+                dshp = ap.get_device_proxy().read_attribute("Shape").value
+                if dshp is not None:
+                    dshp = [int(dm) for dm in dshp]
+                    if image and len(dshp) == 2:
+                        return [dshp[1], dshp[0]]
+                    elif not image and len(dshp) == 1:
+                        return dshp
+            except (tango.DevFailed, TypeError, ValueError):
+                pass
+        if cls.configShapes and ac.max_dim_x and ac.max_dim_x > 1:
+            if not image:
+                return [ac.max_dim_x]
+            elif ac.max_dim_y:
+                return [ac.max_dim_y, ac.max_dim_x]
+        da = ap.read(extract_as=tango.ExtractAs.Nothing)
+        if image:
+            return [da.dim_y, da.dim_x] if da.dim_x and da.dim_y else []
+        return [da.dim_x] if da.dim_x else []
+
+    @classmethod
+    def __subscribeConfigEvents(cls, key, ap):
+        """ subscribes attribute configuration change events
+        which invalidate the cached attribute metadata
+
+        :param key: metadata cache key
+        :type key: :obj:`str`
+        :param ap: attribute proxy
+        :type ap: :class:`tango.AttributeProxy`
+        """
+        with cls.__metadataLock:
+            if key in cls.__subscriptions:
+                return
+            cls.__subscriptions[key] = (None, None)
+        armed = []
+
+        def configChanged(event):
+            if armed:
+                cls.invalidateMetadata(key)
+
+        try:
+            eid = ap.subscribe_event(
+                tango.EventType.ATTR_CONF_EVENT, configChanged)
+            armed.append(True)
+            with cls.__metadataLock:
+                cls.__subscriptions[key] = (ap, eid)
+        except Exception:
+            pass
+
+    @classmethod
+    def invalidateMetadata(cls, source):
+        """ removes cached metadata of the given attribute
+
+        :param source: string with device name and its attribute
+        :type source: :obj:`str`
+        """
+        with cls.__metadataLock:
+            cls.__metadata.pop(Utils.tostr(source).lower(), None)
+
+    @classmethod
+    def clearMetadata(cls):
+        """ removes all cached attribute metadata and unsubscribes
+        attribute configuration change events
+        """
+        with cls.__metadataLock:
+            subscriptions = list(cls.__subscriptions.values())
+            cls.__subscriptions.clear()
+            cls.__metadata.clear()
+        for ap, eid in subscriptions:
+            if ap is not None:
+                try:
+                    ap.unsubscribe_event(eid)
+                except Exception:
+                    pass
+
+    @classmethod
+    def getShapeTypeUnits(cls, sources, numberOfThreads=20, timeout=None,
+                          errors=None):
+        """ retrives shape type units for attribures concurrently
+
+        :brief: Waiting for all sources is limited to the device call
+                timeout for every round of numberOfThreads sources
+        :param sources: list of strings with device names and attributes
+        :type sources: :obj:`list` <:obj:`str`>
+        :param numberOfThreads: maximal number of threads
+        :type numberOfThreads: :obj:`int`
+        :param timeout: device call timeout in seconds
+        :type timeout: :obj:`float`
+        :param errors: dictionary filled with exceptions of failed sources
+        :type errors: :obj:`dict` <:obj:`str`, :class:`Exception`>
+        :returns: dictionary with (shape, data_type, units) of sources
+                  which could be read
+        :rtype: :obj:`dict` <:obj:`str`, (:obj:`list` <:obj:`int`>, \
+                :obj:`str`, :obj:`str`)>
+        """
+        sources = set(sources)
+        return Utils.parallelCall(
+            lambda source: cls.getShapeTypeUnit(source, timeout),
+            sources, numberOfThreads,
+            Utils.roundsTimeout(len(sources), numberOfThreads, timeout),
+            errors)
+
     @classmethod
     def command(cls, server, command, *var):
         """ executes command on server on python package
@@ -462,18 +822,240 @@ class TangoUtils(object):
         :returns: command result
         :rtype: `any`
         """
-        if not hasattr(server, "command_inout"):
-            return getattr(server, command)(*var)
-        elif var is None:
-            return server.command_inout(command)
-        else:
-            return server.command_inout(command, *var)
+        with Instrumentation.call(server, command) as measurement:
+            measurement.add(var)
+            if not hasattr(server, "command_inout"):
+                res = getattr(server, command)(*var)
+            elif var is None:
+                res = server.command_inout(command)
+            else:
+                res = server.command_inout(command, *var)
+            measurement.add(res)
+        return res
+
+
+class MSEnvSession(object):
+
+    """ MacroServer Environment session
+
+    It reads and unpickles the Environment attribute once, serves
+    variable lookups from memory, accumulates changes and writes
+    them back to the MacroServer with a single Environment write.
+    """
+
+    def __init__(self, ms):
+        """ constructor
+
+        :param ms: macroserver device name
+        :type ms: :obj:`str`
+        """
+        #: (:obj:`str`) macroserver device name
+        self.macroServer = ms
+        #: (:class:`tango.DeviceProxy`) macroserver proxy
+        self.__proxy = None
+        #: (:obj:`dict` <:obj:`str` , `any`>) unpickled environment
+        #:     or None if it has not been read yet
+        self.__env = None
+        #: (:obj:`dict` <:obj:`str` , `any`>) variables to set
+        self.__new = {}
+        #: (:obj:`list` <:obj:`str`>) variables to remove
+        self.__del = []
+        #: (:obj:`int`) number of nested session users
+        self.level = 0
+
+    def __getProxy(self):
+        """ provides macroserver proxy opened once per session
+
+        :returns: macroserver proxy
+        :rtype: :class:`tango.DeviceProxy`
+        """
+        if self.__proxy is None:
+            self.__proxy = TangoUtils.openProxy(self.macroServer)
+        return self.__proxy
+
+    def environment(self):
+        """ provides environment dictionary with pending changes
+
+        :returns: unpickled environment or None if it is not pickled
+        :rtype: :obj:`dict` <:obj:`str` , `any`>
+        """
+        if self.__env is None:
+            if PYTG_BUG_213:
+                raise OldTangoError(
+                    "Reading Encoded Attributes not supported "
+                    "in tango < 9.2.5")
+            with Instrumentation.call(
+                    self.macroServer, "read Environment") as measurement:
+                rec = self.__getProxy().Environment
+                measurement.add(rec)
+            if rec[0] == 'pickle':
+                self.__env = Utils.pickleloads(rec[1])
+            else:
+                self.__env = False
+        if self.__env is False:
+            return None
+        if not self.__new and not self.__del:
+            return self.__env
+        dc = dict(self.__env)
+        variables = dict(dc.get('new', {}))
+        for var in self.__del:
+            variables.pop(var, None)
+        variables.update(self.__new)
+        dc['new'] = variables
+        return dc
+
+    def getEnv(self, var):
+        """ provides environment variable value
+
+        :param var: variable name
+        :type var: :obj:`str`
+        :returns: environment variable value
+        :rtype: `any`
+        """
+        if var in self.__new:
+            return self.__new[var]
+        if var in self.__del:
+            return ""
+        dc = self.environment()
+        if dc and 'new' in dc.keys() and var in dc['new'].keys():
+            return dc['new'][var]
+        return ""
+
+    def writeEnv(self, value):
+        """ accumulates environment changes
+
+        :param value: environment change dictionary with 'new'
+                      and 'del' keys
+        :type value: :obj:`dict` <:obj:`str` , `any`>
+        """
+        for var, vl in value.get('new', {}).items():
+            if var in self.__del:
+                self.__del.remove(var)
+            self.__new[var] = vl
+        for var in value.get('del', []):
+            self.__new.pop(var, None)
+            if var not in self.__del:
+                self.__del.append(var)
+
+    def flush(self):
+        """ writes accumulated changes with one Environment write
+        """
+        if not self.__new and not self.__del:
+            return
+        dc = {}
+        if self.__new:
+            dc['new'] = self.__new
+        if self.__del:
+            dc['del'] = self.__del
+        if self.__env:
+            self.__env = self.environment()
+        self.__new = {}
+        self.__del = []
+        MSUtils.writeEnvAttr(dc, self.__getProxy())
+
+    def __enter__(self):
+        """ registers the session for the current thread
+
+        :returns: the active session for the macroserver
+        :rtype: :class:`MSEnvSession`
+        """
+        if not self.macroServer:
+            return self
+        session = MSUtils.activeSession(self.macroServer)
+        if session is None:
+            MSUtils.registerSession(self)
+            session = self
+        session.level += 1
+        return session
+
+    def __exit__(self, etype, evalue, tb):
+        """ flushes the changes and unregisters the outermost session
+
+        :param etype: exception type
+        :type etype: :obj:`type`
+        :param evalue: exception value
+        :type evalue: :obj:`Exception`
+        :param tb: traceback
+        :type tb: :obj:`traceback`
+        """
+        session = MSUtils.activeSession(self.macroServer)
+        if session is None:
+            return
+        session.level -= 1
+        if session.level <= 0:
+            MSUtils.unregisterSession(session)
+            session.flush()
 
 
 class MSUtils(object):
 
     """  MacroServer Utilities """
 
+    #: (:class:`threading.local`) active environment sessions
+    __local = threading.local()
+
+    @classmethod
+    def activeSession(cls, ms):
+        """ provides environment session active in the current thread
+
+        :param ms: macroserver
+        :type ms: :obj:`str`
+        :returns: active session or None
+        :rtype: :class:`MSEnvSession`
+        """
+        sessions = getattr(cls.__local, "sessions", None)
+        if not sessions or not ms:
+            return None
+        return sessions.get(ms)
+
+    @classmethod
+    def registerSession(cls, session):
+        """ registers environment session for the current thread
+
+        :param session: environment session
+        :type session: :class:`MSEnvSession`
+        """
+        if not hasattr(cls.__local, "sessions"):
+            cls.__local.sessions = {}
+        cls.__local.sessions[session.macroServer] = session
+
+    @classmethod
+    def unregisterSession(cls, session):
+        """ unregisters environment session for the current thread
+
+        :param session: environment session
+        :type session: :class:`MSEnvSession`
+        """
+        sessions = getattr(cls.__local, "sessions", {})
+        if sessions.get(session.macroServer) is session:
+            sessions.pop(session.macroServer)
+
+    @classmethod
+    def envSession(cls, ms):
+        """ creates environment session, i.e. to be used
+        in the `with` statement around one command
+
+        :param ms: macroserver
+        :type ms: :obj:`str`
+        :returns: environment session
+        :rtype: :class:`MSEnvSession`
+        """
+        return MSEnvSession(ms)
+
+    @classmethod
+    def getEnvironment(cls, ms):
+        """ provides unpickled environment
+
+        :param ms: macroserver
+        :type ms: :obj:`str`
+        :returns: environment dictionary or None if it is not pickled
+        :rtype: :obj:`dict` <:obj:`str` , `any`>
+        """
+        session = cls.activeSession(ms)
+        if session is not None:
+            return session.environment()
+        return MSEnvSession(ms).environment()
+
     @classmethod
     def getEnv(cls, var, ms):
         """ provides environment variable value
@@ -485,18 +1067,28 @@ class MSUtils(object):
         :returns: environment variable value
         :rtype: `any`
         """
-        active = ""
-        dp = TangoUtils.openProxy(ms)
-        if PYTG_BUG_213:
-            raise OldTangoError(
-                "Reading Encoded Attributes not supported in tango < 9.2.5")
-        rec = dp.Environment
-        if rec[0] == 'pickle':
-            dc = Utils.pickleloads(rec[1])
-            if 'new' in dc.keys() and \
-                    var in dc['new'].keys():
-                active = dc['new'][var]
-        return active
+        session = cls.activeSession(ms)
+        if session is not None:
+            return session.getEnv(var)
+        return MSEnvSession(ms).getEnv(var)
+
+    @classmethod
+    def writeEnv(cls, value, ms):
+        """ writes environment changes or accumulates them
+        in the active session
+
+        :param value: environment change dictionary with 'new'
+                      and 'del' keys
+        :type value: :obj:`dict` <:obj:`str` , `any`>
+        :param ms: macroserver
+        :type ms: :obj:`str`
+        """
+        session = cls.activeSession(ms)
+        if session is not None:
+            session.writeEnv(value)
+        else:
+            dp = TangoUtils.openProxy(ms)
+            MSUtils.writeEnvAttr(value, dp)
 
     @classmethod
     def setEnv(cls, var, value, ms):
@@ -509,10 +1101,9 @@ class MSUtils(object):
         :param ms: macroserver
         :type ms: :obj:`str`
         """
-        dp = TangoUtils.openProxy(ms)
         dc = {'new': {}}
         dc['new'][var] = value
-        MSUtils.writeEnvAttr(dc, dp)
+        cls.writeEnv(dc, ms)
 
     @classmethod
     def setEnvs(cls, varvalues, ms):
@@ -523,11 +1114,10 @@ class MSUtils(object):
         :param ms: macroserver
         :type ms: :obj:`str`
         """
-        dp = TangoUtils.openProxy(ms)
         dc = {'new': {}}
         for var, value in varvalues.items():
             dc['new'][var] = value
-        MSUtils.writeEnvAttr(dc, dp)
+        cls.writeEnv(dc, ms)
 
     @classmethod
     def usetEnv(cls, var, ms):
@@ -538,9 +1128,8 @@ class MSUtils(object):
         :param ms: macroserver
         :type ms: :obj:`str`
         """
-        dp = TangoUtils.openProxy(ms)
         dc = {'del': [var]}
-        MSUtils.writeEnvAttr(dc, dp)
+        cls.writeEnv(dc, ms)
 
     @classmethod
     def getMacroServer(cls, db, door, find=True):
@@ -569,7 +1158,7 @@ class MSUtils(object):
                 mserver = "%s/%s" % (hostname, Utils.tostr(server))
             else:
                 mserver = Utils.tostr(server)
-            dp = tango.DeviceProxy(Utils.tostr(mserver))
+            dp = TangoUtils.deviceProxy(Utils.tostr(mserver))
             if hasattr(dp, "DoorList"):
                 mss.append(mserver)
             if hasattr(dp, "DoorList") and dp.DoorList:
@@ -596,7 +1185,7 @@ class MSUtils(object):
                 "Writing Encoded Attributes not supported in tango < 9.2.5")
         try:
             pk = pickle.dumps(value, protocol=2)
-            dp.Environment = ['pickle', pk]
+            cls.__writeEnvironment(dp, pk)
         except Exception:
             if sys.version_info < (3,):
                 raise
@@ -616,6 +1205,19 @@ class MSUtils(object):
             else:
                 newvalue = value
             pk = pickle.dumps(newvalue, protocol=2)
+            cls.__writeEnvironment(dp, pk)
+
+    @classmethod
+    def __writeEnvironment(cls, dp, pk):
+        """ writes pickled environment to the macroserver
+
+        :param dp: macroserver proxy
+        :type dp: :class:`tango.DeviceProxy`
+        :param pk: pickled environment
+        :type pk: :obj:`bytes`
+        """
+        with Instrumentation.call(dp, "write Environment") as measurement:
+            measurement.add(pk)
             dp.Environment = ['pickle', pk]
 
 
@@ -623,6 +1225,27 @@ class PoolUtils(object):
 
     """  Pool Utilities """
 
+    @classmethod
+    def readList(cls, pool, listattr, optional=False):
+        """ reads pool list attribute
+
+        :param pool: pool device
+        :type pool: :class:`tango.DeviceProxy`
+        :param listattr: pool attribute with list
+        :type listattr: :obj:`str`
+        :param optional: if True missing attribute gives an empty list
+        :type optional: :obj:`bool`
+        :returns: JSON descriptions of pool elements
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        with Instrumentation.call(pool, "read " + listattr) as measurement:
+            if optional:
+                ellist = getattr(pool, listattr, None)
+            else:
+                ellist = getattr(pool, listattr)
+            measurement.add(ellist)
+        return list(ellist or [])
+
     @classmethod
     def getDeviceControllers(cls, pools, devices=None):
         """ provides device controller full names
@@ -636,8 +1259,7 @@ class PoolUtils(object):
         """
         lst = []
         for pool in pools:
-            if pool.ExpChannelList:
-                lst += pool.ExpChannelList
+            lst += cls.readList(pool, 'ExpChannelList')
         ctrls = {}
         for elm in lst:
             chan = json.loads(elm)
@@ -658,8 +1280,7 @@ class PoolUtils(object):
         """
         lst = []
         for pool in pools:
-            if pool.ExpChannelList:
-                lst += pool.ExpChannelList
+            lst += cls.readList(pool, 'ExpChannelList')
         srs = {}
         for elm in lst:
             chan = json.loads(elm)
@@ -683,10 +1304,7 @@ class PoolUtils(object):
         lst = []
         elements = []
         for pool in pools:
-            if hasattr(pool, listattr):
-                ellist = getattr(pool, listattr)
-                if ellist:
-                    lst += ellist
+            lst += cls.readList(pool, listattr, optional=True)
         for elm in lst:
             if elm:
                 chan = json.loads(elm)
@@ -710,8 +1328,7 @@ class PoolUtils(object):
         """
         lst = []
         for pool in pools:
-            if pool.AcqChannelList:
-                lst += pool.AcqChannelList
+            lst += cls.readList(pool, 'AcqChannelList')
         argout = {}
         for elm in lst:
             chan = json.loads(elm)
@@ -733,8 +1350,7 @@ class PoolUtils(object):
         """
         lst = []
         for pool in pools:
-            if pool.AcqChannelList:
-                lst += pool.AcqChannelList
+            lst += cls.readList(pool, 'AcqChannelList')
         argout = {}
         for elm in lst:
             chan = json.loads(elm)
@@ -757,8 +1373,7 @@ class PoolUtils(object):
         """
         lst = []
         for pool in pools:
-            if pool.MeasurementGroupList:
-                lst += pool.MeasurementGroupList
+            lst += cls.readList(pool, 'MeasurementGroupList')
         argout = ""
         for elm in lst:
             chan = json.loads(elm)
@@ -780,8 +1395,7 @@ class PoolUtils(object):
         """
         lst = []
         for pool in pools:
-            if pool.MotorList:
-                lst += pool.MotorList
+            lst += cls.readList(pool, 'MotorList')
         argout = []
         for elm in lst:
             chan = json.loads(elm)
@@ -810,8 +1424,7 @@ class PoolUtils(object):
         lst = []
         res = []
         for pool in pools:
-            if pool.ExpChannelList:
-                lst += pool.ExpChannelList
+            lst += cls.readList(pool, 'ExpChannelList')
 
         if not filters or not hasattr(filters, '__iter__'):
             filters = ["*dgg*", "*/timer/*", "*/ctctrl0*"]
@@ -845,8 +1458,7 @@ class PoolUtils(object):
         if lst is None:
             lst = []
             for pool in pools:
-                if pool.AcqChannelList:
-                    lst += pool.AcqChannelList
+                lst += cls.readList(pool, 'AcqChannelList')
 
         if filters is None or not hasattr(filters, '__iter__'):
             filters = ["*"]
@@ -897,21 +1509,25 @@ class PoolUtils(object):
         return res
 
     @classmethod
-    def getSource(cls, name):
+    def getSource(cls, name, timeout=None):
         """ provides datasource from pool device
 
         :param name: pool device name
         :type name:  :obj:`str`
+        :param timeout: device call timeout in seconds
+        :type timeout: :obj:`float`
         :returns: source of pool device
         :rtype:  :obj:`str`
         """
         source = None
         try:
-            dp = tango.DeviceProxy(Utils.tostr(name))
+            dp = TangoUtils.deviceProxy(Utils.tostr(name))
+            if timeout:
+                dp.set_timeout_millis(int(timeout * 1000))
             if hasattr(dp, 'DataSource'):
                 ds = dp.DataSource
                 sds = ds.split("://")
-                ap = tango.AttributeProxy(sds[-1])
+                ap = TangoUtils.attributeProxy(sds[-1])
                 if ap is None:
                     raise Exception("Empty proxy")
                 source = sds[-1]
@@ -1097,6 +1097,95 @@ class DynamicComponentTest(unittest.TestCase):
 
         self.myAssertRaise(Exception, dc.remove, "sdfsdf")
 
+    # reuse test
+    # \brief It tests reuse of components created from the same inputs
+    def test_create_reuse(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        dname = "__dynamic_component__"
+        dc = DynamicComponent(self._cf.dp)
+        dc.reuse = True
+        ihash = dc.inputHash()
+
+        cpname = dc.create()
+        self.assertEqual(cpname, dname)
+        self.assertTrue(ihash in self._cf.dp.Components([cpname])[0])
+
+        cpname = dc.create()
+        self.assertEqual(cpname, dname)
+
+        dc.setStepDSources(["ann"])
+        self.assertTrue(ihash != dc.inputHash())
+        cpname = dc.create()
+        self.assertEqual(cpname, dname + "x")
+
+        dc2 = DynamicComponent(self._cf.dp)
+        dc2.reuse = True
+        dc2.setStepDSources(["ann"])
+        cpname = dc2.create()
+        self.assertEqual(cpname, dname + "x")
+
+        dc2.reuse = False
+        cpname = dc2.create()
+        self.assertEqual(cpname, dname + "xx")
+
+        dc.remove(dname + "xx")
+        dc.remove(dname + "x")
+        dc.remove(dname)
+
+    # remove test
+    # \brief It tests removing of many dynamic components
+    def test_removeComponents(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        dname = "__dynamic_component__"
+        dc = DynamicComponent(self._cf.dp)
+        self.assertEqual(dc.removeComponents([dname]), [])
+
+        cpnames = [dc.create() for _ in range(3)]
+        self.assertEqual(cpnames, [dname, dname + "x", dname + "xx"])
+        self.assertEqual(
+            dc.removeComponents([dname + "xx", "mycp", dname + "xxx", dname]),
+            [dname + "xx", dname])
+        self.assertEqual(self._cf.dp.Components([dname]), [])
+        self.assertEqual(self._cf.dp.Components([dname + "xx"]), [])
+        self.assertEqual(len(self._cf.dp.Components([dname + "x"])), 1)
+        dc.remove(dname + "x")
+
+    # remove test
+    # \brief It tests removing of stale dynamic components
+    def test_removeStaleComponents(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        dname = "__dynamic_component__"
+        dc = DynamicComponent(self._cf.dp)
+        self.assertEqual(dc.staleComponents(0), [])
+
+        self.assertEqual(dc.create(), dname)
+        self.assertTrue(
+            "created:" not in self._cf.dp.Components([dname])[0])
+        dc.stampTime = True
+        dc.reuse = True
+        self.assertEqual(dc.create(), dname + "x")
+        xml = self._cf.dp.Components([dname + "x"])[0]
+        self.assertTrue("<!-- created: " in xml)
+        self.assertEqual(dc.staleComponents(1000), [])
+        time.sleep(0.01)
+        self.assertEqual(dc.staleComponents(0.001), [dname + "x"])
+
+        # reused components get the new creation time
+        self.assertEqual(dc.create(), dname + "x")
+        self.assertTrue(xml != self._cf.dp.Components([dname + "x"])[0])
+
+        # stale components are found without the creator
+        time.sleep(0.01)
+        dc2 = DynamicComponent(self._cf.dp)
+        self.assertEqual(dc2.removeStaleComponents(0.001), [dname + "x"])
+        self.assertEqual(self._cf.dp.Components([dname + "x"]), [])
+        self.assertEqual(len(self._cf.dp.Components([dname])), 1)
+        self.assertEqual(dc2.removeStaleComponents(0.001), [])
+        dc.remove(dname)
+
     # constructor test
     # \brief It tests default settings
     def test_create_dict(self):
@@ -1141,18 +1230,6 @@ class DynamicComponentTest(unittest.TestCase):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
@@ -1162,9 +1239,10 @@ class DynamicComponentTest(unittest.TestCase):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -1181,36 +1259,12 @@ class DynamicComponentTest(unittest.TestCase):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -1220,9 +1274,12 @@ class DynamicComponentTest(unittest.TestCase):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds3" name="ds3"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -1959,17 +2016,6 @@ class DynamicComponentTest(unittest.TestCase):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -1980,6 +2026,8 @@ class DynamicComponentTest(unittest.TestCase):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -1997,34 +2045,12 @@ class DynamicComponentTest(unittest.TestCase):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -2035,6 +2061,10 @@ class DynamicComponentTest(unittest.TestCase):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -2099,17 +2129,6 @@ class DynamicComponentTest(unittest.TestCase):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -2120,6 +2139,8 @@ class DynamicComponentTest(unittest.TestCase):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -2137,34 +2158,12 @@ class DynamicComponentTest(unittest.TestCase):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -2175,6 +2174,10 @@ class DynamicComponentTest(unittest.TestCase):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
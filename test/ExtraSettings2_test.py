@@ -24,6 +24,7 @@ import os
 import sys
 import struct
 import json
+import time
 import lxml
 import xml.etree.ElementTree as et
 from lxml.etree import XMLParser
@@ -45,6 +46,10 @@ try:
     import TestMGSetUp
 except Exception:
     from . import TestMGSetUp
+try:
+    import TestConfigServerSetUp
+except Exception:
+    from . import TestConfigServerSetUp
 try:
     import Settings2_test
 except Exception:
@@ -4448,6 +4453,78 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
 
         self.myAssertRaise(Exception, rs.removeDynamicComponent, "sdfsdf")
 
+    # clean test
+    # \brief It tests cleaning of stale dynamic components
+    def test_cleanDynamicComponents(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        val = {"ConfigDevice": self._cf.dp.name(),
+               "WriterDevice": self._wr.dp.name(),
+               "Door": 'doortestp09/testts/t1r228',
+               "MntGrp": 'nxsmntgrp'}
+        cf2 = TestConfigServerSetUp.TestConfigServerSetUp(
+            "configservertestp09/testts/t2r228", "CONFIGSERVERTESTS2")
+        cf2.setUp()
+        try:
+            rs = self.openRecSelector()
+            rs.configDevice = val["ConfigDevice"]
+            rs.door = val["Door"]
+            rs.mntGrp = val["MntGrp"]
+            dname = "__dynamic_component__"
+
+            self.assertEqual(rs.cleanDynamicComponents(), [])
+            rs.dynamicComponentMaxAge = 1000
+            cpnames = [rs.createDynamicComponent([]) for _ in range(3)]
+            self.assertEqual(cpnames, [dname, dname + "x", dname + "xx"])
+            self.assertEqual(rs.cleanDynamicComponents(), [])
+            self.assertEqual(
+                len(self._cf.dp.Components(cpnames)), 3)
+
+            # components without creation time are not removed
+            rs.removeDynamicComponent(dname + "x")
+            self._cf.dp.XMLString = "<definition/>"
+            self._cf.dp.StoreComponent(dname + "x")
+
+            rs.configDevice = cf2.dp.name()
+            cpname2 = rs.createDynamicComponent([])
+            self.assertEqual(cpname2, dname)
+
+            time.sleep(0.01)
+            rs.dynamicComponentMaxAge = 0.001
+            rs.configDevice = val["ConfigDevice"]
+            self.assertEqual(
+                sorted(rs.cleanDynamicComponents()),
+                [dname, dname + "xx"])
+            self.assertEqual(self._cf.dp.Components([dname]), [])
+            self.assertEqual(self._cf.dp.Components([dname + "xx"]), [])
+            self.assertEqual(
+                self._cf.dp.Components([dname + "x"]), ["<definition/>"])
+            self.assertEqual(len(cf2.dp.Components([dname])), 1)
+            self.assertEqual(rs.cleanDynamicComponents(), [])
+
+            rs.dynamicComponentCleanInterval = 0.1
+            cnt = 0
+            while cf2.dp.Components([dname]) and cnt < 100:
+                time.sleep(0.1)
+                cnt += 1
+            rs.dynamicComponentCleanInterval = 0
+            self.assertEqual(cf2.dp.Components([dname]), [])
+            self.assertEqual(
+                self._cf.dp.Components([dname + "x"]), ["<definition/>"])
+
+            # components left before a restart are removed
+            rs.dynamicComponentMaxAge = 1000
+            self.assertEqual(rs.createDynamicComponent([]), dname)
+            time.sleep(0.01)
+            rs2 = self.openRecSelector()
+            rs2.configDevice = val["ConfigDevice"]
+            rs2.dynamicComponentMaxAge = 0.001
+            self.assertEqual(rs2.cleanDynamicComponents(), [dname])
+            self.assertEqual(self._cf.dp.Components([dname]), [])
+            self._cf.dp.DeleteComponent(dname + "x")
+        finally:
+            cf2.tearDown()
+
     # constructor test
     # \brief It tests default settings
     def test_create_dict(self):
@@ -4500,18 +4577,6 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
@@ -4521,9 +4586,10 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -4540,36 +4606,12 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -4579,9 +4621,12 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds3" name="ds3"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -5371,17 +5416,6 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -5392,6 +5426,8 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5409,34 +5445,12 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -5447,6 +5461,10 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5518,17 +5536,6 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -5539,6 +5546,8 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5556,34 +5565,12 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -5594,6 +5581,10 @@ class ExtraSettings2Test(Settings2_test.Settings2Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -4601,18 +4601,6 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
@@ -4622,9 +4610,10 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -4641,36 +4630,12 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -4680,9 +4645,12 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds3" name="ds3"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -5472,17 +5440,6 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -5493,6 +5450,8 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5510,34 +5469,12 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -5548,6 +5485,10 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5619,17 +5560,6 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -5640,6 +5570,8 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5657,34 +5589,12 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -5695,6 +5605,10 @@ class ExtraSettings3Test(Settings3_test.Settings3Test):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -4536,18 +4536,6 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
@@ -4557,9 +4545,10 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -4576,36 +4565,12 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -4615,9 +4580,12 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '      </group>\n'
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
-            '      <link '
-            'target="/$var.entryname#\'scan\'$var.serialno:NXentry/'
-            'NXinstrument/collection/ds3" name="ds3"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
             '</definition>\n',
@@ -5415,17 +5383,6 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -5436,6 +5393,8 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5453,34 +5412,12 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -5491,6 +5428,10 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5562,17 +5503,6 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '            <record name="d1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="d2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="d2" type="CLIENT">\n'
@@ -5583,6 +5513,8 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/d1" name="d1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/d2" name="d2"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -5600,34 +5532,12 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '            <record name="ds1"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds2">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds2" type="CLIENT">\n'
             '            <record name="ds2"/>\n'
             '          </datasource>\n'
             '        </field>\n'
-            '      </group>\n'
-            '    </group>\n'
-            '    <group type="NXdata" name="data">\n'
-            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
-            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
-            '    </group>\n'
-            '  </group>\n'
-            '  <group type="NXentry" '
-            'name="$var.entryname#\'scan\'$var.serialno">\n'
-            '    <group type="NXinstrument" name="instrument">\n'
-            '      <group type="NXcollection" name="collection">\n'
             '        <field type="NX_CHAR" name="ds3">\n'
             '          <strategy mode="STEP"/>\n'
             '          <datasource name="ds3" type="CLIENT">\n'
@@ -5638,6 +5548,10 @@ class ExtraSettingsTest(Settings_test.SettingsTest):
             '    </group>\n'
             '    <group type="NXdata" name="data">\n'
             '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds1" name="ds1"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
+            'NXentry/NXinstrument/collection/ds2" name="ds2"/>\n'
+            '      <link target="/$var.entryname#\'scan\'$var.serialno:'
             'NXentry/NXinstrument/collection/ds3" name="ds3"/>\n'
             '    </group>\n'
             '  </group>\n'
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file InstrumentationTest.py
+# unittests for Instrumentation
+#
+import unittest
+import sys
+import json
+
+from nxsrecconfig.Instrumentation import Instrumentation, NOMEASUREMENT
+from nxsrecconfig.Utils import Utils, TangoUtils, PoolUtils
+
+
+# configuration server stand-in
+class ConfigServer(object):
+
+    def dev_name(self):
+        return "p09/nxsconfigserver/1"
+
+    def components(self, names):
+        return ["<definition/>" for _ in names]
+
+
+# pool stand-in
+class Pool(object):
+
+    def __init__(self):
+        self.ExpChannelList = [json.dumps({"name": "ct01"})]
+
+    def dev_name(self):
+        return "p09/pool/1"
+
+
+# test fixture
+class InstrumentationTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        Instrumentation.reset()
+        Instrumentation.enabled = True
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+        Instrumentation.enabled = False
+        Instrumentation.reset()
+
+    # disabled test
+    # \brief It tests if disabled instrumentation records nothing
+    def test_disabled(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        Instrumentation.enabled = False
+        self.assertTrue(Instrumentation.command("UpdateMntGrp")
+                        is NOMEASUREMENT)
+        self.assertTrue(Instrumentation.call("pool", "read")
+                        is NOMEASUREMENT)
+        with Instrumentation.command("UpdateMntGrp"):
+            TangoUtils.command(ConfigServer(), "components", ["cp1"])
+        stats = Instrumentation.stats()
+        self.assertEqual(stats["enabled"], False)
+        self.assertEqual(stats["commands"], {})
+
+    # command test
+    # \brief It tests aggregation of commands and their remote calls
+    def test_command(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = ConfigServer()
+        pool = Pool()
+        stage = Instrumentation.stager()
+        for _ in range(2):
+            with Instrumentation.command("UpdateMntGrp"):
+                stage("configuration")
+                TangoUtils.command(server, "components", ["cp1", "cp2"])
+                stage("mntgrp")
+                PoolUtils.getElementNames([pool], "ExpChannelList")
+                self.assertEqual(
+                    PoolUtils.readList(pool, "MotorList", optional=True),
+                    [])
+        with Instrumentation.call("xml", "parse") as measurement:
+            measurement.add("<definition/>")
+
+        stats = json.loads(json.dumps(Instrumentation.stats()))
+        self.assertEqual(stats["enabled"], True)
+        self.assertEqual(sorted(stats["commands"].keys()),
+                         ["", "UpdateMntGrp"])
+        cmd = stats["commands"]["UpdateMntGrp"]
+        self.assertEqual(cmd["count"], 2)
+        self.assertTrue(cmd["time"] >= cmd["max"] >= 0)
+        calls = dict(((cl["target"], cl["operation"], cl["stage"]), cl)
+                     for cl in cmd["calls"])
+        self.assertEqual(
+            sorted(calls.keys()),
+            [("p09/nxsconfigserver/1", "components", "configuration"),
+             ("p09/pool/1", "read ExpChannelList", "mntgrp"),
+             ("p09/pool/1", "read MotorList", "mntgrp")])
+        call = calls[("p09/nxsconfigserver/1", "components",
+                      "configuration")]
+        self.assertEqual(call["count"], 2)
+        self.assertEqual(call["errors"], 0)
+        self.assertEqual(call["bytes"], 2 * (6 + 2 * 13))
+        call = calls[("p09/pool/1", "read ExpChannelList", "mntgrp")]
+        self.assertEqual(call["bytes"], 2 * len(pool.ExpChannelList[0]))
+
+        other = stats["commands"][""]
+        self.assertEqual(other["count"], 0)
+        self.assertEqual(other["calls"][0]["bytes"], 13)
+
+        Instrumentation.reset()
+        self.assertEqual(Instrumentation.stats()["commands"], {})
+
+    # worker thread test
+    # \brief It tests if remote calls of worker threads and failures
+    #    are recorded in their command
+    def test_parallelCall(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = ConfigServer()
+
+        def fetch(name):
+            if name == "cp3":
+                with Instrumentation.call(server, "components"):
+                    raise Exception("cannot fetch")
+            return TangoUtils.command(server, "components", [name])
+
+        with Instrumentation.command("PreselectComponents"):
+            Instrumentation.stage("check")
+            res = Utils.parallelCall(fetch, ["cp1", "cp2", "cp3"], 2)
+        self.assertEqual(sorted(res.keys()), ["cp1", "cp2"])
+
+        stats = Instrumentation.stats()
+        self.assertEqual(list(stats["commands"].keys()),
+                         ["PreselectComponents"])
+        cmd = stats["commands"]["PreselectComponents"]
+        self.assertEqual(cmd["count"], 1)
+        self.assertEqual(len(cmd["calls"]), 1)
+        call = cmd["calls"][0]
+        self.assertEqual(call["stage"], "check")
+        self.assertEqual(call["count"], 3)
+        self.assertEqual(call["errors"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file JobManagerTest.py
+# unittests for JobManager
+#
+import unittest
+import sys
+import threading
+
+from nxsrecconfig.JobManager import JobManager
+
+
+# test fixture
+class JobManagerTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # job test
+    # \brief It tests job execution, stages and results
+    def test_submit(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        finished = []
+        done = threading.Event()
+        release = threading.Event()
+
+        def callback(job):
+            finished.append(job.id)
+            done.set()
+
+        def update(job):
+            job.stage("configuration")
+            release.wait(5)
+            job.stage("mntgrp")
+            return "{}"
+
+        jm = JobManager(callback=callback)
+        jid = jm.submit("UpdateMntGrp", update, ["configuration", "mntgrp"])
+        self.assertEqual(jm.pending(), 1)
+        self.assertRaises(Exception, jm.result, jid)
+        status = jm.status(jid)
+        self.assertEqual(status["name"], "UpdateMntGrp")
+        self.assertTrue(status["status"] in ["QUEUED", "RUNNING"])
+        self.assertTrue(status["progress"] < 1)
+
+        release.set()
+        self.assertTrue(done.wait(5))
+        self.assertEqual(finished, [jid])
+        self.assertEqual(jm.pending(), 0)
+        self.assertEqual(jm.result(jid), "{}")
+        status = jm.status(jid)
+        self.assertEqual(status["status"], "DONE")
+        self.assertEqual(status["progress"], 1.0)
+        self.assertEqual([st["name"] for st in status["stages"]],
+                         ["configuration", "mntgrp"])
+        for st in status["stages"]:
+            self.assertTrue(st["duration"] >= 0)
+        self.assertEqual([jb["id"] for jb in jm.jobs()], [jid])
+        self.assertRaises(Exception, jm.status, "unknown")
+
+    # failed job test
+    # \brief It tests failed jobs and removal of finished jobs
+    def test_submit_failed(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        done = threading.Event()
+
+        def fail(job):
+            raise ValueError("Door is RUNNING")
+
+        jm = JobManager(maxjobs=2, callback=lambda job: done.set())
+        jids = []
+        for _ in range(4):
+            done.clear()
+            jids.append(jm.submit("UpdateProfile", fail))
+            self.assertTrue(done.wait(5))
+        status = jm.status(jids[-1])
+        self.assertEqual(status["status"], "FAILED")
+        self.assertEqual(status["error"], "Door is RUNNING")
+        self.assertRaises(Exception, jm.result, jids[-1])
+        self.assertEqual(len(jm.jobs()), 3)
+        self.assertRaises(Exception, jm.status, jids[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file MntGrpConfTest.py
+# unittests for MntGrpConf
+#
+import unittest
+import sys
+import json
+import copy
+
+from nxsrecconfig.MntGrpConf import MntGrpConf
+
+
+# test fixture
+class MntGrpConfTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        self._channel = {
+            "_controller_name": "ctctrl01",
+            "_unit_id": "0",
+            "conditioning": "",
+            "data_type": "float64",
+            "data_units": "No unit",
+            "enabled": True,
+            "full_name": "expchan/ctctrl01/1",
+            "index": 0,
+            "instrument": None,
+            "label": "ct01",
+            "name": "ct01",
+            "ndim": 0,
+            "nexus_path": "",
+            "normalization": 0,
+            "output": True,
+            "plot_axes": ["<mov>"],
+            "plot_type": 1,
+            "shape": [],
+            "source": "expchan/ctctrl01/1/value",
+        }
+        self._conf = {
+            "controllers": {
+                "ctctrl01": {
+                    "channels": {
+                        "expchan/ctctrl01/1": self._channel,
+                    },
+                    "monitor": "expchan/ctctrl01/1",
+                    "synchronization": 0,
+                    "synchronizer": "software",
+                    "timer": "expchan/ctctrl01/1",
+                },
+            },
+            "description": "Measurement Group",
+            "label": "mg1",
+        }
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # normalize test
+    # \brief It tests normalised configurations
+    def test_normalize(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.assertEqual(MntGrpConf.normalize("{}"), {})
+        self.assertEqual(MntGrpConf.normalize(""), {})
+        conf = copy.deepcopy(self._conf)
+        conf["controllers"]["ctctrl01"]["channels"] = {
+            "ExpChan/CtCtrl01/1": dict(self._channel, shape=(2, 3))}
+        res = MntGrpConf.normalize(json.dumps(conf))
+        self.assertEqual(
+            list(res["controllers"]["ctctrl01"]["channels"].keys()),
+            ["expchan/ctctrl01/1"])
+        ch = res["controllers"]["ctctrl01"]["channels"]["expchan/ctctrl01/1"]
+        self.assertEqual(ch["shape"], [2, 3])
+        self.assertTrue("_controller_name" not in ch)
+        self.assertTrue("_unit_id" not in ch)
+        self.assertTrue("instrument" not in ch)
+        self.assertEqual(ch["full_name"], "expchan/ctctrl01/1")
+        self.assertEqual(MntGrpConf.normalize(res), res)
+
+    # diff test
+    # \brief It tests configuration differences
+    def test_diff(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        conf = copy.deepcopy(self._conf)
+        self.assertEqual(MntGrpConf.diff(conf, self._conf), [])
+        self.assertEqual(
+            MntGrpConf.diff(json.dumps(conf), json.dumps(self._conf)), [])
+
+        # defaults added by the measurement group are ignored
+        current = copy.deepcopy(self._conf)
+        current["timer"] = "expchan/ctctrl01/1"
+        current["controllers"]["ctctrl01"]["channels"][
+            "expchan/ctctrl01/1"]["value_ref_enabled"] = False
+        del current["controllers"]["ctctrl01"]["channels"][
+            "expchan/ctctrl01/1"]["_unit_id"]
+        self.assertEqual(MntGrpConf.diff(current, self._conf), [])
+
+        required = copy.deepcopy(self._conf)
+        required["controllers"]["ctctrl01"]["channels"][
+            "expchan/ctctrl01/1"]["plot_type"] = 0
+        required["controllers"]["ctctrl01"]["channels"][
+            "expchan/ctctrl01/1"]["plot_axes"] = []
+        diff = MntGrpConf.diff(current, required)
+        self.assertEqual(
+            [(df["path"][-1], df["action"], df["old"], df["new"])
+             for df in diff],
+            [("plot_axes", "change", ["<mov>"], []),
+             ("plot_type", "change", 1, 0)])
+        self.assertEqual(
+            MntGrpConf.changedElements(diff),
+            {"controllers": ["ctctrl01"],
+             "channels": ["expchan/ctctrl01/1"],
+             "settings": []})
+
+        required = copy.deepcopy(self._conf)
+        required["controllers"]["__tango__"] = {
+            "channels": {
+                "tango://haso:10000/p/m/1/position": dict(
+                    self._channel, name="mot01")},
+            "synchronization": 0}
+        required["label"] = "mg2"
+        diff = MntGrpConf.diff(self._conf, required)
+        self.assertEqual(
+            [(df["path"], df["action"]) for df in diff],
+            [(["controllers", "__tango__"], "add"),
+             (["label"], "change")])
+        self.assertEqual(
+            MntGrpConf.changedElements(diff),
+            {"controllers": ["__tango__"],
+             "channels": ["tango://haso:10000/p/m/1/position"],
+             "settings": ["label"]})
+
+        diff = MntGrpConf.diff(required, self._conf)
+        self.assertEqual(
+            [(df["path"], df["action"]) for df in diff],
+            [(["controllers", "__tango__"], "remove"),
+             (["label"], "change")])
+
+        required = copy.deepcopy(self._conf)
+        required["controllers"]["ctctrl01"]["channels"] = {
+            "expchan/ctctrl01/2": dict(
+                self._channel, full_name="expchan/ctctrl01/2")}
+        diff = MntGrpConf.diff(self._conf, required)
+        self.assertEqual(
+            [(df["path"], df["action"]) for df in diff],
+            [(["controllers", "ctctrl01", "channels",
+               "expchan/ctctrl01/2"], "add"),
+             (["controllers", "ctctrl01", "channels",
+               "expchan/ctctrl01/1"], "remove")])
+        self.assertEqual(
+            MntGrpConf.changedElements(diff)["channels"],
+            ["expchan/ctctrl01/1", "expchan/ctctrl01/2"])
+
+        self.assertEqual(
+            [df["path"] for df in MntGrpConf.diff({}, self._conf)],
+            [["controllers"], ["description"], ["label"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,6 +67,7 @@ from nxsrecconfig.Selector import Selector
 from nxsrecconfig.Describer import Describer
 from nxsrecconfig.ProfileManager import ProfileManager
 from nxsrecconfig.Utils import MSUtils, Utils
+from nxsrecconfig.Instrumentation import Instrumentation
 
 import logging
 logger = logging.getLogger()
@@ -2882,6 +2883,196 @@ class ProfileManagerTest(unittest.TestCase):
                 finally:
                     tmg.tearDown()
 
+    # mntGrpUpdatePlan test
+    def test_mntGrpUpdatePlan_empty(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        val = {"ConfigDevice": self._cf.dp.name(),
+               "WriterDevice": self._wr.dp.name(),
+               "Door": 'doortestp09/testts/t1r228',
+               "MntGrp": 'nxsmntgrp'}
+
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+        se["Door"] = val["Door"]
+        se["ConfigDevice"] = val["ConfigDevice"]
+        se["WriterDevice"] = val["WriterDevice"]
+        mgt = ProfileManager(se)
+        mgt.masterTimer = True
+        mgt.masterTimerFirst = False
+
+        db = tango.Database()
+        db.put_device_property(list(self._ms.ms.keys())[0],
+                               {'PoolNames': self._pool.dp.name()})
+        pool = self._pool.dp
+        self._ms.dps[list(self._ms.ms.keys())[0]].Init()
+
+        arr = [
+            {"full_name": "test/ct/01/Value", "name": "ct01"},
+        ]
+        pool.AcqChannelList = [json.dumps(a) for a in arr]
+        se["Timer"] = '["ct01"]'
+
+        tmg = TestMGSetUp.TestMeasurementGroupSetUp(name='nxsmntgrp')
+        try:
+            mgdp = tango.DeviceProxy(tmg.new_device_info_writer.name)
+            mgdp.Configuration = "{}"
+            plan = mgt.mntGrpUpdatePlan()
+            self.assertEqual(plan["alias"], "nxsmntgrp")
+            self.assertTrue(plan["changed"])
+            self.assertTrue(not plan["create"])
+            self.assertEqual(plan["controllers"], [])
+            self.assertEqual(plan["channels"], [])
+            self.assertEqual(
+                sorted(plan["settings"]),
+                ["controllers", "description", "label", "monitor", "timer"])
+            self.assertEqual(mgdp.Configuration, "{}")
+
+            jpcnf = mgt.updateProfile()
+            self.assertEqual(mgdp.Configuration, jpcnf)
+            plan = mgt.mntGrpUpdatePlan()
+            self.assertTrue(not plan["changed"])
+            self.assertEqual(plan["differences"], [])
+
+            mgdp.Configuration = jpcnf.replace(
+                "Measurement Group", "My Group")
+            plan = mgt.mntGrpUpdatePlan()
+            self.assertTrue(plan["changed"])
+            self.assertEqual(plan["settings"], ["description"])
+            self.assertEqual(json.loads(mgt.updateProfile()),
+                             json.loads(jpcnf))
+        finally:
+            try:
+                mgt.deleteProfile("nxsmntgrp")
+            finally:
+                tmg.tearDown()
+
+    # updateProfile test
+    def test_updateProfile_cache(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        val = {"ConfigDevice": self._cf.dp.name(),
+               "WriterDevice": self._wr.dp.name(),
+               "Door": 'doortestp09/testts/t1r228',
+               "MntGrp": 'nxsmntgrp'}
+
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+        se["Door"] = val["Door"]
+        se["ConfigDevice"] = val["ConfigDevice"]
+        se["WriterDevice"] = val["WriterDevice"]
+        mgt = ProfileManager(se)
+        mgt.masterTimer = True
+        mgt.masterTimerFirst = False
+        mgt.profileCacheSize = 2
+
+        db = tango.Database()
+        db.put_device_property(list(self._ms.ms.keys())[0],
+                               {'PoolNames': self._pool.dp.name()})
+        pool = self._pool.dp
+        self._ms.dps[list(self._ms.ms.keys())[0]].Init()
+
+        arr = [
+            {"full_name": "test/ct/01/Value", "name": "ct01"},
+            {"full_name": "test/ct/02/Value", "name": "ct02"},
+        ]
+        pool.AcqChannelList = [json.dumps(a) for a in arr]
+        se["Timer"] = '["ct01"]'
+
+        tmg = TestMGSetUp.TestMeasurementGroupSetUp(name='nxsmntgrp')
+        try:
+            mgdp = tango.DeviceProxy(tmg.new_device_info_writer.name)
+            jpcnf = mgt.updateProfile()
+            self.assertEqual(mgdp.Configuration, jpcnf)
+            self.assertEqual(mgt.updateProfile(), jpcnf)
+            mgdp.Configuration = "{}"
+            self.assertEqual(mgt.updateProfile(), jpcnf)
+            self.assertEqual(mgdp.Configuration, jpcnf)
+
+            se["Timer"] = '["ct02"]'
+            jpcnf2 = mgt.updateProfile()
+            self.assertTrue("test/ct/02" in json.loads(jpcnf2)["timer"])
+            se["Timer"] = '["ct01"]'
+            self.assertEqual(mgt.updateProfile(), jpcnf)
+
+            arr[0]["full_name"] = "test/ct/03/Value"
+            pool.AcqChannelList = [json.dumps(a) for a in arr]
+            jpcnf3 = mgt.updateProfile()
+            self.assertTrue("test/ct/03" in json.loads(jpcnf3)["timer"])
+
+            mgt.profileCacheSize = 0
+            self.assertEqual(mgt.updateProfile(), jpcnf3)
+        finally:
+            try:
+                mgt.deleteProfile("nxsmntgrp")
+            finally:
+                tmg.tearDown()
+
+    def test_switchProfile_cache(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        val = {"ConfigDevice": self._cf.dp.name(),
+               "WriterDevice": self._wr.dp.name(),
+               "Door": 'doortestp09/testts/t1r228',
+               "MntGrp": 'nxsmntgrp'}
+
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+        se["Door"] = val["Door"]
+        se["ConfigDevice"] = val["ConfigDevice"]
+        se["WriterDevice"] = val["WriterDevice"]
+        mgt = ProfileManager(se)
+        mgt.masterTimer = True
+        mgt.masterTimerFirst = False
+        mgt.profileCacheSize = 2
+        # tracked configuration server and pool revisions
+        revisions = [1]
+        se.stateKey = lambda: (0, revisions[0])
+
+        db = tango.Database()
+        db.put_device_property(list(self._ms.ms.keys())[0],
+                               {'PoolNames': self._pool.dp.name()})
+        pool = self._pool.dp
+        self._ms.dps[list(self._ms.ms.keys())[0]].Init()
+
+        arr = [
+            {"full_name": "test/ct/01/Value", "name": "ct01"},
+            {"full_name": "test/ct/02/Value", "name": "ct02"},
+        ]
+        pool.AcqChannelList = [json.dumps(a) for a in arr]
+        se["Timer"] = '["ct01"]'
+
+        def switch():
+            Instrumentation.reset()
+            with Instrumentation.command("SwitchProfile"):
+                mgt.switchProfile(False)
+            return [cl["operation"] for cl in Instrumentation.stats()[
+                "commands"]["SwitchProfile"]["calls"]]
+
+        tmg = TestMGSetUp.TestMeasurementGroupSetUp(name='nxsmntgrp')
+        try:
+            Instrumentation.enabled = True
+            mgt.updateProfile()
+            self.assertTrue("dataSources" in switch())
+            selection = se.get()
+            self.assertTrue("dataSources" not in switch())
+            self.assertEqual(se.get(), selection)
+
+            revisions[0] = 2
+            self.assertTrue("dataSources" in switch())
+            self.assertEqual(se.get(), selection)
+
+            mgt.profileCacheSize = 0
+            self.assertTrue("dataSources" in switch())
+            self.assertEqual(se.get(), selection)
+        finally:
+            Instrumentation.enabled = False
+            Instrumentation.reset()
+            try:
+                mgt.deleteProfile("nxsmntgrp")
+            finally:
+                tmg.tearDown()
+
     # updateProfile test
     def test_updateProfile_components_nopool(self):
         fun = sys._getframe().f_code.co_name
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file ProfilingTest.py
+# unittests for Profiling
+#
+import unittest
+import os
+import sys
+import json
+import pstats
+import shutil
+import tempfile
+
+from nxsrecconfig.Profiling import Profiler
+from nxsrecconfig.Instrumentation import NOMEASUREMENT
+
+
+# slow function to be found in hotspots
+def createMntGrpConf(size):
+    return json.dumps([{"name": "ch%s" % i} for i in range(size)])
+
+
+# test fixture
+class ProfilingTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        self.__dir = tempfile.mkdtemp()
+        Profiler.clear()
+        Profiler.directory = self.__dir
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+        Profiler.clear()
+        Profiler.directory = ""
+        Profiler.topN = 20
+        shutil.rmtree(self.__dir)
+
+    # arm test
+    # \brief It tests if only armed invocations are profiled
+    def test_arm(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.assertTrue(Profiler.profile("UpdateMntGrp") is NOMEASUREMENT)
+        Profiler.arm("UpdateMntGrp", 2)
+        Profiler.arm("UpdateProfile")
+        self.assertEqual(Profiler.armed(),
+                         {"UpdateMntGrp": 2, "UpdateProfile": 1})
+        Profiler.arm("UpdateProfile", 0)
+        self.assertEqual(Profiler.armed(), {"UpdateMntGrp": 2})
+        self.assertTrue(Profiler.profile("UpdateProfile") is NOMEASUREMENT)
+
+        for _ in range(3):
+            with Profiler.profile("UpdateMntGrp"):
+                createMntGrpConf(1000)
+        self.assertEqual(Profiler.armed(), {})
+        self.assertEqual(len(Profiler.reports()), 2)
+        self.assertEqual(len(os.listdir(self.__dir)), 2)
+
+    # report test
+    # \brief It tests pstats files and hotspots of profiled commands
+    def test_report(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        Profiler.topN = 5
+        Profiler.arm("UpdateMntGrp")
+        with Profiler.profile("UpdateMntGrp"):
+            createMntGrpConf(20000)
+        reports = json.loads(json.dumps(Profiler.reports()))
+        self.assertEqual(len(reports), 1)
+        report = reports[0]
+        self.assertEqual(report["command"], "UpdateMntGrp")
+        self.assertEqual(report["error"], None)
+        self.assertTrue(report["duration"] > 0)
+        self.assertEqual(os.path.dirname(report["file"]), self.__dir)
+        self.assertTrue(report["file"].endswith(".pstats"))
+        stats = pstats.Stats(report["file"])
+        self.assertTrue(stats.total_calls > 0)
+        hotspots = report["hotspots"]
+        self.assertTrue(0 < len(hotspots) <= 5)
+        self.assertEqual(
+            sorted(hotspots, key=lambda hs: -hs["tottime"]), hotspots)
+        names = [hs["function"] for hs in hotspots]
+        self.assertTrue("createMntGrpConf" in names or
+                        "<listcomp>" in names or "dumps" in names)
+
+        Profiler.directory = os.path.join(self.__dir, "missing")
+        Profiler.arm("UpdateMntGrp")
+        with Profiler.profile("UpdateMntGrp"):
+            createMntGrpConf(10)
+        report = Profiler.reports()[-1]
+        self.assertEqual(report["file"], "")
+        self.assertTrue(report["error"])
+        self.assertTrue(report["hotspots"])
+
+
+if __name__ == '__main__':
+    unittest.main()
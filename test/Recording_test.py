@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file RecordingTest.py
+# unittests for Recording
+#
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+try:
+    import tango
+except Exception:
+    import PyTango as tango
+
+from nxsrecconfig.Recording import (
+    Recorder, RecordingProxy, RecordedObject, encode, decode)
+from nxsrecconfig.Utils import TangoUtils
+
+
+# attribute reading stand-in
+class Reading(object):
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        self.dim_x = 1
+        self.dim_y = 0
+
+
+# configuration server stand-in
+class ConfigServer(object):
+
+    def __init__(self, name):
+        self.__name = name
+        self.__callbacks = []
+
+    def dev_name(self):
+        return self.__name
+
+    def Components(self, names):
+        return ["<definition/>" for _ in names]
+
+    def Broken(self):
+        tango.Except.throw_exception("Broken", "broken", self.__name)
+
+    def read_attribute(self, name):
+        return Reading(name, 12)
+
+    def subscribe_event(self, name, etype, callback):
+        self.__callbacks.append(callback)
+        self.push(name)
+        return len(self.__callbacks)
+
+    def push(self, name):
+        for callback in self.__callbacks:
+            callback(Reading(name, 13))
+
+    def __getattr__(self, name):
+        if name == "Version":
+            return "3.0.0"
+        raise AttributeError(name)
+
+
+# read attribute stand-in
+class Attribute(object):
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def set_value(self, value):
+        self.value = value
+
+    def get_write_value(self):
+        return self.value
+
+
+# device server stand-in
+class Device(object):
+
+    def __init__(self):
+        self.mntgrp = ""
+
+    def read_MntGrp(self, attr):
+        attr.set_value(self.mntgrp)
+
+    def write_MntGrp(self, attr):
+        self.mntgrp = attr.get_write_value()
+
+    def AvailableComponents(self):
+        return TangoUtils.deviceProxy("p09/nxsconfigserver/1").Components(
+            ["mot01", "mot02"])
+
+
+# test fixture
+class RecordingTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        self.__dir = tempfile.mkdtemp()
+        self.__file = os.path.join(self.__dir, "session.jsonl")
+        TangoUtils.proxyFactory = ConfigServer
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+        Recorder.stop()
+        TangoUtils.proxyFactory = None
+        shutil.rmtree(self.__dir)
+
+    def records(self):
+        with open(self.__file) as fl:
+            return [json.loads(line) for line in fl]
+
+    # encode test
+    # \brief It tests restoring of encoded values
+    def test_encode(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for value in [None, True, 3, 2.5, "mot01", [1, "a"],
+                      {"a": [1, 2.5]}, (1, "b"), b"\x00\xff"]:
+            record = json.loads(json.dumps(encode(value)))
+            self.assertEqual(decode(record), value)
+        self.assertEqual(decode(encode(tango.DevState.ALARM)),
+                         tango.DevState.ALARM)
+
+        try:
+            tango.Except.throw_exception("Reason", "description", "origin")
+        except tango.DevFailed as e:
+            error = decode(json.loads(json.dumps(encode(e))))
+        self.assertTrue(isinstance(error, tango.DevFailed))
+        self.assertEqual(error.args[0].reason, "Reason")
+        self.assertEqual(error.args[0].desc, "description")
+        self.assertTrue(isinstance(decode(encode(AttributeError("x"))),
+                                   AttributeError))
+
+        reading = decode(json.loads(json.dumps(encode(
+            Reading("Value", (1.5, 2.5))))))
+        self.assertTrue(isinstance(reading, RecordedObject))
+        self.assertEqual(reading.name, "Value")
+        self.assertEqual(reading.value, (1.5, 2.5))
+        self.assertEqual(reading.dim_x, 1)
+
+    # record test
+    # \brief It tests records of requests and their remote calls
+    def test_record(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        device = Device()
+        Recorder.start(self.__file, "p09/nxsrecselector/1",
+                       {"NumberOfThreads": 2})
+        self.assertTrue(Recorder.active)
+        self.assertEqual(Recorder.filename(), self.__file)
+
+        Recorder.request("write_MntGrp", Device.write_MntGrp, device,
+                         Attribute("nxsmntgrp"))
+        Recorder.request("read_MntGrp", Device.read_MntGrp, device,
+                         Attribute())
+        self.assertEqual(
+            Recorder.request("AvailableComponents",
+                             Device.AvailableComponents, device),
+            ["<definition/>", "<definition/>"])
+        cs = TangoUtils.deviceProxy("p09/nxsconfigserver/1")
+        self.assertTrue(isinstance(cs, RecordingProxy))
+        self.assertEqual(cs.Version, "3.0.0")
+        self.assertRaises(tango.DevFailed, cs.Broken)
+        self.assertFalse(hasattr(cs, "Missing"))
+        Recorder.stop()
+        self.assertFalse(Recorder.active)
+        self.assertEqual(TangoUtils.proxyFactory, ConfigServer)
+        self.assertTrue(isinstance(TangoUtils.deviceProxy("p09/cs/2"),
+                                   ConfigServer))
+
+        records = self.records()
+        self.assertEqual(records[0]["type"], "start")
+        self.assertEqual(records[0]["device"], "p09/nxsrecselector/1")
+        self.assertEqual(records[0]["properties"], {"NumberOfThreads": 2})
+        requests = [rc for rc in records if rc["type"] == "request"]
+        self.assertEqual([rc["name"] for rc in requests],
+                         ["write_MntGrp", "read_MntGrp",
+                          "AvailableComponents"])
+        self.assertEqual([rc["seq"] for rc in requests], [0, 1, 2])
+        self.assertEqual(requests[0]["args"], ["nxsmntgrp"])
+        self.assertEqual(requests[1]["args"], [])
+        self.assertEqual(requests[1]["result"], "nxsmntgrp")
+        self.assertEqual(requests[2]["result"],
+                         ["<definition/>", "<definition/>"])
+
+        calls = [rc for rc in records if rc["type"] in ["open", "call", "get"]]
+        self.assertEqual(
+            [(rc["type"], rc["target"], rc.get("method", rc.get("name")))
+             for rc in calls],
+            [("open", "p09/nxsconfigserver/1", None),
+             ("call", "p09/nxsconfigserver/1", "Components"),
+             ("open", "p09/nxsconfigserver/1", None),
+             ("get", "p09/nxsconfigserver/1", "Version"),
+             ("call", "p09/nxsconfigserver/1", "Broken"),
+             ("get", "p09/nxsconfigserver/1", "Missing")])
+        self.assertEqual(calls[1]["args"], [["mot01", "mot02"]])
+        self.assertEqual(calls[3]["result"], "3.0.0")
+        self.assertEqual(calls[4]["error"]["__error__"][0][0], "Broken")
+        self.assertTrue(isinstance(decode(calls[5]["error"]),
+                                   AttributeError))
+        for rc in calls:
+            self.assertTrue(rc["duration"] >= 0)
+
+    # event test
+    # \brief It tests records of subscribed events
+    def test_events(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        events = []
+        Recorder.start(self.__file)
+        cs = TangoUtils.deviceProxy("p09/nxsconfigserver/1")
+        eid = cs.subscribe_event(
+            "Elements", tango.EventType.CHANGE_EVENT, events.append)
+        self.assertEqual(eid, 1)
+        reading = cs.read_attribute("Elements")
+        self.assertEqual(reading.value, 12)
+        Recorder.request("read_MntGrp", Device.read_MntGrp, Device(),
+                         Attribute())
+        cs._RecordingProxy__proxy.push("Elements")
+        Recorder.stop()
+        self.assertEqual([ev.value for ev in events], [13, 13])
+
+        records = self.records()
+        subscription = [rc for rc in records
+                        if rc.get("method") == "subscribe_event"][0]
+        self.assertEqual(subscription["args"][1],
+                         {"__enum__": ["EventType", "CHANGE_EVENT"]})
+        self.assertEqual(subscription["args"][2], {"__callable__": "append"})
+        self.assertEqual(subscription["result"], 1)
+        evs = [rc for rc in records if rc["type"] == "event"]
+        self.assertEqual([(rc["sid"], rc["sync"], rc["after"]) for rc in evs],
+                         [(subscription["sid"], True, 0),
+                          (subscription["sid"], False, 1)])
+        self.assertEqual(evs[0]["event"]["__object__"]["value"], 13)
+        read = [rc for rc in records if rc.get("method") == "read_attribute"]
+        self.assertEqual(read[0]["result"]["__object__"]["value"], 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
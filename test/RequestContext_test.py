@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file RequestContextTest.py
+# unittests for RequestContext
+#
+import unittest
+import sys
+import json
+
+from nxsrecconfig.RequestContext import RequestContext, CachedPool
+from nxsrecconfig.Utils import PoolUtils
+
+
+# configuration server stand-in counting its calls
+class ConfigServer(object):
+
+    def __init__(self):
+        self.calls = []
+        self.dss = {
+            "ds1": '<?xml version="1.0"?><definition>'
+            '<datasource type="TANGO" name="ds1"><device member="attribute"'
+            ' name="p/m/1"/><record name="pos"/></datasource>'
+            '</definition>',
+            "ds2": '<?xml version="1.0"?><definition>'
+            '<datasource type="CLIENT" name="ds2"><record name="ds2rec"/>'
+            '</datasource></definition>',
+        }
+
+    def availableComponents(self):
+        self.calls.append("availableComponents")
+        return ["cp1"]
+
+    def availableDataSources(self):
+        self.calls.append("availableDataSources")
+        return list(self.dss.keys())
+
+    def dataSources(self, names):
+        self.calls.append(("dataSources", list(names)))
+        return [self.dss[name] for name in names]
+
+
+# pool stand-in counting its attribute reads
+class Pool(object):
+
+    def __init__(self):
+        self.reads = []
+        self.mgs = []
+
+    @property
+    def ExpChannelList(self):
+        self.reads.append("ExpChannelList")
+        return [json.dumps({"name": "ct01", "controller": "ctrl",
+                            "source": "s/ct/1/value"})]
+
+    @property
+    def MeasurementGroupList(self):
+        self.reads.append("MeasurementGroupList")
+        return [json.dumps({"name": mg, "full_name": "mg/%s" % mg})
+                for mg in self.mgs]
+
+    def command_inout(self, name, *args):
+        self.mgs.append(args[0][0])
+
+
+# test fixture
+class RequestContextTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # describer test
+    # \brief It tests if config server data is fetched once
+    def test_describer(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        cs = ConfigServer()
+        ctx = RequestContext(cs)
+        self.assertTrue(ctx.configServer is cs)
+        self.assertEqual(cs.calls, [])
+
+        self.assertEqual(ctx.availableComponents(), ["cp1"])
+        self.assertEqual(ctx.availableComponents(), ["cp1"])
+        self.assertEqual(sorted(ctx.availableDataSources()), ["ds1", "ds2"])
+        self.assertEqual(
+            cs.calls, ["availableComponents", "availableDataSources"])
+
+        ds = ctx.describer()
+        self.assertTrue(ds is ctx.describer())
+        tds = ctx.describer(True)
+        self.assertTrue(tds is ctx.describer(True))
+        self.assertTrue(tds is not ds)
+        self.assertEqual(len(cs.calls), 2)
+
+        res = [json.loads(r) for r in ds.dataSources(["ds1"])]
+        self.assertEqual(
+            res, [{"dsname": "ds1", "dstype": "TANGO",
+                   "record": "p/m/1/pos"}])
+        res = tds.dataSources(["ds1", "ds2"], "CLIENT")[0]
+        self.assertEqual(list(res.keys()), ["ds2"])
+        self.assertEqual(res["ds2"].record, "ds2rec")
+        res = tds.dataSources(["ds2", "ds1"])[0]
+        self.assertEqual(sorted(res.keys()), ["ds1", "ds2"])
+        self.assertEqual(
+            cs.calls[2:],
+            [("dataSources", ["ds1"]), ("dataSources", ["ds2"])])
+
+    # pools test
+    # \brief It tests if pool lists are read once
+    def test_pools(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        pool = Pool()
+        ctx = RequestContext(ConfigServer(), [pool])
+        pools = ctx.pools()
+        self.assertEqual(len(pools), 1)
+        self.assertTrue(isinstance(pools[0], CachedPool))
+        self.assertTrue(pools[0].pool is pool)
+        self.assertTrue(ctx.pools([Pool()]) is pools)
+
+        for _ in range(3):
+            self.assertEqual(
+                PoolUtils.getDeviceControllers(pools), {"ct01": "ctrl"})
+            self.assertEqual(
+                PoolUtils.getChannelSources(pools, ["ct01"]),
+                {"ct01": "s/ct/1/value"})
+        self.assertEqual(pool.reads, ["ExpChannelList"])
+        self.assertTrue(not hasattr(pools[0], "TriggerGateList"))
+
+        self.assertEqual(PoolUtils.getMntGrpName(pools, "mg1"), "")
+        pools[0].command_inout("CreateMeasurementGroup", ["mg1", "ct01"])
+        self.assertEqual(PoolUtils.getMntGrpName(pools, "mg1"), "mg/mg1")
+        self.assertEqual(
+            pool.reads, ["ExpChannelList", "MeasurementGroupList",
+                         "MeasurementGroupList"])
+        ctx.invalidatePools()
+        PoolUtils.getDeviceControllers(pools)
+        self.assertEqual(pool.reads[-1], "ExpChannelList")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -474,6 +474,48 @@ class SelectionTest(unittest.TestCase):
                 self.assertTrue(ds in ndss.keys())
                 self.assertEqual(ndss[ds], None)
 
+    # getValue and setValue test
+    def test_getValue_setValue(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        el = Selection(Version=self.__version)
+        gen = el.generation
+        el["DataSourceSelection"] = '{"ds1": true}'
+        self.assertEqual(el.getValue("DataSourceSelection"), {"ds1": True})
+        self.assertTrue(el.getValue("DataSourceSelection")
+                        is el.getValue("DataSourceSelection"))
+        self.assertEqual(el.getValue("MntGrp"), "")
+        self.assertEqual(el.getValue("AppendEntry"), False)
+        self.assertTrue(el.generation > gen)
+
+        gen = el.generation
+        el["DataSourceSelection"] = '{"ds1": true}'
+        self.assertEqual(el.generation, gen)
+        el.updateDataSourceSelection(["ds1"], [])
+        el.updateComponentSelection()
+        self.assertEqual(el.generation, gen)
+
+        el.setValue("DataSourceSelection", {"ds2": False})
+        self.assertTrue(el.generation > gen)
+        self.assertEqual(dict.__getitem__(el, "DataSourceSelection"),
+                         '{"ds1": true}')
+        self.assertEqual(el.export()["DataSourceSelection"],
+                         '{"ds2": false}')
+        self.assertEqual(el["DataSourceSelection"], '{"ds2": false}')
+
+        el.setValue("Timer", ["ct01"])
+        el.setValue("MntGrp", "mg1")
+        self.assertEqual(el["MntGrp"], "mg1")
+        self.assertEqual(el.getValue("Timer"), ["ct01"])
+        self.assertEqual(el["Timer"], '["ct01"]')
+        el["Timer"] = '["ct02"]'
+        self.assertEqual(el.getValue("Timer"), ["ct02"])
+
+        el.setValue("OrderedChannels", ["ct01"])
+        el.reset()
+        self.assertEqual(el.getValue("OrderedChannels"), [])
+        self.assertEqual(el.export(), dict(self._keys))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1820,6 +1820,231 @@ class SelectorTest(unittest.TestCase):
         dev_info = inst.info()
         self.assertEqual(dev_info.dev_class, "NXSConfigServer")
 
+    def test_setConfigInstance_reuse(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+
+        se["ConfigDevice"] = self._cf.dp.name()
+        inst = se.setConfigInstance()
+        self.assertTrue(isinstance(inst, tango.DeviceProxy))
+        self.assertTrue(inst is se.setConfigInstance())
+        se.configCommand("availableComponents")
+        self.assertTrue(inst is se.setConfigInstance())
+
+        se.resetConfigInstance()
+        inst2 = se.setConfigInstance()
+        self.assertTrue(inst is not inst2)
+        self.assertEqual(inst2.name(), self._cf.dp.name())
+
+        se["ConfigDevice"] = "sdfsfdsf,./wrwrwe/wer"
+        self.myAssertRaise(Exception, se.setConfigInstance)
+        se["ConfigDevice"] = self._cf.dp.name()
+        inst3 = se.setConfigInstance()
+        self.assertTrue(inst3 is not inst2)
+        self.assertEqual(inst3.name(), self._cf.dp.name())
+
+    def test_preGet_inputs(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        reads = []
+
+        class Pool(object):
+            MotorList = [json.dumps({"name": "mot01", "full_name": "m/t/1"})]
+
+        class MSP(MacroServerPools):
+
+            revision = 1
+
+            def getPools(self, door):
+                reads.append(door)
+                return [Pool()]
+
+            def poolRevision(self):
+                return self.revision
+
+            def updateMacroServer(self, door):
+                return ""
+
+        msp = MSP(10)
+        se = Selector(msp, self.__version)
+        self.assertEqual(
+            json.loads(se["PreselectingDataSources"]), ["mot01"])
+        self.assertEqual(se.getValue("PreselectingDataSources"), ["mot01"])
+        self.assertEqual(len(reads), 1)
+
+        msp.revision = 2
+        se["PreselectingDataSources"]
+        self.assertEqual(len(reads), 2)
+        se["PreselectingDataSources"] = '[]'
+        self.assertEqual(se.getValue("PreselectingDataSources"), ["mot01"])
+        self.assertEqual(len(reads), 3)
+        se.invalidate()
+        se["PreselectingDataSources"]
+        self.assertEqual(len(reads), 4)
+
+        msp.revision = None
+        se["PreselectingDataSources"]
+        se["PreselectingDataSources"]
+        self.assertEqual(len(reads), 6)
+
+    def test_storeSelection_delay(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._cf.dp.SetCommandVariable(["SELDICT", json.dumps({})])
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+        se["ConfigDevice"] = self._cf.dp.name()
+        se["MntGrp"] = "nxsmntgrp"
+        se.storeDelay = 60.0
+        for i in range(4):
+            se["UserData"] = json.dumps({"i": i})
+            se.storeSelection()
+        self.assertEqual(
+            json.loads(self._cf.dp.GetCommandVariable("COMMANDS")).count(
+                "StoreSelection"), 0)
+        se.flushSelection()
+        self.assertEqual(
+            json.loads(self._cf.dp.GetCommandVariable("COMMANDS")).count(
+                "StoreSelection"), 1)
+        jcf = json.loads(self._cf.dp.Selections(["nxsmntgrp"])[0])
+        self.assertEqual(json.loads(jcf["UserData"]), {"i": 3})
+
+        se["UserData"] = json.dumps({"i": 4})
+        se.storeSelection()
+        self.assertTrue(se.fetchSelection())
+        self.assertEqual(json.loads(se["UserData"]), {"i": 4})
+        se.storeDelay = 0
+        se.storeSelection()
+        self.assertEqual(
+            json.loads(self._cf.dp.GetCommandVariable("COMMANDS")).count(
+                "StoreSelection"), 3)
+
+    def test_storeSelection_delay_failure(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        errors = []
+
+        class Streams(object):
+
+            def error(self, message):
+                errors.append(message)
+
+        # selection stores fail
+        self._cf.dp.SetCommandVariable(["SELDICT", json.dumps([])])
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+        se.streams = Streams()
+        se["ConfigDevice"] = self._cf.dp.name()
+        se["MntGrp"] = "nxsmntgrp"
+        se.storeDelay = 0.01
+        se["UserData"] = json.dumps({"i": 1})
+        se.storeSelection()
+        for _ in range(500):
+            if errors:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue("nxsmntgrp" in errors[0])
+
+        self._cf.dp.SetCommandVariable(["SELDICT", json.dumps({})])
+        se.flushSelection()
+        jcf = json.loads(self._cf.dp.Selections(["nxsmntgrp"])[0])
+        self.assertEqual(json.loads(jcf["UserData"]), {"i": 1})
+
+    def test_configCommand_retry(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        calls = []
+
+        class ConfigServer(object):
+            version = "3.0.0"
+            lost = []
+            states = []
+
+            def __init__(self, name):
+                self.__name = name
+
+            def ping(self):
+                pass
+
+            def state(self):
+                calls.append("State")
+                return self.states.pop() if self.states \
+                    else tango.DevState.OPEN
+
+            def set_source(self, source):
+                pass
+
+            def storeSelection(self, name):
+                calls.append("StoreSelection")
+
+            def command_inout(self, command, *var):
+                calls.append(command)
+                if command == "Open":
+                    return
+                if command == "deleteComponent":
+                    tango.Except.throw_exception(
+                        "Error", "Component not found", "ConfigServer")
+                if self.lost:
+                    tango.Except.throw_exception(
+                        self.lost.pop(), "Lost connection", "ConfigServer")
+                return ["mycp"]
+
+        msp = MacroServerPools(10)
+        se = Selector(msp, self.__version)
+        try:
+            TangoUtils.proxyFactory = ConfigServer
+            se["ConfigDevice"] = "p09/nxsconfigserver/retry"
+            self.assertEqual(se.configCommand("availableComponents"),
+                             ["mycp"])
+            self.assertEqual(calls, ["Open", "availableComponents"])
+
+            del calls[:]
+            self.myAssertRaise(tango.DevFailed, se.configCommand,
+                               "deleteComponent", "mycp")
+            self.assertEqual(calls, ["deleteComponent"])
+
+            del calls[:]
+            ConfigServer.lost.append("API_DeviceTimedOut")
+            self.assertEqual(se.configCommand("availableComponents"),
+                             ["mycp"])
+            self.assertEqual(calls, ["availableComponents", "Open",
+                                     "availableComponents"])
+
+            del calls[:]
+            ConfigServer.lost.append("API_CommandNotAllowed")
+            self.assertEqual(se.configCommand("availableComponents"),
+                             ["mycp"])
+            self.assertEqual(calls, ["availableComponents", "Open",
+                                     "availableComponents"])
+
+            del calls[:]
+            se.revisionInterval = 0
+            inst = se.setConfigInstance()
+            self.assertTrue(se.setConfigInstance() is inst)
+            self.assertEqual(calls, ["State", "State"])
+
+            del calls[:]
+            ConfigServer.states.append(tango.DevState.ON)
+            self.assertTrue(se.setConfigInstance() is not inst)
+            self.assertEqual(calls, ["State", "Open"])
+
+            # stores to proxy stand-ins are delayed as well
+            del calls[:]
+            se.storeDelay = 60.0
+            se["MntGrp"] = "nxsmntgrp"
+            se.get = lambda: {"MntGrp": "nxsmntgrp"}
+            se.storeSelection()
+            self.assertTrue("StoreSelection" not in calls)
+            se.flushSelection()
+            self.assertEqual(calls.count("StoreSelection"), 1)
+        finally:
+            se.storeDelay = 0
+            TangoUtils.proxyFactory = None
+            se.resetConfigInstance()
+
     def test_configCommand(self):
         fun = sys._getframe().f_code.co_name
         print("Run: %s.%s() " % (self.__class__.__name__, fun))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file SingleFlightTest.py
+# unittests for SingleFlight
+#
+import unittest
+import sys
+import threading
+import time
+
+from nxsrecconfig.SingleFlight import SingleFlight
+
+
+# test fixture
+class SingleFlightTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # concurrent call test
+    # \brief It tests if concurrent calls share one execution
+    def test_call_concurrent(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        sf = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return ["mg1"]
+
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(sf.call(("cmd",), compute)))
+            for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for th in threads[1:]:
+            th.start()
+        time.sleep(0.1)
+        release.set()
+        for th in threads:
+            th.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["mg1"]] * 4)
+
+        self.assertEqual(sf.call(("cmd",), compute), ["mg1"])
+        self.assertEqual(len(calls), 2)
+
+    # result cache test
+    # \brief It tests if results are cached with the post-call key
+    def test_call_ttl(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        sf = SingleFlight(60.0)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return ["mg%s" % len(calls)]
+
+        res = sf.call(("cmd", 1), compute, lambda: ("cmd", 2))
+        self.assertEqual(res, ["mg1"])
+        self.assertEqual(sf.call(("cmd", 2), compute), ["mg1"])
+        self.assertEqual(len(calls), 1)
+        sf.call(("cmd", 2), compute)[0] = "changed"
+        self.assertEqual(sf.call(("cmd", 2), compute), ["mg1"])
+
+        self.assertEqual(sf.call(("cmd", 1), compute), ["mg2"])
+        self.assertEqual(sf.call(("cmd", 3), compute, lambda: None),
+                         ["mg3"])
+        self.assertEqual(sf.call(("cmd", 3), compute), ["mg4"])
+
+        sf.clear()
+        self.assertEqual(sf.call(("cmd", 2), compute), ["mg5"])
+        sf.ttl = 0
+        self.assertEqual(sf.call(("cmd", 4), compute, lambda: ("cmd", 4)),
+                         ["mg6"])
+        self.assertEqual(sf.call(("cmd", 4), compute), ["mg7"])
+
+    # error test
+    # \brief It tests if errors are not cached
+    def test_call_error(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        sf = SingleFlight(60.0)
+
+        def fail():
+            raise ValueError("failed")
+
+        self.assertRaises(
+            ValueError, sf.call, ("cmd",), fail, lambda: ("cmd",))
+        self.assertEqual(sf.call(("cmd",), lambda: 1, lambda: ("cmd",)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2017 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file TracingTest.py
+# unittests for Tracing
+#
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+from nxsrecconfig.Tracing import Tracer, NOSPAN
+from nxsrecconfig.Instrumentation import Instrumentation
+from nxsrecconfig.Utils import Utils, TangoUtils
+
+
+# configuration server stand-in
+class ConfigServer(object):
+
+    def dev_name(self):
+        return "p09/nxsconfigserver/1"
+
+    def components(self, names):
+        return ["<definition/>" for _ in names]
+
+
+# test fixture
+class TracingTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        self.__dir = tempfile.mkdtemp()
+        Tracer.clear()
+        Tracer.enabled = True
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+        Tracer.enabled = False
+        Tracer.maxSpans = 10000
+        Tracer.setFile("")
+        Tracer.clear()
+        shutil.rmtree(self.__dir)
+
+    # disabled test
+    # \brief It tests if disabled tracing records nothing
+    def test_disabled(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        Tracer.enabled = False
+        self.assertTrue(Tracer.trace("UpdateMntGrp") is NOSPAN)
+        with Instrumentation.command("UpdateMntGrp"):
+            self.assertTrue(Instrumentation.span("Describer.components")
+                            is NOSPAN)
+        self.assertEqual(Tracer.lastTrace(), "")
+        Tracer.enabled = True
+        self.assertTrue(Tracer.span("Describer.components") is NOSPAN)
+
+    # spanned test
+    # \brief It tests spans of decorated methods
+    def test_spanned(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        @Instrumentation.spanned("Describer.components")
+        def components(names, strategy=""):
+            """ describes components """
+            return list(names) + [strategy]
+
+        self.assertEqual(components.__name__, "components")
+        self.assertEqual(components.__doc__, " describes components ")
+        with Instrumentation.command("UpdateMntGrp"):
+            self.assertEqual(
+                components(["cp1"], strategy="INIT"), ["cp1", "INIT"])
+            self.assertRaises(TypeError, components, 1)
+
+        trace = json.loads(Tracer.lastTrace("UpdateMntGrp"))
+        self.assertEqual(
+            [child["name"] for child in trace["children"]],
+            ["Describer.components", "Describer.components"])
+
+    # span tree test
+    # \brief It tests span trees of commands and their worker threads
+    def test_trace(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = ConfigServer()
+
+        with Instrumentation.command("UpdateMntGrp"):
+            with Instrumentation.span("ProfileManager.updateProfile",
+                                      sync=False):
+                Instrumentation.stage("configuration")
+                with Instrumentation.span("Describer.components"):
+                    TangoUtils.command(server, "components", ["cp1"])
+                Utils.parallelCall(
+                    lambda name: TangoUtils.command(
+                        server, "components", [name]),
+                    ["cp2", "cp3"], 2)
+        with Instrumentation.command("ResetPreselectedComponents"):
+            pass
+
+        trace = json.loads(Tracer.lastTrace("UpdateMntGrp"))
+        self.assertEqual(trace["name"], "UpdateMntGrp")
+        self.assertEqual(trace["spans"], 6)
+        self.assertEqual(trace["dropped"], 0)
+        self.assertTrue(trace["end"] >= trace["start"])
+        self.assertEqual(len(trace["children"]), 1)
+        update = trace["children"][0]
+        self.assertEqual(update["name"], "ProfileManager.updateProfile")
+        self.assertEqual(update["attributes"], {"sync": False})
+        self.assertEqual(
+            [child["name"] for child in update["children"]],
+            ["Describer.components", "components", "components"])
+        describer = update["children"][0]
+        call = describer["children"][0]
+        self.assertEqual(call["name"], "components")
+        self.assertEqual(call["attributes"],
+                         {"target": "p09/nxsconfigserver/1",
+                          "stage": "configuration", "bytes": 16})
+        self.assertTrue(describer["start"] <= call["start"]
+                        <= call["end"] <= describer["end"])
+        for call in update["children"][1:]:
+            self.assertEqual(call["attributes"]["bytes"], 16)
+
+        trace = json.loads(Tracer.lastTrace())
+        self.assertEqual(trace["name"], "ResetPreselectedComponents")
+        self.assertEqual(trace["children"], [])
+        self.assertEqual(Tracer.lastTrace("UpdateProfile"), "")
+
+    # error and limit test
+    # \brief It tests span errors and the limit of spans
+    def test_trace_limit(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        Tracer.maxSpans = 3
+        try:
+            with Instrumentation.command("PreselectComponents"):
+                for name in ["pilatus", "lambda", "mca"]:
+                    with Instrumentation.call(name, "check") as measurement:
+                        measurement.set("component", "cp_%s" % name)
+                raise Exception("Door is RUNNING")
+        except Exception:
+            pass
+        trace = json.loads(Tracer.lastTrace())
+        self.assertEqual(trace["attributes"], {"error": "Door is RUNNING"})
+        self.assertEqual(trace["spans"], 3)
+        self.assertEqual(trace["dropped"], 1)
+        self.assertEqual(
+            [child["attributes"]["component"]
+             for child in trace["children"]],
+            ["cp_pilatus", "cp_lambda"])
+
+    # trace file test
+    # \brief It tests writing and rotation of the trace file
+    def test_setFile(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        filename = os.path.join(self.__dir, "traces.jsonl")
+        Tracer.setFile(filename, 1000, 2)
+        for _ in range(2):
+            with Instrumentation.command("UpdateProfile"):
+                pass
+        with open(filename) as fl:
+            lines = fl.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        for line in lines:
+            self.assertEqual(json.loads(line)["name"], "UpdateProfile")
+
+        for _ in range(40):
+            with Instrumentation.command("UpdateProfile"):
+                pass
+        self.assertEqual(sorted(os.listdir(self.__dir)),
+                         ["traces.jsonl", "traces.jsonl.1",
+                          "traces.jsonl.2"])
+        for name in os.listdir(self.__dir):
+            self.assertTrue(
+                os.path.getsize(os.path.join(self.__dir, name)) <= 1000)
+
+        Tracer.setFile("")
+        size = os.path.getsize(filename)
+        with Instrumentation.command("UpdateProfile"):
+            pass
+        self.assertEqual(os.path.getsize(filename), size)
+
+
+if __name__ == '__main__':
+    unittest.main()
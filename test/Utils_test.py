@@ -26,6 +26,7 @@ import sys
 import random
 import struct
 import pickle
+import socket
 import json
 import xml.etree.ElementTree as et
 from lxml.etree import XMLParser
@@ -365,6 +366,42 @@ class UtilsTest(unittest.TestCase):
             self.assertEqual(TangoUtils.getFullAttrName(at),
                              "tango://%s:%s/%s" % (host, port, at))
 
+    # getFullAttrName test
+    # \brief It tests cached database host and fqdn names
+    def test_getFullAttrName_cache(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        db = tango.Database()
+        host, port = db.get_db_host(), db.get_db_port()
+        fhost = socket.getfqdn(host)
+        TangoUtils.clearHostCache()
+        self.assertEqual(TangoUtils.getDBHostPort(), (host, port))
+        self.assertEqual(TangoUtils.getFQDN(host), fhost)
+
+        fqdn = socket.getfqdn
+        lookups = []
+
+        def getfqdn(name):
+            lookups.append(name)
+            return fqdn(name)
+
+        try:
+            socket.getfqdn = getfqdn
+            for _ in range(3):
+                self.assertEqual(
+                    TangoUtils.getFullAttrName("sdfs/dasf/sdf", True),
+                    "tango://%s:%s/sdfs/dasf/sdf" % (fhost, port))
+            self.assertEqual(lookups, [])
+            TangoUtils.clearHostCache()
+            for _ in range(3):
+                self.assertEqual(
+                    TangoUtils.getFullAttrName("sdfs/dasf/sdf", True),
+                    "tango://%s:%s/sdfs/dasf/sdf" % (fhost, port))
+            self.assertEqual(lookups, [host])
+        finally:
+            socket.getfqdn = fqdn
+            TangoUtils.clearHostCache()
+
     # openProxy test
     # \brief It tests default settings
     def test_openProxy(self):
@@ -653,6 +690,101 @@ class UtilsTest(unittest.TestCase):
             self.assertEqual('', MSUtils.getEnv(
                 k, list(self._ms.ms.keys())[0]))
 
+    # envSession test
+    def test_envSession(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        arr = {
+            "ScanDir": [u'/tmp/', "/tmp/sardana/"],
+            "ScanFile": [[u'sar4r.nxs'], [u'sar4r.nxs', u'sar5r.nxs']],
+            "ScanID": [192, 123],
+            "ScanNone": ["", "Something new"],
+            "_ViewOptions": [{'ShowDial': True}, {'ShowDial': False}],
+        }
+        ms = self._simps.new_device_info_writer.name
+
+        with MSUtils.envSession(ms) as session:
+            self.assertTrue(MSUtils.activeSession(ms) is session)
+            for k, vl in arr.items():
+                self.assertEqual(vl[0], MSUtils.getEnv(k, ms))
+            for k, vl in arr.items():
+                MSUtils.setEnv(k, vl[1], ms)
+                self.assertEqual(vl[1], MSUtils.getEnv(k, ms))
+            en = Utils.pickleloads(self._simps.dp.Environment[1])['new']
+            for k, vl in arr.items():
+                if vl[0]:
+                    self.assertEqual(en[k], vl[0])
+                else:
+                    self.assertTrue(k not in en)
+            with MSUtils.envSession(ms) as session2:
+                self.assertTrue(session2 is session)
+                MSUtils.usetEnv("ScanNone", ms)
+                self.assertEqual("", MSUtils.getEnv("ScanNone", ms))
+            self.assertTrue(MSUtils.activeSession(ms) is session)
+
+        self.assertTrue(MSUtils.activeSession(ms) is None)
+        en = Utils.pickleloads(self._simps.dp.Environment[1])['new']
+        for k, vl in arr.items():
+            if k == "ScanNone":
+                self.assertTrue(k not in en)
+            else:
+                self.assertEqual(en[k], vl[1])
+                self.assertEqual(vl[1], MSUtils.getEnv(k, ms))
+
+    # envSession test
+    def test_envSession_getEnvironment(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        ms = self._simps.new_device_info_writer.name
+        en = MSUtils.getEnvironment(ms)
+        self.assertEqual(
+            en, Utils.pickleloads(self._simps.dp.Environment[1]))
+        with MSUtils.envSession(ms):
+            MSUtils.setEnvs({"ScanID": 12, "ScanDir": "/tmp/sardana/"}, ms)
+            en2 = MSUtils.getEnvironment(ms)
+            self.assertEqual(en2["new"]["ScanID"], 12)
+            self.assertEqual(en2["new"]["ScanDir"], "/tmp/sardana/")
+            self.assertEqual(en["new"]["ScanID"], 192)
+        en3 = MSUtils.getEnvironment(ms)
+        self.assertEqual(en3, en2)
+
+    # parallelCall test
+    def test_parallelCall(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        def double(arg):
+            if arg == 3:
+                raise Exception("Wrong argument")
+            time.sleep(0.05)
+            return 2 * arg
+
+        self.assertEqual(Utils.parallelCall(double, []), {})
+        res = Utils.parallelCall(double, range(20), 5)
+        self.assertEqual(
+            res, dict((i, 2 * i) for i in range(20) if i != 3))
+        errors = {}
+        res = Utils.parallelCall(double, range(6), 1, errors=errors)
+        self.assertEqual(
+            res, dict((i, 2 * i) for i in range(6) if i != 3))
+        self.assertEqual(list(errors.keys()), [3])
+        self.assertEqual(str(errors[3]), "Wrong argument")
+
+        def wait(arg):
+            time.sleep(2 if arg == 1 else 0)
+            return arg
+
+        res = Utils.parallelCall(wait, range(4), 4, 0.5)
+        self.assertEqual(res, {0: 0, 2: 2, 3: 3})
+
+        self.assertEqual(Utils.roundsTimeout(0, 4, 3.), None)
+        self.assertEqual(Utils.roundsTimeout(10, 4, None), None)
+        self.assertEqual(Utils.roundsTimeout(4, 4, 3.), 3.)
+        self.assertEqual(Utils.roundsTimeout(10, 4, 3.), 9.)
+        self.assertEqual(Utils.roundsTimeout(2, 0, 3.), 6.)
+
     # getProxies test
     def test_getProxies(self):
         fun = sys._getframe().f_code.co_name
@@ -2137,6 +2269,56 @@ class UtilsTest(unittest.TestCase):
                 "ttestp09/testts/t1r228/%s" % k
             ), ar[0], ar[1], ar[2])
 
+    def test_command_getShapeTypeUnit_cache(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = "ttestp09/testts/t1r228/SpectrumLong"
+        ttl = TangoUtils.metadataTTL
+        try:
+            TangoUtils.clearMetadata()
+            TangoUtils.metadataTTL = 100.
+            self._simps.dp.SpectrumLong = self._mca1[0]
+            self.assertEqual(TangoUtils.getShapeTypeUnit(source)[:2],
+                             ([len(self._mca1[0])], 'int32'))
+            self._simps.dp.SpectrumLong = self._mca1[0][:10]
+            self.assertEqual(TangoUtils.getShapeTypeUnit(source)[:2],
+                             ([len(self._mca1[0])], 'int32'))
+            TangoUtils.invalidateMetadata(source)
+            self.assertEqual(TangoUtils.getShapeTypeUnit(source)[:2],
+                             ([10], 'int32'))
+            TangoUtils.metadataTTL = 0
+            self._simps.dp.SpectrumLong = self._mca1[0][:20]
+            self.assertEqual(TangoUtils.getShapeTypeUnit(source)[:2],
+                             ([20], 'int32'))
+        finally:
+            TangoUtils.metadataTTL = ttl
+            TangoUtils.clearMetadata()
+
+    def test_command_getShapeTypeUnit_configShapes(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        flag = TangoUtils.configShapes
+        try:
+            TangoUtils.clearMetadata()
+            TangoUtils.configShapes = True
+            self._simps.dp.SpectrumLong = self._mca1[0][:10]
+            self._simps.dp.ImageLong = self._pco1[0]
+            self.assertEqual(TangoUtils.getShapeTypeUnit(
+                "ttestp09/testts/t1r228/SpectrumLong")[:2],
+                ([4096], 'int32'))
+            self.assertEqual(TangoUtils.getShapeTypeUnit(
+                "ttestp09/testts/t1r228/ImageLong")[:2],
+                ([4096, 4096], 'int32'))
+            TangoUtils.configShapes = False
+            self.assertEqual(TangoUtils.getShapeTypeUnit(
+                "ttestp09/testts/t1r228/SpectrumLong")[:2],
+                ([10], 'int32'))
+        finally:
+            TangoUtils.configShapes = flag
+            TangoUtils.clearMetadata()
+
     def test_getSource(self):
         fun = sys._getframe().f_code.co_name
         print("Run: %s.%s() " % (self.__class__.__name__, fun))
@@ -33,6 +33,14 @@ import DSItem_test
 import ExDSItem_test
 import ExDSDict_test
 import Describer_test
+import RequestContext_test
+import MntGrpConf_test
+import SingleFlight_test
+import JobManager_test
+import Instrumentation_test
+import Tracing_test
+import Profiling_test
+import Recording_test
 import TangoDSItem_test
 import CheckerItem_test
 import CheckerThread_test
@@ -128,6 +136,22 @@ def main():
         unittest.defaultTestLoader.loadTestsFromModule(ExDSDict_test))
     basicsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(Describer_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(RequestContext_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(MntGrpConf_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(SingleFlight_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(JobManager_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(Instrumentation_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(Tracing_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(Profiling_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(Recording_test))
     basicsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(Utils_test))
     basicsuite.addTests(